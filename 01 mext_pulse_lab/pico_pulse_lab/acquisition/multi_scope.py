@@ -0,0 +1,425 @@
+"""
+Parallele Erfassung mit mehreren PicoScopes (ein Worker-Prozess pro Gerät).
+
+Jeder Scope läuft mit eigenem `PicoReader` in einem eigenen Prozess
+(eigener Interpreter, eigenes GIL) und speichert in ein eigenes
+Run-Verzeichnis:
+
+    <base_dir>/<run_name>/<run_name>_<serial>/<run_name>_<serial>.csv
+
+Die Worker schicken ihre Pulse über eine gemeinsame `multiprocessing.Queue`
+an den Manager. Ein Sammel-Thread im Manager ordnet sie nach Erfassungszeit
+(`RawPulse.timestamp`) zu einem einzigen Ereignis-Strom für GUI und
+Auswertung.
+
+Reihenfolge
+-----------
+Pulse eines Scopes kommen in Erfassungsreihenfolge an, zwischen den Scopes
+aber beliebig verschränkt. Ein Ereignis wird weitergegeben, sobald jeder
+noch laufende Scope ein Ereignis mit gleicher oder späterer Zeit geliefert
+hat – spätestens aber `merge_delay_s` nach seinem Zeitstempel (sonst würde
+ein Scope ohne Trigger den ganzen Strom anhalten). Trotzdem zu spät
+eintreffende Ereignisse werden sofort weitergegeben und in `late` gezählt.
+"""
+
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .picoscope_reader import PicoReader
+
+
+# Nachrichten Worker -> Manager: (Art, Scope-Index, Zeitstempel, pulse_id, Nutzdaten)
+_MSG_PULSE = "pulse"
+_MSG_DONE = "done"
+
+
+class ScopeEvent:
+    """
+    Ein Puls im zusammengeführten Ereignis-Strom.
+
+    Attributes
+    ----------
+    timestamp : float
+        Erfassungszeitpunkt (Unix-Zeit der Host-Uhr).
+    serial : str
+        Seriennummer des Scopes.
+    pulse_id : int
+        pulse_id innerhalb des Runs dieses Scopes.
+    pulse : RawPulse or None
+        Rohdaten (None mit `forward_pulses=False`; die Daten liegen dann
+        nur in der Speicherung des Workers).
+    """
+
+    __slots__ = ("timestamp", "serial", "pulse_id", "pulse")
+
+    def __init__(self, timestamp: float, serial: str, pulse_id: int, pulse=None):
+        self.timestamp = timestamp
+        self.serial = serial
+        self.pulse_id = pulse_id
+        self.pulse = pulse
+
+    def __repr__(self) -> str:
+        return f"ScopeEvent(t={self.timestamp:.6f}, serial={self.serial!r}, pulse_id={self.pulse_id})"
+
+
+def _safe_serial(serial: str) -> str:
+    """Seriennummer als Teil eines Verzeichnisnamens ("AB123/0001" -> "AB123-0001")."""
+    return "".join(c if c.isalnum() or c in "-_" else "-" for c in serial)
+
+
+def _scope_worker(index, serial, settings, measure_kwargs, forward_pulses,
+                  backend_factory, events, stop_event):
+    """
+    Läuft im Worker-Prozess: ein PicoReader, eine Messung (interne Funktion).
+
+    Jeder Puls wird sofort als Nachricht an den Manager geschickt; am Ende
+    folgt eine Abschluss-Nachricht mit Zähler, Meta-Daten und ggf. Fehler.
+    """
+    reader = PicoReader(backend=backend_factory(serial) if backend_factory else None)
+    error = None
+    try:
+        reader.configure(serial=serial, **settings)
+
+        def on_pulse(pulse):
+            timestamp = pulse.timestamp if pulse.timestamp is not None else time.time()
+            events.put((_MSG_PULSE, index, timestamp, pulse.pulse_id,
+                        pulse if forward_pulses else None))
+
+        reader.set_raw_callback(on_pulse)
+
+        # stop() des Managers an den Reader weiterreichen
+        def watch_stop():
+            stop_event.wait()
+            reader.stop()
+
+        threading.Thread(target=watch_stop, daemon=True).start()
+        reader.start_measurement(**measure_kwargs)
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        reader.close()
+        events.put((_MSG_DONE, index, None, None, {
+            'pulse_count': reader.pulse_count,
+            'meta': reader.meta,
+            'error': error,
+        }))
+
+
+class MultiScopeManager:
+    """
+    Startet je Scope einen Worker-Prozess und führt die Pulse zusammen.
+
+    Parameters
+    ----------
+    serials : sequence of str
+        Seriennummern der Scopes (z.B. ["AB123/0001", "AB123/0002"]).
+    backend_factory : callable, optional
+        Funktion serial -> SDK-Backend für den `PicoReader` im Worker
+        (Standard: None = picosdk). Muss pickelbar sein (Modul-Funktion
+        oder Klasse, z.B. `SimulatedPS3000A`).
+    forward_pulses : bool, optional
+        Rohdaten jedes Pulses an den Manager schicken (Standard: True).
+        Mit False gehen nur Zeitstempel und pulse_id über die Queue; das
+        entlastet den Manager-Prozess bei hohen Pulsraten.
+    merge_delay_s : float, optional
+        Maximale Verzögerung eines Ereignisses durch das Sortieren
+        (Standard: 0.2 s).
+    mp_context : str, optional
+        Start-Methode für `multiprocessing` ("spawn", "fork", ...;
+        Standard: None = Plattform-Standard).
+
+    Examples
+    --------
+    >>> manager = MultiScopeManager(["AB123/0001", "AB123/0002"])
+    >>> manager.configure("bench", base_dir="Runs", target_fs=20e6, range_a="2V")
+    >>> manager.set_event_callback(lambda ev: print(ev.serial, ev.pulse_id))
+    >>> manager.start(n_pulses=100)
+    >>> manager.wait()
+    """
+
+    def __init__(
+        self,
+        serials: Sequence[str],
+        backend_factory: Optional[Callable] = None,
+        forward_pulses: bool = True,
+        merge_delay_s: float = 0.2,
+        mp_context: Optional[str] = None
+    ):
+        if not serials:
+            raise ValueError("Mindestens eine Seriennummer angeben")
+        if len(set(serials)) != len(serials):
+            raise ValueError("Seriennummern müssen eindeutig sein")
+
+        self.serials: List[str] = list(serials)
+        self.backend_factory = backend_factory
+        self.forward_pulses = bool(forward_pulses)
+        self.merge_delay_s = float(merge_delay_s)
+        self._ctx = multiprocessing.get_context(mp_context)
+
+        self.settings: Dict[str, dict] = {}
+        self.run_dirs: Dict[str, str] = {}
+        self.on_event_callback = None  # Callback: (ScopeEvent) -> None
+        self.events = queue.Queue()    # Ereignisse, falls kein Callback gesetzt ist
+
+        self._processes = []
+        self._stop_events = []
+        self._queue = None
+        self._collector = None
+        self.is_running = False
+
+        # Statistik / Ergebnisse
+        self.received = {}
+        self.results = {}
+        self.emitted = 0
+        self.late = 0
+        self._pending = 0
+
+    def configure(self, run_name: str, base_dir: str = None,
+                  per_scope: Optional[Dict[str, dict]] = None, **settings) -> None:
+        """
+        Setzt die Reader-Konfiguration für alle Scopes.
+
+        Parameters
+        ----------
+        run_name : str
+            Name des Messlaufs; jeder Scope speichert unter
+            `<base_dir>/<run_name>/<run_name>_<serial>`.
+        base_dir : str, optional
+            Basisverzeichnis (Standard: aktuelles Arbeitsverzeichnis / Runs).
+        per_scope : dict, optional
+            Abweichende Einstellungen je Seriennummer, z.B.
+            {"AB123/0002": {"trigger_level_v": -0.5}}.
+        **settings
+            Weitere Argumente für `PicoReader.configure()`.
+        """
+        if base_dir is None:
+            base_dir = os.path.join(os.getcwd(), "Runs")
+        per_scope = per_scope or {}
+        unknown = set(per_scope) - set(self.serials)
+        if unknown:
+            raise ValueError(f"Unbekannte Seriennummern in per_scope: {sorted(unknown)}")
+
+        group_dir = os.path.join(base_dir, run_name)
+        for serial in self.serials:
+            scope_run = f"{run_name}_{_safe_serial(serial)}"
+            self.settings[serial] = dict(settings, **per_scope.get(serial, {}),
+                                         run_name=scope_run, base_dir=group_dir)
+            self.run_dirs[serial] = os.path.join(group_dir, scope_run)
+
+    def set_event_callback(self, callback) -> None:
+        """
+        Setzt einen Callback für jedes Ereignis des zusammengeführten Stroms.
+
+        Der Callback läuft im Sammel-Thread des Managers (nicht im GUI-Thread).
+        Ohne Callback landen die Ereignisse in `self.events` (queue.Queue).
+
+        Parameters
+        ----------
+        callback : callable
+            Funktion mit Signatur: (event: ScopeEvent) -> None.
+        """
+        self.on_event_callback = callback
+
+    def start(self, n_pulses: int = 1, inter_pulse_delay_s: float = 0.0,
+              save_csv: bool = True, save_npz: bool = True) -> None:
+        """
+        Startet die Messung auf allen Scopes (kehrt sofort zurück).
+
+        Parameters
+        ----------
+        n_pulses : int, optional
+            Anzahl Pulse pro Scope (Standard: 1).
+        inter_pulse_delay_s, save_csv, save_npz :
+            Wie bei `PicoReader.start_measurement()`.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn nicht konfiguriert oder bereits eine Messung läuft.
+        """
+        if not self.settings:
+            raise RuntimeError("Manager muss zuerst mit configure() konfiguriert werden")
+        if self.is_running:
+            raise RuntimeError("Messung läuft bereits")
+
+        measure_kwargs = dict(n_pulses=n_pulses, inter_pulse_delay_s=inter_pulse_delay_s,
+                              save_csv=save_csv, save_npz=save_npz)
+        self._queue = self._ctx.Queue()
+        self._stop_events = [self._ctx.Event() for _ in self.serials]
+        self.received = {serial: 0 for serial in self.serials}
+        self.results = {}
+        self.emitted = self.late = self._pending = 0
+
+        self._processes = []
+        for index, serial in enumerate(self.serials):
+            process = self._ctx.Process(
+                target=_scope_worker,
+                args=(index, serial, self.settings[serial], measure_kwargs, self.forward_pulses,
+                      self.backend_factory, self._queue, self._stop_events[index]),
+                name=f"scope-{_safe_serial(serial)}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        self.is_running = True
+        self._collector = threading.Thread(target=self._collect_loop, daemon=True)
+        self._collector.start()
+
+    def stop(self, timeout_s: float = 0.0) -> bool:
+        """
+        Bricht die Messung auf allen Scopes ab (siehe `PicoReader.stop()`).
+
+        Bereits erfasste Pulse werden von den Workern noch gespeichert und
+        weitergegeben.
+
+        Returns
+        -------
+        bool
+            True wenn alle Worker beendet sind.
+        """
+        for event in self._stop_events:
+            event.set()
+        return self.wait(timeout_s, raise_errors=False) if timeout_s else not self.is_running
+
+    def wait(self, timeout: float = None, raise_errors: bool = True) -> bool:
+        """
+        Wartet, bis alle Worker fertig und alle Ereignisse weitergegeben sind.
+
+        Returns
+        -------
+        bool
+            True wenn fertig, False nach Ablauf von timeout.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn ein Worker mit Fehler beendet wurde (nur mit raise_errors=True).
+        """
+        if self._collector is not None:
+            self._collector.join(timeout)
+            if self._collector.is_alive():
+                return False
+        for process in self._processes:
+            process.join(1.0)
+
+        errors = {serial: r['error'] for serial, r in self.results.items() if r.get('error')}
+        if errors and raise_errors:
+            raise RuntimeError(f"Fehler in Scope-Workern: {errors}")
+        return True
+
+    def get_status(self) -> dict:
+        """
+        Gibt den Status aller Scopes und des Ereignis-Stroms zurück.
+
+        Returns
+        -------
+        dict
+            - is_running: bool
+            - scopes: dict je Seriennummer (alive, received, pulse_count, error, run_dir)
+            - emitted: int - weitergegebene Ereignisse
+            - pending: int - Ereignisse, die noch auf die Sortierung warten
+            - late: int - außerhalb der Zeitreihenfolge weitergegebene Ereignisse
+        """
+        scopes = {}
+        for index, serial in enumerate(self.serials):
+            result = self.results.get(serial, {})
+            scopes[serial] = {
+                'alive': index < len(self._processes) and self._processes[index].is_alive(),
+                'received': self.received.get(serial, 0),
+                'pulse_count': result.get('pulse_count'),
+                'error': result.get('error'),
+                'run_dir': self.run_dirs.get(serial),
+            }
+        return {
+            'is_running': self.is_running,
+            'scopes': scopes,
+            'emitted': self.emitted,
+            'pending': self._pending,
+            'late': self.late,
+        }
+
+    # ---------- Sammel-Thread ----------
+    def _collect_loop(self) -> None:
+        """Empfängt Worker-Nachrichten und gibt sie zeitlich sortiert weiter (interne Funktion)."""
+        heap = []
+        seq = itertools.count()
+        running = set(range(len(self.serials)))
+        last_ts = {index: -math.inf for index in running}
+        last_emitted = -math.inf
+        poll_s = max(0.005, self.merge_delay_s / 4)
+
+        def receive(message):
+            kind, index, timestamp, pulse_id, payload = message
+            serial = self.serials[index]
+            if kind == _MSG_PULSE:
+                heapq.heappush(heap, (timestamp, next(seq), serial, pulse_id, payload))
+                last_ts[index] = max(last_ts[index], timestamp)
+                self.received[serial] += 1
+            else:
+                self.results[serial] = payload
+                running.discard(index)
+
+        try:
+            while running or heap:
+                try:
+                    receive(self._queue.get(timeout=poll_s))
+                except queue.Empty:
+                    self._reap_dead_workers(running, receive)
+
+                # Weitergeben, was kein laufender Scope mehr überholen kann
+                watermark = min((last_ts[index] for index in running), default=math.inf)
+                deadline = time.time() - self.merge_delay_s
+                while heap and (heap[0][0] <= watermark or heap[0][0] <= deadline):
+                    timestamp, _, serial, pulse_id, payload = heapq.heappop(heap)
+                    if timestamp < last_emitted:
+                        self.late += 1
+                    last_emitted = max(last_emitted, timestamp)
+                    self._deliver(ScopeEvent(timestamp, serial, pulse_id, payload))
+                self._pending = len(heap)
+        finally:
+            self.is_running = False
+
+    def _reap_dead_workers(self, running: set, receive: Callable) -> None:
+        """
+        Markiert Worker, die ohne Abschluss-Nachricht beendet wurden (interne Funktion).
+
+        Ein gerade regulär beendeter Worker kann seine letzten Pulse und die
+        Abschluss-Nachricht noch in der Queue haben: diese werden erst ohne
+        Warten abgeholt (über receive), als Fehler gilt nur ein Worker, dessen
+        Abschluss-Nachricht danach noch fehlt.
+        """
+        dead = [index for index in running if not self._processes[index].is_alive()]
+        if not dead:
+            return
+        while True:
+            try:
+                receive(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for index in dead:
+            if index in running:
+                process = self._processes[index]
+                running.discard(index)
+                self.results[self.serials[index]] = {
+                    'pulse_count': None, 'meta': None,
+                    'error': f"Worker-Prozess beendet (exitcode {process.exitcode})",
+                }
+
+    def _deliver(self, event: ScopeEvent) -> None:
+        """Gibt ein Ereignis an Callback bzw. Queue weiter (interne Funktion)."""
+        self.emitted += 1
+        if self.on_event_callback:
+            try:
+                self.on_event_callback(event)
+            except Exception as e:
+                print(f"[Warnung] Callback-Fehler: {e}")
+        else:
+            self.events.put(event)
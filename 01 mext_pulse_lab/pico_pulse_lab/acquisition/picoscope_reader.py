@@ -10,6 +10,7 @@ import os
 import sys
 import time
 import json
+import threading
 import ctypes as ct # C-Typen für Picoscope SDK
 import numpy as np  
 from datetime import datetime
@@ -33,15 +34,31 @@ except (ImportError, OSError) as e:
     print(f"[Warnung] PicoSDK nicht verfügbar: {e}")
     print("[Warnung] Picoscope-Funktionalität wird im Mock-Modus laufen")
     ps = None
-    assert_pico_ok = lambda x: None  # Dummy-Funktion
     PICO_SDK_AVAILABLE = False
 
+    def assert_pico_ok(status):
+        """Ersatz für picosdk.functions.assert_pico_ok (z.B. für den Simulator)."""
+        if status != 0:
+            raise RuntimeError(f"PicoSDK-Aufruf fehlgeschlagen: Status {status}")
+
 from pico_pulse_lab.storage.csv_writer import (
+    CSV_WRITE_BUFFER,
+    STORAGE_FSYNC_INTERVAL_S,
+    STORAGE_QUEUE_SIZE,
     ensure_csv,
     scan_next_pulse_id,
     append_pulse_to_csv,
+    storage_worker,
     write_meta,
 )
+from pico_pulse_lab.acquisition.pipeline import AcquisitionPipeline, BACKPRESSURE_MODES
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis, aggregate_min_max
+from pico_pulse_lab.acquisition.timebase import TimebaseCache, resolve_timebase, resolve_timebase_cached
+from pico_pulse_lab.acquisition.streaming import StreamingPulseDetector
+from pico_pulse_lab.acquisition.timing import (
+    ARM, CALLBACK, CONVERT, CSV_WRITE, NPZ_WRITE, TIMING_CAPACITY, TRANSFER, TRIGGER_WAIT, StageTimer,
+)
+from pico_pulse_lab.processing.pulse_preprocess import TRIM_REL_THRESHOLD, trim_pulse
 
 
 # ============================================================
@@ -52,7 +69,7 @@ from pico_pulse_lab.storage.csv_writer import (
 RUN_NAME            = "90V_DC_300A-3"   # Messlauf-Name (Ordner+Datei) Pulse_Test_30V_Source_1
 
 # Trigger
-TRIG_LEVEL_V        = -0.2              # Trigger auf CH A (AC), in Volt
+TRIG_LEVEL_V        = -0.2              # Trigger auf CH A (AC), in Volt (nur CH B erfasst: auf CH B)
 AUTO_TRIG_MS        = 0                 # 0 = Warten auf echt Trigger, Zahl = auslösen nach definierter Dauer in ms
 
 # Abtastung / Blocklänge
@@ -66,6 +83,25 @@ OVERSAMPLE          = 1                 # Anazhl der gemittelten ADC Werte pro S
 N_PULSES            = 3
 INTER_PULSE_DELAY_S = 0.0            # z.B. 0.01 für 10 ms Pause
 
+# Erfassungsmodus
+ACQUISITION_MODES   = ("block", "streaming")   # "block" = Hardware-Trigger pro Puls, "streaming" = lückenlos + Software-Trigger
+CHANNEL_SETS        = ("AB", "A", "B")  # erfasste Kanäle: beide, nur Spannung, nur Strom (1 Kanal: doppelte max. Abtastrate und Speichertiefe)
+STREAM_BUFFER_SAMPLES = 1_000_000       # Treiber-Puffer pro Kanal für GetStreamingLatestValues
+PICO_BUSY           = 0x27              # PICO_STATUS["PICO_BUSY"]: noch keine neuen Streaming-Daten
+
+# Binäre Speicherung (save_npz)
+# "npz" = .npz (Zip-Member pro Puls), "store" = .pstore (Anhängen in O(1), siehe storage/pulse_store.py),
+# "memmap" = .i16 (int16 Pulse × Kanäle × Samples, siehe storage/memmap_store.py)
+BINARY_FORMATS      = ("npz", "store", "memmap")
+
+# Warten auf Block-Ende
+READY_MODE          = "callback"        # "callback" = lpReady-Callback + Event (0 % CPU), "poll" = IsReady alle 1 ms
+READY_TIMEOUT_S     = None              # None = unbegrenzt warten, Zahl = TimeoutError nach x Sekunden ohne Trigger
+STOP_TIMEOUT_S      = 0.05              # stop(): max. Zeit bis ps3000aStop (Poll-Takt 1 ms, Callback sofort)
+
+# Zuschneiden auf den aktiven Pulsbereich (siehe processing/pulse_preprocess.py)
+TRIM_MARGIN_SAMPLES = 2_000             # Rand vor/nach dem aktiven Bereich
+
 # Kanal A: Spannung (kleiner Bereich für höhere Auflösung)
 # Werte werden nur gesetzt, wenn SDK verfügbar ist
 if PICO_SDK_AVAILABLE:
@@ -86,6 +122,7 @@ U_PROBE_ATTENUATION = 50.0 # 1:50 Tastkopf, heißt bei 10V => 0,2V an PicoScope
 # u_real = u_measured * u_probe_attenuation
 
 DC_OFFSET_B         = 0.0  # Gleichanteil-Offset
+MAX_ADC_DEFAULT     = 32512 # ps3000aMaximumValue der 8-Bit-Modelle (Fallback im Mock-Modus)
 ROGOWSKI_V_PER_A    = 0.02          # V/A -- wenn None oder 0 -> CSV in Volt
 # 1A = 0.02 V => i_real = 1/rogowski_v_per_a * u_measured
 
@@ -95,13 +132,12 @@ BASE_DIR   = r"C:\Users\mext\Documents\02 Python Schnittstelle STM32 serielle St
 RUN_DIR    = os.path.join(BASE_DIR, "Runs", RUN_NAME) 
 CSV_PATH   = os.path.join(RUN_DIR, f"{RUN_NAME}.csv")
 META_PATH  = os.path.join(RUN_DIR, f"{RUN_NAME}.meta.json")
-os.makedirs(RUN_DIR, exist_ok=True)
 
 
 # ============================================================
 # 2) HELFER
 # ============================================================
-def range_fullscale_volts(v_range_enum):
+def range_fullscale_volts(v_range_enum, backend=None):
     """
     Mapping Pico-Range-Enum -> realer Messbereich in Volt.
     
@@ -120,26 +156,30 @@ def range_fullscale_volts(v_range_enum):
     ----------
     v_range_enum
         Pico-Range-Enum oder String (z.B. "50MV")
+    backend : optional
+        SDK-Modul bzw. Simulator mit `PS3000A_RANGE` (Standard: picosdk)
     
     Returns
     -------
     float
         Messbereich in Volt (z.B. 0.05 für 50MV)
     """
+    sdk = ps if backend is None else backend
+    
     # Dictionary für Range-Mapping (wenn SDK verfügbar)
-    if PICO_SDK_AVAILABLE:
+    if sdk is not None:
         table = {
-            ps.PS3000A_RANGE["PS3000A_20MV"]: 0.02,
-            ps.PS3000A_RANGE["PS3000A_50MV"]: 0.05,
-            ps.PS3000A_RANGE["PS3000A_100MV"]: 0.1,
-            ps.PS3000A_RANGE["PS3000A_200MV"]: 0.2,
-            ps.PS3000A_RANGE["PS3000A_500MV"]: 0.5,
-            ps.PS3000A_RANGE["PS3000A_1V"]: 1.0,
-            ps.PS3000A_RANGE["PS3000A_2V"]: 2.0,
-            ps.PS3000A_RANGE["PS3000A_5V"]: 5.0,
-            ps.PS3000A_RANGE["PS3000A_10V"]: 10.0,
-            ps.PS3000A_RANGE["PS3000A_20V"]: 20.0,
-            ps.PS3000A_RANGE["PS3000A_50V"]: 50.0,
+            sdk.PS3000A_RANGE["PS3000A_20MV"]: 0.02,
+            sdk.PS3000A_RANGE["PS3000A_50MV"]: 0.05,
+            sdk.PS3000A_RANGE["PS3000A_100MV"]: 0.1,
+            sdk.PS3000A_RANGE["PS3000A_200MV"]: 0.2,
+            sdk.PS3000A_RANGE["PS3000A_500MV"]: 0.5,
+            sdk.PS3000A_RANGE["PS3000A_1V"]: 1.0,
+            sdk.PS3000A_RANGE["PS3000A_2V"]: 2.0,
+            sdk.PS3000A_RANGE["PS3000A_5V"]: 5.0,
+            sdk.PS3000A_RANGE["PS3000A_10V"]: 10.0,
+            sdk.PS3000A_RANGE["PS3000A_20V"]: 20.0,
+            sdk.PS3000A_RANGE["PS3000A_50V"]: 50.0,
         }
         # Prüfen ob v_range_enum direkt ein Key ist
         if v_range_enum in table:
@@ -161,11 +201,41 @@ def range_fullscale_volts(v_range_enum):
     return 0.05  # 50MV als Default
 
 
-def pick_timebase(handle, target_fs: float, n_samples: int):
+def read_device_id(handle, backend=None) -> str:
+    """
+    Liest Modell und Seriennummer des geöffneten Geräts (z.B. "3205A/CW123/456").
+
+    Wird als Schlüssel für den Timebase-Cache verwendet. Schlägt die Abfrage
+    fehl, wird "unknown" zurückgegeben. `backend` ersetzt optional das
+    picosdk-Modul (z.B. Simulator).
+    """
+    sdk = ps if backend is None else backend
+    if sdk is None or handle is None:
+        return "mock"
+
+    parts = []
+    for info in (3, 4):                     # PICO_VARIANT_INFO, PICO_BATCH_AND_SERIAL
+        buf = ct.create_string_buffer(64)
+        required = ct.c_int16()
+        status = sdk.ps3000aGetUnitInfo(handle, buf, len(buf), ct.byref(required), info)
+        if status != 0:
+            return "unknown"
+        parts.append(buf.value.decode(errors="replace"))
+    return "/".join(parts)
+
+
+def pick_timebase(handle, target_fs: float, n_samples: int,
+                  n_channels: int = 2, device_id: str = None, use_cache: bool = True,
+                  backend=None, cache_path: str = None):
     """
     Sucht eine Timebase, deren reale Abtastrate möglichst nah an target_fs liegt.
     Das ist nötig, weil der Pico nicht jede beliebige fs direkt unterstützt.
 
+    Der Kandidat wird analytisch aus der 3000A-Formel berechnet, das SDK
+    prüft nur wenige Nachbarn (siehe `acquisition/timebase.py`). Ergebnisse
+    landen in einem Cache auf der Platte, sodass der nächste Start mit einem
+    einzigen `ps3000aGetTimebase2`-Aufruf auskommt.
+
     Parameters
     ----------
     handle : 
@@ -174,6 +244,16 @@ def pick_timebase(handle, target_fs: float, n_samples: int):
         gewünschte Abtastrate (z.B. 20e6 für 20 MS/s)
     n_samples : int
         Anzahl der Samples in einem "Messblock"
+    n_channels : int, optional
+        Anzahl aktiver Kanäle (Teil des Cache-Schlüssels, Standard: 2)
+    device_id : str, optional
+        Modell/Seriennummer für den Cache (Standard: per `read_device_id()`)
+    use_cache : bool, optional
+        Persistenten Cache verwenden (Standard: True)
+    backend : optional
+        Ersatz für das picosdk-Modul, z.B. `SimulatedPS3000A` (Standard: picosdk)
+    cache_path : str, optional
+        Pfad der Cache-Datei (Standard: `timebase.DEFAULT_CACHE_PATH`)
 
     Returns
     -------
@@ -195,8 +275,10 @@ def pick_timebase(handle, target_fs: float, n_samples: int):
     
     Im Mock-Modus wird eine geschätzte Timebase zurückgegeben.
     """
+    sdk = ps if backend is None else backend
+    
     # Mock-Modus: Wenn SDK nicht verfügbar, geschätzte Werte zurückgeben
-    if not PICO_SDK_AVAILABLE or handle is None:
+    if sdk is None or handle is None:
         # Geschätzte Timebase (vereinfacht)
         dt = 1.0 / target_fs
         tb = int(target_fs / 1e6)  # Grobe Schätzung
@@ -204,12 +286,10 @@ def pick_timebase(handle, target_fs: float, n_samples: int):
         print(f"[Mock] Timebase geschätzt: tb={tb}, dt={dt*1e9:.2f} ns, fs={fs/1e6:.2f} MS/s")
         return tb, dt, fs
     
-    # Normale Timebase-Suche
-    best = None                             # beste Kandidat-Paket (Fehler, Timebase, dt, fs)
-    for tb in range(1, 50000):
+    def get_timebase(tb):
         time_interval_ns = ct.c_float()     # Deklaration - Zeitintervall pro Sample in ns
         max_samples = ct.c_int32()          # Deklaration - Maximal mögliche Samples bei dieser Timebase
-        status = ps.ps3000aGetTimebase2(    # Versuch mit Timebase 'tb'
+        status = sdk.ps3000aGetTimebase2(   # Versuch mit Timebase 'tb'
             handle,                         # Welches Gerät?
             tb,                             # Zu prüfende Timabase
             n_samples,                      # Anzahl der gewünschten Samples
@@ -218,20 +298,133 @@ def pick_timebase(handle, target_fs: float, n_samples: int):
             ct.byref(max_samples),          # Wie viele samples gehen maximal?
             0                               # Oversample - hier nicht genutzt - schon vorher gesetzt
         ) # status variable oben ergibt danach => 0 = OK, alles andere = NICHT OK
-        if status == 0:                         # Status PicoScope OK
-            dt = time_interval_ns.value * 1e-9  # Nanosekunden Angabe Umwandlung in Sekunden
-            if dt <= 0:                         # filtert fehlerhafte Werte / durch 0 usw. 
-                continue
-            fs = 1.0 / dt                           # Abtastfrequenz bei gegebenem dt
-            err = abs(fs - target_fs) / target_fs   # relativer Fehler zur Wunschfrequenzs
-            if best is None or err < best[0]:       # Speichern aktueller bester Kandidat
-                best = (err, tb, dt, fs)                # Fehler, Timebase, Zeitabschnitt, Abtastfrequenz
-            if err < 0.02:                          # Abbruch bei Fehler unter 2%
-                break
-    if best is None:    # Fehler abfangen
-        raise RuntimeError("Keine gültige Timebase gefunden.")
-    _, tb, dt, fs = best
-    return tb, dt, fs
+        if status != 0:
+            return None
+        return time_interval_ns.value * 1e-9  # Nanosekunden Angabe Umwandlung in Sekunden
+
+    if not use_cache:
+        return resolve_timebase(get_timebase, target_fs)
+
+    if device_id is None:
+        device_id = read_device_id(handle, sdk)
+    return resolve_timebase_cached(get_timebase, target_fs, n_samples, device_id, n_channels,
+                                   cache=TimebaseCache(cache_path))
+
+
+class BlockReadyWaiter:
+    """
+    Wartet ereignisgesteuert auf das Ende einer Block-Erfassung.
+
+    Statt `ps3000aIsReady` im 1-ms-Takt abzufragen, wird der SDK-Callback
+    `lpReady` an `ps3000aRunBlock` übergeben. Der Treiber ruft ihn aus seinem
+    eigenen Thread auf, sobald der Block fertig ist; der Callback setzt ein
+    `threading.Event`, auf das der Mess-Thread ohne CPU-Last wartet.
+
+    Examples
+    --------
+    >>> waiter = BlockReadyWaiter()
+    >>> waiter.arm()
+    >>> ps.ps3000aRunBlock(handle, pre, post, tb, 1, ct.byref(ti), 0, waiter.callback, None)
+    >>> waiter.wait(timeout_s=5.0)
+    """
+
+    def __init__(self, backend=None):
+        self._event = threading.Event()
+        self._status = None
+        self._cancelled = False
+
+        # Callback-Typ aus dem SDK (richtige Aufrufkonvention je Plattform),
+        # Fallback auf cdecl: void (*)(int16 handle, PICO_STATUS status, void *pParameter)
+        sdk = ps if backend is None else backend
+        block_ready_type = getattr(sdk, "BlockReadyType", None) or ct.CFUNCTYPE(
+            None, ct.c_int16, ct.c_uint32, ct.c_void_p
+        )
+        # Referenz halten, sonst räumt der GC den Callback während der Messung ab
+        self.callback = block_ready_type(self._on_ready)
+
+    def _on_ready(self, handle, status, p_parameter):
+        """Wird vom Treiber-Thread aufgerufen, wenn der Block fertig ist."""
+        self._status = status
+        self._event.set()
+
+    def arm(self) -> None:
+        """Setzt den Zustand vor einem neuen `ps3000aRunBlock` zurück."""
+        self._status = None
+        self._cancelled = False
+        self._event.clear()
+
+    def cancel(self) -> None:
+        """Weckt ein laufendes `wait()` sofort auf (Abbruch aus einem anderen Thread)."""
+        self._cancelled = True
+        self._event.set()
+
+    def wait(self, timeout_s: float = None) -> bool:
+        """
+        Blockiert, bis der Treiber das Block-Ende meldet oder `cancel()` aufgerufen wird.
+
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximale Wartezeit in Sekunden (None = unbegrenzt).
+
+        Returns
+        -------
+        bool
+            True wenn der Block fertig ist, False nach `cancel()`.
+
+        Raises
+        ------
+        TimeoutError
+            Wenn innerhalb von timeout_s kein Block fertig wurde.
+        RuntimeError
+            Wenn der Treiber einen Fehlerstatus meldet.
+        """
+        if not self._event.wait(timeout_s):
+            raise TimeoutError(f"Kein Trigger innerhalb von {timeout_s} s")
+        if self._cancelled:
+            return False
+        if self._status not in (None, 0):
+            raise RuntimeError(f"Block-Erfassung fehlgeschlagen: Status {self._status}")
+        return True
+
+
+def poll_until_ready(handle, timeout_s: float = None, backend=None, cancel_event=None) -> bool:
+    """
+    Fragt `ps3000aIsReady` im 1-ms-Takt ab, bis der Block fertig ist.
+
+    Parameters
+    ----------
+    handle :
+        handle des PicoScopes
+    timeout_s : float, optional
+        Maximale Wartezeit in Sekunden (None = unbegrenzt).
+    backend : optional
+        Ersatz für das picosdk-Modul (Standard: picosdk).
+    cancel_event : threading.Event, optional
+        Ist das Event gesetzt, endet das Warten spätestens nach einem Takt.
+
+    Returns
+    -------
+    bool
+        True wenn der Block fertig ist, False nach Abbruch über cancel_event.
+
+    Raises
+    ------
+    TimeoutError
+        Wenn innerhalb von timeout_s kein Block fertig wurde.
+    """
+    sdk = ps if backend is None else backend
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+    ready = ct.c_int16(0)
+    while True:
+        sdk.ps3000aIsReady(handle, ct.byref(ready))
+        if ready.value:
+            return True
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Kein Trigger innerhalb von {timeout_s} s")
+        time.sleep(0.001)
 
 
 # ============================================================
@@ -249,6 +442,7 @@ def acquire_n_pulses(n_pulses: int = N_PULSES,
     Für neue Projekte sollte die PicoReader-Klasse verwendet werden.
     Falls PicoSDK nicht verfügbar ist, wird die Funktion mit einer Fehlermeldung beendet.
     """
+    os.makedirs(RUN_DIR, exist_ok=True)
     # Prüfen ob SDK verfügbar ist
     if not PICO_SDK_AVAILABLE:
         raise RuntimeError("PicoSDK nicht verfügbar. Für Mock-Messungen verwende PicoReader-Klasse.")
@@ -395,9 +589,13 @@ def acquire_n_pulses(n_pulses: int = N_PULSES,
         # --------------------------------------------------------
         # 9) Messschleife über n_pulses
         # --------------------------------------------------------
+        waiter = BlockReadyWaiter() if READY_MODE == "callback" else None
+
         for k in range(n_pulses):
             # 9.1 Messungen starten
             time_indisposed_ms = ct.c_int32(0)
+            if waiter is not None:
+                waiter.arm()
             assert_pico_ok(
                 ps.ps3000aRunBlock(
                     handle, 
@@ -407,16 +605,16 @@ def acquire_n_pulses(n_pulses: int = N_PULSES,
                     int(OVERSAMPLE),
                     ct.byref(time_indisposed_ms), 
                     0, 
-                    None, 
+                    waiter.callback if waiter is not None else None, # lpReady
                     None
                 )
             )
 
             # 9.2 Warten bis Erfassung wirklich fertig ist
-            ready = ct.c_int16(0)
-            while not ready.value:
-                ps.ps3000aIsReady(handle, ct.byref(ready))
-                time.sleep(0.001) # 1ms Polling-Intervall
+            if waiter is not None:
+                waiter.wait(READY_TIMEOUT_S)             # Event, 0 % CPU
+            else:
+                poll_until_ready(handle, READY_TIMEOUT_S) # 1ms Polling-Intervall
 
             # 9.3 Werte aus dem Gerät holen
             n = ct.c_int32(N_SAMPLES)
@@ -516,15 +714,31 @@ class PicoReader:
     >>> reader.close()
     """
     
-    def __init__(self):
+    def __init__(self, backend=None, timebase_cache_path: str = None):
         """
         Initialisiert den PicoReader.
         
         Das Gerät wird noch nicht geöffnet. Verwende `configure()` und
         `start_measurement()` um Messungen zu starten.
+        
+        Parameters
+        ----------
+        backend : optional
+            Objekt mit der ps3000a-Schnittstelle des picosdk-Moduls, z.B.
+            `SimulatedPS3000A` für Tests ohne Hardware (Standard: picosdk,
+            falls installiert, sonst Mock-Modus).
+        timebase_cache_path : str, optional
+            Pfad des Timebase-Caches (Standard: None =
+            `timebase.DEFAULT_CACHE_PATH`), siehe `configure()`.
         """
+        # SDK-Backend (echtes picosdk-Modul oder Simulator)
+        self.ps = backend if backend is not None else ps
+        self.sdk_available = self.ps is not None
+        
         # Gerät-Handle (wird beim Öffnen gesetzt)
         self.handle = None
+        self.device_id = None  # Modell/Seriennummer (Schlüssel für Timebase-Cache)
+        self.timebase_cache_path = timebase_cache_path  # None = timebase.DEFAULT_CACHE_PATH
         
         # Konfiguration (Default-Werte aus Konstanten oben)
         self.run_name = None
@@ -532,6 +746,14 @@ class PicoReader:
         self.csv_path = None
         self.meta_path = None
         self.npz_path = None
+        self.store_path = None
+        self.memmap_path = None
+        
+        # Binäre Speicherung: "npz", "store" oder "memmap" (siehe BINARY_FORMATS)
+        self.binary_format = "npz"
+        self._run_store = None  # offener MemmapRunStore während einer Messung
+        self._csv_file = None  # offene CSV (Anhängen) während einer Messung
+        self._storage = None   # Speicher-Thread (StorageWorker) während einer Messung
         
         # Trigger-Konfiguration
         self.trigger_level_v = -0.2
@@ -544,11 +766,70 @@ class PicoReader:
         self.n_samples = None  # Wird aus base_samples + pretrig berechnet
         self.oversample = 1
         
+        # Rapid-Block (segmentierter Speicher): 1 = normaler Block-Modus
+        self.n_segments = 1
+        
+        # Erfasste Kanäle ("AB", "A" oder "B", siehe CHANNEL_SETS)
+        self.channels = "AB"
+        
+        # Warten auf Block-Ende: "callback" (lpReady + Event) oder "poll" (IsReady)
+        self.ready_mode = "callback"
+        self.ready_timeout_s = None  # None = unbegrenzt
+        self._ready_waiter = None
+
+        # Zeitmessung je Erfassungsstufe (wird pro Messung neu angelegt)
+        self._timer = StageTimer(capacity=1)
+
+        # Abbruch: stop() setzt das Event, der Mess-Thread meldet Leerlauf über _idle
+        self._stop_event = threading.Event()
+        self._stop_requested_at = None
+        self._idle = threading.Event()
+        self._idle.set()
+        
+        # Bereitschaft für den externen Pulsgeber (siehe wait_armed()) und
+        # Host-Zeit jedes Triggers, erfasst im Mess-Thread
+        self._armed = threading.Event()
+        self.trigger_times = []
+        
+        # Producer/Consumer-Pipeline (Erfassung und Verarbeitung entkoppelt)
+        self.use_pipeline = False
+        self.queue_size = 4
+        self.backpressure = "block"  # "block", "drop_oldest" oder "spill"
+        self._pipeline = None
+        
+        # Rohdaten (int16 + Skalierung) statt float64 speichern
+        self.raw_storage = False
+        
+        # Speicher-Thread: wartende Pulse und fsync-Abstand (siehe csv_writer.StorageWorker)
+        self.storage_queue_size = STORAGE_QUEUE_SIZE
+        self.fsync_interval_s = STORAGE_FSYNC_INTERVAL_S
+        
+        # Erfassungsmodus: "block" oder "streaming" (Software-Trigger)
+        self.acquisition_mode = "block"
+        self.stream_buffer_samples = STREAM_BUFFER_SAMPLES
+        self.stream_ring_samples = None  # None = automatisch
+        self._stream_detector = None
+        
+        # Vorschau: Min/Max je Bin per PS3000A_RATIO_MODE_AGGREGATE (0 = aus)
+        self.preview_points = 0
+        self.prev_a_max = self.prev_a_min = None
+        self.prev_b_max = self.prev_b_min = None
+        
+        # Zuschneiden auf den aktiven Bereich nach GetValues (aus = volle Fensterlänge)
+        self.trim_pulses = False
+        self.trim_margin_samples = TRIM_MARGIN_SAMPLES
+        self.trim_rel_threshold = TRIM_REL_THRESHOLD
+        
+        # Session-Modus: Gerät bleibt zwischen Messungen offen
+        self.keep_open = False
+        self.serial = None  # Seriennummer des zu öffnenden Geräts (None = erstes gefundenes)
+        self._applied = {}  # Zuletzt an das Gerät gesendete Einstellungen (Schlüssel -> Parameter)
+        
         # Kanal A (Spannung)
-        if PICO_SDK_AVAILABLE:
-            self.ch_a = ps.PS3000A_CHANNEL["PS3000A_CHANNEL_A"]
-            self.coupling_a = ps.PS3000A_COUPLING["PS3000A_AC"]
-            self.range_a = ps.PS3000A_RANGE["PS3000A_50MV"]
+        if self.sdk_available:
+            self.ch_a = self.ps.PS3000A_CHANNEL["PS3000A_CHANNEL_A"]
+            self.coupling_a = self.ps.PS3000A_COUPLING["PS3000A_AC"]
+            self.range_a = self.ps.PS3000A_RANGE["PS3000A_50MV"]
         else:
             # Mock-Werte
             self.ch_a = 0
@@ -559,10 +840,10 @@ class PicoReader:
         self.u_probe_attenuation = 50.0
         
         # Kanal B (Strom/Rogowski)
-        if PICO_SDK_AVAILABLE:
-            self.ch_b = ps.PS3000A_CHANNEL["PS3000A_CHANNEL_B"]
-            self.coupling_b = ps.PS3000A_COUPLING["PS3000A_AC"]
-            self.range_b = ps.PS3000A_RANGE["PS3000A_10V"]
+        if self.sdk_available:
+            self.ch_b = self.ps.PS3000A_CHANNEL["PS3000A_CHANNEL_B"]
+            self.coupling_b = self.ps.PS3000A_COUPLING["PS3000A_AC"]
+            self.range_b = self.ps.PS3000A_RANGE["PS3000A_10V"]
         else:
             # Mock-Werte
             self.ch_b = 0
@@ -580,10 +861,14 @@ class PicoReader:
         
         # Callbacks
         self.on_pulse_callback = None  # Callback: (pulse_id, t, u, i) -> None
+        self.on_raw_pulse_callback = None  # Callback: (RawPulse) -> None
+        self.on_preview_callback = None  # Callback: (pulse_id, t, u_min, u_max, i_min, i_max) -> None
         
         # Datenpuffer (werden beim Konfigurieren erstellt)
         self.buf_a = None
         self.buf_b = None
+        self.seg_bufs_a = []  # Rapid-Block: ein Pufferpaar pro Segment
+        self.seg_bufs_b = []
         
         # Timebase und Sampling
         self.timebase = None
@@ -608,7 +893,28 @@ class PicoReader:
         rogowski_v_per_a: float = None,
         pretrig_ratio: float = None,
         base_samples: int = None,
-        oversample: int = None
+        oversample: int = None,
+        n_segments: int = None,
+        ready_mode: str = None,
+        ready_timeout_s: float = None,
+        use_pipeline: bool = None,
+        queue_size: int = None,
+        backpressure: str = None,
+        raw_storage: bool = None,
+        storage_queue_size: int = None,
+        fsync_interval_s: float = None,
+        binary_format: str = None,
+        keep_open: bool = None,
+        acquisition_mode: str = None,
+        stream_buffer_samples: int = None,
+        stream_ring_samples: int = None,
+        preview_points: int = None,
+        serial: str = None,
+        trim_pulses: bool = None,
+        trim_margin_samples: int = None,
+        trim_rel_threshold: float = None,
+        channels: str = None,
+        timebase_cache_path: str = None
     ) -> None:
         """
         Konfiguriert den PicoReader für Messungen.
@@ -647,6 +953,114 @@ class PicoReader:
             Anzahl Samples nach Trigger (Standard: 400000).
         oversample : int, optional
             Oversampling-Faktor (1=kein, 2=mittel über 2 Samples, Standard: 1).
+        n_segments : int, optional
+            Anzahl Speichersegmente für Rapid-Block-Modus (Standard: 1 = normaler
+            Block-Modus). Bei n_segments > 1 wird der Scope-Speicher in N Segmente
+            geteilt, N Trigger werden direkt hintereinander in Hardware erfasst
+            und anschließend gesammelt mit `ps3000aGetValuesBulk` ausgelesen.
+        ready_mode : str, optional
+            Warten auf Block-Ende: "callback" (SDK-Callback `lpReady` +
+            threading.Event, keine CPU-Last, Standard) oder "poll"
+            (`ps3000aIsReady` im 1-ms-Takt).
+        ready_timeout_s : float, optional
+            Maximale Wartezeit auf einen Trigger in Sekunden. Danach wird die
+            Erfassung gestoppt und ein TimeoutError ausgelöst
+            (Standard: None = unbegrenzt).
+        use_pipeline : bool, optional
+            Erfassung und Verarbeitung entkoppeln (Standard: False). Der
+            Mess-Thread füllt einen Pool vorab allokierter int16-Pufferpaare
+            und armiert sofort nach `GetValues` neu; Umrechnung, Callback und
+            Speicherung laufen in einem Consumer-Thread
+            (siehe `acquisition/pipeline.py`).
+        queue_size : int, optional
+            Maximale Anzahl wartender Pulse in der Pipeline (Standard: 4).
+        backpressure : str, optional
+            Verhalten bei voller Pipeline: "block" (Erfassung wartet),
+            "drop_oldest" (ältester Puls wird verworfen) oder "spill"
+            (ältester Puls wird auf die Platte ausgelagert). Standard: "block".
+        raw_storage : bool, optional
+            Pulse als int16-Rohdaten plus Skalierung speichern statt als
+            float64 (Standard: False). Die Umrechnung in Volt/Ampere erfolgt
+            dann erst beim Laden bzw. blockweise beim CSV-Schreiben.
+        storage_queue_size : int, optional
+            Maximale Anzahl Pulse, die auf den Speicher-Thread warten
+            (Standard: 16). CSV und binäre Datei werden in einem eigenen
+            Thread gesammelt geschrieben; die Erfassung reiht nur ein. Ist
+            die Warteschlange voll, wartet die Erfassung – außer bei
+            backpressure="drop_oldest", dann wird der älteste Puls verworfen
+            (Zähler in `meta['storage']`).
+        fsync_interval_s : float, optional
+            Mindestabstand zwischen zwei fsync der Lauf-Dateien in Sekunden
+            (Standard: 1.0; 0 = nach jedem Schreibvorgang, negativ = nur am
+            Ende der Messung).
+        binary_format : str, optional
+            Format der binären Speicherung (`save_npz`): "npz" (Standard,
+            `storage/npz_writer.py`, ein Zip-Member pro Array, das
+            Zip-Verzeichnis wächst mit jedem Puls) oder "store"
+            (`storage/pulse_store.py`, hängt jeden Puls in O(1) an
+            `<run_name>.pstore` an – für lange Läufe) oder "memmap"
+            (`storage/memmap_store.py`, ein int16-Array Pulse × Kanäle ×
+            Samples in `<run_name>.i16`, per `np.memmap` beschrieben – für
+            Dauerläufe; speichert immer Rohdaten, unabhängig von `raw_storage`).
+        keep_open : bool, optional
+            Session-Modus (Standard: False). Das Gerät bleibt nach
+            `start_measurement()` geöffnet; beim nächsten Start werden nur
+            geänderte Einstellungen (SetChannel, SetSimpleTrigger,
+            SetDataBuffer, Segmente, Timebase) erneut gesendet. Schließen
+            mit `close()`.
+        acquisition_mode : str, optional
+            "block" (Hardware-Trigger, ein RunBlock pro Puls, Standard) oder
+            "streaming" (lückenlose Erfassung mit `ps3000aRunStreaming`,
+            Software-Trigger auf fallende Flanke an Kanal A, siehe
+            `acquisition/streaming.py`). Pulse inkl. Pretrigger gehen über
+            dieselben Callbacks wie im Block-Modus.
+        stream_buffer_samples : int, optional
+            Größe des Treiber-Puffers pro Kanal im Streaming-Modus
+            (Standard: 1 000 000).
+        stream_ring_samples : int, optional
+            Größe des Ringpuffers für den Software-Trigger
+            (Standard: None = 8 x Pulslänge, mindestens Pulslänge + 2 x Treiber-Puffer).
+        preview_points : int, optional
+            Anzahl Vorschau-Bins pro Kanal (Standard: 0 = keine Vorschau). Im
+            Block-Modus liefert der Scope Min/Max je Bin per
+            `PS3000A_RATIO_MODE_AGGREGATE` über zusätzliche Puffer
+            (`ps3000aSetDataBuffers`); der Vorschau-Callback feuert direkt
+            nach dem Block, vor der vollen Übertragung. Gibt es weder
+            Speicherung noch Puls-Callbacks, entfällt die volle Übertragung
+            ganz. In Rapid-Block und Streaming wird die Vorschau in Software
+            aus den Rohdaten berechnet.
+        serial : str, optional
+            Seriennummer des Scopes, z.B. "AB123/0001" (Standard: None = erstes
+            gefundenes Gerät). Nötig, wenn mehrere Scopes angeschlossen sind
+            (siehe `acquisition/multi_scope.py`). Ein offenes Gerät mit anderer
+            Seriennummer wird geschlossen.
+        trim_pulses : bool, optional
+            Pulse nach der Übertragung auf den aktiven Bereich zuschneiden
+            (Standard: False). Das Ende der Pulsenergie wird über Schwellwerte
+            auf |i| und |du/dt| bestimmt (siehe `processing/pulse_preprocess.py`);
+            Callbacks und Speicherung erhalten nur diesen Ausschnitt. Der
+            Versatz steht im `t0` jedes Pulses (Zeitspalte bzw. Skalierungs-
+            Metadaten), Statistik in `meta['trim']`.
+        trim_margin_samples : int, optional
+            Rand vor und nach dem aktiven Bereich in Samples (Standard: 2000).
+        trim_rel_threshold : float, optional
+            Schwellwert relativ zum Spitzenwert von |i| bzw. |du/dt|
+            (Standard: 0.01).
+        channels : str, optional
+            Erfasste Kanäle: "AB" (Spannung und Strom, Standard), "A" (nur
+            Spannung) oder "B" (nur Strom). Der abgeschaltete Kanal wird mit
+            `ps3000aSetChannel(enabled=0)` deaktiviert; mit einem Kanal
+            erlaubt der Scope die doppelte Abtastrate (3205A: 500 statt
+            250 MS/s) und die doppelte Speichertiefe. Ist Kanal A aus,
+            triggert der Scope auf Kanal B (gleicher `trigger_level_v`).
+            Pulse enthalten für den fehlenden Kanal None (`RawPulse.adc_u`
+            bzw. `adc_i`, Callback-Argumente u bzw. i); CSV und .npz
+            speichern nur die erfassten Kanäle.
+        timebase_cache_path : str, optional
+            Pfad der JSON-Datei mit aufgelösten Timebases (Standard:
+            ~/.pico_pulse_lab/timebase_cache.json, siehe
+            `acquisition/timebase.py`). Z.B. für Tests oder mehrere
+            Benutzer mit getrennten Caches.
         
         Returns
         -------
@@ -670,6 +1084,8 @@ class PicoReader:
         self.csv_path = os.path.join(self.run_dir, f"{run_name}.csv")
         self.meta_path = os.path.join(self.run_dir, f"{run_name}.meta.json")
         self.npz_path = os.path.join(self.run_dir, f"{run_name}.npz")
+        self.store_path = os.path.join(self.run_dir, f"{run_name}.pstore")
+        self.memmap_path = os.path.join(self.run_dir, f"{run_name}.i16")
         
         # Trigger
         if trigger_level_v is not None:
@@ -684,22 +1100,89 @@ class PicoReader:
             self.base_samples = base_samples
         if oversample is not None:
             self.oversample = oversample
+        if n_segments is not None:
+            if int(n_segments) < 1:
+                raise ValueError("n_segments muss >= 1 sein")
+            self.n_segments = int(n_segments)
+        if ready_mode is not None:
+            if ready_mode not in ("callback", "poll"):
+                raise ValueError("ready_mode muss 'callback' oder 'poll' sein")
+            self.ready_mode = ready_mode
+        if ready_timeout_s is not None:
+            self.ready_timeout_s = ready_timeout_s if ready_timeout_s > 0 else None
+        if use_pipeline is not None:
+            self.use_pipeline = bool(use_pipeline)
+        if queue_size is not None:
+            self.queue_size = int(queue_size)
+        if backpressure is not None:
+            if backpressure not in BACKPRESSURE_MODES:
+                raise ValueError(f"backpressure muss einer von {BACKPRESSURE_MODES} sein")
+            self.backpressure = backpressure
+        if raw_storage is not None:
+            self.raw_storage = bool(raw_storage)
+        if storage_queue_size is not None:
+            if storage_queue_size < 1:
+                raise ValueError("storage_queue_size muss >= 1 sein")
+            self.storage_queue_size = int(storage_queue_size)
+        if fsync_interval_s is not None:
+            self.fsync_interval_s = fsync_interval_s if fsync_interval_s >= 0 else None
+        if binary_format is not None:
+            if binary_format not in BINARY_FORMATS:
+                raise ValueError(f"binary_format muss einer von {BINARY_FORMATS} sein")
+            self.binary_format = binary_format
+        if keep_open is not None:
+            self.keep_open = bool(keep_open)
+        if acquisition_mode is not None:
+            if acquisition_mode not in ACQUISITION_MODES:
+                raise ValueError(f"acquisition_mode muss einer von {ACQUISITION_MODES} sein")
+            self.acquisition_mode = acquisition_mode
+        if stream_buffer_samples is not None:
+            self.stream_buffer_samples = int(stream_buffer_samples)
+        if stream_ring_samples is not None:
+            self.stream_ring_samples = int(stream_ring_samples) if stream_ring_samples > 0 else None
+        if preview_points is not None:
+            if int(preview_points) < 0:
+                raise ValueError("preview_points muss >= 0 sein")
+            self.preview_points = int(preview_points)
+        if trim_pulses is not None:
+            self.trim_pulses = bool(trim_pulses)
+        if trim_margin_samples is not None:
+            if int(trim_margin_samples) < 0:
+                raise ValueError("trim_margin_samples muss >= 0 sein")
+            self.trim_margin_samples = int(trim_margin_samples)
+        if trim_rel_threshold is not None:
+            if not 0.0 < trim_rel_threshold < 1.0:
+                raise ValueError("trim_rel_threshold muss zwischen 0 und 1 liegen")
+            self.trim_rel_threshold = float(trim_rel_threshold)
+        if channels is not None:
+            channels = str(channels).upper()
+            if channels not in CHANNEL_SETS:
+                raise ValueError(f"channels muss einer von {CHANNEL_SETS} sein")
+            self.channels = channels
+        if timebase_cache_path is not None:
+            self.timebase_cache_path = timebase_cache_path
+        if self.acquisition_mode == "streaming" and self.n_segments > 1:
+            raise ValueError("Streaming-Modus unterstützt keinen Rapid-Block (n_segments > 1)")
+        if serial is not None and serial != self.serial:
+            if self.handle is not None:
+                self.close()  # Session gehört zu einem anderen Gerät
+            self.serial = serial
         
         # Gesamtanzahl Samples berechnen
         self.n_samples = self.base_samples + int(self.pretrig_ratio * self.base_samples)
         
         # Kanal A
         if coupling_a is not None:
-            if PICO_SDK_AVAILABLE:
-                self.coupling_a = ps.PS3000A_COUPLING[f"PS3000A_{coupling_a}"]
+            if self.sdk_available:
+                self.coupling_a = self.ps.PS3000A_COUPLING[f"PS3000A_{coupling_a}"]
             else:
                 # Mock: String speichern für später
                 self.coupling_a_str = coupling_a
                 self.coupling_a = 0
         
         if range_a is not None:
-            if PICO_SDK_AVAILABLE:
-                self.range_a = ps.PS3000A_RANGE[f"PS3000A_{range_a}"]
+            if self.sdk_available:
+                self.range_a = self.ps.PS3000A_RANGE[f"PS3000A_{range_a}"]
             else:
                 # Mock: String speichern
                 self.range_a_str = range_a
@@ -709,16 +1192,16 @@ class PicoReader:
         
         # Kanal B
         if coupling_b is not None:
-            if PICO_SDK_AVAILABLE:
-                self.coupling_b = ps.PS3000A_COUPLING[f"PS3000A_{coupling_b}"]
+            if self.sdk_available:
+                self.coupling_b = self.ps.PS3000A_COUPLING[f"PS3000A_{coupling_b}"]
             else:
                 # Mock: String speichern
                 self.coupling_b_str = coupling_b
                 self.coupling_b = 0
         
         if range_b is not None:
-            if PICO_SDK_AVAILABLE:
-                self.range_b = ps.PS3000A_RANGE[f"PS3000A_{range_b}"]
+            if self.sdk_available:
+                self.range_b = self.ps.PS3000A_RANGE[f"PS3000A_{range_b}"]
             else:
                 # Mock: String speichern
                 self.range_b_str = range_b
@@ -746,7 +1229,8 @@ class PicoReader:
         callback : callable, optional
             Funktion mit Signatur: (pulse_id, t, u, i) -> None
             - pulse_id: int - Eindeutige ID des Pulses
-            - t: np.ndarray - Zeitvektor in Sekunden
+            - t: TimeAxis - Zeitachse (t0, dt, n); Array bei Bedarf per
+              `t.to_array()` bzw. `np.asarray(t)`
             - u: np.ndarray - Spannungswerte in Volt
             - i: np.ndarray - Stromwerte in Ampere (oder Volt)
             Falls None: Callback wird entfernt.
@@ -758,6 +1242,135 @@ class PicoReader:
         >>> reader.set_callback(on_pulse)
         """
         self.on_pulse_callback = callback
+
+    def set_raw_callback(self, callback):
+        """
+        Setzt einen Callback, der jeden Puls als RawPulse (int16) erhält.
+        
+        Im Gegensatz zu `set_callback()` wird hier nichts in float umgerechnet;
+        der Empfänger entscheidet selbst, ob und in welchem dtype er
+        `pulse.u()` / `pulse.i()` abruft.
+        
+        Parameters
+        ----------
+        callback : callable, optional
+            Funktion mit Signatur: (pulse: RawPulse) -> None.
+            Falls None: Callback wird entfernt.
+        
+        Examples
+        --------
+        >>> reader.set_raw_callback(lambda p: print(p.pulse_id, p.u(np.float32).max()))
+        """
+        self.on_raw_pulse_callback = callback
+
+    def set_preview_callback(self, callback):
+        """
+        Setzt einen Callback für die Min/Max-Vorschau jedes Pulses.
+        
+        Wird nur aufgerufen, wenn `preview_points > 0` konfiguriert ist. Die
+        Arrays sind float32 und enthalten einen Wert pro Bin.
+        
+        Parameters
+        ----------
+        callback : callable, optional
+            Funktion mit Signatur:
+            (pulse_id: int, t: np.ndarray, u_min, u_max, i_min, i_max) -> None.
+            t ist die Startzeit jedes Bins; Min/Max eines nicht erfassten
+            Kanals sind None. Falls None: Callback wird entfernt.
+        
+        Examples
+        --------
+        >>> reader.configure(run_name="test", preview_points=2000)
+        >>> reader.set_preview_callback(lambda pid, t, u0, u1, i0, i1: ax.fill_between(t, u0, u1))
+        """
+        self.on_preview_callback = callback
+
+    def _preview_ratio(self) -> tuple:
+        """
+        Downsampling-Faktor und Bin-Anzahl der Vorschau (interne Funktion).
+        
+        Returns
+        -------
+        tuple
+            (ratio, n_bins)
+        """
+        ratio = max(1, -(-self.n_samples // self.preview_points))  # aufrunden
+        n_bins = -(-self.n_samples // ratio)
+        return ratio, n_bins
+
+    def _emit_preview(self, pulse_id, a_min, a_max, b_min, b_max, ratio):
+        """
+        Skaliert Min/Max-Rohwerte und ruft den Vorschau-Callback auf (interne Funktion).
+
+        Für einen nicht erfassten Kanal sind Min/Max None.
+        """
+        if not self.on_preview_callback:
+            return
+        scale_u, scale_i = self._channel_scales(self.max_adc.value)
+
+        def scaled(x, scale):
+            return None if x is None else x.astype(np.float32) * np.float32(scale)
+
+        n_bins = len(a_min if a_min is not None else b_min)
+        t = TimeAxis(0.0, ratio * self.dt, n_bins)
+        try:
+            self.on_preview_callback(
+                pulse_id, t,
+                scaled(a_min, scale_u), scaled(a_max, scale_u),
+                scaled(b_min, scale_i), scaled(b_max, scale_i),
+            )
+        except Exception as e:
+            print(f"[Warnung] Vorschau-Callback-Fehler: {e}")
+
+    def _emit_software_preview(self, pulse_id, buf_a, buf_b, n_values):
+        """
+        Vorschau aus bereits übertragenen Rohdaten (Rapid-Block/Streaming, interne Funktion).
+        """
+        if self.preview_points <= 0 or not self.on_preview_callback:
+            return
+        ratio, _ = self._preview_ratio()
+        bins = []
+        for buf in self._enabled_buffers(buf_a, buf_b):
+            if buf is None:
+                bins += [None, None]
+            else:
+                bins += aggregate_min_max(np.frombuffer(buf, dtype=np.int16, count=n_values), ratio)
+        self._emit_preview(pulse_id, *bins, ratio)
+
+    def _enabled_buffers(self, buf_a, buf_b) -> tuple:
+        """
+        Pufferpaar mit None für nicht erfasste Kanäle (interne Funktion).
+        """
+        return (buf_a if "A" in self.channels else None,
+                buf_b if "B" in self.channels else None)
+
+    def _needs_full_data(self, save_csv: bool, save_npz: bool) -> bool:
+        """
+        Ob die volle Auflösung übertragen werden muss (interne Funktion).
+        
+        Ohne Vorschau immer; mit Vorschau nur, wenn gespeichert wird oder ein
+        Puls-Callback die vollen Daten erwartet.
+        """
+        if self.preview_points <= 0:
+            return True
+        return bool(save_csv or save_npz or self.on_pulse_callback or self.on_raw_pulse_callback)
+
+    def _channel_scales(self, max_adc: int) -> tuple:
+        """
+        Skalierungsfaktoren ADC -> Volt (Kanal A) bzw. Ampere/Volt (Kanal B).
+        
+        Returns
+        -------
+        tuple
+            (scale_u, scale_i)
+        """
+        vfs_a = range_fullscale_volts(self.range_a, self.ps)
+        vfs_b = range_fullscale_volts(self.range_b, self.ps)
+        scale_u = vfs_a / max_adc * self.u_probe_attenuation
+        scale_i = vfs_b / max_adc
+        if self.rogowski_v_per_a and self.rogowski_v_per_a > 0:
+            scale_i /= self.rogowski_v_per_a
+        return scale_u, scale_i
     
     def _open_device(self):
         """
@@ -768,113 +1381,919 @@ class PicoReader:
         RuntimeError
             Wenn das Gerät nicht geöffnet werden kann oder SDK nicht verfügbar ist.
         """
-        if not PICO_SDK_AVAILABLE:
+        if not self.sdk_available:
             raise RuntimeError("PicoSDK nicht verfügbar. Picoscope-Gerät kann nicht geöffnet werden.")
         
         # Gerät öffnen
         self.handle = ct.c_int16()
-        status = ps.ps3000aOpenUnit(ct.byref(self.handle), None)
+        serial = self.serial.encode() if self.serial else None
+        status = self.ps.ps3000aOpenUnit(ct.byref(self.handle), serial)
         
         try:
             assert_pico_ok(status)
         except:
             # Versuche alternative Stromversorgung
-            if status in (ps.PICO_POWER_SUPPLY_NOT_CONNECTED, 
-                          ps.PICO_USB3_0_DEVICE_NON_USB3_0_PORT):
-                status = ps.ps3000aChangePowerSource(self.handle, status)
+            if status in (self.ps.PICO_POWER_SUPPLY_NOT_CONNECTED, 
+                          self.ps.PICO_USB3_0_DEVICE_NON_USB3_0_PORT):
+                status = self.ps.ps3000aChangePowerSource(self.handle, status)
                 assert_pico_ok(status)
             else:
                 raise RuntimeError(f"Fehler beim Öffnen des Picoscope-Geräts: Status {status}")
+        
+        # Frisch geöffnetes Gerät: nichts gesetzt, Speicher nicht segmentiert
+        self._applied = {'segments': (1, self.channels)}
+    
+    def _apply(self, key: str, params, setup) -> bool:
+        """
+        Führt `setup()` nur aus, wenn sich `params` seit dem letzten Aufruf geändert hat (interne Funktion).
+        
+        Im Session-Modus werden so nur geänderte Einstellungen erneut an das
+        Gerät gesendet. Schlägt `setup()` fehl, gilt die Einstellung als unbekannt.
+        
+        Returns
+        -------
+        bool
+            True wenn `setup()` ausgeführt wurde.
+        """
+        if key in self._applied and self._applied[key] == params:
+            return False
+        self._applied.pop(key, None)
+        setup()
+        self._applied[key] = params
+        return True
     
     def _setup_channels(self):
         """
         Konfiguriert die Kanäle (interne Funktion).
         """
-        if not PICO_SDK_AVAILABLE:
+        if not self.sdk_available:
             # Mock-Modus: Kanal-Setup übersprungen
             print("[Mock] Kanal-Setup übersprungen (SDK nicht verfügbar)")
             return
         
-        # Kanal A: Spannung
-        assert_pico_ok(ps.ps3000aSetChannel(
-            self.handle,
-            self.ch_a,
-            1,  # enabled
-            self.coupling_a,
-            self.range_a,
-            self.dc_offset_a
-        ))
+        # Kanal A: Spannung (abgeschaltet -> enabled = 0, doppelte fs/Speichertiefe für B)
+        params_a = (self.ch_a, int("A" in self.channels), self.coupling_a, self.range_a, self.dc_offset_a)
+        self._apply('channel_a', params_a,
+                    lambda: assert_pico_ok(self.ps.ps3000aSetChannel(self.handle, *params_a)))
         
         # Kanal B: Strom/Rogowski
-        assert_pico_ok(ps.ps3000aSetChannel(
-            self.handle,
-            self.ch_b,
-            1,  # enabled
-            self.coupling_b,
-            self.range_b,
-            self.dc_offset_b
-        ))
+        params_b = (self.ch_b, int("B" in self.channels), self.coupling_b, self.range_b, self.dc_offset_b)
+        self._apply('channel_b', params_b,
+                    lambda: assert_pico_ok(self.ps.ps3000aSetChannel(self.handle, *params_b)))
     
-    def _setup_trigger(self):
+    def _trigger_channel(self) -> tuple:
+        """
+        Trigger-Kanal und dessen Messbereich (interne Funktion).
+        
+        Kanal A, solange er erfasst wird, sonst Kanal B.
+        
+        Returns
+        -------
+        tuple
+            (Kanal, Messbereich)
+        """
+        if "A" in self.channels:
+            return self.ch_a, self.range_a
+        return self.ch_b, self.range_b
+    
+    def _trigger_adc(self) -> int:
+        """
+        Trigger-Pegel als ADC-Schwellwert auf dem Trigger-Kanal (interne Funktion).
+        
+        Wird vom Hardware-Trigger und vom Software-Trigger im Streaming-Modus
+        gleichermaßen verwendet.
+        """
+        # Vollständiger Bereich in Volt
+        _, v_range = self._trigger_channel()
+        vfs = range_fullscale_volts(v_range, self.ps)
+        
+        # ADC-Schwellwert berechnen
+        return int((self.trigger_level_v / vfs) * self.max_adc.value)
+    
+    def _setup_trigger(self, enabled: bool = True):
         """
         Konfiguriert den Trigger (interne Funktion).
+        
+        Im Streaming-Modus wird der Hardware-Trigger deaktiviert
+        (`enabled=False`), die Flanken sucht dann der Software-Trigger.
         """
-        if not PICO_SDK_AVAILABLE:
+        if not self.sdk_available:
             # Mock-Modus: Trigger wird übersprungen
             print("[Mock] Trigger-Setup übersprungen (SDK nicht verfügbar)")
             return
         
-        # Vollständiger Bereich in Volt
-        vfs_a = range_fullscale_volts(self.range_a)
-        
-        # ADC-Schwellwert berechnen
-        trig_adc = int((self.trigger_level_v / vfs_a) * self.max_adc.value)
+        trig_adc = self._trigger_adc()
         
         # Trigger setzen
-        assert_pico_ok(ps.ps3000aSetSimpleTrigger(
-            self.handle,
-            1,  # aktiv
-            self.ch_a,  # Trigger-Kanal
+        params = (
+            1 if enabled else 0,  # aktiv
+            self._trigger_channel()[0],  # Trigger-Kanal (A, ohne A: B)
             trig_adc,  # ADC-Schwellwert
-            ps.PS3000A_THRESHOLD_DIRECTION["PS3000A_FALLING"],  # fallende Flanke
+            self.ps.PS3000A_THRESHOLD_DIRECTION["PS3000A_FALLING"],  # fallende Flanke
             0,  # delay
             int(self.auto_trig_ms)  # Auto-Trigger
-        ))
+        )
+        self._apply('trigger', params,
+                    lambda: assert_pico_ok(self.ps.ps3000aSetSimpleTrigger(self.handle, *params)))
     
     def _setup_data_buffers(self):
         """
         Erstellt und konfiguriert die Datenpuffer (interne Funktion).
         """
-        if not PICO_SDK_AVAILABLE:
+        # Puffer nur für erfasste Kanäle (sonst None)
+        def allocate(channel):
+            return (ct.c_int16 * self.n_samples)() if channel in self.channels else None
+        
+        if not self.sdk_available:
             # Mock-Modus: Puffer mit Dummy-Werten erstellen
             print("[Mock] Puffer-Setup übersprungen (SDK nicht verfügbar)")
-            self.buf_a = (ct.c_int16 * self.n_samples)()
-            self.buf_b = (ct.c_int16 * self.n_samples)()
+            self.buf_a, self.buf_b = allocate("A"), allocate("B")
+            return
+        
+        # Session: vorhandene, bereits angemeldete Puffer weiterverwenden
+        key = ('block', self.n_samples, self.channels)
+        if self._applied.get('buffers') == key:
             return
         
         # Puffer erstellen
-        self.buf_a = (ct.c_int16 * self.n_samples)()
-        self.buf_b = (ct.c_int16 * self.n_samples)()
+        self.buf_a, self.buf_b = allocate("A"), allocate("B")
         
         # Puffer zuordnen
-        assert_pico_ok(ps.ps3000aSetDataBuffer(
+        self._bind_data_buffers(self.buf_a, self.buf_b)
+        self._applied['buffers'] = key
+
+    def _bind_data_buffers(self, buf_a, buf_b, segment_index: int = 0, n_values: int = None):
+        """
+        Meldet ein Pufferpaar beim Treiber an (interne Funktion).
+
+        Reiner Treiber-Aufruf ohne USB-Transfer; wird im Pipeline-Modus vor
+        jeder Erfassung mit dem nächsten freien Pufferpaar aufgerufen.
+        `n_values` ist die Pufferlänge (Standard: n_samples). Angemeldet
+        werden nur die erfassten Kanäle.
+        """
+        # Angemeldete Puffer ändern sich -> gemerkte Zuordnung ungültig
+        self._applied.pop('buffers', None)
+        n_values = self.n_samples if n_values is None else n_values
+        
+        for channel, buf in zip((self.ch_a, self.ch_b), self._enabled_buffers(buf_a, buf_b)):
+            if buf is None:
+                continue
+            assert_pico_ok(self.ps.ps3000aSetDataBuffer(
+                self.handle,
+                channel,
+                ct.byref(buf),
+                n_values,
+                segment_index,
+                self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]
+            ))
+
+    def _setup_preview_buffers(self):
+        """
+        Meldet Min/Max-Puffer für die Aggregat-Vorschau an (interne Funktion).
+        
+        Die Puffer werden mit `ps3000aSetDataBuffers` im Modus
+        `PS3000A_RATIO_MODE_AGGREGATE` neben den vollen Puffern registriert;
+        `_fetch_preview()` holt dann nur n_bins Min/Max-Paare über USB.
+        """
+        ratio, n_bins = self._preview_ratio()
+        key = (self.n_samples, ratio, self.channels)
+        if self._applied.get('preview') == key:
+            return
+        self._applied.pop('preview', None)
+        
+        def allocate(channel):
+            return (ct.c_int16 * n_bins)() if channel in self.channels else None
+        
+        self.prev_a_max, self.prev_a_min = allocate("A"), allocate("A")
+        self.prev_b_max, self.prev_b_min = allocate("B"), allocate("B")
+        
+        for channel, buf_max, buf_min in ((self.ch_a, self.prev_a_max, self.prev_a_min),
+                                          (self.ch_b, self.prev_b_max, self.prev_b_min)):
+            if buf_max is None:
+                continue
+            assert_pico_ok(self.ps.ps3000aSetDataBuffers(
+                self.handle,
+                channel,
+                ct.byref(buf_max),
+                ct.byref(buf_min),
+                n_bins,
+                0,  # Segment
+                self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_AGGREGATE"]
+            ))
+        self._applied['preview'] = key
+
+    def _fetch_preview(self, pulse_id):
+        """
+        Überträgt die Min/Max-Vorschau des letzten Blocks und ruft den Callback auf (interne Funktion).
+        """
+        ratio, n_bins = self._preview_ratio()
+        # Angefordert wird die Anzahl Roh-Samples; zurück kommt die Anzahl Bins
+        n = ct.c_uint32(self.n_samples)
+        overflow = ct.c_int16()
+        assert_pico_ok(
+            self.ps.ps3000aGetValues(
+                self.handle,
+                0,
+                ct.byref(n),
+                ratio,
+                self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_AGGREGATE"],
+                0,
+                ct.byref(overflow)
+            )
+        )
+        n_bins = min(n.value, n_bins)
+
+        def view(buf):
+            return None if buf is None else np.frombuffer(buf, dtype=np.int16, count=n_bins)
+
+        self._emit_preview(
+            pulse_id,
+            view(self.prev_a_min), view(self.prev_a_max),
+            view(self.prev_b_min), view(self.prev_b_max),
+            ratio
+        )
+
+    def _setup_segments(self):
+        """
+        Teilt den Scope-Speicher für den Rapid-Block-Modus in Segmente (interne Funktion).
+
+        Muss vor `pick_timebase()` aufgerufen werden, da die maximal mögliche
+        Sample-Anzahl danach pro Segment gilt.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn ein Segment nicht genug Platz für n_samples bietet.
+        """
+        key = (self.n_segments, self.channels)
+        if self._applied.get('segments') == key:
+            return
+        
+        # Neue Segmentierung verwirft die Puffer-Zuordnung im Treiber
+        self._applied.pop('segments', None)
+        self._applied.pop('buffers', None)
+        self._applied.pop('preview', None)
+        
+        max_samples = ct.c_int32()
+        assert_pico_ok(self.ps.ps3000aMemorySegments(
             self.handle,
-            self.ch_a,
-            ct.byref(self.buf_a),
-            self.n_samples,
-            0,
-            ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]
+            self.n_segments,
+            ct.byref(max_samples)  # Samples pro Segment (alle Kanäle zusammen)
         ))
+
+        # Alle erfassten Kanäle teilen sich den Segmentspeicher
+        per_channel = max_samples.value // len(self.channels)
+        if per_channel < self.n_samples:
+            raise RuntimeError(
+                f"Segmentspeicher zu klein: {self.n_segments} Segmente erlauben "
+                f"{per_channel} Samples pro Kanal, benötigt {self.n_samples}"
+            )
+
+        assert_pico_ok(self.ps.ps3000aSetNoOfCaptures(self.handle, self.n_segments))
+        self._applied['segments'] = key
+
+    def _setup_segment_buffers(self):
+        """
+        Erstellt ein Pufferpaar pro Segment und ordnet es zu (interne Funktion).
+        """
+        key = ('rapid', self.n_samples, self.n_segments, self.channels)
+        if self._applied.get('buffers') == key:
+            return
         
-        assert_pico_ok(ps.ps3000aSetDataBuffer(
+        def allocate(channel):
+            return [(ct.c_int16 * self.n_samples)() if channel in self.channels else None
+                    for _ in range(self.n_segments)]
+        
+        self.seg_bufs_a, self.seg_bufs_b = allocate("A"), allocate("B")
+
+        for seg in range(self.n_segments):
+            self._bind_data_buffers(self.seg_bufs_a[seg], self.seg_bufs_b[seg], seg)
+        self._applied['buffers'] = key
+
+    def _run_block(self, pre_samples, post_samples):
+        """
+        Startet eine Block-Erfassung (interne Funktion).
+
+        Im Modus "callback" wird der `lpReady`-Callback übergeben, damit
+        `_wait_ready()` ohne Polling auf das Block-Ende warten kann.
+
+        Returns
+        -------
+        int
+            timeIndisposedMs laut Treiber.
+        """
+        lp_ready = None
+        if self.ready_mode == "callback":
+            if self._ready_waiter is None:
+                self._ready_waiter = BlockReadyWaiter(self.ps)
+            self._ready_waiter.arm()
+            lp_ready = self._ready_waiter.callback
+
+        time_indisposed_ms = ct.c_int32(0)
+        assert_pico_ok(
+            self.ps.ps3000aRunBlock(
+                self.handle,
+                pre_samples,
+                post_samples,
+                self.timebase,
+                int(self.oversample),
+                ct.byref(time_indisposed_ms),
+                0,
+                lp_ready,
+                None
+            )
+        )
+        return time_indisposed_ms.value
+
+    def _wait_ready(self) -> bool:
+        """
+        Wartet, bis die laufende Block-Erfassung abgeschlossen ist (interne Funktion).
+
+        Returns
+        -------
+        bool
+            True wenn der Block fertig ist, False nach `stop()`. Die Erfassung
+            ist dann bereits mit `ps3000aStop` beendet.
+
+        Raises
+        ------
+        TimeoutError
+            Wenn innerhalb von `ready_timeout_s` kein Trigger kam. Die Erfassung
+            wird vorher mit `ps3000aStop` abgebrochen.
+        """
+        try:
+            if self._stop_event.is_set():
+                ready = False
+            elif self.ready_mode == "callback":
+                ready = self._ready_waiter.wait(self.ready_timeout_s)
+            else:
+                ready = poll_until_ready(self.handle, self.ready_timeout_s, self.ps, self._stop_event)
+        except TimeoutError:
+            self.ps.ps3000aStop(self.handle)
+            raise
+        if not ready:
+            self._halt_device()
+        return ready
+
+    def _halt_device(self) -> None:
+        """
+        Beendet die laufende Erfassung mit `ps3000aStop` (interne Funktion).
+
+        Nach `stop()` wird die Zeit von der Anforderung bis zur Rückkehr
+        von `ps3000aStop` als `abort_latency_ms` in den Meta-Daten vermerkt.
+        """
+        self.ps.ps3000aStop(self.handle)
+        if self._stop_requested_at is not None and 'abort_latency_ms' not in self.meta:
+            self.meta['abort_latency_ms'] = (time.perf_counter() - self._stop_requested_at) * 1e3
+
+    def _handle_pulse(self, buf_a, buf_b, n_values, t, i_unit, save_csv, save_npz, pulse_id, timestamp):
+        """
+        Übernimmt einen erfassten Puls als RawPulse und verteilt ihn an
+        Callbacks und Speicher.
+
+        Parameters
+        ----------
+        buf_a, buf_b : ctypes-Array
+            Rohdaten-Puffer (int16) von Kanal A und B; der Puffer eines nicht
+            erfassten Kanals wird ignoriert.
+        n_values : int
+            Anzahl gültiger Samples in den Puffern.
+        t : TimeAxis
+            Zeitachse (t0, dt, n) des Erfassungsfensters; wird auf n_values
+            gekürzt.
+        i_unit : str
+            Einheit des Stroms ("A" oder "V").
+        save_csv, save_npz : bool
+            Speicherziele.
+        pulse_id : int
+            Vom Producer bei der Erfassung vergebene ID (siehe `_next_pulse_id()`).
+        timestamp : float
+            Erfassungszeit (time.time()) aus dem Producer, nicht die Zeit der
+            Verarbeitung im Consumer (`MultiScopeManager` sortiert danach).
+        """
+        # Rohdaten übernehmen (int16-Kopie, Puffer ist danach wieder frei)
+        t_ns = time.perf_counter_ns()
+        scale_u, scale_i = self._channel_scales(self.max_adc.value)
+        pulse = RawPulse.from_buffers(
+            pulse_id, *self._enabled_buffers(buf_a, buf_b), n_values,
+            scale_u=scale_u, scale_i=scale_i, dt=self.dt, i_unit=i_unit,
+            timestamp=timestamp
+        )
+        self._dispatch_pulse(pulse, t[:n_values], i_unit, save_csv, save_npz, t_ns)
+
+    def _dispatch_pulse(self, pulse, t, i_unit, save_csv, save_npz, t_convert_ns=None):
+        """
+        Verteilt einen RawPulse an Callbacks und Speicher (interne Funktion).
+        
+        float-Arrays werden hier nur für den float-Callback erzeugt; die
+        Speicherung übernimmt der Speicher-Thread (`_store_batch()`), hier
+        wird der Puls nur eingereiht. Die Zeit für Rohdaten-Kopie (ab
+        t_convert_ns), Zuschneiden und Umrechnung zählt als Stufe "convert",
+        danach "callback"; "csv_write" und "npz_write" misst der Speicher-Thread.
+        """
+        timer = self._timer
+        t_ns = time.perf_counter_ns() if t_convert_ns is None else t_convert_ns
+        if self.trim_pulses:
+            pulse, t = self._trim_pulse(pulse)
+        if self.on_pulse_callback:
+            pulse.u()
+            pulse.i()  # einmal umrechnen (Cache, None ohne Kanal), getrennt vom Callback messbar
+        t_ns = timer.record(CONVERT, t_ns)
+        
+        # Callbacks aufrufen (für Live-Updates)
+        if self.on_raw_pulse_callback:
+            try:
+                self.on_raw_pulse_callback(pulse)
+            except Exception as e:
+                print(f"[Warnung] Callback-Fehler: {e}")
+        
+        if self.on_pulse_callback:
+            try:
+                self.on_pulse_callback(pulse.pulse_id, t, pulse.u(), pulse.i())
+            except Exception as e:
+                print(f"[Warnung] Callback-Fehler: {e}")
+        timer.record(CALLBACK, t_ns)
+
+        # Speicherung: nur einreihen (int16, float-Cache freigeben)
+        if save_csv or save_npz:
+            pulse.release_cache()
+            self._storage.submit((pulse, t))
+
+        # Zähler aktualisieren (pulse_id vergibt der Producer)
+        self.pulse_count += 1
+
+    def _next_pulse_id(self) -> int:
+        """
+        Vergibt die pulse_id einer Erfassung im Producer (interne Funktion).
+
+        Vorschau und gespeicherter Puls tragen dieselbe ID; verwirft die
+        Pipeline einen Puls, bleibt seine ID als Lücke.
+        """
+        pulse_id = self.pulse_id
+        self.pulse_id += 1
+        return pulse_id
+
+    def _open_storage(self, save_csv, save_npz):
+        """
+        Öffnet die CSV zum Anhängen und startet den Speicher-Thread (interne Funktion).
+        """
+        if not (save_csv or save_npz):
+            return
+        if save_csv:
+            self._csv_file = open(self.csv_path, "ab", buffering=CSV_WRITE_BUFFER)
+        self._storage = storage_worker(
+            lambda batch: self._store_batch(batch, save_csv, save_npz),
+            sync=lambda: self._sync_storage(save_csv, save_npz),
+            queue_size=self.storage_queue_size,
+            fsync_interval_s=self.fsync_interval_s,
+            overflow="drop_oldest" if self.backpressure == "drop_oldest" else "block",
+        )
+
+    def _store_batch(self, batch, save_csv, save_npz) -> int:
+        """
+        Schreibt mehrere eingereihte Pulse (Speicher-Thread, interne Funktion).
+
+        CSV: ein Dateizugriff und ein Index-Zugriff für alle Pulse des Batches;
+        binär: die Pulse nacheinander. Die Stufen "csv_write" und "npz_write"
+        werden je Puls mit dem Anteil am Batch erfasst.
+
+        Returns
+        -------
+        int
+            In die CSV geschriebene Bytes.
+        """
+        timer = self._timer
+        nbytes = 0
+        t_ns = time.perf_counter_ns()
+        if save_csv:
+            from pico_pulse_lab.storage.csv_writer import append_pulses_to_csv
+            nbytes = append_pulses_to_csv(self.csv_path, [pulse for pulse, _ in batch], f=self._csv_file)
+            t_ns = self._record_batch(CSV_WRITE, t_ns, len(batch))
+
+        if save_npz:
+            for pulse, t in batch:
+                if self.binary_format == "memmap":
+                    self._run_store.append_pulse(pulse)
+                elif self.binary_format == "store":
+                    from pico_pulse_lab.storage.pulse_store import append_pulse_store, append_raw_pulse_store
+                    if self.raw_storage:
+                        append_raw_pulse_store(self.store_path, pulse)
+                    else:
+                        append_pulse_store(self.store_path, pulse.pulse_id, t, pulse.u(), pulse.i())
+                elif self.raw_storage:
+                    from pico_pulse_lab.storage.npz_writer import append_raw_pulse_npz
+                    append_raw_pulse_npz(self.npz_path, pulse)
+                else:
+                    from pico_pulse_lab.storage.npz_writer import append_pulse_npz
+                    append_pulse_npz(self.npz_path, pulse.pulse_id, t, pulse.u(), pulse.i())
+                pulse.release_cache()
+            self._record_batch(NPZ_WRITE, t_ns, len(batch))
+        return nbytes
+
+    def _record_batch(self, stage, t_start_ns, n) -> int:
+        """Verteilt die Dauer eines Batches gleichmäßig auf seine n Pulse (interne Funktion)."""
+        t_end_ns = time.perf_counter_ns()
+        share = (t_end_ns - t_start_ns) // max(1, n)
+        for _ in range(n):
+            self._timer.record(stage, t_end_ns - share)
+        return t_end_ns
+
+    def _sync_storage(self, save_csv, save_npz):
+        """fsync der Lauf-Dateien (Speicher-Thread, interne Funktion)."""
+        from pico_pulse_lab.storage.csv_index import index_path
+        from pico_pulse_lab.storage.csv_writer import fsync_path
+        if save_csv:
+            self._csv_file.flush()
+            os.fsync(self._csv_file.fileno())
+            if os.path.exists(index_path(self.csv_path)):
+                fsync_path(index_path(self.csv_path))
+        if save_npz:
+            if self.binary_format == "memmap":
+                self._run_store.flush()
+            else:
+                fsync_path(self.store_path if self.binary_format == "store" else self.npz_path)
+
+    def _init_binary_storage(self, i_unit: str):
+        """
+        Legt die binäre Datei des Laufs mit den Metadaten neu an (interne Funktion).
+
+        .npz: Platzhalter-Puls 0 trägt die Metadaten; .pstore: nur META-Datensatz;
+        .i16: bleibt bis `_close_storage()` geöffnet.
+        """
+        if self.binary_format == "memmap":
+            from pico_pulse_lab.storage.memmap_store import MemmapRunStore
+            self._run_store = MemmapRunStore.create(
+                self.memmap_path, self.n_samples, channels=self.channels, dt=self.dt,
+                i_unit=i_unit, meta=self.meta
+            )
+        elif self.binary_format == "store":
+            from pico_pulse_lab.storage.pulse_store import create_pulse_store
+            create_pulse_store(self.store_path, meta=self.meta)
+        else:
+            from pico_pulse_lab.storage.npz_writer import save_pulse_npz
+            save_pulse_npz(
+                self.npz_path, 0,  # pulse_id 0 für Meta
+                np.array([0.0]), np.array([0.0]), np.array([0.0]),
+                meta=self.meta
+            )
+
+    def _close_storage(self):
+        """
+        Schließt offene Speicher der Messung (interne Funktion).
+
+        Der Speicher-Thread schreibt dabei noch wartende Pulse (mit
+        abschließendem fsync); seine Statistik steht danach in `meta['storage']`.
+        """
+        try:
+            if self._storage is not None:
+                storage, self._storage = self._storage, None
+                try:
+                    storage.close()
+                finally:
+                    self.meta['storage'] = storage.get_stats()
+                    print(f"[pico] Speicher: {self.meta['storage']}")
+        finally:
+            if self._csv_file is not None:
+                f, self._csv_file = self._csv_file, None
+                f.close()
+            if self._run_store is not None:
+                store, self._run_store = self._run_store, None
+                store.close()
+
+    def _next_binary_pulse_id(self) -> int:
+        """Nächste freie Pulse-ID in der binären Datei (interne Funktion)."""
+        if self.binary_format == "memmap":
+            return 1  # Datei wird pro Messung neu angelegt
+        if self.binary_format == "store":
+            from pico_pulse_lab.storage.pulse_store import get_all_pulse_ids_store
+            ids = get_all_pulse_ids_store(self.store_path)
+        else:
+            from pico_pulse_lab.storage.npz_writer import get_all_pulse_ids
+            ids = get_all_pulse_ids(self.npz_path)
+        return max(ids) + 1 if ids else 1
+
+    def _trim_pulse(self, pulse):
+        """
+        Schneidet einen Puls auf den aktiven Bereich zu und führt Statistik (interne Funktion).
+
+        Returns
+        -------
+        tuple
+            (zugeschnittener RawPulse, zugehörige TimeAxis)
+        """
+        n_in = pulse.n_samples
+        pulse, (start, stop) = trim_pulse(
+            pulse, self.meta.get('pretrigger_samples', 0),
+            margin_samples=self.trim_margin_samples, rel_threshold=self.trim_rel_threshold
+        )
+        stats = self.meta.setdefault('trim', {})
+        stats['pulses'] = stats.get('pulses', 0) + 1
+        stats['samples_in'] = stats.get('samples_in', 0) + n_in
+        stats['samples_out'] = stats.get('samples_out', 0) + (stop - start)
+        stats['last_start'], stats['last_stop'] = start, stop
+        return pulse, pulse.time_axis()
+
+    def _run_block_loop(self, n_pulses, pre_samples, post_samples, t, i_unit,
+                        inter_pulse_delay_s, save_csv, save_npz):
+        """
+        Messschleife im normalen Block-Modus: ein RunBlock pro Puls (interne Funktion).
+
+        Mit Vorschau (`preview_points > 0`) wird nach jedem Block zuerst die
+        Min/Max-Vorschau übertragen; die volle Auflösung nur, wenn sie
+        gebraucht wird (siehe `_needs_full_data()`).
+        """
+        preview = self.preview_points > 0
+        need_full = self._needs_full_data(save_csv, save_npz)
+
+        for k in range(n_pulses):
+            if self._stop_event.is_set():
+                break
+
+            # Pipeline: nächstes freies Pufferpaar anmelden (Backpressure greift hier)
+            buf_index = None
+            if self._pipeline is not None and need_full:
+                acquired = self._pipeline.acquire_buffers(cancel=self._stop_event)
+                if acquired is None:
+                    break
+                buf_index, buf_a, buf_b = acquired
+                self._bind_data_buffers(buf_a, buf_b)
+            else:
+                buf_a, buf_b = self.buf_a, self.buf_b
+
+            # Block-Messung starten
+            t_ns = time.perf_counter_ns()
+            self._run_block(pre_samples, post_samples)
+            t_ns = self._timer.record(ARM, t_ns)
+            self._armed.set()
+
+            # Warten bis fertig (oder Abbruch durch stop())
+            if not self._wait_ready():
+                if buf_index is not None:
+                    self._pipeline.release(buf_index)
+                break
+            t_ns = self._timer.record(TRIGGER_WAIT, t_ns)
+            timestamp = time.time()
+            self.trigger_times.append(timestamp)
+            pulse_id = self._next_pulse_id()
+
+            # Vorschau sofort (wenige kB über USB)
+            if preview:
+                self._fetch_preview(pulse_id)
+
+            if not need_full:
+                # Niemand braucht die vollen Daten -> Übertragung entfällt
+                self._timer.record(TRANSFER, t_ns)
+                self.pulse_count += 1
+                if inter_pulse_delay_s > 0 and self._stop_event.wait(inter_pulse_delay_s):
+                    break
+                continue
+
+            # Werte holen
+            n = ct.c_int32(self.n_samples)
+            overflow = ct.c_int16()
+            assert_pico_ok(
+                self.ps.ps3000aGetValues(
+                    self.handle,
+                    0,
+                    ct.byref(n),
+                    1,
+                    self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"],
+                    0,
+                    ct.byref(overflow)
+                )
+            )
+            self._timer.record(TRANSFER, t_ns)
+
+            if self._pipeline is not None:
+                # Verarbeitung im Consumer-Thread, sofort neu armieren
+                self._pipeline.submit(buf_index, n.value, overflow.value, info=(pulse_id, timestamp))
+            else:
+                self._handle_pulse(buf_a, buf_b, n.value, t, i_unit, save_csv, save_npz, pulse_id, timestamp)
+
+            # Pause zwischen Pulsen (durch stop() unterbrechbar)
+            if inter_pulse_delay_s > 0 and self._stop_event.wait(inter_pulse_delay_s):
+                break
+
+    def _run_rapid_block_loop(self, n_pulses, pre_samples, post_samples, t, i_unit,
+                              inter_pulse_delay_s, save_csv, save_npz):
+        """
+        Messschleife im Rapid-Block-Modus (interne Funktion).
+
+        Pro RunBlock werden bis zu n_segments Trigger direkt hintereinander in
+        Hardware erfasst (ohne Re-Arm-Totzeit über USB) und danach gesammelt mit
+        `ps3000aGetValuesBulk` übertragen. Jedes Segment durchläuft anschließend
+        den normalen Callback-/Speicherpfad mit eigener pulse_id.
+
+        Nach `stop()` werden die bereits gefüllten Segmente des laufenden
+        Blocks noch übertragen und gespeichert.
+        """
+        remaining = n_pulses
+        n_captures = self.n_segments
+
+        try:
+            while remaining > 0 and not self._stop_event.is_set():
+                # Letzter Block ggf. mit weniger Captures
+                captures = min(self.n_segments, remaining)
+                if captures != n_captures:
+                    assert_pico_ok(self.ps.ps3000aSetNoOfCaptures(self.handle, captures))
+                    n_captures = captures
+
+                # Block-Messung über alle Segmente starten (Trigger-Zeiten einzelner
+                # Segmente kennt nur der Scope -> keine trigger_times)
+                t_ns = time.perf_counter_ns()
+                self._run_block(pre_samples, post_samples)
+                t_ns = self._timer.record(ARM, t_ns)
+                self._armed.set()
+
+                # Warten bis alle Segmente gefüllt sind
+                aborted = not self._wait_ready()
+                t_ns = self._timer.record(TRIGGER_WAIT, t_ns)
+                timestamp = time.time()  # Block-Ende: gemeinsame Erfassungszeit aller Segmente
+                if aborted:
+                    # Abbruch: nur die bis zum Stop gefüllten Segmente übernehmen
+                    n_done = ct.c_uint32(0)
+                    assert_pico_ok(self.ps.ps3000aGetNoOfCaptures(self.handle, ct.byref(n_done)))
+                    captures = min(int(n_done.value), captures)
+                    if captures == 0:
+                        break
+
+                # Alle Segmente in einem Transfer holen
+                n = ct.c_uint32(self.n_samples)
+                overflow = (ct.c_int16 * captures)()
+                assert_pico_ok(
+                    self.ps.ps3000aGetValuesBulk(
+                        self.handle,
+                        ct.byref(n),
+                        0,               # erstes Segment
+                        captures - 1,    # letztes Segment
+                        1,               # kein Downsampling
+                        self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"],
+                        ct.byref(overflow)
+                    )
+                )
+                self._timer.record(TRANSFER, t_ns)
+
+                for seg in range(captures):
+                    pulse_id = self._next_pulse_id()
+                    self._emit_software_preview(
+                        pulse_id, self.seg_bufs_a[seg], self.seg_bufs_b[seg], n.value
+                    )
+                    if self._pipeline is not None:
+                        # Segment in Pool-Puffer kopieren, damit der nächste Block
+                        # sofort gestartet werden kann (stop() bricht das Warten ab)
+                        acquired = self._pipeline.acquire_buffers(cancel=self._stop_event)
+                        if acquired is None:
+                            captures, aborted = seg, True  # restliche Segmente verwerfen
+                            break
+                        buf_index, buf_a, buf_b = acquired
+                        for dst, src in ((buf_a, self.seg_bufs_a[seg]), (buf_b, self.seg_bufs_b[seg])):
+                            if src is not None:
+                                ct.memmove(dst, src, n.value * 2)
+                        self._pipeline.submit(buf_index, n.value, overflow[seg], info=(pulse_id, timestamp))
+                    else:
+                        self._handle_pulse(
+                            self.seg_bufs_a[seg], self.seg_bufs_b[seg], n.value,
+                            t, i_unit, save_csv, save_npz, pulse_id, timestamp
+                        )
+
+                remaining -= captures
+                print(f"[pico] Rapid-Block: {captures} Segmente übertragen, noch {remaining} Pulse")
+                if aborted:
+                    break
+
+                # Pause zwischen Blöcken (durch stop() unterbrechbar)
+                if inter_pulse_delay_s > 0 and remaining > 0 and self._stop_event.wait(inter_pulse_delay_s):
+                    break
+        finally:
+            # Session (keep_open): der nächste Start überspringt _setup_segments()
+            # und erwartet wieder n_segments Captures
+            if n_captures != self.n_segments and \
+                    self.ps.ps3000aSetNoOfCaptures(self.handle, self.n_segments) != 0:
+                self._applied.pop('segments', None)
+
+    def _run_streaming_loop(self, n_pulses, pre_samples, post_samples, t, i_unit,
+                            save_csv, save_npz):
+        """
+        Lückenlose Streaming-Erfassung mit Software-Trigger (interne Funktion).
+
+        Der Treiber füllt einen Puffer der Größe `stream_buffer_samples`; jeder
+        neue Block wird im Streaming-Callback in den Ringpuffer des
+        `StreamingPulseDetector` kopiert und auf fallende Flanken durchsucht.
+        Fertige Pulse (Pretrigger + Nachtrigger) laufen danach über denselben
+        Pfad wie im Block-Modus (Callbacks, Speicherung, ggf. Pipeline).
+        Der Detektor erhält den Trigger-Kanal zuerst (ohne Kanal A: Kanal B).
+        """
+        chunk = int(self.stream_buffer_samples)
+        stream_a = (ct.c_int16 * chunk)() if "A" in self.channels else None
+        stream_b = (ct.c_int16 * chunk)() if "B" in self.channels else None
+        self._bind_data_buffers(stream_a, stream_b, n_values=chunk)
+        views = [np.frombuffer(buf, dtype=np.int16) for buf in (stream_a, stream_b) if buf is not None]
+        view_trig, view_other = views[0], (views[1] if len(views) > 1 else None)
+
+        window = pre_samples + post_samples
+        ring_samples = self.stream_ring_samples or max(8 * window, window + 2 * chunk)
+        detector = StreamingPulseDetector(
+            pre_samples, post_samples, self._trigger_adc(), ring_samples=ring_samples,
+            n_channels=len(views)
+        )
+        self._stream_detector = detector
+
+        ready = []                  # fertige Pulse aus dem Callback
+        driver_overflows = [0]
+
+        def on_stream(handle, n_values, start_index, overflow, trigger_at,
+                      triggered, auto_stop, p_parameter):
+            # Läuft innerhalb von GetStreamingLatestValues: nur kopieren + Flanken suchen
+            if n_values > 0:
+                stop = start_index + n_values
+                other = view_other[start_index:stop] if view_other is not None else None
+                ready.extend(detector.push(view_trig[start_index:stop], other))
+            if overflow:
+                driver_overflows[0] += 1
+
+        # Callback-Typ aus dem SDK, Fallback: void (*)(int16 handle, int32 noOfSamples,
+        # uint32 startIndex, int16 overflow, uint32 triggerAt, int16 triggered,
+        # int16 autoStop, void *pParameter)
+        streaming_ready_type = getattr(self.ps, "StreamingReadyType", None) or ct.CFUNCTYPE(
+            None, ct.c_int16, ct.c_int32, ct.c_uint32, ct.c_int16,
+            ct.c_uint32, ct.c_int16, ct.c_int16, ct.c_void_p
+        )
+        callback = streaming_ready_type(on_stream)  # Referenz halten (GC)
+
+        sample_interval = ct.c_uint32(max(1, int(round(1e9 / self.target_fs))))
+        t_ns = time.perf_counter_ns()
+        assert_pico_ok(self.ps.ps3000aRunStreaming(
             self.handle,
-            self.ch_b,
-            ct.byref(self.buf_b),
-            self.n_samples,
-            0,
-            ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]
+            ct.byref(sample_interval),              # wird vom Treiber auf realen Wert gesetzt
+            self.ps.PS3000A_TIME_UNITS["PS3000A_NS"],
+            0,                                      # kein Hardware-Pretrigger
+            chunk,                                  # maxPostTriggerSamples
+            0,                                      # autoStop aus: endlos bis Stop
+            1,                                      # kein Downsampling
+            self.ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"],
+            chunk                                   # overviewBufferSize
         ))
-    
+        self._timer.record(ARM, t_ns)
+        self._armed.set()
+
+        # Reales Sample-Intervall übernehmen
+        dt = sample_interval.value * 1e-9
+        if abs(dt - self.dt) > 1e-12:
+            print(f"[pico] Streaming: Sample-Intervall {sample_interval.value} ns statt {self.dt*1e9:.1f} ns")
+            self.dt, self.fs = dt, 1.0 / dt
+            self.meta['dt_s'], self.meta['fs'] = self.dt, self.fs
+            t.dt = self.dt  # in-place: auch der Pipeline-Consumer nutzt diese Zeitachse
+
+        scale_u, scale_i = self._channel_scales(self.max_adc.value)
+        emitted = 0
+        try:
+            while not self._stop_event.is_set() and emitted < n_pulses:
+                t_ns = time.perf_counter_ns()
+                status = self.ps.ps3000aGetStreamingLatestValues(self.handle, callback, None)
+                if status not in (0, PICO_BUSY):
+                    assert_pico_ok(status)
+                if status == 0:
+                    self._timer.record(TRANSFER, t_ns)  # inkl. Kopie in den Ring + Flankensuche
+                if not ready:
+                    time.sleep(0.001)  # Treiber hat noch keine neuen Daten
+                    continue
+
+                for trig, adc_trig, adc_other in ready:
+                    if emitted >= n_pulses:
+                        break
+                    adc_a, adc_b = (adc_trig, adc_other) if stream_a is not None else (None, adc_trig)
+                    timestamp = time.time()  # Erkennung: höchstens einen Treiber-Puffer nach dem Trigger
+                    self.trigger_times.append(timestamp)
+                    pulse_id = self._next_pulse_id()
+                    self._emit_software_preview(pulse_id, adc_a, adc_b, window)
+                    if self._pipeline is not None:
+                        acquired = self._pipeline.acquire_buffers(cancel=self._stop_event)
+                        if acquired is None:
+                            break  # stop(): Schleife endet über _stop_event
+                        buf_index, buf_a, buf_b = acquired
+                        for buf, adc in ((buf_a, adc_a), (buf_b, adc_b)):
+                            if adc is not None:
+                                np.frombuffer(buf, dtype=np.int16)[:window] = adc
+                        self._pipeline.submit(buf_index, window, 0, info=(pulse_id, timestamp))
+                    else:
+                        pulse = RawPulse(
+                            pulse_id, adc_a, adc_b,
+                            scale_u=scale_u, scale_i=scale_i, dt=self.dt, i_unit=i_unit,
+                            timestamp=timestamp
+                        )
+                        self._dispatch_pulse(pulse, t, i_unit, save_csv, save_npz)
+                    emitted += 1
+                ready.clear()
+        finally:
+            self._halt_device()
+            self.meta['streaming'] = dict(
+                detector.get_stats(),
+                sample_interval_ns=sample_interval.value,
+                ring_samples=detector.ring.capacity,
+                driver_overflows=driver_overflows[0],
+            )
+            print(f"[pico] Streaming: {self.meta['streaming']}")
+
     def start_measurement(
         self,
         n_pulses: int = 1,
@@ -889,6 +2308,9 @@ class PicoReader:
         Messung. Die Funktion läuft blockierend, bis alle Pulse erfasst sind.
         Für nicht-blockierende Ausführung in einem Thread starten.
         
+        Im Session-Modus (`keep_open=True`) bleibt das Gerät danach offen und
+        der nächste Aufruf sendet nur geänderte Einstellungen.
+        
         Parameters
         ----------
         n_pulses : int, optional
@@ -924,186 +2346,219 @@ class PicoReader:
         if self.is_running:
             raise RuntimeError("Messung läuft bereits")
         
+        self._stop_event.clear()
+        self._stop_requested_at = None
+        self._idle.clear()
+        self._armed.clear()
+        self.trigger_times = []
+        self._timer = StageTimer(capacity=min(max(1, n_pulses), TIMING_CAPACITY))
+
         # Mock-Modus: Wenn SDK nicht verfügbar, Mock-Messung durchführen
-        if not PICO_SDK_AVAILABLE:
+        if not self.sdk_available:
             print("[Mock] PicoSDK nicht verfügbar - Messung im Mock-Modus")
             self._run_mock_measurement(n_pulses, inter_pulse_delay_s, save_csv, save_npz)
             return
         
         self.is_running = True
+        failed = False
+        pulses_before = self.pulse_count
+        meta_path = None  # gesetzt, sobald die Meta-JSON dieses Runs geschrieben ist
         
         try:
-            # Gerät öffnen
-            self._open_device()
+            # Gerät öffnen (Session: offenes Gerät wiederverwenden)
+            session_reused = self.handle is not None
+            if not session_reused:
+                self._open_device()
             
             try:
                 # Kanäle konfigurieren
                 self._setup_channels()
                 
-                # Maximalwert ADC abfragen
-                self.max_adc = ct.c_int16()
-                assert_pico_ok(ps.ps3000aMaximumValue(self.handle, ct.byref(self.max_adc)))
-                
-                # Timebase bestimmen
-                self.timebase, self.dt, self.fs = pick_timebase(
-                    self.handle, self.target_fs, self.n_samples
-                )
-                
-                # Trigger einrichten
-                self._setup_trigger()
-                
-                # Datenpuffer zuordnen
-                self._setup_data_buffers()
+                # Maximalwert ADC abfragen (ändert sich nicht, solange das Gerät offen ist)
+                if self.max_adc is None or not session_reused:
+                    self.max_adc = ct.c_int16()
+                    assert_pico_ok(self.ps.ps3000aMaximumValue(self.handle, ct.byref(self.max_adc)))
+                    self.device_id = read_device_id(self.handle, self.ps)
+
+                # Rapid-Block: Speicher segmentieren (vor Timebase-Prüfung);
+                # im Session-Modus auch zurück auf 1 Segment
+                rapid = self.n_segments > 1
+                streaming = self.acquisition_mode == "streaming"
+                self._setup_segments()
+
+                if streaming:
+                    # Streaming: Sample-Intervall statt Timebase (Treiber bestätigt in RunStreaming)
+                    self._applied.pop('timebase', None)
+                    self.timebase = None
+                    self.dt = max(1, int(round(1e9 / self.target_fs))) * 1e-9
+                    self.fs = 1.0 / self.dt
+                else:
+                    # Timebase bestimmen (analytisch + Cache, nur wenige SDK-Aufrufe)
+                    def resolve():
+                        self.timebase, self.dt, self.fs = pick_timebase(
+                            self.handle, self.target_fs, self.n_samples,
+                            n_channels=len(self.channels), device_id=self.device_id, backend=self.ps,
+                            cache_path=self.timebase_cache_path
+                        )
+                    self._apply('timebase', (self.target_fs, self.n_samples, self.n_segments, self.channels),
+                                resolve)
+
+                # Trigger einrichten (Streaming: Software-Trigger, Hardware-Trigger aus)
+                self._setup_trigger(enabled=not streaming)
+
+                # Datenpuffer zuordnen (Streaming meldet eigene Treiber-Puffer an)
+                if rapid:
+                    self._setup_segment_buffers()
+                elif not streaming:
+                    self._setup_data_buffers()
+                    if self.preview_points > 0:
+                        self._setup_preview_buffers()
                 
-                # Zeitvektor berechnen
+                # Zeitachse (gleich für alle Pulse, kein Array pro Puls)
                 pre_samples = int(self.pretrig_ratio * self.n_samples)
                 post_samples = self.n_samples - pre_samples
-                t = np.arange(self.n_samples) * self.dt
+                t = TimeAxis(0.0, self.dt, self.n_samples)
                 
                 # Speicherung vorbereiten
                 i_unit = "A" if (self.rogowski_v_per_a and self.rogowski_v_per_a > 0) else "V"
                 
                 if save_csv:
-                    # CSV-Header schreiben
-                    ensure_csv(self.csv_path, self.run_name, i_unit)
-                
-                if save_npz:
-                    # .npz importieren (falls nicht schon importiert)
-                    from pico_pulse_lab.storage.npz_writer import append_pulse_npz, save_pulse_npz
+                    # CSV-Header schreiben (Spalten der erfassten Kanäle)
+                    ensure_csv(self.csv_path, self.run_name, i_unit, self.channels)
                 
                 # Metadaten vorbereiten
-                vfs_a = range_fullscale_volts(self.range_a)
-                vfs_b = range_fullscale_volts(self.range_b)
+                vfs_a = range_fullscale_volts(self.range_a, self.ps)
+                vfs_b = range_fullscale_volts(self.range_b, self.ps)
                 
                 self.meta = {
                     'run_name': self.run_name,
+                    'device': self.device_id,
+                    'timebase': self.timebase,
                     'fs': self.fs,
                     'dt_s': self.dt,
                     'pretrigger_samples': pre_samples,
                     'posttrigger_samples': post_samples,
+                    'channels': self.channels,
                     'ch_a': {
-                        'coupling': "AC" if self.coupling_a == ps.PS3000A_COUPLING["PS3000A_AC"] else "DC",
+                        'enabled': "A" in self.channels,
+                        'coupling': "AC" if self.coupling_a == self.ps.PS3000A_COUPLING["PS3000A_AC"] else "DC",
                         'v_range': vfs_a
                     },
                     'ch_b': {
-                        'coupling': "AC" if self.coupling_b == ps.PS3000A_COUPLING["PS3000A_AC"] else "DC",
+                        'enabled': "B" in self.channels,
+                        'coupling': "AC" if self.coupling_b == self.ps.PS3000A_COUPLING["PS3000A_AC"] else "DC",
                         'v_range': vfs_b,
                         'rogowski_v_per_a': self.rogowski_v_per_a
                     },
                     'trigger_level_v': self.trigger_level_v,
+                    'acquisition_mode': self.acquisition_mode,
+                    'preview_points': self.preview_points,
+                    'n_segments': self.n_segments,
+                    'ready_mode': self.ready_mode,
+                    'raw_storage': self.raw_storage,
+                    'binary_format': self.binary_format,
+                    'trim': {
+                        'margin_samples': self.trim_margin_samples,
+                        'rel_threshold': self.trim_rel_threshold,
+                    } if self.trim_pulses else None,
+                    'session_reused': session_reused,
                     'csv_path': self.csv_path if save_csv else None,
-                    'npz_path': self.npz_path if save_npz else None
+                    'npz_path': self.npz_path if save_npz and self.binary_format == "npz" else None,
+                    'store_path': self.store_path if save_npz and self.binary_format == "store" else None,
+                    'memmap_path': self.memmap_path if save_npz and self.binary_format == "memmap" else None
                 }
                 
                 if save_csv:
                     # Meta-JSON schreiben (write_meta benötigt meta_path, aber meta enthält bereits run_name und csv_path)
                     write_meta(self.meta_path, self.meta)
+                    meta_path = self.meta_path
                 
                 if save_npz:
-                    # .npz Meta initialisieren
-                    save_pulse_npz(
-                        self.npz_path, 0,  # pulse_id 0 für Meta
-                        np.array([0.0]), np.array([0.0]), np.array([0.0]),
-                        meta=self.meta
-                    )
+                    self._init_binary_storage(i_unit)
                 
                 # Pulse-ID ermitteln
                 if save_csv:
                     self.pulse_id = scan_next_pulse_id(self.csv_path)
                 elif save_npz:
-                    from pico_pulse_lab.storage.npz_writer import get_all_pulse_ids
-                    ids = get_all_pulse_ids(self.npz_path)
-                    self.pulse_id = max(ids) + 1 if ids else 1
+                    self.pulse_id = self._next_binary_pulse_id()
                 else:
                     self.pulse_id = 1
                 
+                # Speicher-Thread: CSV und binäre Datei gesammelt schreiben
+                self._open_storage(save_csv, save_npz)
+                
+                # Pipeline: Consumer-Thread übernimmt Umrechnung, Callback, Speicherung
+                if self.use_pipeline:
+                    self._pipeline = AcquisitionPipeline(
+                        self.n_samples,
+                        consumer=lambda buf_a, buf_b, n_values, overflow, info: self._handle_pulse(
+                            buf_a, buf_b, n_values, t, i_unit, save_csv, save_npz, *info
+                        ),
+                        queue_size=self.queue_size,
+                        backpressure=self.backpressure,
+                        spill_dir=os.path.join(self.run_dir, "_spill"),
+                        channels=self.channels,
+                    )
+                    self._pipeline.start()
+                
                 # Messschleife
-                for k in range(n_pulses):
-                    # Block-Messung starten
-                    time_indisposed_ms = ct.c_int32(0)
-                    assert_pico_ok(
-                        ps.ps3000aRunBlock(
-                            self.handle,
-                            pre_samples,
-                            post_samples,
-                            self.timebase,
-                            int(self.oversample),
-                            ct.byref(time_indisposed_ms),
-                            0,
-                            None,
-                            None
+                try:
+                    if streaming:
+                        self._run_streaming_loop(
+                            n_pulses, pre_samples, post_samples, t, i_unit,
+                            save_csv, save_npz
                         )
-                    )
-                    
-                    # Warten bis fertig
-                    ready = ct.c_int16(0)
-                    while not ready.value:
-                        ps.ps3000aIsReady(self.handle, ct.byref(ready))
-                        time.sleep(0.001)
-                    
-                    # Werte holen
-                    n = ct.c_int32(self.n_samples)
-                    overflow = ct.c_int16()
-                    assert_pico_ok(
-                        ps.ps3000aGetValues(
-                            self.handle,
-                            0,
-                            ct.byref(n),
-                            1,
-                            ps.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"],
-                            0,
-                            ct.byref(overflow)
+                    elif rapid:
+                        self._run_rapid_block_loop(
+                            n_pulses, pre_samples, post_samples, t, i_unit,
+                            inter_pulse_delay_s, save_csv, save_npz
                         )
-                    )
-                    
-                    # ADC -> Volt
-                    adc_a = np.frombuffer(self.buf_a, dtype=np.int16, count=n.value).astype(np.float64)
-                    adc_b = np.frombuffer(self.buf_b, dtype=np.int16, count=n.value).astype(np.float64)
-                    
-                    # Spannung: ADC -> Volt -> DUT (mit Tastkopf-Dämpfung)
-                    vfs_a = range_fullscale_volts(self.range_a)
-                    vfs_b = range_fullscale_volts(self.range_b)
-                    u = adc_a * (vfs_a / self.max_adc.value) * self.u_probe_attenuation
-                    
-                    # Strom: ADC -> Volt -> Ampere (mit Rogowski-Kalibrierung)
-                    i_v = adc_b * (vfs_b / self.max_adc.value)
-                    if self.rogowski_v_per_a and self.rogowski_v_per_a > 0:
-                        i = i_v / self.rogowski_v_per_a
                     else:
-                        i = i_v
-                    
-                    # Callback aufrufen (für Live-Updates)
-                    if self.on_pulse_callback:
-                        try:
-                            self.on_pulse_callback(self.pulse_id, t, u, i)
-                        except Exception as e:
-                            print(f"[Warnung] Callback-Fehler: {e}")
-                    
-                    # Speicherung
-                    if save_csv:
-                        append_pulse_to_csv(self.csv_path, t, u, i, i_unit, self.pulse_id)
-                    
-                    if save_npz:
-                        append_pulse_npz(self.npz_path, self.pulse_id, t, u, i)
-                    
-                    # Zähler aktualisieren
-                    self.pulse_count += 1
-                    self.pulse_id += 1
-                    
-                    # Pause zwischen Pulsen
-                    if inter_pulse_delay_s > 0:
-                        time.sleep(inter_pulse_delay_s)
+                        self._run_block_loop(
+                            n_pulses, pre_samples, post_samples, t, i_unit,
+                            inter_pulse_delay_s, save_csv, save_npz
+                        )
+                finally:
+                    # Bereits erfasste Pulse noch verarbeiten/speichern
+                    if self._pipeline is not None:
+                        pipeline, self._pipeline = self._pipeline, None
+                        pipeline.close()
+                        self.meta['pipeline'] = pipeline.get_stats()
+                        print(f"[pico] Pipeline: {pipeline.get_stats()}")
+                    self._close_storage()
                 
             finally:
-                # Gerät stoppen und schließen
+                # Gerät stoppen
                 try:
-                    ps.ps3000aStop(self.handle)
+                    self._halt_device()
                 except Exception:
                     pass
+                self.meta['aborted'] = self._stop_event.is_set()
+                self.meta['pulses_captured'] = self.pulse_count - pulses_before
+                if self.meta['aborted']:
+                    print(f"[pico] Messung abgebrochen nach {self.meta['pulses_captured']} Pulsen "
+                          f"(Abbruch-Latenz {self.meta.get('abort_latency_ms', 0.0):.1f} ms)")
+                
+                # Zeitmessung je Stufe (und Statistiken der Schleifen) in die Meta-JSON
+                self.meta['timing'] = self._timer.summary()
+                if meta_path is not None:
+                    try:
+                        write_meta(meta_path, self.meta)
+                    except Exception as e:
+                        print(f"[Warnung] Meta-JSON konnte nicht aktualisiert werden: {e}")
+        
+        except BaseException:
+            # Gerätezustand nach Fehler unklar -> auch im Session-Modus schließen
+            failed = True
+            raise
         
         finally:
+            self._close_storage()
             self.is_running = False
-            self.close()
+            self._armed.clear()
+            if failed or not self.keep_open:
+                self.close()
+            self._idle.set()
     
     def _run_mock_measurement(self, n_pulses: int, inter_pulse_delay_s: float, save_csv: bool, save_npz: bool):
         """
@@ -1120,21 +2575,19 @@ class PicoReader:
             post_samples = self.n_samples - pre_samples
             self.dt = 1.0 / self.target_fs  # Geschätztes dt
             self.fs = self.target_fs
-            t = np.arange(self.n_samples) * self.dt
+            time_axis = TimeAxis(0.0, self.dt, self.n_samples)
+            t = time_axis.to_array()  # nur für die Synthese der Testsignale
             
             # Speicherung vorbereiten
             i_unit = "A" if (self.rogowski_v_per_a and self.rogowski_v_per_a > 0) else "V"
             
             if save_csv:
-                from pico_pulse_lab.storage.csv_writer import ensure_csv, append_pulse_to_csv, write_meta
-                ensure_csv(self.csv_path, self.run_name, i_unit)
-            
-            if save_npz:
-                from pico_pulse_lab.storage.npz_writer import append_pulse_npz, save_pulse_npz
+                from pico_pulse_lab.storage.csv_writer import ensure_csv, write_meta
+                ensure_csv(self.csv_path, self.run_name, i_unit, self.channels)
             
             # Meta-Daten
-            vfs_a = range_fullscale_volts(self.range_a)
-            vfs_b = range_fullscale_volts(self.range_b)
+            vfs_a = range_fullscale_volts(self.range_a, self.ps)
+            vfs_b = range_fullscale_volts(self.range_b, self.ps)
             
             self.meta = {
                 'run_name': self.run_name,
@@ -1142,12 +2595,17 @@ class PicoReader:
                 'dt_s': self.dt,
                 'pretrigger_samples': pre_samples,
                 'posttrigger_samples': post_samples,
-                'ch_a': {'coupling': getattr(self, 'coupling_a_str', 'AC'), 'v_range': vfs_a},
-                'ch_b': {'coupling': getattr(self, 'coupling_b_str', 'AC'), 'v_range': vfs_b,
-                        'rogowski_v_per_a': self.rogowski_v_per_a},
+                'channels': self.channels,
+                'ch_a': {'enabled': "A" in self.channels,
+                         'coupling': getattr(self, 'coupling_a_str', 'AC'), 'v_range': vfs_a},
+                'ch_b': {'enabled': "B" in self.channels,
+                         'coupling': getattr(self, 'coupling_b_str', 'AC'), 'v_range': vfs_b,
+                         'rogowski_v_per_a': self.rogowski_v_per_a},
                 'trigger_level_v': self.trigger_level_v,
                 'csv_path': self.csv_path if save_csv else None,
-                'npz_path': self.npz_path if save_npz else None,
+                'npz_path': self.npz_path if save_npz and self.binary_format == "npz" else None,
+                'store_path': self.store_path if save_npz and self.binary_format == "store" else None,
+                'memmap_path': self.memmap_path if save_npz and self.binary_format == "memmap" else None,
                 'mock_mode': True  # Markierung für Mock-Modus
             }
             
@@ -1155,88 +2613,156 @@ class PicoReader:
                 write_meta(self.meta_path, self.meta)
             
             if save_npz:
-                save_pulse_npz(self.npz_path, 0, np.array([0.0]), np.array([0.0]), np.array([0.0]), meta=self.meta)
+                self._init_binary_storage(i_unit)
             
             # Pulse-ID ermitteln
             if save_csv:
                 from pico_pulse_lab.storage.csv_writer import scan_next_pulse_id
                 self.pulse_id = scan_next_pulse_id(self.csv_path)
             elif save_npz:
-                from pico_pulse_lab.storage.npz_writer import get_all_pulse_ids
-                ids = get_all_pulse_ids(self.npz_path)
-                self.pulse_id = max(ids) + 1 if ids else 1
+                self.pulse_id = self._next_binary_pulse_id()
             else:
                 self.pulse_id = 1
             
-            # Mock-Messung: Synthetische Pulse
+            # Speicher-Thread: CSV und binäre Datei wie bei der SDK-Messung
+            self._open_storage(save_csv, save_npz)
+            
+            # Skalierung der Rohdaten (Mock: Standard-ADC-Maximum)
+            self.max_adc = ct.c_int16(MAX_ADC_DEFAULT)
+            scale_u, scale_i = self._channel_scales(MAX_ADC_DEFAULT)
+            
+            # Mock-Messung: Synthetische Pulse (ohne Trigger, sofort "armiert")
+            self._armed.set()
             for k in range(n_pulses):
-                # Synthetische Daten erzeugen: Exponential-Fall mit Rauschen
-                u = 10.0 * np.exp(-t * 1000) * np.sin(2 * np.pi * 1000 * t) + np.random.normal(0, 0.1, len(t))
-                i = -0.1 * np.exp(-t * 1000) * np.cos(2 * np.pi * 1000 * t) + np.random.normal(0, 0.01, len(t))
-                
-                # Callback aufrufen
-                if self.on_pulse_callback:
-                    try:
-                        self.on_pulse_callback(self.pulse_id, t, u, i)
-                    except Exception as e:
-                        print(f"[Warnung] Callback-Fehler: {e}")
-                
-                # Speicherung
-                if save_csv:
-                    append_pulse_to_csv(self.csv_path, t, u, i, i_unit, self.pulse_id)
-                
-                if save_npz:
-                    append_pulse_npz(self.npz_path, self.pulse_id, t, u, i)
+                if self._stop_event.is_set():
+                    print("[Mock] Messung abgebrochen")
+                    break
+                self.trigger_times.append(time.time())
+
+                # Synthetische Daten erzeugen: Exponential-Fall mit Rauschen (zählt als "transfer")
+                t_ns = time.perf_counter_ns()
+                u = i = None  # nicht erfasster Kanal bleibt None
+                if "A" in self.channels:
+                    u = 10.0 * np.exp(-t * 1000) * np.sin(2 * np.pi * 1000 * t) + np.random.normal(0, 0.1, len(t))
+                if "B" in self.channels:
+                    i = -0.1 * np.exp(-t * 1000) * np.cos(2 * np.pi * 1000 * t) + np.random.normal(0, 0.01, len(t))
+                t_ns = self._timer.record(TRANSFER, t_ns)
                 
-                self.pulse_count += 1
-                self.pulse_id += 1
+                # Wie ein Scope auf int16 quantisieren, dann Callbacks und Speicher-Thread
+                pulse = RawPulse.from_values(
+                    self._next_pulse_id(), u, i, scale_u, scale_i, self.dt, i_unit=i_unit,
+                    timestamp=time.time()
+                )
+                self._emit_software_preview(pulse.pulse_id, pulse.adc_u, pulse.adc_i, pulse.n_samples)
+                self._dispatch_pulse(pulse, time_axis, i_unit, save_csv, save_npz, t_ns)
                 
                 print(f"[Mock] Puls {k+1}/{n_pulses} erfasst")
                 
                 if inter_pulse_delay_s > 0:
-                    time.sleep(inter_pulse_delay_s)
+                    self._stop_event.wait(inter_pulse_delay_s)
             
             print("[Mock] Mock-Messung abgeschlossen")
+            
+            # Wartende Pulse schreiben, damit Timing und Speicher-Statistik vollständig sind
+            self._close_storage()
+            self.meta['timing'] = self._timer.summary()
+            if save_csv:
+                write_meta(self.meta_path, self.meta)
         
         finally:
+            self._close_storage()
             self.is_running = False
+            self._armed.clear()
+            self._idle.set()
     
-    def stop(self) -> None:
+    def wait_armed(self, timeout_s: float = None) -> bool:
         """
-        Stoppt eine laufende Messung.
+        Wartet, bis der Scope für den ersten Trigger der Messung armiert ist.
+        
+        Gedacht für einen externen Pulsgeber (z.B. STM32): erst feuern, wenn
+        `RunBlock` bzw. `RunStreaming` zurückgekehrt ist, sonst geht der
+        erste Puls verloren.
+        
+        Parameters
+        ----------
+        timeout_s : float, optional
+            Maximale Wartezeit in Sekunden (Standard: None = unbegrenzt).
+        
+        Returns
+        -------
+        bool
+            True wenn armiert, False nach Ablauf von timeout_s.
+        """
+        return self._armed.wait(timeout_s)
+    
+    def stop(self, timeout_s: float = 0.0) -> bool:
+        """
+        Bricht eine laufende Messung ab.
         
         Diese Funktion sollte aus einem anderen Thread aufgerufen werden,
         wenn `start_measurement()` in einem Thread läuft.
         
+        Parameters
+        ----------
+        timeout_s : float, optional
+            So lange auf das Ende der Messung warten (Standard: 0 = nicht warten).
+        
         Returns
         -------
-        None
+        bool
+            True wenn keine Messung mehr läuft.
         
         Notes
         -----
-        - Aktuell unterstützt die Implementierung keinen Abbruch während
-          der Messung. Diese Funktion bereitet die Implementierung vor.
+        - Ein wartender Block wird sofort geweckt (Callback-Modus) bzw. nach
+          höchstens einem Poll-Takt von 1 ms; der Mess-Thread ruft danach
+          `ps3000aStop` auf. Die Zeit bis dahin (Ziel: < STOP_TIMEOUT_S) steht
+          in `meta['abort_latency_ms']`.
+        - Bereits erfasste Pulse werden noch gespeichert (Pipeline wird
+          geleert, im Rapid-Block werden fertige Segmente übertragen).
+        - Im Session-Modus bleibt das Gerät offen und im Leerlauf; die
+          nächste Messung kann sofort starten.
         """
-        self.is_running = False
+        if not self.is_running:
+            return True
+        if self._stop_requested_at is None:
+            self._stop_requested_at = time.perf_counter()
+        self._stop_event.set()
+        
+        # Wartende Stellen im Mess-Thread wecken
+        waiter = self._ready_waiter
+        if waiter is not None:
+            waiter.cancel()
+        pipeline = self._pipeline
+        if pipeline is not None:
+            pipeline.wake()
+        
+        return self._idle.wait(timeout_s) if timeout_s else not self.is_running
     
     def close(self) -> None:
         """
         Schließt das Picoscope-Gerät.
         
-        Diese Funktion wird automatisch von `start_measurement()` aufgerufen.
-        Kann auch manuell aufgerufen werden für explizites Cleanup.
+        Diese Funktion wird automatisch von `start_measurement()` aufgerufen
+        (außer im Session-Modus, `keep_open=True`). Kann auch manuell
+        aufgerufen werden für explizites Cleanup bzw. zum Beenden der Session.
         
         Returns
         -------
         None
         """
-        if self.handle is not None and PICO_SDK_AVAILABLE:
+        self._applied = {}
+        self.max_adc = None
+        self.buf_a = self.buf_b = None
+        self.seg_bufs_a, self.seg_bufs_b = [], []
+        
+        if self.handle is not None and self.sdk_available:
             try:
-                ps.ps3000aCloseUnit(self.handle)
+                self.ps.ps3000aCloseUnit(self.handle)
             except Exception:
                 pass
             self.handle = None
-        elif not PICO_SDK_AVAILABLE:
+        elif not self.sdk_available:
             # Mock-Modus: Nichts zu schließen
             self.handle = None
     
@@ -1272,11 +2798,28 @@ class PicoReader:
             - pulse_count: int - Anzahl erfasster Pulse in aktueller Session
             - pulse_id: int - Nächste freie Pulse-ID
             - run_name: str - Name des aktuellen Messlaufs
+            - pipeline: dict - Warteschlangen-Statistik (nur im Pipeline-Modus)
+            - storage: dict - Warteschlange und Durchsatz des Speicher-Threads
+              (nur während einer speichernden Messung)
+            - streaming: dict - Software-Trigger-Statistik (nur im Streaming-Modus)
+            - timing: dict - Dauer je Erfassungsstufe (Perzentile + Histogramm,
+              siehe `acquisition/timing.py`) der laufenden bzw. letzten Messung
         """
-        return {
+        status = {
             'is_running': self.is_running,
             'is_configured': self.is_configured,
             'pulse_count': self.pulse_count,
             'pulse_id': self.pulse_id,
             'run_name': self.run_name
         }
+        pipeline = self._pipeline
+        if pipeline is not None:
+            status['pipeline'] = pipeline.get_stats()
+        storage = self._storage
+        if storage is not None:
+            status['storage'] = storage.get_stats()
+        detector = self._stream_detector
+        if detector is not None and self.acquisition_mode == "streaming":
+            status['streaming'] = detector.get_stats()
+        status['timing'] = self._timer.summary()
+        return status
@@ -0,0 +1,300 @@
+"""
+Doppelt gepufferte Producer/Consumer-Pipeline für die Puls-Erfassung.
+
+Der Mess-Thread (Producer) füllt vorab allokierte int16-Pufferpaare direkt
+aus dem SDK und armiert den Scope sofort nach `GetValues` neu. Ein eigener
+Consumer-Thread übernimmt Umrechnung, GUI-Callback und Speicherung.
+
+Beide Seiten sind über eine begrenzte Warteschlange verbunden. Ist kein
+freies Pufferpaar mehr vorhanden, greift die konfigurierte Backpressure:
+- "block":       Producer wartet, bis der Consumer einen Puffer freigibt
+- "drop_oldest": ältester noch nicht verarbeiteter Puls wird verworfen
+- "spill":       ältester Puls wird als .npy auf die Platte ausgelagert
+"""
+
+import os
+import ctypes as ct
+import itertools
+import tempfile
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+
+BACKPRESSURE_MODES = ("block", "drop_oldest", "spill")
+
+
+class _Capture:
+    """
+    Ein erfasster, noch nicht verarbeiteter Puls in der Warteschlange (intern).
+
+    Entweder verweist `buf_index` auf ein Pufferpaar im Pool, oder der Puls
+    wurde ausgelagert und liegt unter `spill_path`.
+    """
+
+    __slots__ = ("buf_index", "n_values", "overflow", "info", "spill_path")
+
+    def __init__(self, buf_index: int, n_values: int, overflow: int, info=None):
+        self.buf_index = buf_index
+        self.n_values = n_values
+        self.overflow = overflow
+        self.info = info
+        self.spill_path = None
+
+
+class AcquisitionPipeline:
+    """
+    Pufferpool + begrenzte Warteschlange + Consumer-Thread.
+
+    Parameters
+    ----------
+    n_samples : int
+        Samples pro Kanal und Puls (Größe jedes Puffers).
+    consumer : callable
+        Funktion mit Signatur (buf_a, buf_b, n_values, overflow, info) -> None.
+        Wird im Consumer-Thread für jeden Puls in Erfassungsreihenfolge
+        aufgerufen. buf_a/buf_b sind int16-Arrays und nur bis zur Rückkehr
+        des Aufrufs gültig (danach wird der Puffer wiederverwendet); für
+        einen nicht erfassten Kanal ist der Puffer None. info ist das an
+        `submit()` übergebene Objekt (z.B. pulse_id und Erfassungszeit,
+        die der Producer vergibt – verworfene Pulse hinterlassen Lücken).
+    queue_size : int, optional
+        Maximale Anzahl wartender Pulse im Speicher (Standard: 4).
+        Der Pool enthält queue_size + 2 Pufferpaare (einer wird gerade
+        gefüllt, einer gerade verarbeitet).
+    backpressure : str, optional
+        "block", "drop_oldest" oder "spill" (Standard: "block").
+    spill_dir : str, optional
+        Verzeichnis für ausgelagerte Pulse (Standard: temporäres Verzeichnis).
+    channels : str, optional
+        Erfasste Kanäle "AB", "A" oder "B" (Standard: "AB"). Nur für diese
+        werden Puffer allokiert; der andere Eintrag jedes Paars ist None.
+
+    Examples
+    --------
+    >>> pipe = AcquisitionPipeline(480_000, consumer=handle, queue_size=4)
+    >>> pipe.start()
+    >>> idx, buf_a, buf_b = pipe.acquire_buffers()
+    >>> # ... SetDataBuffer(buf_a/buf_b), RunBlock, GetValues ...
+    >>> pipe.submit(idx, n_values, overflow, info=(pulse_id, t_capture))
+    >>> pipe.close()  # wartet, bis alle Pulse verarbeitet sind
+    """
+
+    def __init__(
+        self,
+        n_samples: int,
+        consumer: Callable,
+        queue_size: int = 4,
+        backpressure: str = "block",
+        spill_dir: Optional[str] = None,
+        channels: str = "AB"
+    ):
+        if backpressure not in BACKPRESSURE_MODES:
+            raise ValueError(f"backpressure muss einer von {BACKPRESSURE_MODES} sein")
+        if queue_size < 1:
+            raise ValueError("queue_size muss >= 1 sein")
+
+        self.n_samples = int(n_samples)
+        self.consumer = consumer
+        self.queue_size = int(queue_size)
+        self.backpressure = backpressure
+        self.spill_dir = spill_dir
+
+        # Pufferpool: vorab allokierte ctypes-Paare (direkt an das SDK übergebbar)
+        n_buffers = self.queue_size + 2
+        self.buffers_a = [(ct.c_int16 * self.n_samples)() if "A" in channels else None
+                          for _ in range(n_buffers)]
+        self.buffers_b = [(ct.c_int16 * self.n_samples)() if "B" in channels else None
+                          for _ in range(n_buffers)]
+
+        self._free = deque(range(n_buffers))
+        self._queue = deque()          # wartende _Capture-Einträge (FIFO)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+        self._spill_seq = itertools.count()
+
+        # Statistik
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.max_depth = 0
+        self.error: Optional[BaseException] = None
+
+    # ---------- Lebenszyklus ----------
+    def start(self) -> None:
+        """Startet den Consumer-Thread."""
+        if self.backpressure == "spill":
+            if self.spill_dir is None:
+                self.spill_dir = tempfile.mkdtemp(prefix="pico_spill_")
+            else:
+                os.makedirs(self.spill_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._consumer_loop, daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Beendet die Pipeline, nachdem alle wartenden Pulse verarbeitet wurden.
+
+        Raises
+        ------
+        BaseException
+            Ein im Consumer aufgetretener Fehler wird hier weitergereicht.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def depth(self) -> int:
+        """Anzahl aktuell wartender Pulse."""
+        return len(self._queue)
+
+    def get_stats(self) -> dict:
+        """Gibt Zähler der Pipeline zurück (für get_status/Meta)."""
+        return {
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'backpressure': self.backpressure,
+        }
+
+    # ---------- Producer-Seite ----------
+    def acquire_buffers(self, cancel: Optional[threading.Event] = None):
+        """
+        Liefert ein freies Pufferpaar für die nächste Erfassung.
+
+        Ist keines frei, greift die Backpressure-Strategie.
+
+        Parameters
+        ----------
+        cancel : threading.Event, optional
+            Ist das Event gesetzt, wird das Warten abgebrochen (siehe `wake()`).
+
+        Returns
+        -------
+        tuple or None
+            (buf_index, buf_a, buf_b), oder None nach Abbruch über `cancel`.
+        """
+        with self._cond:
+            while not self._free:
+                self._raise_consumer_error()
+                if cancel is not None and cancel.is_set():
+                    return None
+                if self.backpressure == "block":
+                    self._cond.wait(0.05)
+                elif self.backpressure == "drop_oldest":
+                    self._drop_oldest_locked()
+                else:
+                    self._spill_oldest_locked()
+            idx = self._free.popleft()
+        return idx, self.buffers_a[idx], self.buffers_b[idx]
+
+    def submit(self, buf_index: int, n_values: int, overflow: int = 0, info=None) -> None:
+        """Reiht einen gefüllten Puffer (mit Begleitdaten info für den Consumer) ein."""
+        with self._cond:
+            self._raise_consumer_error()
+            self._queue.append(_Capture(buf_index, n_values, overflow, info))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Weckt einen in `acquire_buffers()` wartenden Producer sofort auf."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self, buf_index: int) -> None:
+        """Gibt einen Puffer ohne Verarbeitung zurück (z.B. nach Abbruch)."""
+        with self._cond:
+            self._free.append(buf_index)
+            self._cond.notify_all()
+
+    # ---------- Backpressure (Lock gehalten) ----------
+    def _oldest_in_memory_locked(self) -> Optional[_Capture]:
+        for cap in self._queue:
+            if cap.spill_path is None:
+                return cap
+        return None
+
+    def _drop_oldest_locked(self) -> None:
+        cap = self._oldest_in_memory_locked()
+        if cap is None:
+            # Alle Puffer sind beim Consumer -> auf Freigabe warten
+            self._cond.wait(0.05)
+            return
+        self._queue.remove(cap)
+        self._free.append(cap.buf_index)
+        self.dropped += 1
+
+    def _spill_oldest_locked(self) -> None:
+        cap = self._oldest_in_memory_locked()
+        if cap is None:
+            self._cond.wait(0.05)
+            return
+        n = cap.n_values
+        # Ausgelagert werden nur vorhandene Kanäle (Zeilen in Reihenfolge A, B)
+        data = np.stack([
+            np.frombuffer(buf[cap.buf_index], dtype=np.int16, count=n)
+            for buf in (self.buffers_a, self.buffers_b) if buf[cap.buf_index] is not None
+        ])
+        path = os.path.join(self.spill_dir, f"spill_{next(self._spill_seq):06d}.npy")
+        np.save(path, data)
+        cap.spill_path = path
+        self._free.append(cap.buf_index)
+        cap.buf_index = None
+        self.spilled += 1
+
+    def _raise_consumer_error(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"Consumer-Fehler: {self.error}") from self.error
+
+    # ---------- Consumer-Seite ----------
+    def _consumer_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return  # geschlossen und leer
+                cap = self._queue.popleft()
+
+            try:
+                if cap.spill_path is not None:
+                    rows = iter(np.load(cap.spill_path))
+                    buf_a = next(rows) if self.buffers_a[0] is not None else None
+                    buf_b = next(rows) if self.buffers_b[0] is not None else None
+                    self.consumer(buf_a, buf_b, cap.n_values, cap.overflow, cap.info)
+                    os.remove(cap.spill_path)
+                else:
+                    self.consumer(
+                        self.buffers_a[cap.buf_index],
+                        self.buffers_b[cap.buf_index],
+                        cap.n_values,
+                        cap.overflow,
+                        cap.info,
+                    )
+            except BaseException as e:
+                self.error = e
+                # Restliche Puffer freigeben, damit der Producer nicht hängt
+                with self._cond:
+                    if cap.buf_index is not None:
+                        self._free.append(cap.buf_index)
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                if cap.buf_index is not None:
+                    self._free.append(cap.buf_index)
+                self.processed += 1
+                self._cond.notify_all()
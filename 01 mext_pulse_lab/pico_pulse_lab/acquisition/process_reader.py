@@ -0,0 +1,504 @@
+"""
+Erfassung in einem eigenen Prozess mit Puls-Ring im Shared Memory.
+
+Im GUI-Betrieb teilen sich Mess-Thread, Tk und matplotlib ein GIL: ein
+Redraw oder eine Parameter-Schätzung hält die Erfassung an. `ProcessReader`
+startet den `PicoReader` deshalb in einem Kind-Prozess (eigener
+Interpreter, eigenes GIL). Speicherung (CSV/NPZ) läuft ebenfalls dort.
+
+Datenweg
+--------
+Das Kind legt nach `configure()` einen Ring aus `n_slots` int16-Slots in
+`multiprocessing.shared_memory` an (je Slot Kanal A und B mit
+`n_samples`). Jeder Puls wird einmal in einen freien Slot kopiert; über
+die Pipe gehen nur Slot-Index und Metadaten (Skalierung, dt, t0, ...).
+Der Eltern-Prozess erzeugt daraus einen `RawPulse`, dessen `adc_u`/`adc_i`
+direkt in den Shared Memory zeigen (keine Kopie).
+
+Ein Slot wird freigegeben, sobald im Eltern-Prozess kein Array mehr auf
+ihn verweist (auch keine Teil-Ansicht wie `pulse.adc_u[100:]`). Wer Pulse
+länger aufbewahrt, blockiert Slots; sind alle belegt, verwirft das Kind
+den Puls für die Weitergabe (`dropped`) – gespeichert wird er trotzdem.
+"""
+
+import multiprocessing
+import threading
+import weakref
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .picoscope_reader import PicoReader
+from .pulse_data import RawPulse
+
+
+RING_SLOTS          = 16       # Slots im Shared-Memory-Ring (je n_samples × 2 Kanäle int16)
+RECV_POLL_S         = 0.05     # Prüfintervall des Empfangs-Threads (Kind noch am Leben?)
+
+# Nachrichten Kind -> Eltern: (Art, Slot-Index, Nutzdaten)
+_MSG_READY = "ready"
+_MSG_PULSE = "pulse"
+_MSG_PREVIEW = "preview"
+_MSG_DONE = "done"
+
+
+class _SlotLease:
+    """
+    Besitzer der Array-Ansichten auf einen Slot (intern).
+
+    Alle Ansichten eines Pulses haben dieses Objekt als `base`; wird es
+    freigegeben, ist der Slot wieder frei.
+    """
+
+    def __init__(self, slot_array: np.ndarray, ring: "PulseRing"):
+        self.__array_interface__ = slot_array.__array_interface__
+        self._ring = ring  # Abbildung bleibt bestehen, solange Ansichten existieren
+
+
+class PulseRing:
+    """
+    Ring aus int16-Slots in `multiprocessing.shared_memory`.
+
+    Parameters
+    ----------
+    n_slots : int
+        Anzahl Slots.
+    slot_samples : int
+        Samples pro Kanal und Slot (maximale Pulslänge).
+    name : str, optional
+        Name eines bestehenden Rings (Standard: None = neu anlegen).
+
+    Examples
+    --------
+    >>> ring = PulseRing(16, 480_000)                  # Erzeuger
+    >>> ring.write(0, pulse.adc_u, pulse.adc_i)
+    >>> view = PulseRing(16, 480_000, name=ring.name)  # anderer Prozess
+    >>> adc_u, adc_i = view.lease(0, pulse.n_samples)
+    """
+
+    def __init__(self, n_slots: int, slot_samples: int, name: str = None):
+        if n_slots < 1 or slot_samples < 1:
+            raise ValueError("n_slots und slot_samples müssen >= 1 sein")
+        self.n_slots = int(n_slots)
+        self.slot_samples = int(slot_samples)
+        nbytes = self.n_slots * 2 * self.slot_samples * np.dtype(np.int16).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray((self.n_slots, 2, self.slot_samples), dtype=np.int16, buffer=self.shm.buf)
+        self._leases = 0
+        self._lease_lock = threading.Lock()
+        self._closing = False
+
+    @property
+    def name(self) -> str:
+        """Name des Shared-Memory-Blocks (zum Öffnen in einem anderen Prozess)."""
+        return self.shm.name
+
+    def write(self, slot: int, adc_u: Optional[np.ndarray], adc_i: Optional[np.ndarray]) -> None:
+        """Kopiert die Rohdaten eines Pulses in einen Slot (ein fehlender Kanal bleibt unberührt)."""
+        n = len(adc_u if adc_u is not None else adc_i)
+        if n > self.slot_samples:
+            raise ValueError(f"Puls mit {n} Samples passt nicht in Slot ({self.slot_samples})")
+        for row, adc in enumerate((adc_u, adc_i)):
+            if adc is not None:
+                self.array[slot, row, :n] = adc
+
+    def lease(self, slot: int, n: int, on_release: Callable = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Liefert Ansichten (ohne Kopie) auf die ersten n Samples eines Slots.
+
+        Parameters
+        ----------
+        slot : int
+            Slot-Index.
+        n : int
+            Anzahl Samples pro Kanal.
+        on_release : callable, optional
+            Wird aufgerufen, sobald keine Ansicht auf den Slot mehr existiert.
+
+        Returns
+        -------
+        adc_u, adc_i : np.ndarray
+            int16-Ansichten auf Kanal A und B.
+        """
+        lease = _SlotLease(self.array[slot, :, :n], self)
+        with self._lease_lock:
+            self._leases += 1
+        weakref.finalize(lease, self._release, on_release)
+        data = np.asarray(lease)
+        return data[0], data[1]
+
+    def _release(self, on_release: Optional[Callable]) -> None:
+        """Zählt eine freigegebene Ansicht und schließt ggf. verzögert (interne Funktion)."""
+        with self._lease_lock:
+            self._leases -= 1
+            close_now = self._closing and self._leases == 0
+        if on_release is not None:
+            on_release()
+        if close_now:
+            self.shm.close()
+
+    def close(self, unlink: bool = False) -> None:
+        """
+        Schließt den Ring in diesem Prozess (und entfernt ihn mit unlink=True).
+
+        Existieren noch Ansichten, bleibt die Abbildung bis zu deren Freigabe
+        bestehen (`SharedMemory.close()` würde den Speicher unter ihnen
+        entfernen); `unlink` wirkt trotzdem sofort.
+        """
+        with self._lease_lock:
+            self._closing = True
+            close_now = self._leases == 0
+        if close_now:
+            self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _reader_worker(settings, measure_kwargs, n_slots, backend_factory, forward_preview,
+                   conn, free_conn, stop_event):
+    """
+    Läuft im Kind-Prozess: PicoReader + Ring, eine Messung (interne Funktion).
+
+    Schickt nach dem Anlegen des Rings dessen Namen, dann je Puls Slot und
+    Metadaten und am Ende eine Abschluss-Nachricht mit Zähler, Meta-Daten
+    und ggf. Fehler.
+    """
+    reader = PicoReader(backend=backend_factory() if backend_factory else None)
+    send_lock = threading.Lock()  # Preview (Mess-Thread) und Pulse (Consumer) senden parallel
+    ring = None
+    dropped = 0
+    error = None
+
+    def send(msg):
+        with send_lock:
+            conn.send(msg)
+
+    try:
+        reader.configure(**settings)
+        ring = PulseRing(n_slots, reader.n_samples)
+        free = list(range(n_slots))
+        send((_MSG_READY, None, {'name': ring.name, 'n_slots': n_slots, 'slot_samples': reader.n_samples}))
+
+        def on_pulse(pulse):
+            nonlocal dropped
+            while free_conn.poll():
+                free.append(free_conn.recv())
+            if not free or pulse.n_samples > ring.slot_samples:
+                dropped += 1
+                return
+            slot = free.pop()
+            ring.write(slot, pulse.adc_u, pulse.adc_i)
+            state = pulse.__getstate__()
+            del state['adc_u'], state['adc_i']
+            state['n'] = pulse.n_samples
+            state['channels'] = pulse.channels
+            send((_MSG_PULSE, slot, state))
+
+        reader.set_raw_callback(on_pulse)
+        if forward_preview:
+            reader.set_preview_callback(lambda *args: send((_MSG_PREVIEW, None, args)))
+
+        # stop() des Eltern-Prozesses an den Reader weiterreichen
+        def watch_stop():
+            stop_event.wait()
+            reader.stop()
+
+        threading.Thread(target=watch_stop, daemon=True).start()
+        reader.start_measurement(**measure_kwargs)
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        reader.close()
+        if ring is not None:
+            ring.close()  # entfernt wird der Ring vom Eltern-Prozess
+        send((_MSG_DONE, None, {
+            'pulse_count': reader.pulse_count,
+            'dropped': dropped,
+            'meta': reader.meta,
+            'error': error,
+        }))
+
+
+class ProcessReader:
+    """
+    `PicoReader` in einem Kind-Prozess mit gleicher Schnittstelle.
+
+    Callbacks laufen im Empfangs-Thread des Eltern-Prozesses. Die Pulse des
+    Raw-Callbacks zeigen in den Shared-Memory-Ring (siehe Modul-Doku).
+
+    Parameters
+    ----------
+    backend_factory : callable, optional
+        Funktion () -> SDK-Backend für den `PicoReader` im Kind (Standard:
+        None = picosdk). Muss pickelbar sein (z.B. `SimulatedPS3000A`).
+    n_slots : int, optional
+        Slots im Ring (Standard: 16). Bei 480 000 Samples sind das ~31 MB.
+    mp_context : str, optional
+        Start-Methode für `multiprocessing` (Standard: None = Plattform-Standard).
+
+    Notes
+    -----
+    Jede Messung startet einen neuen Prozess; `keep_open` wirkt daher nur
+    innerhalb einer Messung.
+
+    Examples
+    --------
+    >>> reader = ProcessReader()
+    >>> reader.configure(run_name="bench", target_fs=20e6, range_a="2V")
+    >>> reader.set_raw_callback(lambda pulse: print(pulse.pulse_id, pulse.adc_u.max()))
+    >>> reader.start_measurement(n_pulses=100)   # blockiert wie PicoReader
+    """
+
+    def __init__(self, backend_factory: Optional[Callable] = None, n_slots: int = RING_SLOTS,
+                 mp_context: Optional[str] = None):
+        if n_slots < 1:
+            raise ValueError("n_slots muss >= 1 sein")
+        self.backend_factory = backend_factory
+        self.n_slots = int(n_slots)
+        self._ctx = multiprocessing.get_context(mp_context)
+
+        self.settings = None
+        self.on_raw_pulse_callback = None  # Callback: (pulse: RawPulse) -> None
+        self.on_preview_callback = None    # Callback: (pulse_id, t, u_min, u_max, i_min, i_max) -> None
+
+        self._process = None
+        self._receiver = None
+        self._stop_event = None
+        self._ring = None
+        self.is_running = False
+
+        # Statistik / Ergebnis
+        self.pulse_count = 0
+        self.dropped = 0
+        self.meta = {}
+        self.error = None
+
+    def configure(self, **settings) -> None:
+        """
+        Setzt die Konfiguration für den `PicoReader` im Kind-Prozess.
+
+        Parameters
+        ----------
+        **settings
+            Argumente für `PicoReader.configure()`; geprüft werden sie erst
+            im Kind (Fehler kommen über `wait()` bzw. `start_measurement()`).
+        """
+        self.settings = dict(settings)
+
+    def set_raw_callback(self, callback) -> None:
+        """
+        Setzt einen Callback für jeden Puls als `RawPulse` (Daten im Ring).
+
+        Parameters
+        ----------
+        callback : callable
+            Funktion mit Signatur: (pulse: RawPulse) -> None.
+        """
+        self.on_raw_pulse_callback = callback
+
+    def set_preview_callback(self, callback) -> None:
+        """
+        Setzt einen Callback für die Min/Max-Vorschau (siehe `PicoReader`).
+
+        Muss vor `start()` gesetzt werden.
+        """
+        self.on_preview_callback = callback
+
+    def start(self, n_pulses: int = 1, inter_pulse_delay_s: float = 0.0,
+              save_csv: bool = True, save_npz: bool = True) -> None:
+        """
+        Startet die Messung im Kind-Prozess (kehrt sofort zurück).
+
+        Parameters
+        ----------
+        n_pulses, inter_pulse_delay_s, save_csv, save_npz :
+            Wie bei `PicoReader.start_measurement()`.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn nicht konfiguriert oder bereits eine Messung läuft.
+        """
+        if self.settings is None:
+            raise RuntimeError("Reader muss zuerst mit configure() konfiguriert werden")
+        if self.is_running:
+            raise RuntimeError("Messung läuft bereits")
+        self._close_ring()
+
+        measure_kwargs = dict(n_pulses=n_pulses, inter_pulse_delay_s=inter_pulse_delay_s,
+                              save_csv=save_csv, save_npz=save_npz)
+        recv_conn, send_conn = self._ctx.Pipe(duplex=False)
+        free_recv, free_send = self._ctx.Pipe(duplex=False)
+        self._stop_event = self._ctx.Event()
+        self.pulse_count = self.dropped = 0
+        self.meta = {}
+        self.error = None
+
+        self._process = self._ctx.Process(
+            target=_reader_worker,
+            args=(self.settings, measure_kwargs, self.n_slots, self.backend_factory,
+                  self.on_preview_callback is not None, send_conn, free_recv, self._stop_event),
+            name="pico-reader",
+            daemon=True,
+        )
+        self._process.start()
+        # Diese Enden gehören jetzt dem Kind (EOF bzw. BrokenPipe, sobald es endet)
+        send_conn.close()
+        free_recv.close()
+
+        self.is_running = True
+        self._receiver = threading.Thread(target=self._receive_loop, args=(recv_conn, free_send), daemon=True)
+        self._receiver.start()
+
+    def start_measurement(self, n_pulses: int = 1, inter_pulse_delay_s: float = 0.0,
+                          save_csv: bool = True, save_npz: bool = True) -> None:
+        """
+        Startet die Messung und wartet bis zum Ende (wie `PicoReader.start_measurement()`).
+
+        Raises
+        ------
+        RuntimeError
+            Wenn die Messung im Kind-Prozess mit Fehler endet.
+        """
+        self.start(n_pulses, inter_pulse_delay_s, save_csv, save_npz)
+        self.wait()
+
+    def stop(self, timeout_s: float = 0.0) -> bool:
+        """
+        Bricht die Messung ab (siehe `PicoReader.stop()`).
+
+        Returns
+        -------
+        bool
+            True wenn der Kind-Prozess beendet ist.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+        return self.wait(timeout_s, raise_errors=False) if timeout_s else not self.is_running
+
+    def wait(self, timeout: float = None, raise_errors: bool = True) -> bool:
+        """
+        Wartet, bis der Kind-Prozess fertig und alle Pulse weitergegeben sind.
+
+        Returns
+        -------
+        bool
+            True wenn fertig, False nach Ablauf von timeout.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn die Messung mit Fehler beendet wurde (nur mit raise_errors=True).
+        """
+        if self._receiver is not None:
+            self._receiver.join(timeout)
+            if self._receiver.is_alive():
+                return False
+        if self._process is not None:
+            self._process.join(1.0)
+        if self.error and raise_errors:
+            raise RuntimeError(f"Fehler im Reader-Prozess: {self.error}")
+        return True
+
+    def close(self) -> None:
+        """Beendet eine laufende Messung und gibt den Ring frei."""
+        if self.is_running:
+            self.stop(timeout_s=5.0)
+        self._close_ring()
+
+    def get_status(self) -> dict:
+        """
+        Gibt den Status des Reader-Prozesses zurück.
+
+        Returns
+        -------
+        dict
+            - is_running: bool
+            - alive: bool - Kind-Prozess läuft
+            - pulse_count: int - weitergegebene Pulse
+            - dropped: int - wegen vollem Ring nicht weitergegebene Pulse (nach Ende)
+            - n_slots / slot_samples: Größe des Rings (None vor dem Start)
+            - error: str oder None
+        """
+        ring = self._ring
+        return {
+            'is_running': self.is_running,
+            'alive': self._process is not None and self._process.is_alive(),
+            'pulse_count': self.pulse_count,
+            'dropped': self.dropped,
+            'n_slots': ring.n_slots if ring else None,
+            'slot_samples': ring.slot_samples if ring else None,
+            'error': self.error,
+        }
+
+    # ---------- Empfangs-Thread ----------
+    def _receive_loop(self, conn, free_send) -> None:
+        """Empfängt Nachrichten des Kinds und ruft die Callbacks auf (interne Funktion)."""
+        free_lock = threading.Lock()  # Freigaben kommen aus beliebigen Threads (GC)
+
+        def release(slot):
+            with free_lock:
+                try:
+                    free_send.send(slot)
+                except OSError:
+                    pass  # Messung vorbei, Slot wird nicht mehr gebraucht
+
+        try:
+            while True:
+                try:
+                    if not conn.poll(RECV_POLL_S):
+                        if not self._process.is_alive() and not conn.poll():
+                            self.error = f"Reader-Prozess beendet (exitcode {self._process.exitcode})"
+                            break
+                        continue
+                    kind, slot, payload = conn.recv()
+                except EOFError:
+                    self.error = f"Reader-Prozess beendet (exitcode {self._process.exitcode})"
+                    break
+
+                if kind == _MSG_PULSE:
+                    self.pulse_count += 1
+                    n = payload.pop('n')
+                    channels = payload.pop('channels')
+                    adc_u, adc_i = self._ring.lease(slot, n, lambda s=slot: release(s))
+                    self._deliver(RawPulse(adc_u=adc_u if "A" in channels else None,
+                                           adc_i=adc_i if "B" in channels else None, **payload))
+                elif kind == _MSG_PREVIEW:
+                    self._call(self.on_preview_callback, *payload)
+                elif kind == _MSG_READY:
+                    self._ring = PulseRing(payload['n_slots'], payload['slot_samples'], name=payload['name'])
+                else:
+                    self.dropped = payload['dropped']
+                    self.meta = payload['meta']
+                    self.error = payload['error']
+                    break
+        finally:
+            conn.close()
+            self.is_running = False
+
+    def _deliver(self, pulse: RawPulse) -> None:
+        """Gibt einen Puls an den Raw-Callback weiter (interne Funktion)."""
+        # Ohne Callback wird der Puls sofort verworfen und der Slot frei
+        self._call(self.on_raw_pulse_callback, pulse)
+
+    @staticmethod
+    def _call(callback, *args) -> None:
+        """Ruft einen Callback auf, Fehler nur als Warnung (interne Funktion)."""
+        if callback:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[Warnung] Callback-Fehler: {e}")
+
+    def _close_ring(self) -> None:
+        """Schließt und entfernt den Ring der letzten Messung (interne Funktion)."""
+        if self._ring is not None:
+            self._ring.close(unlink=True)
+            self._ring = None
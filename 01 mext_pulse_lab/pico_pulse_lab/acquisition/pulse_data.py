@@ -0,0 +1,365 @@
+"""
+Datencontainer für erfasste Pulse.
+
+Statt jeden Puls sofort in float64 umzurechnen (4x Speicher der 16-Bit-
+Rohdaten und mehrere Durchläufe über das ganze Array), trägt `RawPulse`
+die int16-ADC-Werte plus Skalierung/Offset pro Kanal. Die Umrechnung in
+Volt/Ampere passiert erst, wenn ein Verbraucher sie anfordert – wahlweise
+in float32 oder float64.
+
+Umrechnung pro Kanal:
+    wert = adc * scale + offset
+
+Die Zeitachse ist bei allen Pulsen eines Runs gleich und wird als
+`TimeAxis` (t0, dt, n) weitergegeben statt als float64-Array pro Puls.
+
+Wird nur ein Kanal erfasst (siehe `PicoReader.configure(channels=...)`),
+ist das Array des anderen Kanals None; `u()` bzw. `i()` liefern dann None.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple, Union
+
+
+class TimeAxis:
+    """
+    Äquidistante Zeitachse t[k] = t0 + k * dt, k = 0 .. n-1.
+
+    Ersetzt das pro Puls erzeugte `np.arange(n) * dt` (bei 480k Samples
+    3,8 MB float64 je Puls). Ein Array entsteht erst bei Bedarf über
+    `to_array()` bzw. `np.asarray(axis)`.
+
+    Parameters
+    ----------
+    t0 : float
+        Zeit des ersten Samples in Sekunden.
+    dt : float
+        Sample-Abstand in Sekunden (> 0).
+    n : int
+        Anzahl Samples.
+
+    Examples
+    --------
+    >>> axis = TimeAxis(0.0, 5e-8, 480_000)
+    >>> axis[-1]
+    0.02399995
+    >>> t = axis.to_array(np.float32)  # nur für Plot/Export
+    """
+
+    __slots__ = ("t0", "dt", "n")
+
+    def __init__(self, t0: float, dt: float, n: int):
+        if dt <= 0:
+            raise ValueError("dt muss > 0 sein")
+        if n < 0:
+            raise ValueError("n muss >= 0 sein")
+        self.t0 = float(t0)
+        self.dt = float(dt)
+        self.n = int(n)
+
+    @classmethod
+    def from_array(cls, t: np.ndarray, rtol: float = 1e-6) -> "TimeAxis":
+        """
+        Erkennt eine äquidistante Zeitachse in einem Array.
+
+        Raises
+        ------
+        ValueError
+            Wenn t nicht streng monoton steigend und äquidistant ist.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        if t.size < 2:
+            raise ValueError("Zeitachse braucht mindestens 2 Samples")
+        dt = (t[-1] - t[0]) / (t.size - 1)
+        if dt <= 0:
+            raise ValueError("Zeitvektor muss streng monoton steigend sein")
+        expected = t[0] + np.arange(t.size) * dt
+        if np.max(np.abs(t - expected)) > rtol * dt * t.size:
+            raise ValueError("Zeitvektor ist nicht äquidistant")
+        return cls(t[0], dt, t.size)
+
+    @property
+    def fs(self) -> float:
+        """Abtastrate in Hz."""
+        return 1.0 / self.dt
+
+    @property
+    def duration(self) -> float:
+        """Länge des Fensters n * dt in Sekunden."""
+        return self.n * self.dt
+
+    def to_array(self, dtype=np.float64) -> np.ndarray:
+        """Zeitvektor in Sekunden als Array (wird bei jedem Aufruf neu erzeugt)."""
+        ftype = np.dtype(dtype).type
+        t = np.arange(self.n, dtype=ftype)
+        t *= ftype(self.dt)
+        if self.t0:
+            t += ftype(self.t0)
+        return t
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_array(np.float64 if dtype is None else dtype)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, key) -> Union[float, "TimeAxis"]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.n)
+            if step < 0:
+                return self.to_array()[key]  # absteigend: keine Zeitachse mehr
+            return TimeAxis(self.t0 + start * self.dt, self.dt * step, len(range(start, stop, step)))
+        k = int(key)
+        if k < 0:
+            k += self.n
+        if not 0 <= k < self.n:
+            raise IndexError("Index außerhalb der Zeitachse")
+        return self.t0 + k * self.dt
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimeAxis):
+            return NotImplemented
+        return (self.t0, self.dt, self.n) == (other.t0, other.dt, other.n)
+
+    def __repr__(self) -> str:
+        return f"TimeAxis(t0={self.t0:.3e}, dt={self.dt:.3e}, n={self.n})"
+
+
+def as_time_array(t, dtype=np.float64) -> np.ndarray:
+    """Zeitvektor als Array, egal ob `TimeAxis` oder bereits ein Array übergeben wurde."""
+    if isinstance(t, TimeAxis):
+        return t.to_array(dtype)
+    return np.asarray(t, dtype=dtype)
+
+
+def aggregate_min_max(adc: np.ndarray, ratio: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Min/Max je Bin aus `ratio` Samples (Software-Gegenstück zu
+    `PS3000A_RATIO_MODE_AGGREGATE`).
+
+    Parameters
+    ----------
+    adc : np.ndarray
+        Rohwerte eines Kanals.
+    ratio : int
+        Samples pro Bin; der letzte Bin darf kürzer sein.
+
+    Returns
+    -------
+    tuple
+        (min, max) je Bin, gleicher dtype wie adc.
+    """
+    ratio = max(1, int(ratio))
+    n_full = (len(adc) // ratio) * ratio
+    blocks = adc[:n_full].reshape(-1, ratio)
+    a_min, a_max = blocks.min(axis=1), blocks.max(axis=1)
+    if n_full < len(adc):
+        tail = adc[n_full:]
+        a_min = np.append(a_min, tail.min())
+        a_max = np.append(a_max, tail.max())
+    return a_min, a_max
+
+
+class RawPulse:
+    """
+    Ein Puls als int16-Rohdaten mit Skalierungs-Metadaten.
+
+    Parameters
+    ----------
+    pulse_id : int
+        Eindeutige ID des Pulses.
+    adc_u : np.ndarray or None
+        Rohwerte Kanal A (Spannung) als int16; None, wenn Kanal A nicht erfasst wurde.
+    adc_i : np.ndarray or None
+        Rohwerte Kanal B (Strom) als int16, gleiche Länge wie adc_u; None,
+        wenn Kanal B nicht erfasst wurde. Mindestens ein Kanal muss vorhanden sein.
+    scale_u : float
+        Faktor ADC -> Volt am DUT (inkl. Tastkopf-Dämpfung).
+    scale_i : float
+        Faktor ADC -> Ampere (bzw. Volt, falls kein Rogowski-Faktor).
+    dt : float
+        Zeitabstand zwischen Samples in Sekunden.
+    offset_u, offset_i : float, optional
+        Additiver Offset nach der Skalierung (Standard: 0.0).
+    t0 : float, optional
+        Zeit des ersten Samples in Sekunden (Standard: 0.0).
+    i_unit : str, optional
+        Einheit des Stroms: "A" oder "V" (Standard: "A").
+    timestamp : float, optional
+        Erfassungszeitpunkt als Unix-Zeit der Host-Uhr (Standard: None = unbekannt).
+
+    Examples
+    --------
+    >>> pulse = RawPulse(1, adc_a, adc_b, scale_u=7.6e-5, scale_i=0.015, dt=5e-8)
+    >>> u32 = pulse.u(np.float32)  # Umrechnung erst hier
+    >>> t = pulse.t()
+    """
+
+    __slots__ = ("pulse_id", "adc_u", "adc_i", "scale_u", "scale_i",
+                 "offset_u", "offset_i", "dt", "t0", "i_unit", "timestamp", "_cache")
+
+    def __init__(
+        self,
+        pulse_id: int,
+        adc_u: np.ndarray,
+        adc_i: np.ndarray,
+        scale_u: float,
+        scale_i: float,
+        dt: float,
+        offset_u: float = 0.0,
+        offset_i: float = 0.0,
+        t0: float = 0.0,
+        i_unit: str = "A",
+        timestamp: float = None
+    ):
+        if adc_u is None and adc_i is None:
+            raise ValueError("Mindestens einer von adc_u und adc_i muss vorhanden sein")
+        adc_u = None if adc_u is None else np.asarray(adc_u, dtype=np.int16)
+        adc_i = None if adc_i is None else np.asarray(adc_i, dtype=np.int16)
+        if adc_u is not None and adc_i is not None and adc_u.shape != adc_i.shape:
+            raise ValueError("adc_u und adc_i müssen gleiche Länge haben")
+
+        self.pulse_id = int(pulse_id)
+        self.adc_u = adc_u
+        self.adc_i = adc_i
+        self.scale_u = float(scale_u)
+        self.scale_i = float(scale_i)
+        self.offset_u = float(offset_u)
+        self.offset_i = float(offset_i)
+        self.dt = float(dt)
+        self.t0 = float(t0)
+        self.i_unit = i_unit
+        self.timestamp = None if timestamp is None else float(timestamp)
+        self._cache: Dict = {}
+
+    def __getstate__(self):
+        # Pickle (z.B. Queue zwischen Prozessen): nur Rohdaten, keine umgerechneten Arrays
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_cache"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._cache = {}
+
+    @classmethod
+    def from_buffers(cls, pulse_id: int, buf_a, buf_b, n_values: int, **kwargs) -> "RawPulse":
+        """
+        Erzeugt einen RawPulse aus SDK-Puffern (ctypes oder NumPy).
+
+        Die int16-Werte werden kopiert, damit der Puffer sofort für die
+        nächste Erfassung wiederverwendet werden kann. Ein Puffer None
+        steht für einen nicht erfassten Kanal.
+        """
+        adc_u = None if buf_a is None else np.frombuffer(buf_a, dtype=np.int16, count=n_values).copy()
+        adc_i = None if buf_b is None else np.frombuffer(buf_b, dtype=np.int16, count=n_values).copy()
+        return cls(pulse_id, adc_u, adc_i, **kwargs)
+
+    @classmethod
+    def from_values(
+        cls,
+        pulse_id: int,
+        u: np.ndarray,
+        i: np.ndarray,
+        scale_u: float,
+        scale_i: float,
+        dt: float,
+        **kwargs
+    ) -> "RawPulse":
+        """
+        Quantisiert float-Werte auf int16 (z.B. für Mock-Daten).
+
+        Werte außerhalb des int16-Bereichs werden begrenzt; u oder i None
+        ergibt einen Puls ohne diesen Kanal.
+        """
+        info = np.iinfo(np.int16)
+
+        def quantize(x, scale):
+            if x is None:
+                return None
+            return np.clip(np.rint(np.asarray(x) / scale), info.min, info.max).astype(np.int16)
+
+        return cls(pulse_id, quantize(u, scale_u), quantize(i, scale_i), scale_u, scale_i, dt, **kwargs)
+
+    # ---------- Eigenschaften ----------
+    @property
+    def n_samples(self) -> int:
+        """Anzahl Samples pro Kanal."""
+        return int((self.adc_u if self.adc_u is not None else self.adc_i).size)
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    @property
+    def channels(self) -> str:
+        """Erfasste Kanäle: "AB", "A" (nur Spannung) oder "B" (nur Strom)."""
+        return ("A" if self.adc_u is not None else "") + ("B" if self.adc_i is not None else "")
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der Rohdaten in Bytes."""
+        return int(sum(adc.nbytes for adc in (self.adc_u, self.adc_i) if adc is not None))
+
+    # ---------- Umrechnung (lazy) ----------
+    @staticmethod
+    def _scale(adc: np.ndarray, scale: float, offset: float, dtype) -> np.ndarray:
+        # Ein Cast + In-place-Operationen: kein float64-Zwischenarray bei float32
+        out = adc.astype(dtype)
+        out *= out.dtype.type(scale)
+        if offset:
+            out += out.dtype.type(offset)
+        return out
+
+    def _converted(self, key: str, adc: np.ndarray, scale: float, offset: float, dtype) -> Optional[np.ndarray]:
+        if adc is None:
+            return None
+        dtype = np.dtype(dtype)
+        cache_key = (key, dtype.str)
+        arr = self._cache.get(cache_key)
+        if arr is None:
+            arr = self._scale(adc, scale, offset, dtype)
+            self._cache[cache_key] = arr
+        return arr
+
+    def u(self, dtype=np.float64) -> Optional[np.ndarray]:
+        """Spannung in Volt (wird beim ersten Aufruf je dtype berechnet; None ohne Kanal A)."""
+        return self._converted("u", self.adc_u, self.scale_u, self.offset_u, dtype)
+
+    def i(self, dtype=np.float64) -> Optional[np.ndarray]:
+        """Strom in Ampere bzw. Volt (wird beim ersten Aufruf je dtype berechnet; None ohne Kanal B)."""
+        return self._converted("i", self.adc_i, self.scale_i, self.offset_i, dtype)
+
+    def t(self, dtype=np.float64) -> np.ndarray:
+        """Zeitvektor in Sekunden (als Array, siehe auch `time_axis()`)."""
+        return self.time_axis().to_array(dtype)
+
+    def time_axis(self) -> TimeAxis:
+        """Zeitachse (t0, dt, n) ohne Array."""
+        return TimeAxis(self.t0, self.dt, self.n_samples)
+
+    def release_cache(self) -> None:
+        """Verwirft bereits umgerechnete float-Arrays (Rohdaten bleiben erhalten)."""
+        self._cache.clear()
+
+    # ---------- Metadaten ----------
+    def scaling_meta(self) -> Dict:
+        """
+        Skalierungs-Metadaten zum Speichern neben den Rohdaten.
+
+        Returns
+        -------
+        dict
+            scale_u, scale_i, offset_u, offset_i, dt, t0, i_unit
+        """
+        return {
+            'scale_u': self.scale_u,
+            'scale_i': self.scale_i,
+            'offset_u': self.offset_u,
+            'offset_i': self.offset_i,
+            'dt': self.dt,
+            't0': self.t0,
+            'i_unit': self.i_unit,
+        }
+
+    def __repr__(self) -> str:
+        return (f"RawPulse(pulse_id={self.pulse_id}, n_samples={self.n_samples}, "
+                f"channels='{self.channels}', dt={self.dt:.3e}, i_unit='{self.i_unit}')")
@@ -0,0 +1,713 @@
+"""
+Simuliertes PS3000A-SDK für Tests und Entwicklung ohne Hardware.
+
+`SimulatedPS3000A` stellt die ps3000a-Aufrufe bereit, die `PicoReader`
+verwendet (OpenUnit, SetChannel, SetSimpleTrigger, GetTimebase2, RunBlock,
+IsReady, GetValues, GetValuesBulk, GetNoOfCaptures, RunStreaming, Stop, ...), mit denselben
+Argumenten wie das picosdk-Modul (`ct.byref(...)`-Zeiger, Status-Codes,
+Callback-Typen). Ein Objekt wird einfach als Backend übergeben:
+
+    >>> sim = SimulatedPS3000A(trigger_interval_s=0.01, seed=1)
+    >>> reader = PicoReader(backend=sim)
+
+Signalmodell
+------------
+Jeder Trigger ist eine RC-Entladung: Kanal A (Spannung) und Kanal B (Strom)
+springen auf ihre Amplitude und fallen mit tau ab. Die Kurven werden pro
+Einstellung (Bereich, dt, Pre-/Posttrigger) einmal als int16-Vorlage
+berechnet und auf 8 Bit quantisiert (Vielfache von 256, wie beim 3000A);
+pro Erfassung wird nur ein Ausschnitt einer vorberechneten Rausch-Tabelle
+addiert.
+
+Zeitmodell
+----------
+Trigger kommen periodisch (`trigger_interval_s`) mit normalverteiltem
+Jitter. Ein Block ist fertig, wenn nach dem Pretrigger der nächste Trigger
+kam und die Nachtrigger-Samples erfasst sind (Rapid-Block: für jedes
+Segment nacheinander). `GetValues` wartet zusätzlich die Transferzeit
+(Latenz + Bytes / Datenrate) ab. Nach `Stop` bleiben die bis dahin
+gefüllten Rapid-Block-Segmente lesbar (`GetNoOfCaptures`).
+"""
+
+import ctypes as ct
+import functools
+import math
+import threading
+import time
+from collections import Counter
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .pulse_data import aggregate_min_max
+from .timebase import dt_to_timebase, timebase_to_dt
+
+
+# Status-Codes (PicoStatus.h)
+PICO_OK                 = 0x00
+PICO_NOT_FOUND          = 0x03
+PICO_INVALID_HANDLE     = 0x0C
+PICO_INVALID_PARAMETER  = 0x0D
+PICO_INVALID_TIMEBASE   = 0x0E
+PICO_INVALID_VOLTAGE_RANGE = 0x0F
+PICO_INVALID_CHANNEL    = 0x10
+PICO_TOO_MANY_SAMPLES   = 0x1D
+PICO_TOO_MANY_SEGMENTS  = 0x1E
+PICO_NO_SAMPLES_AVAILABLE = 0x25
+PICO_SEGMENT_OUT_OF_RANGE = 0x26
+PICO_BUSY               = 0x27
+
+MAX_ADC                 = 32512     # ps3000aMaximumValue bei 8-Bit-Geräten
+ADC_LSB                 = 256       # 8-Bit-Auflösung im int16-Wertebereich
+NOISE_TABLE_SAMPLES     = 1 << 16
+
+_RANGE_VOLTS = {0: 0.01, 1: 0.02, 2: 0.05, 3: 0.1, 4: 0.2, 5: 0.5,
+                6: 1.0, 7: 2.0, 8: 5.0, 9: 10.0, 10: 20.0, 11: 50.0}
+
+
+def _deref(p):
+    """Objekt hinter `ct.byref(...)` (oder das Objekt selbst)."""
+    return getattr(p, "_obj", p)
+
+
+def _value(x):
+    """int aus ctypes-Zahl oder Python-Zahl (Handles werden als c_int16 übergeben)."""
+    return getattr(x, "value", x)
+
+
+def _api(func):
+    """Zählt SDK-Aufrufe in `calls` (für Tests, z.B. Session-Modus)."""
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        with self._lock:
+            self.calls[func.__name__] += 1
+        return func(self, *args)
+    return wrapper
+
+
+class SimulatedPS3000A:
+    """
+    Ein simuliertes PicoScope der 3000A-Serie (2 Kanäle).
+
+    Parameters
+    ----------
+    serial : str, optional
+        Seriennummer; `ps3000aOpenUnit` mit anderer Seriennummer schlägt fehl.
+    variant : str, optional
+        Modellname für `ps3000aGetUnitInfo` (Standard: "3205A").
+    trigger_interval_s : float, optional
+        Abstand der Trigger-Ereignisse (Standard: 20 ms). 0 = sofort.
+    jitter_s : float, optional
+        Standardabweichung des Trigger-Zeitpunkts (Standard: 50 µs).
+    transfer_latency_s : float, optional
+        Feste Latenz pro Datenübertragung (Standard: 1 ms).
+    transfer_rate_bps : float, optional
+        USB-Datenrate in Byte/s (Standard: 30 MB/s, 0 = unendlich).
+    tau_s : float, optional
+        Zeitkonstante der RC-Entladung (Standard: 1 ms).
+    amplitudes_v : tuple, optional
+        Sprunghöhe (Kanal A, Kanal B) am Scope-Eingang in Volt
+        (Standard: (-1.0, -0.5)).
+    noise_lsb : float, optional
+        Rauschen (Standardabweichung) in 8-Bit-LSB (Standard: 0.7).
+    memory_samples : int, optional
+        Gerätespeicher in Samples (alle Kanäle zusammen).
+    seed : int, optional
+        Startwert für Rauschen und Jitter (reproduzierbar).
+
+    Attributes
+    ----------
+    calls : collections.Counter
+        Anzahl der Aufrufe pro SDK-Funktion.
+    """
+
+    PS3000A_CHANNEL = {"PS3000A_CHANNEL_A": 0, "PS3000A_CHANNEL_B": 1}
+    PS3000A_COUPLING = {"PS3000A_AC": 0, "PS3000A_DC": 1}
+    PS3000A_RANGE = {
+        "PS3000A_10MV": 0, "PS3000A_20MV": 1, "PS3000A_50MV": 2, "PS3000A_100MV": 3,
+        "PS3000A_200MV": 4, "PS3000A_500MV": 5, "PS3000A_1V": 6, "PS3000A_2V": 7,
+        "PS3000A_5V": 8, "PS3000A_10V": 9, "PS3000A_20V": 10, "PS3000A_50V": 11,
+    }
+    PS3000A_THRESHOLD_DIRECTION = {
+        "PS3000A_ABOVE": 0, "PS3000A_BELOW": 1, "PS3000A_RISING": 2,
+        "PS3000A_FALLING": 3, "PS3000A_RISING_OR_FALLING": 4,
+    }
+    PS3000A_RATIO_MODE = {
+        "PS3000A_RATIO_MODE_NONE": 0, "PS3000A_RATIO_MODE_AGGREGATE": 1,
+        "PS3000A_RATIO_MODE_DECIMATE": 2, "PS3000A_RATIO_MODE_AVERAGE": 4,
+    }
+    PS3000A_TIME_UNITS = {
+        "PS3000A_FS": 0, "PS3000A_PS": 1, "PS3000A_NS": 2,
+        "PS3000A_US": 3, "PS3000A_MS": 4, "PS3000A_S": 5,
+    }
+    PICO_POWER_SUPPLY_NOT_CONNECTED = 0x119
+    PICO_USB3_0_DEVICE_NON_USB3_0_PORT = 0x11E
+
+    BlockReadyType = ct.CFUNCTYPE(None, ct.c_int16, ct.c_uint32, ct.c_void_p)
+    StreamingReadyType = ct.CFUNCTYPE(
+        None, ct.c_int16, ct.c_int32, ct.c_uint32, ct.c_int16,
+        ct.c_uint32, ct.c_int16, ct.c_int16, ct.c_void_p
+    )
+
+    _next_handle = 1  # Handles über alle simulierten Geräte eindeutig
+
+    def __init__(
+        self,
+        serial: str = "SIM0001",
+        variant: str = "3205A",
+        trigger_interval_s: float = 0.02,
+        jitter_s: float = 50e-6,
+        transfer_latency_s: float = 1e-3,
+        transfer_rate_bps: float = 30e6,
+        tau_s: float = 1e-3,
+        amplitudes_v: Tuple[float, float] = (-1.0, -0.5),
+        noise_lsb: float = 0.7,
+        memory_samples: int = 64 * 1024 * 1024,
+        seed: Optional[int] = None
+    ):
+        self.serial = serial
+        self.variant = variant
+        self.trigger_interval_s = float(trigger_interval_s)
+        self.jitter_s = float(jitter_s)
+        self.transfer_latency_s = float(transfer_latency_s)
+        self.transfer_rate_bps = float(transfer_rate_bps)
+        self.tau_s = float(tau_s)
+        self.amplitudes_v = tuple(amplitudes_v)
+        self.memory_samples = int(memory_samples)
+
+        self.calls = Counter()
+        self._lock = threading.RLock()
+        self._rng = np.random.default_rng(seed)
+        noise = np.round(self._rng.normal(0.0, noise_lsb, NOISE_TABLE_SAMPLES)) * ADC_LSB
+        self._noise = noise.astype(np.int32)
+        self._jitter_table = self._rng.normal(0.0, 1.0, 1024)
+
+        self.handle = None
+        self._reset_device()
+
+    # ------------------------------------------------------------
+    # Gerätezustand
+    # ------------------------------------------------------------
+
+    def _reset_device(self):
+        self._channels = {0: [1, 1, 8, 0.0], 1: [1, 1, 8, 0.0]}  # enabled, coupling, range, offset
+        self._trigger = (0, 0, 0, 3, 0, 0)  # enable, source, threshold, direction, delay, auto_ms
+        self._segments = 1
+        self._captures = 1
+        self._buffers = {}                  # (channel, segment, mode) -> (buffer(s), n)
+        self._templates = {}
+        self._block = None
+        self._generation = 0                # ungültig machen von Ready-Timern nach Stop
+        self._timer = None
+        self._stream = None
+        self._t_origin = time.perf_counter() + self._rng.uniform(0.0, max(self.trigger_interval_s, 0.0))
+
+    def _is_open(self, handle) -> bool:
+        return self.handle is not None and _value(handle) == self.handle
+
+    def _n_enabled(self) -> int:
+        return sum(1 for ch in self._channels.values() if ch[0])
+
+    def _max_samples(self) -> int:
+        """Samples pro Kanal und Segment."""
+        return self.memory_samples // self._segments // max(1, self._n_enabled())
+
+    def _timebase_valid(self, timebase: int) -> bool:
+        # 2 Kanäle teilen sich den ADC: tb 0 (500 MS/s) nur mit einem Kanal
+        return timebase >= max(0, self._n_enabled() - 1)
+
+    def _transfer(self, n_bytes: int) -> None:
+        """Wartet die simulierte USB-Übertragung ab."""
+        delay = self.transfer_latency_s
+        if self.transfer_rate_bps > 0:
+            delay += n_bytes / self.transfer_rate_bps
+        if delay > 0:
+            time.sleep(delay)
+
+    # ------------------------------------------------------------
+    # Signal
+    # ------------------------------------------------------------
+
+    def _template(self, channel: int, pre: int, n: int, dt: float) -> Tuple[np.ndarray, bool]:
+        """
+        Quantisierte RC-Entladung für einen Kanal (int32, Trigger bei Index pre).
+
+        Returns
+        -------
+        tuple
+            (Vorlage, übersteuert) - übersteuert, wenn die Amplitude den
+            Messbereich überschreitet.
+        """
+        v_range = _RANGE_VOLTS[self._channels[channel][2]]
+        key = (channel, pre, n, dt, v_range)
+        if key not in self._templates:
+            k = np.arange(n - pre)
+            volts = self.amplitudes_v[channel] * np.exp(-k * dt / self.tau_s)
+            counts = np.zeros(n)
+            counts[pre:] = volts / v_range * MAX_ADC
+            clipped = bool(np.abs(counts).max() > MAX_ADC)
+            counts = np.round(np.clip(counts, -MAX_ADC, MAX_ADC) / ADC_LSB) * ADC_LSB
+            self._templates[key] = (counts.astype(np.int32), clipped)
+        return self._templates[key]
+
+    def _noise_at(self, start: int, n: int) -> np.ndarray:
+        """n Rausch-Samples ab Position start der zyklischen Tabelle."""
+        return np.take(self._noise, np.arange(start, start + n), mode="wrap")
+
+    def _capture(self, channel: int, segment: int, start: int, n: int) -> Tuple[np.ndarray, bool]:
+        """Samples [start, start + n) eines erfassten Segments als int16."""
+        block = self._block
+        total = block['pre'] + block['post']
+        if block['triggered'][segment]:
+            tmpl, clipped = self._template(channel, block['pre'], total, block['dt'])
+            x = tmpl[start:start + n]
+        else:
+            x, clipped = np.zeros(n, dtype=np.int32), False  # Auto-Trigger ohne Puls
+        x = x + self._noise_at(block['noise'][segment] + 7919 * channel + start, n)
+        return np.clip(x, -MAX_ADC, MAX_ADC).astype(np.int16), clipped
+
+    def _fires(self) -> bool:
+        """Ob der eingestellte Trigger vom Puls ausgelöst werden kann."""
+        enable, source, threshold, direction, _, _ = self._trigger
+        if not enable:
+            return True
+        if source not in self._channels or not self._channels[source][0]:
+            return False
+        amplitude = self.amplitudes_v[source] / _RANGE_VOLTS[self._channels[source][2]] * MAX_ADC
+        amplitude = max(-MAX_ADC, min(MAX_ADC, amplitude))
+        if direction in (1, 3):   # BELOW / FALLING
+            return amplitude <= threshold < 0
+        if direction in (0, 2):   # ABOVE / RISING
+            return 0 < threshold <= amplitude
+        return min(0, amplitude) <= threshold <= max(0, amplitude)
+
+    def _next_trigger(self, t: float) -> float:
+        """Zeitpunkt des ersten Triggers nach t (periodisch + Jitter)."""
+        period = self.trigger_interval_s
+        if period <= 0:
+            return t
+        k = math.ceil((t - self._t_origin) / period)
+        trig = self._t_origin + k * period + self._rng.normal(0.0, self.jitter_s)
+        return trig if trig >= t else trig + period
+
+    # ------------------------------------------------------------
+    # Gerät öffnen / schließen / Info
+    # ------------------------------------------------------------
+
+    @_api
+    def ps3000aOpenUnit(self, p_handle, serial=None):
+        if serial is not None:
+            serial = serial.decode() if isinstance(serial, bytes) else str(_value(serial))
+            if serial != self.serial:
+                return PICO_NOT_FOUND
+        if self.handle is not None:
+            return PICO_NOT_FOUND  # bereits von anderem Prozess/Reader geöffnet
+        with self._lock:
+            self.handle = SimulatedPS3000A._next_handle
+            SimulatedPS3000A._next_handle += 1
+        self._reset_device()
+        _deref(p_handle).value = self.handle
+        return PICO_OK
+
+    @_api
+    def ps3000aChangePowerSource(self, handle, power_state):
+        return PICO_OK if self._is_open(handle) else PICO_INVALID_HANDLE
+
+    @_api
+    def ps3000aCloseUnit(self, handle):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        self._halt()
+        self.handle = None
+        return PICO_OK
+
+    @_api
+    def ps3000aMaximumValue(self, handle, p_value):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        _deref(p_value).value = MAX_ADC
+        return PICO_OK
+
+    @_api
+    def ps3000aGetUnitInfo(self, handle, string, string_length, p_required_size, info):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        text = {3: self.variant, 4: self.serial}.get(_value(info))
+        if text is None:
+            return PICO_INVALID_PARAMETER
+        data = text.encode()[:max(0, _value(string_length) - 1)]
+        string.value = data
+        _deref(p_required_size).value = len(text) + 1
+        return PICO_OK
+
+    # ------------------------------------------------------------
+    # Einstellungen
+    # ------------------------------------------------------------
+
+    @_api
+    def ps3000aSetChannel(self, handle, channel, enabled, coupling, v_range, offset):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if channel not in self._channels:
+            return PICO_INVALID_CHANNEL
+        if v_range not in _RANGE_VOLTS:
+            return PICO_INVALID_VOLTAGE_RANGE
+        self._channels[channel] = [int(enabled), int(coupling), int(v_range), float(offset)]
+        return PICO_OK
+
+    @_api
+    def ps3000aSetSimpleTrigger(self, handle, enable, source, threshold, direction, delay, auto_trigger_ms):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        self._trigger = (int(enable), int(source), int(threshold), int(direction),
+                         int(delay), int(auto_trigger_ms))
+        return PICO_OK
+
+    @_api
+    def ps3000aGetTimebase2(self, handle, timebase, no_samples, p_time_interval_ns,
+                            oversample, p_max_samples, segment_index):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if not self._timebase_valid(timebase):
+            return PICO_INVALID_TIMEBASE
+        if no_samples > self._max_samples():
+            return PICO_TOO_MANY_SAMPLES
+        _deref(p_time_interval_ns).value = timebase_to_dt(timebase) * 1e9
+        _deref(p_max_samples).value = self._max_samples()
+        return PICO_OK
+
+    @_api
+    def ps3000aMemorySegments(self, handle, n_segments, p_max_samples):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if n_segments < 1 or n_segments > self.memory_samples:
+            return PICO_TOO_MANY_SEGMENTS
+        self._segments = int(n_segments)
+        self._captures = min(self._captures, self._segments)
+        self._buffers.clear()
+        _deref(p_max_samples).value = self.memory_samples // self._segments
+        return PICO_OK
+
+    @_api
+    def ps3000aSetNoOfCaptures(self, handle, n_captures):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if not 1 <= n_captures <= self._segments:
+            return PICO_TOO_MANY_SEGMENTS
+        self._captures = int(n_captures)
+        return PICO_OK
+
+    @_api
+    def ps3000aSetDataBuffer(self, handle, channel, p_buffer, n_values, segment_index, mode):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if channel not in self._channels:
+            return PICO_INVALID_CHANNEL
+        if segment_index >= self._segments:
+            return PICO_SEGMENT_OUT_OF_RANGE
+        self._buffers[(channel, segment_index, mode)] = ((_deref(p_buffer),), int(n_values))
+        return PICO_OK
+
+    @_api
+    def ps3000aSetDataBuffers(self, handle, channel, p_buffer_max, p_buffer_min,
+                              n_values, segment_index, mode):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if channel not in self._channels:
+            return PICO_INVALID_CHANNEL
+        if segment_index >= self._segments:
+            return PICO_SEGMENT_OUT_OF_RANGE
+        self._buffers[(channel, segment_index, mode)] = (
+            (_deref(p_buffer_max), _deref(p_buffer_min)), int(n_values)
+        )
+        return PICO_OK
+
+    # ------------------------------------------------------------
+    # Block-Modus
+    # ------------------------------------------------------------
+
+    @_api
+    def ps3000aRunBlock(self, handle, pre_samples, post_samples, timebase, oversample,
+                        p_time_indisposed_ms, segment_index, lp_ready, p_parameter):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if not self._timebase_valid(timebase):
+            return PICO_INVALID_TIMEBASE
+        if pre_samples + post_samples > self._max_samples():
+            return PICO_TOO_MANY_SAMPLES
+        if segment_index + self._captures > self._segments:
+            return PICO_SEGMENT_OUT_OF_RANGE
+
+        self._halt()
+        dt = timebase_to_dt(timebase)
+        auto_s = self._trigger[5] / 1000.0
+        fires = self._fires()
+
+        # Zeitpunkte: Pretrigger füllen, dann pro Segment auf den nächsten Trigger warten
+        t_arm = time.perf_counter()
+        t = t_arm
+        triggered = []
+        done_at = []
+        for _ in range(self._captures):
+            t += pre_samples * dt
+            if fires:
+                trig = self._next_trigger(t) if self._trigger[0] else t
+                if auto_s > 0 and trig - t > auto_s:
+                    trig, fired = t + auto_s, False
+                else:
+                    fired = True
+            elif auto_s > 0:
+                trig, fired = t + auto_s, False
+            else:
+                trig, fired = math.inf, False  # wartet ewig (bis Stop)
+            triggered.append(fired)
+            t = trig + post_samples * dt
+            done_at.append(t)
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._block = {
+                'pre': int(pre_samples),
+                'post': int(post_samples),
+                'dt': dt,
+                'first_segment': int(segment_index),
+                'triggered': triggered,
+                'noise': [int(x) for x in self._rng.integers(0, NOISE_TABLE_SAMPLES, len(triggered))],
+                'ready_at': t,
+                'done_at': done_at,     # Ende jedes Segments
+                'stopped_at': None,     # Zeitpunkt von Stop (danach keine neuen Segmente)
+            }
+
+        if p_time_indisposed_ms is not None and math.isfinite(t):
+            _deref(p_time_indisposed_ms).value = int((t - t_arm) * 1000)
+
+        if lp_ready is not None and math.isfinite(t):
+            def fire():
+                with self._lock:
+                    if self._generation != generation:
+                        return  # inzwischen gestoppt oder neu armiert
+                lp_ready(self.handle, PICO_OK, p_parameter)
+            self._timer = threading.Timer(max(0.0, t - time.perf_counter()), fire)
+            self._timer.daemon = True
+            self._timer.start()
+        return PICO_OK
+
+    @_api
+    def ps3000aIsReady(self, handle, p_ready):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        _deref(p_ready).value = 1 if self._block_ready() else 0
+        return PICO_OK
+
+    def _block_ready(self) -> bool:
+        block = self._block
+        return block is not None and (block['stopped_at'] is not None
+                                      or time.perf_counter() >= block['ready_at'])
+
+    def _completed_captures(self) -> int:
+        """Anzahl vollständig gefüllter Segmente des aktuellen Blocks."""
+        block = self._block
+        if block is None:
+            return 0
+        t = time.perf_counter() if block['stopped_at'] is None else block['stopped_at']
+        return sum(1 for done in block['done_at'] if done <= t)
+
+    @_api
+    def ps3000aGetNoOfCaptures(self, handle, p_n_captures):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        _deref(p_n_captures).value = self._completed_captures()
+        return PICO_OK
+
+    @_api
+    def ps3000aGetValues(self, handle, start_index, p_n_samples, downsample_ratio,
+                         mode, segment_index, p_overflow):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if not self._block_ready():
+            return PICO_NO_SAMPLES_AVAILABLE
+        block = self._block
+        segment = segment_index - block['first_segment']
+        if not 0 <= segment < len(block['triggered']):
+            return PICO_SEGMENT_OUT_OF_RANGE
+        if segment >= self._completed_captures():
+            return PICO_NO_SAMPLES_AVAILABLE
+
+        n_req = _deref(p_n_samples)
+        n = max(0, min(int(n_req.value), block['pre'] + block['post'] - start_index))
+        overflow = 0
+        n_out = n
+        for channel in self._channels:
+            entry = self._buffers.get((channel, segment_index, mode))
+            if entry is None or not self._channels[channel][0]:
+                continue
+            (bufs, buf_len) = entry
+            x, clipped = self._capture(channel, segment, start_index, n)
+            overflow |= (1 << channel) if clipped else 0
+            if mode == self.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_AGGREGATE"]:
+                x_min, x_max = aggregate_min_max(x, max(1, int(downsample_ratio)))
+                n_out = min(len(x_min), buf_len)
+                np.frombuffer(bufs[0], dtype=np.int16, count=n_out)[:] = x_max[:n_out]
+                np.frombuffer(bufs[1], dtype=np.int16, count=n_out)[:] = x_min[:n_out]
+            elif mode == self.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]:
+                n_out = min(n, buf_len)
+                np.frombuffer(bufs[0], dtype=np.int16, count=n_out)[:] = x[:n_out]
+            else:
+                return PICO_INVALID_PARAMETER
+
+        self._transfer(2 * n_out * self._n_enabled() * (2 if mode else 1))
+        n_req.value = n_out
+        if p_overflow is not None:
+            _deref(p_overflow).value = overflow
+        return PICO_OK
+
+    @_api
+    def ps3000aGetValuesBulk(self, handle, p_n_samples, from_segment, to_segment,
+                             downsample_ratio, mode, p_overflow):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        if not self._block_ready():
+            return PICO_NO_SAMPLES_AVAILABLE
+        if mode != self.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]:
+            return PICO_INVALID_PARAMETER
+        block = self._block
+        first = block['first_segment']
+        if from_segment < first or to_segment >= first + len(block['triggered']):
+            return PICO_SEGMENT_OUT_OF_RANGE
+        if to_segment - first >= self._completed_captures():
+            return PICO_NO_SAMPLES_AVAILABLE
+
+        n_req = _deref(p_n_samples)
+        n = min(int(n_req.value), block['pre'] + block['post'])
+        overflows = _deref(p_overflow)
+        for k, seg in enumerate(range(from_segment, to_segment + 1)):
+            overflow = 0
+            for channel in self._channels:
+                entry = self._buffers.get((channel, seg, mode))
+                if entry is None or not self._channels[channel][0]:
+                    continue
+                x, clipped = self._capture(channel, seg - first, 0, n)
+                overflow |= (1 << channel) if clipped else 0
+                np.frombuffer(entry[0][0], dtype=np.int16, count=min(n, entry[1]))[:] = x[:entry[1]]
+            overflows[k] = overflow
+
+        self._transfer(2 * n * self._n_enabled() * (to_segment - from_segment + 1))
+        n_req.value = n
+        return PICO_OK
+
+    def _halt(self) -> None:
+        """
+        Bricht laufende Erfassung ab; ausstehende Ready-Callbacks verfallen.
+
+        Bereits gefüllte Segmente eines unfertigen Blocks bleiben lesbar.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            block = self._block
+            if block is not None and block['stopped_at'] is None and not self._block_ready():
+                if self._completed_captures() == 0:
+                    self._block = None  # noch kein Segment fertig: keine Daten
+                else:
+                    block['stopped_at'] = time.perf_counter()
+            self._stream = None
+
+    @_api
+    def ps3000aStop(self, handle):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        self._halt()
+        return PICO_OK
+
+    # ------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------
+
+    @_api
+    def ps3000aRunStreaming(self, handle, p_sample_interval, time_units, max_pre_trigger_samples,
+                            max_post_trigger_samples, auto_stop, downsample_ratio,
+                            ratio_mode, overview_buffer_size):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        # Puffer des ersten aktivierten Kanals (nur Kanal B: dessen Puffer)
+        mode = self.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]
+        entry = next((self._buffers[(channel, 0, mode)] for channel in sorted(self._channels)
+                      if self._channels[channel][0] and (channel, 0, mode) in self._buffers), None)
+        if entry is None:
+            return PICO_INVALID_PARAMETER
+
+        # Intervall auf das Timebase-Raster runden und zurückschreiben
+        unit = 10.0 ** (-15 + 3 * int(time_units))
+        interval = _deref(p_sample_interval)
+        tb = max(dt_to_timebase(interval.value * unit), max(0, self._n_enabled() - 1))
+        dt = timebase_to_dt(tb)
+        interval.value = max(1, int(round(dt / unit)))
+
+        self._halt()
+        period = self.trigger_interval_s / dt if self.trigger_interval_s > 0 else math.inf
+        tail = int(min(10 * self.tau_s / dt, period if math.isfinite(period) else 10 * self.tau_s / dt))
+        with self._lock:
+            self._stream = {
+                'dt': dt,
+                'start': time.perf_counter(),
+                'produced': 0,
+                'pos': 0,
+                'buffer_len': entry[1],
+                'period': period,
+                'phase': self._rng.uniform(0.0, period) if math.isfinite(period) else 0.0,
+                'tails': [self._template(ch, 0, max(1, tail), dt)[0] for ch in (0, 1)],
+                'lost': 0,
+            }
+        return PICO_OK
+
+    def _stream_chunk(self, channel: int, s0: int, n: int) -> np.ndarray:
+        """Stromabschnitt [s0, s0 + n) eines Kanals: Rauschen + Pulse."""
+        stream = self._stream
+        x = self._noise_at(s0 + 7919 * channel, n)
+        period = stream['period']
+        if math.isfinite(period):
+            tail = stream['tails'][channel]
+            jitter = self.jitter_s / stream['dt']
+            j0 = max(0, int((s0 - len(tail) - stream['phase']) / period) - 1)
+            j1 = int((s0 + n - stream['phase']) / period) + 2
+            for j in range(j0, j1):
+                start = int(round(stream['phase'] + j * period
+                                  + jitter * self._jitter_table[j % len(self._jitter_table)]))
+                lo, hi = max(start, s0), min(start + len(tail), s0 + n)
+                if lo < hi:
+                    x[lo - s0:hi - s0] += tail[lo - start:hi - start]
+        return np.clip(x, -MAX_ADC, MAX_ADC).astype(np.int16)
+
+    @_api
+    def ps3000aGetStreamingLatestValues(self, handle, lp_ready, p_parameter):
+        if not self._is_open(handle):
+            return PICO_INVALID_HANDLE
+        stream = self._stream
+        if stream is None:
+            return PICO_INVALID_PARAMETER
+
+        available = int((time.perf_counter() - stream['start']) / stream['dt']) - stream['produced']
+        if available <= 0:
+            return PICO_BUSY
+        if available > stream['buffer_len']:
+            # Anwendung zu langsam: Treiberpuffer übergelaufen
+            stream['lost'] += available - stream['buffer_len']
+            stream['produced'] += available - stream['buffer_len']
+            available = stream['buffer_len']
+
+        pos = stream['pos']
+        n = min(available, stream['buffer_len'] - pos)
+        for channel in self._channels:
+            entry = self._buffers.get((channel, 0, self.PS3000A_RATIO_MODE["PS3000A_RATIO_MODE_NONE"]))
+            if entry is None or not self._channels[channel][0]:
+                continue
+            view = np.frombuffer(entry[0][0], dtype=np.int16, count=entry[1])
+            view[pos:pos + n] = self._stream_chunk(channel, stream['produced'], n)
+
+        stream['produced'] += n
+        stream['pos'] = (pos + n) % stream['buffer_len']
+        lp_ready(self.handle, n, pos, 0, 0, 0, 0, p_parameter)
+        return PICO_OK
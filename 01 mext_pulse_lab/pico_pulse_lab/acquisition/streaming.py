@@ -0,0 +1,263 @@
+"""
+Lückenlose Streaming-Erfassung mit Software-Trigger.
+
+Im Streaming-Modus (`ps3000aRunStreaming` / `ps3000aGetStreamingLatestValues`)
+liefert der Treiber fortlaufend Blöcke beliebiger Länge. Diese werden hier
+in einen großen int16-Ringpuffer kopiert; ein vektorisierter Software-Trigger
+sucht in jedem neuen Block fallende Flanken (gleiche Logik wie der
+Hardware-Trigger in `_setup_trigger`: der Trigger-Kanal unterschreitet den
+ADC-Schwellwert). Der Trigger-Kanal wird immer als erster Kanal übergeben;
+bei Erfassung nur eines Kanals entfällt der zweite (`n_channels=1`).
+
+Sobald nach einer Flanke genug Nachtrigger-Samples im Ring liegen, wird das
+Fenster [Trigger - pre, Trigger + post) als Puls herausgeschnitten.
+
+Die Klassen hier kennen das SDK nicht; `PicoReader` füttert sie aus dem
+Streaming-Callback.
+"""
+
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def find_falling_edges(x: np.ndarray, threshold_adc: int, prev: Optional[int] = None) -> np.ndarray:
+    """
+    Indizes fallender Flanken durch den Schwellwert (vektorisiert).
+
+    Eine Flanke liegt bei Index k, wenn x[k-1] > threshold und x[k] <= threshold.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        int16-Samples des Trigger-Kanals.
+    threshold_adc : int
+        Schwellwert in ADC-Counts.
+    prev : int, optional
+        Letztes Sample des vorherigen Blocks (damit Flanken an der
+        Blockgrenze nicht verloren gehen).
+
+    Returns
+    -------
+    np.ndarray
+        Indizes (int64) relativ zum Blockanfang, aufsteigend.
+    """
+    if x.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    above = x > threshold_adc
+    edges = np.flatnonzero(above[:-1] & ~above[1:]) + 1
+    if prev is not None and prev > threshold_adc and not above[0]:
+        edges = np.concatenate(([0], edges))
+    return edges.astype(np.int64, copy=False)
+
+
+class StreamRingBuffer:
+    """
+    Ringpuffer für ein oder zwei int16-Kanäle mit absolutem Sample-Index.
+
+    Parameters
+    ----------
+    capacity : int
+        Anzahl Samples pro Kanal, die im Ring gehalten werden.
+    n_channels : int, optional
+        1 oder 2 (Standard: 2). Mit 1 Kanal ist `b` None und wird beim
+        Schreiben ignoriert.
+
+    Notes
+    -----
+    `total` zählt alle jemals geschriebenen Samples. Lesbar sind die
+    Samples im Bereich [oldest, total).
+    """
+
+    def __init__(self, capacity: int, n_channels: int = 2):
+        if capacity < 1:
+            raise ValueError("capacity muss >= 1 sein")
+        if n_channels not in (1, 2):
+            raise ValueError("n_channels muss 1 oder 2 sein")
+        self.capacity = int(capacity)
+        self.a = np.zeros(self.capacity, dtype=np.int16)
+        self.b = np.zeros(self.capacity, dtype=np.int16) if n_channels == 2 else None
+        self.total = 0
+
+    @property
+    def oldest(self) -> int:
+        """Absoluter Index des ältesten noch vorhandenen Samples."""
+        return max(0, self.total - self.capacity)
+
+    def write(self, a: np.ndarray, b: Optional[np.ndarray] = None) -> None:
+        """Hängt einen Block an (überschreibt die ältesten Samples)."""
+        n = len(a)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Nur das Ende passt in den Ring
+            skip = n - self.capacity
+            self.total += skip
+            a, n = a[skip:], self.capacity
+            b = b[skip:] if b is not None else None
+
+        pos = self.total % self.capacity
+        first = min(n, self.capacity - pos)
+        self.a[pos:pos + first] = a[:first]
+        if self.b is not None:
+            self.b[pos:pos + first] = b[:first]
+        if first < n:
+            self.a[:n - first] = a[first:]
+            if self.b is not None:
+                self.b[:n - first] = b[first:]
+        self.total += n
+
+    def read(self, start: int, n: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Kopiert n Samples ab absolutem Index start (b ist None bei 1 Kanal).
+
+        Raises
+        ------
+        ValueError
+            Wenn der Bereich bereits überschrieben oder noch nicht geschrieben ist.
+        """
+        if start < self.oldest or start + n > self.total:
+            raise ValueError(f"Bereich [{start}, {start + n}) nicht im Ringpuffer "
+                             f"[{self.oldest}, {self.total})")
+        pos = start % self.capacity
+
+        def copy(x):
+            if x is None:
+                return None
+            if pos + n <= self.capacity:
+                return x[pos:pos + n].copy()
+            first = self.capacity - pos
+            return np.concatenate((x[pos:], x[:n - first]))
+
+        return copy(self.a), copy(self.b)
+
+
+class StreamingPulseDetector:
+    """
+    Software-Trigger über einen kontinuierlichen Datenstrom.
+
+    Parameters
+    ----------
+    pre_samples : int
+        Samples vor dem Trigger (Pretrigger-Kontext).
+    post_samples : int
+        Samples ab dem Trigger.
+    threshold_adc : int
+        Schwellwert für die fallende Flanke auf dem Trigger-Kanal (ADC-Counts).
+    ring_samples : int, optional
+        Größe des Ringpuffers (Standard: 8 x Pulslänge).
+    holdoff_samples : int, optional
+        Mindestabstand zwischen zwei Triggern (Standard: post_samples,
+        d.h. wie beim Hardware-Trigger erst nach Ende des Pulsfensters
+        neu scharf).
+    n_channels : int, optional
+        Anzahl Kanäle im Strom (Standard: 2). Mit 1 ist `b` überall None.
+
+    Examples
+    --------
+    >>> det = StreamingPulseDetector(80_000, 400_000, threshold_adc=-4000)
+    >>> for trig, adc_a, adc_b in det.push(chunk_a, chunk_b):
+    ...     handle(adc_a, adc_b)
+    """
+
+    def __init__(
+        self,
+        pre_samples: int,
+        post_samples: int,
+        threshold_adc: int,
+        ring_samples: Optional[int] = None,
+        holdoff_samples: Optional[int] = None,
+        n_channels: int = 2
+    ):
+        self.pre_samples = int(pre_samples)
+        self.post_samples = int(post_samples)
+        self.threshold_adc = int(threshold_adc)
+        window = self.pre_samples + self.post_samples
+        self.ring = StreamRingBuffer(ring_samples or 8 * window, n_channels)
+        if self.ring.capacity < window:
+            raise ValueError("ring_samples muss mindestens pre_samples + post_samples sein")
+        self.holdoff_samples = self.post_samples if holdoff_samples is None else int(holdoff_samples)
+
+        self._pending = deque()                 # absolute Trigger-Indizes
+        self._next_allowed = self.pre_samples   # erst triggern, wenn Pretrigger vorhanden
+        self._prev = None
+
+        # Statistik
+        self.detected = 0
+        self.emitted = 0
+        self.lost = 0  # Pretrigger bereits überschrieben (Ring zu klein / Verarbeitung zu langsam)
+
+    def push(self, a: np.ndarray, b: Optional[np.ndarray] = None) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Verarbeitet einen neuen Block vom Treiber.
+
+        Parameters
+        ----------
+        a : np.ndarray
+            Neue int16-Samples des Trigger-Kanals.
+        b : np.ndarray, optional
+            Neue int16-Samples des zweiten Kanals (gleiche Länge; None bei 1 Kanal).
+
+        Returns
+        -------
+        list of tuple
+            Fertige Pulse als (trigger_index, adc_a, adc_b); trigger_index
+            ist der absolute Sample-Index im Strom, adc_b ist None bei 1 Kanal.
+
+        Notes
+        -----
+        Blöcke, die größer als der freie Platz im Ring sind, werden in
+        Teilstücken verarbeitet, damit kein Pretrigger überschrieben wird,
+        bevor der Puls herausgeschnitten ist.
+        """
+        step = max(1, self.ring.capacity - self.pre_samples - self.post_samples)
+        if len(a) <= step:
+            return self._push_chunk(a, b)
+
+        out = []
+        for k in range(0, len(a), step):
+            out.extend(self._push_chunk(a[k:k + step], None if b is None else b[k:k + step]))
+        return out
+
+    def _push_chunk(self, a: np.ndarray, b: np.ndarray) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        start = self.ring.total
+        self.ring.write(a, b)
+
+        if len(a):
+            edges = find_falling_edges(a, self.threshold_adc, self._prev) + start
+            self._prev = int(a[-1])
+            # Holdoff: wenige Flanken pro Block -> Schleife unkritisch
+            for trig in edges[edges >= self._next_allowed]:
+                if trig < self._next_allowed:
+                    continue
+                self._pending.append(int(trig))
+                self._next_allowed = int(trig) + max(1, self.holdoff_samples)
+                self.detected += 1
+
+        return self._collect()
+
+    def _collect(self) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        out = []
+        window = self.pre_samples + self.post_samples
+        while self._pending and self._pending[0] + self.post_samples <= self.ring.total:
+            trig = self._pending.popleft()
+            first = trig - self.pre_samples
+            if first < self.ring.oldest:
+                self.lost += 1
+                continue
+            adc_a, adc_b = self.ring.read(first, window)
+            out.append((trig, adc_a, adc_b))
+            self.emitted += 1
+        return out
+
+    def get_stats(self) -> dict:
+        """Gibt Zähler des Detektors zurück (für get_status/Meta)."""
+        return {
+            'samples': self.ring.total,
+            'detected': self.detected,
+            'emitted': self.emitted,
+            'pending': len(self._pending),
+            'lost': self.lost,
+        }
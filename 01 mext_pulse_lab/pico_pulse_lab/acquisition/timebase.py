@@ -0,0 +1,280 @@
+"""
+Schnelle Timebase-Auflösung für PS3000A mit persistentem Cache.
+
+Statt `ps3000aGetTimebase2` für jede Timebase von 1 bis 50000 aufzurufen
+(jeder Aufruf geht durch den USB-Treiber), wird der Kandidat direkt aus
+der Timebase-Formel der 3000A-Serie berechnet:
+
+    tb = 0..2:  dt = 2^tb / 500 MHz
+    tb >= 3:    dt = (tb - 2) / 62,5 MHz
+
+Anschließend werden nur wenige Nachbarn mit dem SDK geprüft. Weicht das
+SDK im linearen Bereich von der Formel ab (z.B. 1-GS/s-Modelle mit
+125 MHz Takt), wird der Takt aus der Antwort kalibriert und der Kandidat
+neu berechnet.
+
+Ergebnisse werden als JSON auf der Platte gespeichert, Schlüssel:
+Modell/Seriennummer, Anzahl Kanäle, n_samples, target_fs. Beim nächsten
+Start genügt ein einziger SDK-Aufruf zur Bestätigung.
+
+Die Funktionen hier kennen das SDK nicht selbst; der Aufrufer übergibt
+eine Funktion `get_timebase(tb) -> dt_s oder None`.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+
+# 3000A-Serie (500 MS/s): exponentieller Bereich tb 0..2, danach linear
+FAST_CLOCK_HZ       = 500e6     # Takt für tb = 0..2
+LINEAR_CLOCK_HZ     = 62.5e6    # Takt für tb >= 3
+N_FAST_TIMEBASES    = 3
+MAX_TIMEBASE        = 2**32 - 1
+
+NEIGHBOUR_WINDOW    = 2         # geprüfte Nachbarn links/rechts vom Kandidaten
+MAX_EXTRA_PROBES    = 64        # weitere Versuche, falls kein Nachbar gültig ist
+
+DEFAULT_CACHE_PATH  = os.path.join(os.path.expanduser("~"), ".pico_pulse_lab", "timebase_cache.json")
+
+
+def timebase_to_dt(tb: int, linear_clock_hz: float = LINEAR_CLOCK_HZ) -> float:
+    """
+    Sample-Abstand einer Timebase nach der 3000A-Formel.
+
+    Parameters
+    ----------
+    tb : int
+        Timebase (0 .. 2^32-1).
+    linear_clock_hz : float, optional
+        Takt im linearen Bereich (Standard: 62,5 MHz).
+
+    Returns
+    -------
+    float
+        dt in Sekunden.
+    """
+    if tb < N_FAST_TIMEBASES:
+        return (2 ** tb) / FAST_CLOCK_HZ
+    return (tb - 2) / linear_clock_hz
+
+
+def dt_to_timebase(target_dt: float, linear_clock_hz: float = LINEAR_CLOCK_HZ) -> int:
+    """
+    Nächstliegende Timebase zu einem gewünschten Sample-Abstand (analytisch).
+
+    Parameters
+    ----------
+    target_dt : float
+        Gewünschter Sample-Abstand in Sekunden.
+    linear_clock_hz : float, optional
+        Takt im linearen Bereich (Standard: 62,5 MHz).
+
+    Returns
+    -------
+    int
+        Timebase mit dem kleinsten relativen Fehler zu target_dt.
+    """
+    if target_dt <= 0:
+        raise ValueError("target_dt muss > 0 sein")
+
+    candidates = list(range(N_FAST_TIMEBASES))
+    tb_lin = int(round(target_dt * linear_clock_hz)) + 2
+    candidates += [tb for tb in (tb_lin - 1, tb_lin, tb_lin + 1)
+                   if N_FAST_TIMEBASES <= tb <= MAX_TIMEBASE]
+
+    return min(candidates,
+               key=lambda tb: abs(timebase_to_dt(tb, linear_clock_hz) - target_dt) / target_dt)
+
+
+def cache_key(device_id: str, n_channels: int, n_samples: int, target_fs: float) -> str:
+    """Schlüssel eines Cache-Eintrags (Gerät|Kanäle|Samples|fs)."""
+    return f"{device_id}|{int(n_channels)}ch|{int(n_samples)}|{float(target_fs):.6g}"
+
+
+class TimebaseCache:
+    """
+    JSON-Datei mit bereits aufgelösten Timebases.
+
+    Parameters
+    ----------
+    path : str, optional
+        Pfad der Cache-Datei (Standard: ~/.pico_pulse_lab/timebase_cache.json).
+
+    Notes
+    -----
+    Eine defekte oder fehlende Datei wird wie ein leerer Cache behandelt.
+    Geschrieben wird über eine temporäre Datei + `os.replace`, damit ein
+    Abbruch keine halbe Datei hinterlässt.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CACHE_PATH
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Gibt den Eintrag {timebase, dt, fs, ...} zurück oder None."""
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, timebase: int, dt: float, fs: float) -> None:
+        """Speichert einen Eintrag (überschreibt vorhandenen)."""
+        with self._lock:
+            data = self._load()
+            data[key] = {
+                'timebase': int(timebase),
+                'dt': float(dt),
+                'fs': float(fs),
+                'created': datetime.now().isoformat(),
+            }
+            self._write(data)
+
+    def invalidate(self, key: str) -> None:
+        """Entfernt einen (veralteten) Eintrag."""
+        with self._lock:
+            data = self._load()
+            if data.pop(key, None) is not None:
+                self._write(data)
+
+    def _write(self, data: Dict) -> None:
+        """Schreibt den Cache atomar (temporäre Datei + `os.replace`)."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Cache ist nur Beschleunigung -> Messung nicht abbrechen
+            print(f"[Warnung] Timebase-Cache nicht schreibbar: {e}")
+
+
+def resolve_timebase(
+    get_timebase: Callable[[int], Optional[float]],
+    target_fs: float
+) -> Tuple[int, float, float]:
+    """
+    Bestimmt die Timebase mit wenigen SDK-Aufrufen.
+
+    Parameters
+    ----------
+    get_timebase : callable
+        Funktion tb -> dt in Sekunden, oder None wenn die Timebase ungültig
+        ist (z.B. ps3000aGetTimebase2 mit Status != 0).
+    target_fs : float
+        Gewünschte Abtastrate in Hz.
+
+    Returns
+    -------
+    tuple
+        (tb, dt, fs) - Timebase, Zeitdauer pro Sample [s], Abtastrate [Hz]
+
+    Raises
+    ------
+    RuntimeError
+        Keine gültige Timebase gefunden.
+    """
+    if target_fs <= 0:
+        raise ValueError("target_fs muss > 0 sein")
+    target_dt = 1.0 / target_fs
+
+    probed: Dict[int, Optional[float]] = {}
+
+    def probe(tb: int) -> Optional[float]:
+        if tb not in probed:
+            dt = get_timebase(tb) if 0 <= tb <= MAX_TIMEBASE else None
+            probed[tb] = dt if (dt is not None and dt > 0) else None
+        return probed[tb]
+
+    # 1) Analytischer Kandidat
+    tb0 = dt_to_timebase(target_dt)
+    dt0 = probe(tb0)
+
+    # 2) Linearer Bereich weicht ab -> Takt aus SDK-Antwort kalibrieren
+    if dt0 is not None and tb0 >= N_FAST_TIMEBASES:
+        expected = timebase_to_dt(tb0)
+        if abs(dt0 - expected) / expected > 0.01:
+            clock_hz = (tb0 - 2) / dt0
+            tb0 = dt_to_timebase(target_dt, clock_hz)
+
+    # 3) Nachbarn prüfen
+    for tb in range(tb0 - NEIGHBOUR_WINDOW, tb0 + NEIGHBOUR_WINDOW + 1):
+        probe(tb)
+
+    # 4) Nichts gültig (z.B. zu viele Samples für kleine tb) -> nach oben weitersuchen
+    tb = tb0 + NEIGHBOUR_WINDOW + 1
+    while not any(dt is not None for dt in probed.values()) and tb <= tb0 + MAX_EXTRA_PROBES:
+        probe(tb)
+        tb += 1
+
+    valid = [(abs(1.0 / dt - target_fs) / target_fs, tb, dt)
+             for tb, dt in probed.items() if dt is not None]
+    if not valid:
+        raise RuntimeError("Keine gültige Timebase gefunden.")
+
+    _, tb, dt = min(valid)
+    return tb, dt, 1.0 / dt
+
+
+def resolve_timebase_cached(
+    get_timebase: Callable[[int], Optional[float]],
+    target_fs: float,
+    n_samples: int,
+    device_id: str,
+    n_channels: int = 2,
+    cache: Optional[TimebaseCache] = None
+) -> Tuple[int, float, float]:
+    """
+    Wie `resolve_timebase()`, aber mit persistentem Cache.
+
+    Ein Cache-Treffer wird mit einem einzigen `get_timebase`-Aufruf
+    bestätigt; ist die Timebase nicht mehr gültig (z.B. andere
+    Segmentierung), wird neu aufgelöst und der Eintrag ersetzt.
+
+    Parameters
+    ----------
+    get_timebase : callable
+        Siehe `resolve_timebase()`.
+    target_fs : float
+        Gewünschte Abtastrate in Hz.
+    n_samples : int
+        Samples pro Kanal und Block.
+    device_id : str
+        Modell/Seriennummer, z.B. "3205A/CW123/456".
+    n_channels : int, optional
+        Anzahl aktiver Kanäle (Standard: 2).
+    cache : TimebaseCache, optional
+        Cache-Objekt (Standard: Datei unter ~/.pico_pulse_lab).
+
+    Returns
+    -------
+    tuple
+        (tb, dt, fs)
+
+    Examples
+    --------
+    >>> tb, dt, fs = resolve_timebase_cached(probe, 20e6, 480_000, "3205A/AB123/001")
+    """
+    cache = cache or TimebaseCache()
+    key = cache_key(device_id, n_channels, n_samples, target_fs)
+
+    entry = cache.get(key)
+    if entry is not None:
+        dt = get_timebase(int(entry['timebase']))
+        if dt is not None and dt > 0 and abs(dt - entry['dt']) <= 1e-6 * entry['dt']:
+            return int(entry['timebase']), dt, 1.0 / dt
+        cache.invalidate(key)
+
+    tb, dt, fs = resolve_timebase(get_timebase, target_fs)
+    cache.put(key, tb, dt, fs)
+    return tb, dt, fs
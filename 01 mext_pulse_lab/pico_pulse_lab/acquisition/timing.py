@@ -0,0 +1,113 @@
+"""
+Zeitmessung der Erfassungsstufen pro Puls.
+
+`StageTimer` hält für jede Stufe (Arm, Trigger-Warten, Transfer,
+Umrechnung, Callback, CSV, NPZ) ein vorab allokiertes int64-Array mit
+Dauern in Nanosekunden (`time.perf_counter_ns`, monoton). Eine Messung
+kostet zwei Zeitabfragen und einen Array-Schreibzugriff; ausgewertet wird
+erst in `summary()` (Perzentile + logarithmisches Histogramm).
+
+Jede Stufe wird nur von einem Thread beschrieben (Erfassung: Arm, Warten,
+Transfer; Verarbeitung: Umrechnung bis NPZ – im Pipeline-Modus im
+Consumer-Thread), daher ohne Lock.
+
+Examples
+--------
+>>> timer = StageTimer(capacity=1000)
+>>> t0 = time.perf_counter_ns()
+>>> run_block()
+>>> t1 = timer.record(ARM, t0)          # gibt Endzeit zurück -> nächste Stufe
+>>> wait_ready()
+>>> timer.record(TRIGGER_WAIT, t1)
+>>> timer.summary()['trigger_wait']['p50_us']
+"""
+
+import time
+from typing import Dict
+
+import numpy as np
+
+
+STAGES = ("arm", "trigger_wait", "transfer", "convert", "callback", "csv_write", "npz_write")
+ARM, TRIGGER_WAIT, TRANSFER, CONVERT, CALLBACK, CSV_WRITE, NPZ_WRITE = range(len(STAGES))
+
+TIMING_CAPACITY = 100_000                   # Werte pro Stufe (danach Ringpuffer: die letzten N)
+HIST_EDGES_US = np.logspace(0, 7, 29)       # 1 µs .. 10 s, 4 Bins pro Dekade
+
+
+class StageTimer:
+    """
+    Vorab allokierte Dauern je Erfassungsstufe.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Anzahl gespeicherter Werte pro Stufe (Standard: 100 000). Bei mehr
+        Pulsen werden die ältesten überschrieben; `count` zählt weiter.
+    """
+
+    def __init__(self, capacity: int = TIMING_CAPACITY):
+        self.capacity = max(1, int(capacity))
+        self._ns = np.zeros((len(STAGES), self.capacity), dtype=np.int64)
+        self._count = [0] * len(STAGES)
+
+    def record(self, stage: int, t_start_ns: int) -> int:
+        """
+        Speichert die Dauer seit t_start_ns für eine Stufe.
+
+        Parameters
+        ----------
+        stage : int
+            Stufen-Index (ARM, TRIGGER_WAIT, ...).
+        t_start_ns : int
+            Startzeit aus `time.perf_counter_ns()`.
+
+        Returns
+        -------
+        int
+            Aktuelle Zeit in ns (Startzeit der nächsten Stufe).
+        """
+        now = time.perf_counter_ns()
+        k = self._count[stage]
+        self._ns[stage, k % self.capacity] = now - t_start_ns
+        self._count[stage] = k + 1
+        return now
+
+    def count(self, stage: int) -> int:
+        """Anzahl Messungen einer Stufe (inkl. überschriebener)."""
+        return self._count[stage]
+
+    def values_ns(self, stage: int) -> np.ndarray:
+        """Gespeicherte Dauern einer Stufe in ns (höchstens `capacity` Werte, Reihenfolge beliebig)."""
+        return self._ns[stage, :min(self._count[stage], self.capacity)]
+
+    def summary(self) -> Dict:
+        """
+        Statistik und Histogramm je Stufe (JSON-tauglich, für Meta/Status).
+
+        Returns
+        -------
+        dict
+            {stage: {'n', 'mean_us', 'p50_us', 'p95_us', 'max_us', 'total_ms', 'hist'}}
+            für jede Stufe mit Messungen, plus 'hist_edges_us' (Bin-Grenzen).
+            'total_ms' bezieht sich auf die gespeicherten Werte.
+        """
+        out = {}
+        for stage, name in enumerate(STAGES):
+            values = self.values_ns(stage)
+            if values.size == 0:
+                continue
+            us = values / 1e3
+            p50, p95 = np.percentile(us, (50, 95))
+            hist, _ = np.histogram(np.clip(us, HIST_EDGES_US[0], HIST_EDGES_US[-1]), HIST_EDGES_US)
+            out[name] = {
+                'n': self._count[stage],
+                'mean_us': float(us.mean()),
+                'p50_us': float(p50),
+                'p95_us': float(p95),
+                'max_us': float(us.max()),
+                'total_ms': float(values.sum() / 1e6),
+                'hist': hist.tolist(),
+            }
+        out['hist_edges_us'] = HIST_EDGES_US.tolist()
+        return out
@@ -0,0 +1,287 @@
+"""
+Ablaufsteuerung Scope + Pulsgeber: erst armieren, dann feuern.
+
+`PulseController` koordiniert `PicoReader` (Erfassung) und `NucleoUART`
+(STM32-Pulsgeber) für eine Pulsfolge:
+
+1. T2-Periode (Pulsabstand) setzen bzw. per READBACK lesen
+2. Messung im Hintergrund starten, warten bis der Scope armiert ist
+3. `start_sequence(n)` an den STM32 senden
+4. Warten, bis alle Pulse erfasst sind (höchstens n · T2 + Reserve)
+5. Fehlende und zusätzliche Trigger auswerten
+
+Der Reader läuft standardmäßig mit `use_pipeline=True`: der Mess-Thread
+armiert direkt nach `GetValues` neu, Umrechnung und Speicherung laufen im
+Consumer. Die Totzeit pro Trigger (Arm + Transfer) muss kleiner als T2
+sein; der Bericht enthält sie als `dead_time_ms`. Für T2 unterhalb der
+USB-Totzeit Rapid-Block verwenden (`n_segments`).
+
+Examples
+--------
+>>> with NucleoUART("COM5") as nuc:
+...     ctrl = PulseController(PicoReader(), nuc)
+...     ctrl.configure("90V_DC", target_fs=20e6, range_a="2V", range_b="1V")
+...     report = ctrl.run(n_pulses=100, period_ms=50)
+>>> report['missed'], report['extra']
+(0, 0)
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from pico_pulse_lab.acquisition.picoscope_reader import STOP_TIMEOUT_S
+
+
+ARM_TIMEOUT_S       = 5.0      # max. Wartezeit, bis der Scope armiert ist
+FINISH_MARGIN_S     = 1.0      # Reserve nach n · T2, bevor die Messung abgebrochen wird
+T2_TIMER            = 2        # STM32-Timer für den Pulsabstand (ms)
+T1_TIMER            = 1        # STM32-Timer für die Pulsdauer (µs)
+
+# Stufen, die den Mess-Thread zwischen zwei Triggern belegen (siehe acquisition/timing.py)
+_PRODUCER_STAGES = ("arm", "transfer")
+_INLINE_STAGES = ("convert", "callback", "csv_write", "npz_write")  # ohne Pipeline zusätzlich
+
+
+def classify_triggers(trigger_times: Sequence[float], period_s: float, expected: int,
+                      t_fire: float = None) -> Dict:
+    """
+    Vergleicht erfasste Trigger mit dem Pulsraster des STM32.
+
+    Jeder Abstand zweier Trigger wird in Vielfache von T2 gerundet:
+    0 = zusätzlicher Trigger (z.B. Störimpuls), 1 = regulär, k > 1 =
+    k - 1 übersprungene Pulse (Scope war noch nicht wieder armiert).
+    Mit `t_fire` zählen außerdem Trigger außerhalb der Pulsfolge
+    [t_fire, t_fire + (expected + 0.5) · T2] als zusätzlich.
+
+    Parameters
+    ----------
+    trigger_times : sequence of float
+        Host-Zeiten der erfassten Trigger in Sekunden (aufsteigend).
+    period_s : float
+        Pulsabstand T2 in Sekunden.
+    expected : int
+        Anzahl gefeuerter Pulse.
+    t_fire : float, optional
+        Host-Zeit direkt vor dem START-Kommando (Standard: None = kein Zeitfenster).
+
+    Returns
+    -------
+    dict
+        - expected, captured: int
+        - extra: int - Trigger ohne eigenen Puls im Raster
+        - skipped: int - Lücken im Raster zwischen erfassten Triggern
+        - missed: int - gefeuerte, aber nicht erfasste Pulse (inkl. Anfang/Ende)
+        - interval_ms: dict (mean, min, max) oder None
+
+    Notes
+    -----
+    Die Host-Zeiten schwanken um die USB-Latenz (einige ms); die Einteilung
+    ist erst für T2 deutlich darüber zuverlässig.
+    """
+    if period_s <= 0:
+        raise ValueError("period_s muss > 0 sein")
+    times = np.asarray(trigger_times, dtype=np.float64)
+    outside = 0
+    if t_fire is not None:
+        inside = (times >= t_fire) & (times <= t_fire + (expected + 0.5) * period_s)
+        outside = int(times.size - np.count_nonzero(inside))
+        times_in = times[inside]
+    else:
+        times_in = times
+    intervals = np.diff(times_in)
+    k = np.rint(intervals / period_s).astype(np.int64)
+    extra = outside + int(np.count_nonzero(k <= 0))
+    skipped = int(np.sum(k[k > 1] - 1))
+    return {
+        'expected': int(expected),
+        'captured': int(times.size),
+        'extra': extra,
+        'skipped': skipped,
+        'missed': max(0, int(expected) - (int(times.size) - extra)),
+        'interval_ms': {
+            'mean': float(intervals.mean() * 1e3),
+            'min': float(intervals.min() * 1e3),
+            'max': float(intervals.max() * 1e3),
+        } if intervals.size else None,
+    }
+
+
+class PulseController:
+    """
+    Armiert den Scope, startet die STM32-Pulsfolge und prüft die Trigger.
+
+    Parameters
+    ----------
+    reader : PicoReader
+        Erfassung (bzw. ein Objekt mit gleicher Schnittstelle).
+    nuc : NucleoUART
+        Verbindung zum STM32-Pulsgeber.
+    arm_timeout_s : float, optional
+        Maximale Wartezeit auf das Armieren (Standard: 5 s).
+    finish_margin_s : float, optional
+        Reserve nach n · T2 bis zum Abbruch der Messung (Standard: 1 s).
+    """
+
+    def __init__(self, reader, nuc, arm_timeout_s: float = ARM_TIMEOUT_S,
+                 finish_margin_s: float = FINISH_MARGIN_S):
+        self.reader = reader
+        self.nuc = nuc
+        self.arm_timeout_s = float(arm_timeout_s)
+        self.finish_margin_s = float(finish_margin_s)
+        self.last_report: Optional[Dict] = None
+        self._abort = threading.Event()
+
+    def configure(self, run_name: str, use_pipeline: bool = True, **settings) -> None:
+        """
+        Konfiguriert den Reader (siehe `PicoReader.configure()`).
+
+        Parameters
+        ----------
+        run_name : str
+            Name des Messlaufs.
+        use_pipeline : bool, optional
+            Sofort nach dem Transfer neu armieren (Standard: True).
+        **settings
+            Weitere Argumente für `PicoReader.configure()`.
+        """
+        self.reader.configure(run_name, use_pipeline=use_pipeline, **settings)
+
+    def run(self, n_pulses: int, period_ms: int = None, width_us: int = None,
+            save_csv: bool = True, save_npz: bool = True) -> Dict:
+        """
+        Führt eine Pulsfolge aus: armieren, feuern, erfassen, auswerten.
+
+        Parameters
+        ----------
+        n_pulses : int
+            Anzahl Pulse (> 0; "endlos" wird nicht unterstützt).
+        period_ms : int, optional
+            Pulsabstand T2 in ms; wird vorher gesetzt (Standard: None =
+            aktuellen Wert per READBACK lesen).
+        width_us : int, optional
+            Pulsdauer T1 in µs; wird vorher gesetzt (Standard: None = unverändert).
+        save_csv, save_npz : bool, optional
+            Wie bei `PicoReader.start_measurement()`.
+
+        Returns
+        -------
+        dict
+            Ergebnis von `classify_triggers()` plus period_ms, arm_s (Start
+            bis armiert), duration_s (Feuern bis Ende), rate_hz, dead_time_ms
+            (Totzeit pro Trigger laut Zeitmessung) und period_ok.
+
+        Raises
+        ------
+        RuntimeError
+            Wenn der Scope nicht armiert (START wird dann nicht gesendet)
+            oder die Messung fehlschlägt (der STM32 wird gestoppt).
+        """
+        if n_pulses < 1:
+            raise ValueError("n_pulses muss >= 1 sein")
+        self._abort.clear()
+
+        # Timer setzen bzw. T2 lesen
+        if width_us is not None:
+            self.nuc.set_timer(T1_TIMER, int(width_us))
+        if period_ms is not None:
+            self.nuc.set_timer(T2_TIMER, int(period_ms))
+        else:
+            period_ms, _ = self.nuc.readback(T2_TIMER)
+        if period_ms <= 0:
+            raise ValueError("T2-Periode muss > 0 ms sein")
+        period_s = period_ms / 1e3
+
+        # Messung im Hintergrund starten
+        errors = []
+
+        def measure():
+            try:
+                self.reader.start_measurement(n_pulses=n_pulses, save_csv=save_csv, save_npz=save_npz)
+            except BaseException as e:
+                errors.append(e)
+
+        t_start = time.time()
+        thread = threading.Thread(target=measure, name="pulse-controller", daemon=True)
+        thread.start()
+
+        # Erst feuern, wenn der Scope auf den ersten Trigger wartet
+        if not self._wait_armed(thread):
+            self.reader.stop(timeout_s=STOP_TIMEOUT_S)
+            thread.join(self.finish_margin_s)
+            if errors:
+                raise RuntimeError(f"Messung fehlgeschlagen: {errors[0]}") from errors[0]
+            raise RuntimeError(f"Scope nicht innerhalb von {self.arm_timeout_s} s armiert")
+        t_armed = t_fire = time.time()
+        self.nuc.start_sequence(n_pulses)
+        print(f"[ctrl] Armiert nach {t_armed - t_start:.3f} s, {n_pulses} Pulse à {period_ms} ms gestartet")
+
+        # Warten bis alle Pulse erfasst sind, sonst abbrechen (fehlende Trigger)
+        deadline = t_fire + n_pulses * period_s + self.finish_margin_s
+        while thread.is_alive() and time.time() < deadline and not self._abort.is_set():
+            thread.join(min(0.05, max(0.0, deadline - time.time())))
+        if thread.is_alive():
+            self.nuc.stop_timer()  # erst keine weiteren Pulse, dann die Erfassung beenden
+            self.reader.stop(timeout_s=STOP_TIMEOUT_S)
+            thread.join()
+        t_end = time.time()
+
+        if errors:
+            self.nuc.stop_timer()
+            raise RuntimeError(f"Messung fehlgeschlagen: {errors[0]}") from errors[0]
+        if self._abort.is_set():
+            self.nuc.stop_timer()
+
+        # Rapid-Block liefert keine trigger_times -> nur Zählung
+        trigger_times = self.reader.trigger_times
+        report = classify_triggers(trigger_times, period_s, n_pulses,
+                                   t_fire=t_fire if trigger_times else None)
+        report['captured'] = int(self.reader.meta.get('pulses_captured', report['captured']))
+        report['missed'] = max(0, n_pulses - (report['captured'] - report['extra']))
+        dead_time_ms = self._dead_time_ms()
+        valid = report['captured'] - report['extra']
+        span = trigger_times[-1] - trigger_times[0] if len(trigger_times) > 1 else 0.0
+        report.update({
+            'period_ms': period_ms,
+            'arm_s': t_armed - t_start,
+            'duration_s': t_end - t_fire,
+            'rate_hz': (valid - 1) / span if span > 0 else None,
+            'dead_time_ms': dead_time_ms,
+            'period_ok': dead_time_ms is None or dead_time_ms < period_ms,
+        })
+        self.last_report = report
+        print(f"[ctrl] {report['captured']}/{n_pulses} erfasst, "
+              f"{report['missed']} fehlend, {report['extra']} zusätzlich")
+        if not report['period_ok']:
+            print(f"[Warnung] Totzeit {dead_time_ms:.1f} ms >= T2 {period_ms} ms: "
+                  f"Pulse gehen verloren (T2 erhöhen oder Rapid-Block verwenden)")
+        return report
+
+    def stop(self) -> None:
+        """Bricht eine laufende Pulsfolge ab (STM32 und Erfassung)."""
+        self._abort.set()
+        self.nuc.stop_timer()
+        self.reader.stop()
+
+    def _wait_armed(self, thread: threading.Thread) -> bool:
+        """Wartet auf das Armieren, solange die Messung läuft (interne Funktion)."""
+        deadline = time.time() + self.arm_timeout_s
+        while time.time() < deadline:
+            if self.reader.wait_armed(0.01):
+                return True
+            if not thread.is_alive() or self._abort.is_set():
+                return False
+        return False
+
+    def _dead_time_ms(self) -> Optional[float]:
+        """
+        Mittlere Totzeit des Mess-Threads pro Trigger aus `meta['timing']` (interne Funktion).
+
+        Ohne Pipeline zählen Umrechnung, Callback und Speicherung mit.
+        """
+        timing = self.reader.meta.get('timing') or {}
+        stages = _PRODUCER_STAGES if self.reader.use_pipeline else _PRODUCER_STAGES + _INLINE_STAGES
+        means = [timing[name]['mean_us'] for name in stages if name in timing]
+        return sum(means) / 1e3 if means else None
@@ -20,7 +20,7 @@ import sys
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 
 # Python-Pfad korrigieren: Füge das übergeordnete Verzeichnis hinzu
 # damit pico_pulse_lab als Modul gefunden wird
@@ -38,10 +38,15 @@ except Exception:
 
 # Imports für Pulse Lab Module
 from pico_pulse_lab.control.stm32_uart import NucleoUART
-from pico_pulse_lab.acquisition.picoscope_reader import PicoReader
+from pico_pulse_lab.acquisition.picoscope_reader import CHANNEL_SETS, PicoReader, STOP_TIMEOUT_S
+from pico_pulse_lab.acquisition.process_reader import ProcessReader
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, as_time_array
 from pico_pulse_lab.acquisition.temp_logger import TempLogger
 from pico_pulse_lab.processing.cap_params import estimate_cap_params
 
+# Punkte pro Kanal in der Live-Vorschau (Min/Max je Bin vom Scope)
+PREVIEW_POINTS = 2000
+
 
 class App:
     """
@@ -72,7 +77,7 @@ class App:
         self._reader_stop = True
         
         # Picoscope
-        self.pico_reader: Optional[PicoReader] = None
+        self.pico_reader: Optional[Union[PicoReader, ProcessReader]] = None
         self.pico_thread: Optional[threading.Thread] = None
         self.pico_queue = queue.Queue()  # Für Pulse-Updates
         
@@ -81,7 +86,8 @@ class App:
         self.temp_queue = queue.Queue()  # Für Temperatur-Updates
         
         # Live-Daten (thread-sicher)
-        self.latest_pulse = None  # (pulse_id, t, u, i)
+        self.latest_pulse = None  # RawPulse oder (pulse_id, t, u, i)
+        self.latest_preview = None  # (pulse_id, t, u_min, u_max, i_min, i_max)
         self.pulse_count = 0
         self.latest_params = None  # (esr, cap, timestamp)
         self.param_history = []  # Liste von (timestamp, esr, cap)
@@ -96,6 +102,9 @@ class App:
         # Start Queue-Drainer für Thread-zu-GUI Kommunikation
         self.root.after(100, self._drain_queues)
         
+        # Beim Schließen Picoscope-Session beenden
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
         # Start Parameter-Berechnung Timer (alle 2 Sekunden)
         self._start_param_calculation()
     
@@ -225,6 +234,11 @@ class App:
         self.chk_save_csv.grid(row=0, column=2, padx=(12, 0))
         self.chk_save_csv.state(['selected'])  # Default aktiviert
         
+        # Erfassung im eigenen Prozess: GUI-Redraws bremsen den Mess-Loop nicht (eigenes GIL)
+        self.chk_own_process = ttk.Checkbutton(frm_run, text="Eigener Prozess", state="normal")
+        self.chk_own_process.grid(row=0, column=3, padx=(12, 0))
+        self.chk_own_process.state(['!alternate'])
+        
         # Picoscope-Konfiguration
         frm_pico = ttk.LabelFrame(frm_measure, text="Picoscope")
         frm_pico.grid(row=1, column=0, sticky="ew", **pad)
@@ -263,12 +277,18 @@ class App:
         self.cmb_range_b.set("10V")
         self.cmb_range_b.grid(row=2, column=2, sticky="w")
         
+        # Erfasste Kanäle (ein Kanal: doppelte max. Abtastrate)
+        ttk.Label(frm_pico, text="Kanäle:").grid(row=3, column=0, sticky="e")
+        self.cmb_channels = ttk.Combobox(frm_pico, state="readonly", width=8, values=list(CHANNEL_SETS))
+        self.cmb_channels.set("AB")
+        self.cmb_channels.grid(row=3, column=1, sticky="w")
+        
         # Picoscope-Buttons
         self.btn_pico_start = ttk.Button(frm_pico, text="Start Messung", command=self.on_pico_start)
-        self.btn_pico_start.grid(row=3, column=0, columnspan=2, pady=(4, 0))
+        self.btn_pico_start.grid(row=4, column=0, columnspan=2, pady=(4, 0))
         
         self.btn_pico_stop = ttk.Button(frm_pico, text="Stop Messung", command=self.on_pico_stop)
-        self.btn_pico_stop.grid(row=3, column=2, columnspan=2, pady=(4, 0))
+        self.btn_pico_stop.grid(row=4, column=2, columnspan=2, pady=(4, 0))
         
         # Temp-Logger
         frm_temp = ttk.LabelFrame(frm_measure, text="Temperatur-Logger")
@@ -504,8 +524,14 @@ class App:
             target_fs = float(self.ent_target_fs.get()) * 1e6  # MS/s -> Hz
             trigger_level = float(self.ent_trig_level.get())
             
-            # Reader erstellen und konfigurieren
-            self.pico_reader = PicoReader()
+            # Reader erstellen (einmalig) und konfigurieren; das Gerät bleibt
+            # zwischen Messungen offen, geänderte Einstellungen werden nachgesendet.
+            # Im eigenen Prozess liegen die Pulse im Shared-Memory-Ring.
+            reader_cls = ProcessReader if self.chk_own_process.instate(['selected']) else PicoReader
+            if not isinstance(self.pico_reader, reader_cls):
+                if self.pico_reader is not None:
+                    self.pico_reader.close()
+                self.pico_reader = reader_cls()
             self.pico_reader.configure(
                 run_name=run_name,
                 target_fs=target_fs,
@@ -513,11 +539,16 @@ class App:
                 coupling_a=self.cmb_coupling_a.get(),
                 range_a=self.cmb_range_a.get(),
                 coupling_b=self.cmb_coupling_b.get(),
-                range_b=self.cmb_range_b.get()
+                range_b=self.cmb_range_b.get(),
+                channels=self.cmb_channels.get(),
+                keep_open=True,
+                preview_points=PREVIEW_POINTS
             )
             
-            # Callback setzen
-            self.pico_reader.set_callback(self._on_pico_pulse)
+            # Callbacks setzen: Plots aus der Min/Max-Vorschau, Parameter aus
+            # den Rohdaten (Umrechnung erst beim Auswerten)
+            self.pico_reader.set_preview_callback(self._on_pico_preview)
+            self.pico_reader.set_raw_callback(self._on_pico_raw_pulse)
             
             # Thread starten
             save_csv = self.chk_save_csv.instate(['selected'])
@@ -547,16 +578,48 @@ class App:
         except Exception as e:
             self.pico_queue.put(("error", str(e)))
     
-    def _on_pico_pulse(self, pulse_id: int, t: np.ndarray, u: np.ndarray, i: np.ndarray):
-        """Callback für jeden erfassten Puls (wird vom Reader aufgerufen)."""
-        self.pico_queue.put(("pulse", (pulse_id, t, u, i)))
+    def _on_pico_raw_pulse(self, pulse: RawPulse):
+        """Callback für jeden erfassten Puls als int16-Rohdaten (wird vom Reader aufgerufen)."""
+        self.pico_queue.put(("pulse", pulse))
+    
+    def _on_pico_preview(self, pulse_id, t, u_min, u_max, i_min, i_max):
+        """Callback für die Min/Max-Vorschau eines Pulses (kommt vor den vollen Daten)."""
+        self.pico_queue.put(("preview", (pulse_id, t, u_min, u_max, i_min, i_max)))
+    
+    @staticmethod
+    def _pulse_arrays(pulse, dtype=np.float64, time_axis=False):
+        """
+        Liefert (pulse_id, t, u, i) für RawPulse oder bereits umgerechnete Tupel.
+        
+        Für die Plots reicht float32, für die Parameter-Berechnung wird float64 verwendet.
+        Mit `time_axis=True` bleibt t eine `TimeAxis` (kein Array).
+        """
+        if isinstance(pulse, RawPulse):
+            pulse_id, t, u, i = pulse.pulse_id, pulse.time_axis(), pulse.u(dtype), pulse.i(dtype)
+        else:
+            pulse_id, t, u, i = pulse
+        if not time_axis:
+            t = as_time_array(t, dtype)
+        return pulse_id, t, u, i
     
     def on_pico_stop(self):
         """Stoppt die Picoscope-Messung."""
         if self.pico_reader:
-            self.pico_reader.stop()
+            if self.pico_reader.stop(timeout_s=STOP_TIMEOUT_S):
+                self.log("[Pico] Messung gestoppt")
+            else:
+                self.log("[Pico] Messung wird beendet (erfasste Pulse werden gespeichert)")
             self.btn_pico_start.configure(state="normal")
-            self.log("[Pico] Messung gestoppt")
+    
+    def _on_close(self):
+        """Beendet die Picoscope-Session und schließt das Fenster."""
+        if self.pico_reader:
+            self.pico_reader.stop()
+            if self.pico_thread is not None:
+                self.pico_thread.join(timeout=2.0)
+            if not (self.pico_thread and self.pico_thread.is_alive()):
+                self.pico_reader.close()
+        self.root.destroy()
     
     # ============ Temp-Logger-Funktionen ============
     
@@ -592,21 +655,26 @@ class App:
     
     def _drain_queues(self):
         """Drainiert alle Queues und aktualisiert die GUI (wird periodisch aufgerufen)."""
-        # Picoscope-Updates
+        # Picoscope-Updates (nur einmal pro Durchlauf neu zeichnen)
+        redraw = False
         try:
             while True:
                 msg_type, data = self.pico_queue.get_nowait()
                 if msg_type == "pulse":
-                    pulse_id, t, u, i = data
-                    self.latest_pulse = (pulse_id, t, u, i)
+                    self.latest_pulse = data
                     self.pulse_count += 1
                     self.lbl_pulse_count.configure(text=f"Pulse: {self.pulse_count}")
-                    self._update_ui_plots()
+                    redraw = redraw or self.latest_preview is None
+                elif msg_type == "preview":
+                    self.latest_preview = data
+                    redraw = True
                 elif msg_type == "error":
                     self.log(f"[ERR] Pico: {data}")
                     self.btn_pico_start.configure(state="normal")
         except queue.Empty:
             pass
+        if redraw:
+            self._update_ui_plots()
         
         # Temperatur-Updates
         try:
@@ -634,26 +702,38 @@ class App:
         self.root.after(100, self._drain_queues)
     
     def _update_ui_plots(self):
-        """Aktualisiert die U/I-Plots mit dem neuesten Puls."""
-        if self.latest_pulse is None:
+        """Aktualisiert die U/I-Plots mit dem neuesten Puls (Vorschau bevorzugt)."""
+        if self.latest_preview is None and self.latest_pulse is None:
             return
         
-        pulse_id, t, u, i = self.latest_pulse
-        
         # Plots aktualisieren
         self.ax_u.clear()
         self.ax_i.clear()
         
-        self.ax_u.plot(t, u, linewidth=1.0, label=f"U (pulse {pulse_id})")
-        self.ax_i.plot(t, i, linewidth=1.0, label=f"I (pulse {pulse_id})")
+        if self.latest_preview is not None:
+            # Min/Max-Band: wenige tausend Punkte statt voller Auflösung
+            # Nicht erfasster Kanal (None) bleibt leer
+            pulse_id, t, u_min, u_max, i_min, i_max = self.latest_preview
+            t = as_time_array(t, np.float32)
+            if u_min is not None:
+                self.ax_u.fill_between(t, u_min, u_max, linewidth=0.5, label=f"U (pulse {pulse_id})")
+            if i_min is not None:
+                self.ax_i.fill_between(t, i_min, i_max, linewidth=0.5, label=f"I (pulse {pulse_id})")
+        else:
+            pulse_id, t, u, i = self._pulse_arrays(self.latest_pulse, np.float32)
+            if u is not None:
+                self.ax_u.plot(t, u, linewidth=1.0, label=f"U (pulse {pulse_id})")
+            if i is not None:
+                self.ax_i.plot(t, i, linewidth=1.0, label=f"I (pulse {pulse_id})")
         
         self.ax_u.set_ylabel("Spannung U [V]")
         self.ax_i.set_ylabel("Strom I [A]")
         self.ax_i.set_xlabel("Zeit t [s]")
         self.ax_u.grid(True, alpha=0.3)
         self.ax_i.grid(True, alpha=0.3)
-        self.ax_u.legend()
-        self.ax_i.legend()
+        for ax in (self.ax_u, self.ax_i):
+            if ax.has_data():
+                ax.legend()
         
         self.canvas_ui.draw()
     
@@ -693,7 +773,11 @@ class App:
             return
         
         try:
-            pulse_id, t, u, i = self.latest_pulse
+            pulse_id, t, u, i = self._pulse_arrays(self.latest_pulse, time_axis=True)
+            if u is None or i is None:
+                # ESR/C brauchen Spannung und Strom (nur ein Kanal erfasst)
+                self.root.after(2000, self._calculate_params)
+                return
             
             # Parameter berechnen
             esr, cap = estimate_cap_params(t, u, i)
@@ -8,10 +8,19 @@ Analyse CSV-basierter U/I-Pulse (ohne CLI)
 """
 
 import os
+import sys
 import json
 import numpy as np
 import matplotlib.pyplot as plt
 
+# pico_pulse_lab als Modul finden (wie gui/app.py): 01 mext_pulse_lab/ muss im sys.path sein
+_parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
+
+from pico_pulse_lab.storage.csv_index import next_pulse_id
+from pico_pulse_lab.storage.csv_reader import get_all_pulse_ids_csv, load_pulses_csv, read_csv_columns
+
 # ===================== CONTROL =====================
 BASE_DIR     = r"/Users/peer/Documents/00 - MEXT BA/10 Code/MEXT Capacitor Pulse Lab"
 RUN_NAME     = "31-10_01"   # muss zum Messlauf passen (CSV + meta.json)
@@ -39,6 +48,10 @@ def read_meta():
     with open(META_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def read_columns_from_header():
+    """Liest die Spaltennamen aus der Kopfzeile "# columns:" (ohne Kanal A bzw. B fehlt u_V bzw. i_*)."""
+    return read_csv_columns(CSV_PATH)
+
 def detect_i_unit_from_header():
     """Liest Kopfzeilen (# ...) und erkennt die I-Spaltenbezeichnung (i_A oder i_V)."""
     if not os.path.isfile(CSV_PATH):
@@ -59,64 +72,33 @@ def detect_i_unit_from_header():
     return i_colname  # "i_A" oder "i_V"
 
 def get_last_pulse_id():
-    """Liest die größte pulse_id aus der CSV (letzte Zeilen scannen)."""
+    """Größte pulse_id der CSV (aus dem Index <csv>.idx, ohne die CSV zu durchsuchen)."""
     if not os.path.isfile(CSV_PATH):
         raise FileNotFoundError(f"CSV nicht gefunden: {CSV_PATH}")
-    last_id = None
-    # effizient genug für typische Dateigrößen; für extrem große CSV ggf. anders lösen
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line or line[0] == "#":
-                continue
-            try:
-                pid = int(line.split(",")[0])
-                last_id = pid if (last_id is None or pid > last_id) else last_id
-            except Exception:
-                pass
-    if last_id is None:
+    last_id = next_pulse_id(CSV_PATH) - 1
+    if last_id < 1:
         raise ValueError("Keine Datenzeilen in CSV gefunden.")
     return last_id
 
-def read_pulse_from_csv(pulse_id, i_colname):
+def read_pulses_from_csv(pulse_ids):
     """
-    Liest einen Puls (alle Zeilen mit pulse_id) aus der CSV.
-    Gibt (t, u, i) zurück.
+    Liest mehrere Pulse in einem Durchgang (per Seek über den Index, siehe storage/csv_reader.py).
+    Gibt {pulse_id: (t, u, i)} zurück; u bzw. i ist None, wenn der Kanal nicht erfasst wurde.
     """
     if not os.path.isfile(CSV_PATH):
         raise FileNotFoundError(f"CSV nicht gefunden: {CSV_PATH}")
+    try:
+        return load_pulses_csv(CSV_PATH, pulse_ids)
+    except KeyError as e:
+        raise FileNotFoundError(f"Pulse-ID nicht in CSV gefunden: {e}") from e
 
-    # Spalten: pulse_id,sample_idx,time_s,u_V,i_{V|A}
-    # Wir lesen nur Datenzeilen (skip '#'), dann filtern wir auf pulse_id.
-    # Für moderate Dateigrößen ist das okay. Bei >GB CSV später auf chunking umstellen.
-    rows = []
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line or line[0] == "#":
-                continue
-            parts = line.strip().split(",")
-            if len(parts) < 5:
-                continue
-            try:
-                pid = int(parts[0])
-            except:
-                continue
-            if pid == pulse_id:
-                # sample_idx = int(parts[1])  # würde die Reihenfolge sichern, falls nötig
-                t = float(parts[2])
-                u = float(parts[3])
-                i = float(parts[4])
-                rows.append((t, u, i))
-
-    if not rows:
-        raise FileNotFoundError(f"Pulse-ID {pulse_id} nicht in CSV gefunden.")
-
-    # nach Zeit sortieren (falls Zeilenreihenfolge nicht sicher)
-    rows.sort(key=lambda r: r[0])
-    data = np.array(rows, dtype=float)
-    t = data[:, 0]
-    u = data[:, 1]
-    i = data[:, 2]
-    return t, u, i
+def read_pulse_from_csv(pulse_id, i_colname=None):
+    """
+    Liest einen Puls aus der CSV (zuletzt gelesene Pulse kommen aus dem LRU-Cache).
+    Gibt (t, u, i) zurück; u bzw. i ist None, wenn der Kanal nicht erfasst wurde.
+    i_colname wird nur aus Kompatibilität angenommen (die Spalte steht im Header).
+    """
+    return read_pulses_from_csv([pulse_id])[int(pulse_id)]
 
 def plot_fft(y, fs, title="FFT"):
     N = len(y)
@@ -152,14 +134,24 @@ def analyze_pulse_csv():
     # Hauptpuls-ID
     pid = get_last_pulse_id() if USE_LAST else int(PULSE_ID)
 
-    # Hauptpuls laden
-    t, u, i = read_pulse_from_csv(pid, i_colname)
+    # Hauptpuls und Overlays in einem Durchgang laden (fehlende Overlays nur melden)
+    available = set(get_all_pulse_ids_csv(CSV_PATH))
+    overlay_ids = []
+    for pid_ov in OVERLAY_IDS:
+        if int(pid_ov) in available:
+            overlay_ids.append(int(pid_ov))
+        else:
+            print(f"[Warn] Overlay {pid_ov}: Pulse-ID nicht in CSV gefunden")
+    found = read_pulses_from_csv([pid] + overlay_ids)
+    t, u, i = found[pid]
 
     # y-Limits aus Meta: voller Messbereich ±v_range
     if v_range_u:
         u_ylim = (-abs(v_range_u), abs(v_range_u))
-    else:
+    elif u is not None:
         u_ylim = (-max(abs(u.min()), abs(u.max())), max(abs(u.min()), abs(u.max())))
+    else:
+        u_ylim = None
 
     if i_unit == "A" and (v_range_i_v is not None) and (rogowski_v_per_a and rogowski_v_per_a > 0):
         # v_range_i_v ist der Spannungsbereich am Kanal B; in A umrechnen
@@ -167,37 +159,41 @@ def analyze_pulse_csv():
         i_ylim  = (-abs(i_range), abs(i_range))
     elif (i_unit == "V") and (v_range_i_v is not None):
         i_ylim  = (-abs(v_range_i_v), abs(v_range_i_v))
-    else:
+    elif i is not None:
         i_ylim  = (-max(abs(i.min()), abs(i.max())), max(abs(i.min()), abs(i.max())))
+    else:
+        i_ylim = None
 
     # ---------- Plot: großes Fenster, 2 Zeilen ----------
     fig, (ax_u, ax_i) = plt.subplots(2, 1, figsize=FIG_SIZE, sharex=True, constrained_layout=True)
 
-    # Spannung
-    ax_u.plot(t, u, linewidth=LINEWIDTH, label=f"U  (pulse {pid})")
+    # Spannung (leer, wenn Kanal A nicht erfasst wurde)
+    if u is not None:
+        ax_u.plot(t, u, linewidth=LINEWIDTH, label=f"U  (pulse {pid})")
+        ax_u.set_ylim(u_ylim)
     ax_u.set_ylabel("Spannung U [V]", fontsize=12)
-    ax_u.set_ylim(u_ylim)
     ax_u.set_title(f"{RUN_NAME} – Spannung & Strom (pulse_id={pid})", fontsize=15)
     ax_u.grid(True, alpha=GRID_ALPHA)
 
-    # Strom
-    ax_i.plot(t, i, linewidth=LINEWIDTH, label=f"I  (pulse {pid})")
+    # Strom (leer, wenn Kanal B nicht erfasst wurde)
+    if i is not None:
+        ax_i.plot(t, i, linewidth=LINEWIDTH, label=f"I  (pulse {pid})")
+        ax_i.set_ylim(i_ylim)
     ax_i.set_ylabel(f"Strom I [{i_unit}]", fontsize=12)
     ax_i.set_xlabel("Zeit t [s]", fontsize=12)
-    ax_i.set_ylim(i_ylim)
     ax_i.grid(True, alpha=GRID_ALPHA)
 
     # Overlays (optional)
-    for pid_ov in OVERLAY_IDS:
-        try:
-            t_o, u_o, i_o = read_pulse_from_csv(int(pid_ov), i_colname)
+    for pid_ov in overlay_ids:
+        t_o, u_o, i_o = found[pid_ov]
+        if u_o is not None:
             ax_u.plot(t_o, u_o, linewidth=0.9, alpha=0.65, label=f"U (pulse {pid_ov})")
+        if i_o is not None:
             ax_i.plot(t_o, i_o, linewidth=0.9, alpha=0.65, label=f"I (pulse {pid_ov})")
-        except Exception as e:
-            print(f"[Warn] Overlay {pid_ov}: {e}")
 
-    ax_u.legend(loc="best", fontsize=9)
-    ax_i.legend(loc="best", fontsize=9)
+    for ax in (ax_u, ax_i):
+        if ax.has_data():
+            ax.legend(loc="best", fontsize=9)
 
     # Schöne Ticks
     for ax in (ax_u, ax_i):
@@ -207,8 +203,10 @@ def analyze_pulse_csv():
 
     # FFT (optional, nur Hauptpuls)
     if SHOW_FFT and fs:
-        plot_fft(u, fs, f"FFT U (pulse {pid})")
-        plot_fft(i, fs, f"FFT I (pulse {pid})")
+        if u is not None:
+            plot_fft(u, fs, f"FFT U (pulse {pid})")
+        if i is not None:
+            plot_fft(i, fs, f"FFT I (pulse {pid})")
         plt.show()
 
 
@@ -10,10 +10,12 @@ lineares Gleichungssystem löst, um die Impedanz-Parameter zu bestimmen.
 """
 
 import numpy as np
-from typing import Tuple
+from typing import Tuple, Union
 
+from pico_pulse_lab.acquisition.pulse_data import TimeAxis
 
-def estimate_cap_params(t: np.ndarray, u: np.ndarray, i: np.ndarray) -> Tuple[float, float]:
+
+def estimate_cap_params(t: Union[np.ndarray, TimeAxis], u: np.ndarray, i: np.ndarray) -> Tuple[float, float]:
     """
     Schätzt ESR (Equivalent Series Resistance) und Kapazität aus Puls-Messdaten.
     
@@ -26,9 +28,9 @@ def estimate_cap_params(t: np.ndarray, u: np.ndarray, i: np.ndarray) -> Tuple[fl
     
     Parameters
     ----------
-    t : np.ndarray
-        Zeitvektor in Sekunden (1D-Array).
-        Muss streng monoton steigend sein.
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (1D-Array, streng monoton steigend) oder
+        `TimeAxis` (t0, dt, n) – dann entfällt die Prüfung des Arrays.
     u : np.ndarray
         Spannungswerte in Volt (1D-Array, gleiche Länge wie t).
         Gemessene Spannung am Kondensator.
@@ -75,21 +77,26 @@ def estimate_cap_params(t: np.ndarray, u: np.ndarray, i: np.ndarray) -> Tuple[fl
     >>> print(f"ESR: {esr:.6f} Ω, C: {cap*1e6:.6f} µF")
     """
     # Eingabevalidierung
-    t = np.asarray(t, dtype=float)
     u = np.asarray(u, dtype=complex)  # Komplex erlauben (für FFT)
     i = np.asarray(i, dtype=complex)
     
     if len(t) != len(u) or len(t) != len(i):
         raise ValueError("Arrays t, u, i müssen gleiche Länge haben")
     
-    # Zeitvektor prüfen: muss streng monoton steigend sein
-    dt = np.diff(t)
-    if np.any(dt <= 0):
-        raise ValueError("Zeitvektor muss streng monoton steigend sein")
-    
-    # Abtastfrequenz aus mittlerem Zeitabstand berechnen
-    fs = 1.0 / np.mean(dt)
-    N = t.size
+    if isinstance(t, TimeAxis):
+        # Äquidistant per Konstruktion: fs direkt aus dt
+        fs = t.fs
+    else:
+        t = np.asarray(t, dtype=float)
+        
+        # Zeitvektor prüfen: muss streng monoton steigend sein
+        dt = np.diff(t)
+        if np.any(dt <= 0):
+            raise ValueError("Zeitvektor muss streng monoton steigend sein")
+        
+        # Abtastfrequenz aus mittlerem Zeitabstand berechnen
+        fs = 1.0 / np.mean(dt)
+    N = len(u)
     
     # FFT berechnen (shifted für symmetrische Darstellung)
     fU = np.fft.fftshift(np.fft.fft(u))
@@ -0,0 +1,178 @@
+"""
+Vorverarbeitung erfasster Pulse: Zuschneiden auf den aktiven Bereich.
+
+Bei `base_samples=400_000` plus 20 % Pretrigger ist der größte Teil jeder
+Erfassung flache Grundlinie, nachdem die Entladung abgeklungen ist.
+`trim_pulse()` sucht Anfang und Ende der Pulsenergie über Schwellwerte auf
+|i| und |du/dt| und behält nur den aktiven Bereich plus Rand. Speicherplatz,
+FFT- und Plot-Aufwand sinken proportional.
+
+Die Suche läuft blockweise direkt auf den int16-Rohdaten (Hüllkurven per
+`np.maximum.reduceat` / `np.add.reduceat`), ohne float-Kopie des Pulses.
+Der Versatz des Ausschnitts steckt im `t0` des zugeschnittenen Pulses
+(Zeit relativ zum Beginn der Erfassung).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+
+
+TRIM_BLOCK_SAMPLES  = 64       # Auflösung der Hüllkurven (Samples pro Block)
+TRIM_REL_THRESHOLD  = 0.01     # aktiv ab 1 % des Spitzenwerts ...
+TRIM_NOISE_FACTOR   = 2.0      # ... und mehr als doppelter Ausschlag der Grundlinie im Pretrigger
+
+
+def _envelopes(adc_u: np.ndarray, adc_i: np.ndarray, block: int,
+               baseline_i: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hüllkurven je Block: max |i - Grundlinie| und |du/dt| der Blockmittel (interne Funktion).
+
+    Returns
+    -------
+    env_i, env_du : np.ndarray or None
+        Je ein Wert pro Block (letzter Block ggf. kürzer), in ADC-Counts;
+        None für einen nicht erfassten Kanal.
+    """
+    n = (adc_u if adc_u is not None else adc_i).size
+    starts = np.arange(0, n, block)
+    counts = np.diff(np.append(starts, n))
+
+    env_i = env_du = None
+    if adc_i is not None:
+        i_dev = np.abs(adc_i.astype(np.int32) - np.int32(baseline_i))
+        env_i = np.maximum.reduceat(i_dev, starts).astype(np.float64)
+
+    if adc_u is not None:
+        # Blockmittel glätten das 8-Bit-Quantisierungsrauschen vor der Ableitung
+        u_mean = np.add.reduceat(adc_u.astype(np.int64), starts) / counts
+        env_du = np.empty_like(u_mean)
+        env_du[0] = 0.0
+        np.abs(np.diff(u_mean), out=env_du[1:])
+    return env_i, env_du
+
+
+def find_active_region(
+    adc_u: np.ndarray,
+    adc_i: np.ndarray,
+    pre_samples: int = 0,
+    rel_threshold: float = TRIM_REL_THRESHOLD,
+    noise_factor: float = TRIM_NOISE_FACTOR,
+    block: int = TRIM_BLOCK_SAMPLES
+) -> Tuple[int, int]:
+    """
+    Bestimmt den Bereich, in dem der Puls Energie führt.
+
+    Ein Block gilt als aktiv, wenn |i| (gegen die Grundlinie) oder |du/dt|
+    über ihrem Schwellwert liegt. Schwellwert je Größe:
+    max(rel_threshold * Spitzenwert, noise_factor * größter Ausschlag im Pretrigger).
+    Fehlt ein Kanal, entscheidet die Hüllkurve des anderen allein.
+
+    Parameters
+    ----------
+    adc_u, adc_i : np.ndarray or None
+        int16-Rohdaten von Spannung und Strom (gleiche Länge); höchstens
+        einer darf None sein.
+    pre_samples : int, optional
+        Pretrigger-Samples; daraus werden Grundlinie und Rauschen geschätzt
+        (Standard: 0 = Grundlinie 0, nur relativer Schwellwert).
+    rel_threshold : float, optional
+        Schwellwert relativ zum Spitzenwert (Standard: 0.01).
+    noise_factor : float, optional
+        Schwellwert relativ zum Rauschen im Pretrigger (Standard: 2.0).
+    block : int, optional
+        Samples pro Block der Hüllkurven (Standard: 64).
+
+    Returns
+    -------
+    (start, stop) : tuple of int
+        Sample-Bereich [start, stop) des aktiven Bereichs (auf Blockgrenzen).
+        Ohne erkennbaren Puls wird (0, n) zurückgegeben.
+    """
+    if adc_u is None and adc_i is None:
+        raise ValueError("Mindestens einer von adc_u und adc_i muss vorhanden sein")
+    n = len(adc_u if adc_u is not None else adc_i)
+    if adc_u is not None and adc_i is not None and len(adc_i) != n:
+        raise ValueError("adc_u und adc_i müssen gleiche Länge haben")
+    if n == 0:
+        return 0, 0
+    block = max(1, int(block))
+
+    # Nur vollständige Blöcke vor dem Trigger-Block zählen als Grundlinie
+    n_pre_blocks = max(0, int(pre_samples) // block - 1)
+    baseline_i = 0.0
+    if adc_i is not None and n_pre_blocks:
+        baseline_i = float(np.median(adc_i[:n_pre_blocks * block]))
+    envelopes = [env for env in _envelopes(adc_u, adc_i, block, baseline_i) if env is not None]
+
+    active = np.zeros(envelopes[0].size, dtype=bool)
+    for env in envelopes:
+        noise = env[1:n_pre_blocks].max() if n_pre_blocks > 1 else 0.0
+        threshold = max(rel_threshold * env.max(), noise_factor * noise)
+        if threshold > 0:
+            active |= env > threshold
+
+    blocks = np.flatnonzero(active)
+    if blocks.size == 0:
+        return 0, n
+    return int(blocks[0]) * block, min(n, (int(blocks[-1]) + 1) * block)
+
+
+def trim_pulse(
+    pulse: RawPulse,
+    pre_samples: int = 0,
+    margin_samples: int = 0,
+    rel_threshold: float = TRIM_REL_THRESHOLD,
+    noise_factor: float = TRIM_NOISE_FACTOR,
+    block: int = TRIM_BLOCK_SAMPLES
+) -> Tuple[RawPulse, Tuple[int, int]]:
+    """
+    Schneidet einen Puls auf den aktiven Bereich plus Rand zu.
+
+    Parameters
+    ----------
+    pulse : RawPulse
+        Erfasster Puls (int16-Rohdaten).
+    pre_samples : int, optional
+        Pretrigger-Samples des Pulses (für Grundlinie/Rauschen).
+    margin_samples : int, optional
+        Zusätzlich behaltene Samples vor und nach dem aktiven Bereich (Standard: 0).
+    rel_threshold, noise_factor, block :
+        Siehe `find_active_region()`.
+
+    Returns
+    -------
+    trimmed : RawPulse
+        Zugeschnittener Puls mit `t0 = pulse.t0 + start * dt` (gleiche
+        pulse_id, Skalierung und Zeitstempel). Ist nichts abzuschneiden,
+        wird `pulse` selbst zurückgegeben.
+    (start, stop) : tuple of int
+        Behaltener Sample-Bereich bezogen auf den ursprünglichen Puls.
+
+    Examples
+    --------
+    >>> trimmed, (start, stop) = trim_pulse(pulse, pre_samples=80_000, margin_samples=2000)
+    >>> trimmed.t0 == pulse.t0 + start * pulse.dt
+    True
+    """
+    n = pulse.n_samples
+    start, stop = find_active_region(pulse.adc_u, pulse.adc_i, pre_samples,
+                                     rel_threshold, noise_factor, block)
+    start = max(0, start - int(margin_samples))
+    stop = min(n, stop + int(margin_samples))
+    if start == 0 and stop == n:
+        return pulse, (0, n)
+
+    trimmed = RawPulse(
+        pulse.pulse_id,
+        # Kopie: großes Original kann freigegeben werden
+        None if pulse.adc_u is None else pulse.adc_u[start:stop].copy(),
+        None if pulse.adc_i is None else pulse.adc_i[start:stop].copy(),
+        scale_u=pulse.scale_u, scale_i=pulse.scale_i, dt=pulse.dt,
+        offset_u=pulse.offset_u, offset_i=pulse.offset_i,
+        t0=pulse.t0 + start * pulse.dt, i_unit=pulse.i_unit,
+        timestamp=pulse.timestamp,
+    )
+    return trimmed, (start, stop)
@@ -0,0 +1,354 @@
+"""
+Puls-Index neben einer Lauf-CSV (<run>.csv.idx).
+
+Die CSV selbst kennt keine Pulsgrenzen: `scan_next_pulse_id()` musste
+bisher jede Zeile lesen und zerlegen, ein Leser jede Zeile bis zum
+gesuchten Puls. Der Index hält je Puls einen Eintrag fester Länge:
+
+- pulse_id (int64), Byte-Position des ersten Datensatzes (uint64),
+  Länge in Bytes (uint64), Anzahl Zeilen (uint64), Zeitstempel
+  (float64, Unix-Zeit; NaN bei nachträglich aufgebautem Index)
+
+Dateiaufbau:
+- Dateikopf (32 Byte): b"PPLCSVIX" + uint16 Version + uint16 Eintragslänge
+  + int64 höchste pulse_id + uint64 indiziertes CSV-Ende + 4 Byte reserviert
+- danach die Einträge hintereinander (little endian)
+
+Die Einträge werden von `append_pulse_to_csv()` nach dem Schreiben der
+Daten angehängt, danach wird der Kopf aktualisiert. Die nächste freie
+pulse_id steht damit im Kopf (O(1)), ein Puls wird per Seek gelesen.
+Stimmt das indizierte Ende nicht mit der CSV-Größe überein (alte Datei
+ohne Index, Absturz, extern angehängte Zeilen), wird nur der nicht
+indizierte Rest der CSV gelesen und ergänzt; ist die CSV kürzer als der
+Index, wird er neu aufgebaut. Für bestehende Läufe:
+`python -m pico_pulse_lab.storage.csv_index run.csv [...]`.
+"""
+
+import os
+import struct
+import sys
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+INDEX_MAGIC    = b"PPLCSVIX"
+INDEX_VERSION  = 1
+INDEX_EXT      = ".idx"                         # Index liegt unter <csv>.idx
+INDEX_DTYPE    = np.dtype([
+    ('pulse_id', '<i8'),
+    ('offset', '<u8'),
+    ('nbytes', '<u8'),
+    ('rows', '<u8'),
+    ('timestamp', '<f8'),
+])
+SCAN_BLOCK     = 16 * 1024 * 1024               # Lesegröße beim Nachindizieren
+_HEADER        = struct.Struct("<8sHHqQ4x")     # Magic, Version, Eintragslänge, max. ID, CSV-Ende
+_NO_PULSE      = -1                             # max. ID eines leeren Index
+
+_INDEX_LOCK = threading.Lock()
+
+
+def index_path(csv_path: str) -> str:
+    """Pfad des Index zu einer CSV-Datei."""
+    return csv_path + INDEX_EXT
+
+
+def _scan_csv(csv_path: str, start: int, stop: int) -> Tuple[list, int]:
+    """
+    Liest Pulsgrenzen aus einem Bereich der CSV (interne Funktion).
+
+    Aufeinanderfolgende Zeilen mit gleicher pulse_id bilden einen Eintrag;
+    Kommentarzeilen ('#') und eine unvollständige letzte Zeile werden
+    übersprungen.
+
+    Returns
+    -------
+    tuple
+        (Einträge [(pulse_id, offset, nbytes, rows)], Ende der letzten vollständigen Zeile)
+    """
+    entries = []
+    current = None  # [pulse_id, offset, nbytes, rows]
+    pos = end = start
+    rest = b""
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        while pos < stop:
+            block = f.read(min(SCAN_BLOCK, stop - pos))
+            if not block:
+                break
+            pos += len(block)
+            lines = (rest + block).split(b"\n")
+            rest = lines.pop()  # ohne Zeilenende: unvollständig bzw. Rest im nächsten Block
+            for line in lines:
+                length = len(line) + 1
+                comma = line.find(b",")
+                if comma > 0 and line[:1] != b"#":
+                    try:
+                        pulse_id = int(line[:comma])
+                    except ValueError:
+                        pulse_id = None
+                    if pulse_id is not None:
+                        if current is not None and current[0] == pulse_id and current[1] + current[2] == end:
+                            current[2] += length
+                            current[3] += 1
+                        else:
+                            if current is not None:
+                                entries.append(tuple(current))
+                            current = [pulse_id, end, length, 1]
+                end += length
+    if current is not None:
+        entries.append(tuple(current))
+    return entries, end
+
+
+def _read_header(f) -> Optional[Tuple[int, int]]:
+    """(max. pulse_id, indiziertes CSV-Ende) oder None bei fehlendem/ungültigem Kopf (interne Funktion)."""
+    f.seek(0)
+    raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        return None
+    magic, version, itemsize, max_id, end = _HEADER.unpack(raw)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION or itemsize != INDEX_DTYPE.itemsize:
+        return None
+    return max_id, end
+
+
+def _write_header(f, max_id: int, end: int) -> None:
+    f.seek(0)
+    f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_DTYPE.itemsize, max_id, end))
+
+
+def _read_entries(f) -> np.ndarray:
+    """Alle vollständigen Einträge (interne Funktion)."""
+    f.seek(0, os.SEEK_END)
+    count = (f.tell() - _HEADER.size) // INDEX_DTYPE.itemsize
+    if count <= 0:
+        return np.empty(0, dtype=INDEX_DTYPE)
+    f.seek(_HEADER.size)
+    return np.frombuffer(f.read(count * INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE).copy()
+
+
+def _append_entries(f, entries: np.ndarray, max_id: int, end: int) -> int:
+    """Hängt Einträge an und aktualisiert danach den Kopf; gibt die neue max. ID zurück (interne Funktion)."""
+    if len(entries):
+        # Hinter den letzten vollständigen Eintrag (ein abgebrochener Eintrag wird überschrieben)
+        count = max(0, f.seek(0, os.SEEK_END) - _HEADER.size) // INDEX_DTYPE.itemsize
+        f.seek(_HEADER.size + count * INDEX_DTYPE.itemsize)
+        f.write(entries.tobytes())
+        f.truncate()
+        max_id = max(max_id, int(entries['pulse_id'].max()))
+    _write_header(f, max_id, end)
+    f.flush()
+    return max_id
+
+
+def _entries(scanned: list) -> np.ndarray:
+    """Gelesene Pulsgrenzen als Index-Einträge ohne Zeitstempel (interne Funktion)."""
+    out = np.empty(len(scanned), dtype=INDEX_DTYPE)
+    if scanned:
+        out['pulse_id'], out['offset'], out['nbytes'], out['rows'] = zip(*scanned)
+    out['timestamp'] = np.nan
+    return out
+
+
+def _open_synced(csv_path: str, upto: Optional[int] = None):
+    """
+    Öffnet den Index und gleicht ihn mit der CSV bis Byte `upto` ab (interne Funktion).
+
+    Returns
+    -------
+    tuple
+        (offene Index-Datei "r+b", max. pulse_id, indiziertes CSV-Ende)
+    """
+    if upto is None:
+        upto = os.path.getsize(csv_path)
+    path = index_path(csv_path)
+    f = open(path, "r+b" if os.path.exists(path) else "w+b")
+    try:
+        header = _read_header(f)
+        if header is None or header[1] > upto:
+            # Kein/ungültiger Index oder CSV kürzer als indiziert: neu aufbauen
+            f.seek(0)
+            f.truncate()
+            _write_header(f, _NO_PULSE, 0)
+            header = (_NO_PULSE, 0)
+        max_id, end = header
+        if end < upto:
+            scanned, end = _scan_csv(csv_path, end, upto)
+            max_id = _append_entries(f, _entries(scanned), max_id, end)
+        return f, max_id, end
+    except BaseException:
+        f.close()
+        raise
+
+
+def append_index_entry(
+    csv_path: str,
+    pulse_id: int,
+    offset: int,
+    nbytes: int,
+    rows: int,
+    timestamp: Optional[float] = None
+) -> None:
+    """
+    Trägt einen gerade geschriebenen Puls in den Index ein.
+
+    Nicht indizierte Zeilen vor `offset` (z.B. eine CSV ohne Index) werden
+    vorher nachgetragen.
+
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei.
+    pulse_id : int
+        ID des Pulses.
+    offset : int
+        Byte-Position der ersten Zeile des Pulses in der CSV.
+    nbytes : int
+        Länge aller Zeilen des Pulses in Bytes.
+    rows : int
+        Anzahl Zeilen (Samples).
+    timestamp : float, optional
+        Zeitstempel des Pulses (Unix-Zeit); None wird als NaN gespeichert.
+    """
+    append_index_entries(csv_path, [(pulse_id, offset, nbytes, rows, timestamp)])
+
+
+def append_index_entries(csv_path: str, entries: List[tuple]) -> None:
+    """
+    Trägt mehrere aufeinanderfolgend geschriebene Pulse mit einem Schreibzugriff ein.
+
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei.
+    entries : list of tuple
+        (pulse_id, offset, nbytes, rows, timestamp) je Puls in Dateireihenfolge
+        (siehe `append_index_entry()`).
+    """
+    if not entries:
+        return
+    records = np.array([(pid, offset, nbytes, rows, np.nan if ts is None else ts)
+                        for pid, offset, nbytes, rows, ts in entries], dtype=INDEX_DTYPE)
+    last = records[-1]
+    with _INDEX_LOCK:
+        f, max_id, _ = _open_synced(csv_path, upto=int(records['offset'][0]))
+        with f:
+            _append_entries(f, records, max_id, int(last['offset'] + last['nbytes']))
+
+
+def load_csv_index(csv_path: str) -> np.ndarray:
+    """
+    Lädt den Index einer CSV (nicht indizierte Zeilen werden vorher ergänzt).
+
+    Returns
+    -------
+    np.ndarray
+        Einträge mit dtype INDEX_DTYPE in Dateireihenfolge.
+
+    Examples
+    --------
+    >>> index = load_csv_index("runs/test_01/test_01.csv")
+    >>> index['pulse_id'], index['rows']
+    """
+    with _INDEX_LOCK:
+        f, _, _ = _open_synced(csv_path)
+        with f:
+            return _read_entries(f)
+
+
+def next_pulse_id(csv_path: str) -> int:
+    """
+    Nächste freie pulse_id einer CSV aus dem Index-Kopf.
+
+    Ist der Index aktuell, wird nur der Kopf gelesen (O(1)); sonst wird der
+    nicht indizierte Rest der CSV einmal nachgetragen.
+
+    Returns
+    -------
+    int
+        Höchste pulse_id + 1 (1 wenn die CSV nicht existiert oder leer ist).
+    """
+    if not os.path.exists(csv_path):
+        return 1
+    with _INDEX_LOCK:
+        f, max_id, _ = _open_synced(csv_path)
+        f.close()
+    return max(max_id, 0) + 1
+
+
+def find_pulse(csv_path: str, pulse_id: int) -> np.void:
+    """
+    Index-Eintrag eines Pulses (bei mehrfacher pulse_id der letzte).
+
+    Raises
+    ------
+    KeyError
+        Wenn die pulse_id nicht in der CSV steht.
+    """
+    index = load_csv_index(csv_path)
+    hits = np.flatnonzero(index['pulse_id'] == pulse_id)
+    if not len(hits):
+        raise KeyError(f"pulse_id {pulse_id} nicht in {csv_path}")
+    return index[hits[-1]]
+
+
+def read_pulse_rows(csv_path: str, pulse_id: int) -> bytes:
+    """
+    Liest die CSV-Zeilen eines Pulses per Seek (ohne die Datei davor zu lesen).
+
+    Returns
+    -------
+    bytes
+        Zeilen "pulse_id,sample_idx,time_s,..." des Pulses inkl. Zeilenenden.
+
+    Examples
+    --------
+    >>> rows = read_pulse_rows("runs/test_01/test_01.csv", 42)
+    >>> data = np.loadtxt(io.BytesIO(rows), delimiter=",")
+    """
+    entry = find_pulse(csv_path, pulse_id)
+    with open(csv_path, "rb") as f:
+        f.seek(int(entry['offset']))
+        return f.read(int(entry['nbytes']))
+
+
+def iter_pulse_rows(csv_path: str) -> Iterator[Tuple[int, bytes]]:
+    """Liefert (pulse_id, Zeilen) aller Pulse in Dateireihenfolge."""
+    index = load_csv_index(csv_path)
+    with open(csv_path, "rb") as f:
+        for entry in index:
+            f.seek(int(entry['offset']))
+            yield int(entry['pulse_id']), f.read(int(entry['nbytes']))
+
+
+def rebuild_csv_index(csv_path: str) -> int:
+    """
+    Baut den Index einer CSV vollständig neu auf (z.B. für Läufe ohne Index).
+
+    Zeitstempel sind in der CSV nicht enthalten und bleiben NaN.
+
+    Returns
+    -------
+    int
+        Anzahl indizierter Pulse.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV-Datei existiert nicht: {csv_path}")
+    with _INDEX_LOCK:
+        path = index_path(csv_path)
+        if os.path.exists(path):
+            os.remove(path)
+        f, _, _ = _open_synced(csv_path)
+        with f:
+            return len(_read_entries(f))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Verwendung: python -m pico_pulse_lab.storage.csv_index <run.csv> [...]")
+        sys.exit(1)
+    for csv_file in sys.argv[1:]:
+        print(f"{csv_file}: {rebuild_csv_index(csv_file)} Pulse indiziert -> {index_path(csv_file)}")
@@ -0,0 +1,182 @@
+"""
+Lesefunktionen für Puls-CSV-Dateien.
+
+Gegenstück zu `csv_writer.py`: Pulse werden über den Index <csv>.idx
+(siehe `csv_index.py`) per Seek gelesen statt die CSV Zeile für Zeile zu
+durchsuchen, und die Zahlenspalten werden in einem Aufruf von
+`np.loadtxt` (C-Parser) in Arrays umgewandelt. Mehrere Pulse werden in
+Dateireihenfolge in einem Durchgang gelesen und gemeinsam umgewandelt.
+
+Zuletzt geladene Pulse hält ein kleiner LRU-Cache (PULSE_CACHE_SIZE
+Einträge). Der Schlüssel enthält Byte-Position und Länge aus dem Index,
+ein später mit gleicher pulse_id angehängter Puls wird daher neu gelesen.
+Die Arrays aus dem Cache sind schreibgeschützt.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from pico_pulse_lab.storage.csv_index import load_csv_index
+
+
+PULSE_CACHE_SIZE = 8             # zuletzt geladene Pulse im Speicher
+DEFAULT_COLUMNS  = ["pulse_id", "sample_idx", "time_s", "u_V", "i_V"]  # CSV ohne "# columns:"
+
+_PULSE_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def read_csv_columns(csv_path: str) -> List[str]:
+    """
+    Spaltennamen aus der Kopfzeile "# columns:" einer Puls-CSV.
+
+    Returns
+    -------
+    list of str
+        z.B. ['pulse_id', 'sample_idx', 'time_s', 'u_V', 'i_A']; DEFAULT_COLUMNS
+        wenn die Kopfzeile fehlt.
+    """
+    if not os.path.isfile(csv_path):
+        raise FileNotFoundError(f"CSV nicht gefunden: {csv_path}")
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            if "columns:" in line:
+                return [p.strip() for p in line.split("columns:")[-1].strip().split(",")]
+    return list(DEFAULT_COLUMNS)
+
+
+def _split_columns(data: np.ndarray, columns: List[str]) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """(t, u, i) aus den Zahlenspalten eines Pulses; fehlender Kanal -> None (interne Funktion)."""
+    i_col = next((k for k, name in enumerate(columns) if name.startswith("i_")), None)
+    u_col = columns.index("u_V") if "u_V" in columns else None
+    t = data[:, columns.index("time_s")]
+    u = None if u_col is None else data[:, u_col]
+    i = None if i_col is None else data[:, i_col]
+    return t, u, i
+
+
+def _cache_get(key):
+    with _CACHE_LOCK:
+        pulse = _PULSE_CACHE.get(key)
+        if pulse is not None:
+            _PULSE_CACHE.move_to_end(key)
+        return pulse
+
+
+def _cache_put(key, pulse) -> None:
+    with _CACHE_LOCK:
+        _PULSE_CACHE[key] = pulse
+        while len(_PULSE_CACHE) > PULSE_CACHE_SIZE:
+            _PULSE_CACHE.popitem(last=False)
+
+
+def clear_pulse_cache() -> None:
+    """Leert den LRU-Cache geladener Pulse."""
+    with _CACHE_LOCK:
+        _PULSE_CACHE.clear()
+
+
+def load_pulses_csv(
+    csv_path: str,
+    pulse_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]]:
+    """
+    Lädt mehrere Pulse aus einer CSV in einem Durchgang.
+
+    Die Zeilen aller nicht zwischengespeicherten Pulse werden in
+    Dateireihenfolge per Seek gelesen und gemeinsam umgewandelt.
+
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei.
+    pulse_ids : iterable of int, optional
+        Gewünschte Pulse; None lädt alle Pulse der Datei.
+
+    Returns
+    -------
+    dict
+        {pulse_id: (t, u, i)} in der Reihenfolge von pulse_ids; u bzw. i ist
+        None, wenn der Kanal nicht erfasst wurde.
+
+    Raises
+    ------
+    KeyError
+        Wenn eine pulse_id nicht in der CSV steht.
+
+    Examples
+    --------
+    >>> pulses = load_pulses_csv("runs/test_01/test_01.csv", [1, 2, 5])
+    >>> t, u, i = pulses[5]
+    """
+    columns = read_csv_columns(csv_path)
+    index = load_csv_index(csv_path)
+    # Bei mehrfacher pulse_id gilt der letzte Eintrag (wie `find_pulse()`)
+    entries = {int(entry['pulse_id']): entry for entry in index}
+    if pulse_ids is None:
+        pulse_ids = list(entries)
+    pulse_ids = [int(pid) for pid in pulse_ids]
+    missing = [pid for pid in pulse_ids if pid not in entries]
+    if missing:
+        raise KeyError(f"pulse_id {missing} nicht in {csv_path}")
+
+    path = os.path.abspath(csv_path)
+    result, keys = {}, {}
+    for pid in pulse_ids:
+        entry = entries[pid]
+        keys[pid] = (path, pid, int(entry['offset']), int(entry['nbytes']))
+        cached = _cache_get(keys[pid])
+        if cached is not None:
+            result[pid] = cached
+
+    to_read = sorted({pid for pid in pulse_ids if pid not in result}, key=lambda pid: keys[pid][2])
+    if to_read:
+        blocks = []
+        with open(csv_path, "rb") as f:
+            for pid in to_read:
+                f.seek(keys[pid][2])
+                blocks.append(f.read(keys[pid][3]))
+        data = np.loadtxt(io.BytesIO(b"".join(blocks)), delimiter=",", ndmin=2)
+        if data.shape[1] != len(columns):
+            raise ValueError(f"CSV hat {data.shape[1]} Spalten, Header nennt {len(columns)}")
+        data.flags.writeable = False
+        start = 0
+        for pid in to_read:
+            rows = int(entries[pid]['rows'])
+            result[pid] = _split_columns(data[start:start + rows], columns)
+            _cache_put(keys[pid], result[pid])
+            start += rows
+    return {pid: result[pid] for pid in pulse_ids}
+
+
+def load_pulse_csv(csv_path: str, pulse_id: int) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Lädt einen Puls aus einer CSV (per Seek über den Index).
+
+    Returns
+    -------
+    tuple
+        (t, u, i); u bzw. i ist None, wenn der Kanal nicht erfasst wurde.
+
+    Raises
+    ------
+    KeyError
+        Wenn die pulse_id nicht in der CSV steht.
+
+    Examples
+    --------
+    >>> t, u, i = load_pulse_csv("runs/test_01/test_01.csv", 42)
+    """
+    return load_pulses_csv(csv_path, [pulse_id])[int(pulse_id)]
+
+
+def get_all_pulse_ids_csv(csv_path: str) -> List[int]:
+    """Sortierte Liste aller pulse_ids einer CSV (aus dem Index)."""
+    return sorted(set(load_csv_index(csv_path)['pulse_id'].tolist()))
@@ -8,17 +8,89 @@ kompatibel, aber langsamer als binäre Formate wie .npz.
 Struktur der CSV:
 - Header-Zeilen beginnen mit '#'
 - Datenzeilen: pulse_id,sample_idx,time_s,u_V,i_{A|V}
+- Bei Erfassung nur eines Kanals fehlt die Spalte des anderen
+  (pulse_id,sample_idx,time_s,u_V bzw. pulse_id,sample_idx,time_s,i_{A|V});
+  die Zeile "# columns:" im Header nennt die vorhandenen Spalten.
+
+Schreibpfad:
+Die Zeilen werden spaltenweise kodiert statt zeilenweise über `np.savetxt`.
+Jeder verschiedene Wert einer Spalte wird nur einmal mit "%.9e" formatiert
+(ein 8-Bit-Scope liefert je Block nur wenige hundert verschiedene
+int16-Werte), Zeit- und Indexspalte werden je Zeitachse zwischengespeichert.
+Die Ausgabe ist byte-identisch zu `np.savetxt(fmt=["%d", "%d", "%.9e", ...])`.
+Optional übernimmt ein `CsvChunkWriter` das Schreiben in großen Blöcken
+aus einem Hintergrund-Thread.
+
+Jeder geschriebene Puls wird in den Index <csv>.idx eingetragen
+(pulse_id, Byte-Position, Länge, Zeilen, Zeitstempel; siehe `csv_index.py`).
+
+Speicher-Thread:
+`StorageWorker` (bzw. `storage_worker()`) nimmt Pulse aus einer begrenzten
+Warteschlange und übergibt sie gesammelt (bis zu batch_size Pulse) an eine
+Schreibfunktion, z.B. `append_pulses_to_csv()`; fsync erfolgt höchstens
+alle fsync_interval_s Sekunden statt pro Puls. Die Erfassung reiht nur ein
+und wartet nie auf die Platte (bei voller Warteschlange: "block" wartet auf
+einen freien Platz, "drop_oldest" verwirft den ältesten Puls).
 """
 
 import os
 import json
+import threading
+import time
 import numpy as np
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from pico_pulse_lab.acquisition.pulse_data import TimeAxis
+from pico_pulse_lab.storage.csv_index import append_index_entries, append_index_entry, next_pulse_id
+
+
+# ---------- Kodierung ----------
+CSV_FLOAT_FMT = b"%.9e"          # Format der float-Spalten (Zeit, Spannung, Strom)
+CSV_CHUNK_ROWS = 65536           # Zeilen pro kodiertem Block
+CSV_WRITER_QUEUE = 8             # max. ausstehende Blöcke im Schreib-Thread
+CSV_WRITE_BUFFER = 8 * 2**20     # Dateipuffer beim Schreiben mehrerer Pulse (Bytes)
+TIME_CACHE_SIZE = 4              # zwischengespeicherte Zeitspalten (je Zeitachse)
+_NEWLINE = os.linesep.encode()   # Zeilenende wie np.savetxt in eine Textdatei
+
+# ---------- Speicher-Thread ----------
+STORAGE_QUEUE_SIZE = 16          # max. wartende Pulse (int16: ~1,9 MB je 480k-Puls)
+STORAGE_BATCH_SIZE = 8           # max. Pulse pro Schreibvorgang
+STORAGE_FSYNC_INTERVAL_S = 1.0   # fsync höchstens so oft (0: nach jedem Batch, None: nie)
+STORAGE_OVERFLOW_MODES = ("block", "drop_oldest")
+
+_INDEX_STRINGS = np.empty(0, dtype="S1")
+_TIME_STRINGS = OrderedDict()
+_CACHE_LOCK = threading.Lock()
 
 
 # ---------- CSV-Helfer ----------
-def _csv_header(run_name: str, i_unit: str) -> str:
+def csv_columns(i_unit: str, channels: str = "AB") -> List[str]:
+    """
+    Spaltennamen einer Puls-CSV für die erfassten Kanäle.
+
+    Parameters
+    ----------
+    i_unit : str
+        Einheit des Stroms ("A" oder "V").
+    channels : str, optional
+        Erfasste Kanäle: "AB", "A" (nur u_V) oder "B" (nur i_{unit}) (Standard: "AB").
+
+    Returns
+    -------
+    list of str
+        z.B. ['pulse_id', 'sample_idx', 'time_s', 'u_V', 'i_A'].
+    """
+    columns = ["pulse_id", "sample_idx", "time_s"]
+    if "A" in channels:
+        columns.append("u_V")
+    if "B" in channels:
+        columns.append(f"i_{i_unit}")
+    return columns
+
+
+def _csv_header(run_name: str, i_unit: str, channels: str = "AB") -> str:
     """
     Erzeugt den Header für eine neue CSV-Datei.
     
@@ -32,6 +104,8 @@ def _csv_header(run_name: str, i_unit: str) -> str:
     i_unit : str
         Einheit des Stroms: "A" für Ampere oder "V" für Volt
         (falls Rogowski noch nicht umgerechnet wurde).
+    channels : str, optional
+        Erfasste Kanäle ("AB", "A" oder "B", Standard: "AB").
     
     Returns
     -------
@@ -49,11 +123,11 @@ def _csv_header(run_name: str, i_unit: str) -> str:
     return (
         f"# RUN_NAME={run_name}\n"
         f"# created={datetime.now().isoformat()}\n"
-        f"# columns: pulse_id,sample_idx,time_s,u_V,i_{i_unit}\n"
+        f"# columns: {','.join(csv_columns(i_unit, channels))}\n"
     )
 
 
-def ensure_csv(csv_path: str, run_name: str, i_unit: str) -> None:
+def ensure_csv(csv_path: str, run_name: str, i_unit: str, channels: str = "AB") -> None:
     """
     Legt CSV-Datei mit Header an, falls sie noch nicht existiert.
     
@@ -69,6 +143,9 @@ def ensure_csv(csv_path: str, run_name: str, i_unit: str) -> None:
         Name des Messlaufs.
     i_unit : str
         Einheit des Stroms ("A" oder "V").
+    channels : str, optional
+        Erfasste Kanäle ("AB", "A" oder "B", Standard: "AB"); bestimmt die
+        Spalten. Eine bestehende Datei wird nicht verändert.
     
     Returns
     -------
@@ -85,16 +162,19 @@ def ensure_csv(csv_path: str, run_name: str, i_unit: str) -> None:
     # Header schreiben wenn Datei nicht existiert
     if not os.path.exists(csv_path):
         with open(csv_path, "w", encoding="utf-8") as f:
-            f.write(_csv_header(run_name, i_unit))
+            f.write(_csv_header(run_name, i_unit, channels))
 
 
 def scan_next_pulse_id(csv_path: str) -> int:
     """
     Liest aus bestehender CSV die nächste freie pulse_id.
     
-    Durchsucht die CSV nach der höchsten vorhandenen pulse_id und gibt
-    die nächste zurück. Sollte nur einmal pro Mess-Session am Anfang
-    aufgerufen werden. Danach wird pulse_id manuell hochgezählt.
+    Die höchste pulse_id steht im Index <csv>.idx (siehe `csv_index.py`),
+    der Aufruf ist damit unabhängig von der Länge des Laufs. Fehlt der
+    Index (alte Läufe), wird er dabei einmal aufgebaut; nur wenn er nicht
+    geschrieben werden kann, wird die CSV wie bisher vollständig durchsucht.
+    Sollte nur einmal pro Mess-Session am Anfang aufgerufen werden.
+    Danach wird pulse_id manuell hochgezählt.
     
     Parameters
     ----------
@@ -114,6 +194,11 @@ def scan_next_pulse_id(csv_path: str) -> int:
     if not os.path.exists(csv_path):
         return 1  # Erste ID wenn Datei nicht existiert
     
+    try:
+        return next_pulse_id(csv_path)
+    except OSError as e:
+        print(f"[Warnung] CSV-Index nicht verfügbar ({e}), durchsuche {csv_path}")
+    
     last_id = 0
     
     # Datei durchsuchen nach höchster pulse_id
@@ -135,13 +220,548 @@ def scan_next_pulse_id(csv_path: str) -> int:
     return last_id + 1
 
 
+# ---------- Spaltenweise Kodierung ----------
+def _format_floats(values: np.ndarray) -> np.ndarray:
+    """
+    Formatiert eine float-Spalte mit "%.9e" (interne Funktion).
+
+    Jeder verschiedene Wert wird nur einmal formatiert und per Index
+    verteilt; bei quantisierten Messdaten sind das wenige hundert statt
+    65536 Formatierungen je Block.
+
+    Returns
+    -------
+    np.ndarray
+        Bytes-Array (dtype "S"), ein Eintrag je Wert.
+    """
+    uniq, inv = np.unique(values, return_inverse=True)
+    table = np.array([CSV_FLOAT_FMT % v for v in uniq.tolist()])
+    out = table[inv.reshape(-1)]
+    # np.unique fasst -0.0 und 0.0 zusammen, "%.9e" unterscheidet sie
+    zero = values == 0
+    neg_zero = zero & np.signbit(values)
+    if neg_zero.any():
+        out = out.astype(f"S{max(out.itemsize, 16)}")
+        out[zero] = CSV_FLOAT_FMT % 0.0
+        out[neg_zero] = CSV_FLOAT_FMT % -0.0
+    return out
+
+
+def _format_counts(adc: np.ndarray, scale: float, offset: float) -> np.ndarray:
+    """
+    Formatiert int16-Rohwerte als adc * scale + offset (interne Funktion).
+
+    Gleiche Rechnung wie `RawPulse.u()/i()`, aber nur einmal je
+    vorkommendem ADC-Wert.
+    """
+    uniq, inv = np.unique(adc, return_inverse=True)
+    table = np.array([CSV_FLOAT_FMT % v for v in (uniq * scale + offset).tolist()])
+    return table[inv.reshape(-1)]
+
+
+def _index_strings(stop: int) -> np.ndarray:
+    """
+    sample_idx 0 .. stop-1 als Bytes-Array (interne Funktion, wächst bei Bedarf).
+    """
+    global _INDEX_STRINGS
+    with _CACHE_LOCK:
+        if len(_INDEX_STRINGS) < stop:
+            _INDEX_STRINGS = np.array([b"%d" % k for k in range(max(stop, CSV_CHUNK_ROWS))])
+        return _INDEX_STRINGS
+
+
+def _time_strings(axis: TimeAxis) -> np.ndarray:
+    """
+    Formatierte Zeitspalte einer Zeitachse (interne Funktion).
+
+    Alle Pulse eines Laufs teilen sich dieselbe Zeitachse; sie wird daher
+    nur beim ersten Puls formatiert (LRU mit TIME_CACHE_SIZE Einträgen).
+    """
+    key = (axis.t0, axis.dt, axis.n)
+    with _CACHE_LOCK:
+        column = _TIME_STRINGS.get(key)
+        if column is not None:
+            _TIME_STRINGS.move_to_end(key)
+            return column
+    column = np.array([CSV_FLOAT_FMT % v for v in axis.to_array().tolist()])
+    with _CACHE_LOCK:
+        _TIME_STRINGS[key] = column
+        while len(_TIME_STRINGS) > TIME_CACHE_SIZE:
+            _TIME_STRINGS.popitem(last=False)
+    return column
+
+
+def _encode_rows(pulse_id: int, idx: np.ndarray, columns: List[np.ndarray]) -> bytes:
+    """
+    Setzt Zeilen "pulse_id,sample_idx,col,..." aus formatierten Spalten zusammen (interne Funktion).
+    """
+    rows = np.char.add(b"%d," % pulse_id, idx)
+    for column in columns:
+        rows = np.char.add(np.char.add(rows, b","), column)
+    return _NEWLINE.join(rows.tolist()) + _NEWLINE
+
+
+def encode_pulse_csv(
+    t,
+    u: Optional[np.ndarray],
+    i: Optional[np.ndarray],
+    pulse_id: int,
+    chunk_rows: int = CSV_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """
+    Kodiert einen Puls blockweise als CSV-Zeilen (ohne Header).
+
+    Parameters
+    ----------
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden; eine `TimeAxis` wird zwischengespeichert.
+    u, i : np.ndarray or None
+        Spannungs-/Stromwerte (None: Spalte entfällt).
+    pulse_id : int
+        ID des Pulses (erste Spalte).
+    chunk_rows : int, optional
+        Zeilen pro Block (Standard: CSV_CHUNK_ROWS).
+
+    Yields
+    ------
+    bytes
+        Zeilenblöcke, byte-identisch zu `np.savetxt` mit
+        fmt=["%d", "%d"] + ["%.9e"] * Spalten.
+    """
+    n = len(t)
+    values = [np.asarray(x, dtype=np.float64) for x in (u, i) if x is not None]
+    times = _time_strings(t) if isinstance(t, TimeAxis) else None
+    t_arr = None if times is not None else np.asarray(t, dtype=np.float64)
+    idx = _index_strings(n)
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        t_col = times[start:stop] if times is not None else _format_floats(t_arr[start:stop])
+        yield _encode_rows(pulse_id, idx[start:stop],
+                           [t_col] + [_format_floats(x[start:stop]) for x in values])
+
+
+def encode_raw_pulse_csv(pulse, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Kodiert einen RawPulse blockweise direkt aus den int16-Rohwerten.
+
+    Die Werte werden wie in `RawPulse.u()/i()` als adc * scale + offset
+    berechnet, aber nur einmal je vorkommendem ADC-Wert formatiert; ein
+    float64-Array des ganzen Pulses entsteht nicht.
+
+    Yields
+    ------
+    bytes
+        Zeilenblöcke im Format von `encode_pulse_csv()`.
+    """
+    n = pulse.n_samples
+    scaled = [(adc, scale, offset) for adc, scale, offset in
+              ((pulse.adc_u, pulse.scale_u, pulse.offset_u),
+               (pulse.adc_i, pulse.scale_i, pulse.offset_i)) if adc is not None]
+    times = _time_strings(pulse.time_axis())
+    idx = _index_strings(n)
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        yield _encode_rows(pulse.pulse_id, idx[start:stop],
+                           [times[start:stop]] + [_format_counts(adc[start:stop], scale, offset)
+                                                  for adc, scale, offset in scaled])
+
+
+def _write_pulse(
+    csv_path: str,
+    chunks: Iterator[bytes],
+    pulse_id: int,
+    rows: int,
+    timestamp: Optional[float],
+    writer: Optional["CsvChunkWriter"]
+) -> None:
+    """
+    Schreibt die kodierten Blöcke eines Pulses und trägt ihn in den Index ein (interne Funktion).
+
+    Direkt oder über den Schreib-Thread; der Index-Eintrag folgt erst,
+    wenn die Zeilen in der Datei stehen.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    if writer is not None:
+        writer.write_pulse(chunks, pulse_id, rows, timestamp)
+        return
+    with open(csv_path, "ab") as f:
+        offset = f.tell()
+        for chunk in chunks:
+            f.write(chunk)
+        nbytes = f.tell() - offset
+    append_index_entry(csv_path, pulse_id, offset, nbytes, rows, timestamp)
+
+
+class StorageWorker:
+    """
+    Speicher-Thread mit begrenzter Warteschlange und gesammeltem Schreiben.
+
+    `submit()` reiht einen Puls nur ein; der Thread übergibt jeweils alle
+    wartenden Pulse (höchstens batch_size) in einem Aufruf an write_batch
+    und ruft sync (fsync) höchstens alle fsync_interval_s Sekunden sowie
+    beim Schließen auf.
+
+    Parameters
+    ----------
+    write_batch : callable
+        Funktion (list of items) -> int: schreibt die Pulse eines Batches in
+        Einreihungsreihenfolge und gibt die geschriebenen Bytes zurück
+        (None zählt als 0).
+    sync : callable, optional
+        Funktion ohne Argumente, die geschriebene Daten auf die Platte bringt
+        (z.B. `os.fsync`); None: kein fsync.
+    queue_size : int, optional
+        Maximale Anzahl wartender Pulse (Standard: STORAGE_QUEUE_SIZE).
+    batch_size : int, optional
+        Maximale Anzahl Pulse pro write_batch-Aufruf (Standard: STORAGE_BATCH_SIZE).
+    fsync_interval_s : float or None, optional
+        Mindestabstand zwischen zwei sync-Aufrufen in Sekunden; 0 nach jedem
+        Batch, None nur beim Schließen (Standard: STORAGE_FSYNC_INTERVAL_S).
+    overflow : str, optional
+        Verhalten bei voller Warteschlange: "block" (warten) oder
+        "drop_oldest" (ältesten Puls verwerfen) (Standard: "block").
+    name : str, optional
+        Name des Threads.
+
+    Examples
+    --------
+    >>> worker = storage_worker(lambda batch: append_pulses_to_csv(csv_path, batch))
+    >>> worker.submit(pulse)        # kehrt sofort zurück
+    >>> worker.get_stats()['queue_depth']
+    >>> worker.close()              # schreibt Rest, fsync, beendet Thread
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list], Optional[int]],
+        sync: Optional[Callable[[], None]] = None,
+        queue_size: int = STORAGE_QUEUE_SIZE,
+        batch_size: int = STORAGE_BATCH_SIZE,
+        fsync_interval_s: Optional[float] = STORAGE_FSYNC_INTERVAL_S,
+        overflow: str = "block",
+        name: str = "storage-worker"
+    ):
+        if overflow not in STORAGE_OVERFLOW_MODES:
+            raise ValueError(f"overflow muss einer von {STORAGE_OVERFLOW_MODES} sein")
+        if queue_size < 1 or batch_size < 1:
+            raise ValueError("queue_size und batch_size müssen >= 1 sein")
+
+        self.write_batch = write_batch
+        self.sync = sync
+        self.queue_size = int(queue_size)
+        self.batch_size = int(batch_size)
+        self.fsync_interval_s = fsync_interval_s
+        self.overflow = overflow
+        self.name = name
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0            # Pulse im laufenden write_batch-Aufruf
+        self._closed = False
+        self._thread = None
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+
+        # Statistik
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.bytes_written = 0
+        self.write_s = 0.0
+        self.max_depth = 0
+        self.error: Optional[BaseException] = None
+
+    # ---------- Lebenszyklus ----------
+    def start(self) -> "StorageWorker":
+        """Startet den Speicher-Thread."""
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wartet, bis alle eingereihten Pulse geschrieben sind (ohne fsync)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while (self._queue or self._in_flight) and self.error is None and self._thread is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        self._raise_error()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Schreibt alle wartenden Pulse, ruft sync auf und beendet den Thread.
+
+        Raises
+        ------
+        IOError
+            Ein im Speicher-Thread aufgetretener Fehler wird hier weitergereicht.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._raise_error()
+
+    @property
+    def depth(self) -> int:
+        """Anzahl aktuell wartender Pulse."""
+        return len(self._queue)
+
+    def get_stats(self) -> dict:
+        """Gibt Zähler und Durchsatz des Speicher-Threads zurück (für get_status/Meta)."""
+        write_s = self.write_s
+        return {
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'fsyncs': self.fsyncs,
+            'bytes_written': self.bytes_written,
+            'write_s': write_s,
+            'mb_per_s': self.bytes_written / write_s / 1e6 if write_s > 0 else 0.0,
+            'pulses_per_s': self.written / write_s if write_s > 0 else 0.0,
+            'overflow': self.overflow,
+        }
+
+    # ---------- Erfassungsseite ----------
+    def submit(self, item) -> None:
+        """
+        Reiht einen Puls zum Speichern ein (ohne Plattenzugriff).
+
+        Raises
+        ------
+        IOError
+            Wenn der Speicher-Thread zuvor fehlgeschlagen ist.
+        ValueError
+            Nach `close()`.
+        """
+        with self._cond:
+            self._raise_error()
+            if self._closed:
+                raise ValueError(f"{self.name} ist geschlossen")
+            while len(self._queue) >= self.queue_size:
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    self._cond.wait(0.05)
+                    self._raise_error()
+            self._queue.append(item)
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise IOError(f"Speichern fehlgeschlagen: {self.error}") from self.error
+
+    # ---------- Speicher-Thread ----------
+    def _sync_now(self) -> None:
+        if self.sync is not None and self._unsynced:
+            self.sync()
+            self.fsyncs += 1
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+            try:
+                if not batch:
+                    self._sync_now()  # geschlossen und leer
+                    return
+                t_start = time.perf_counter()
+                nbytes = self.write_batch(batch)
+                self.write_s += time.perf_counter() - t_start
+                self.bytes_written += int(nbytes or 0)
+                self._unsynced = True
+                if (self.fsync_interval_s is not None
+                        and time.monotonic() - self._last_sync >= self.fsync_interval_s):
+                    self._sync_now()
+            except BaseException as e:
+                self.error = e
+                with self._cond:
+                    self._queue.clear()  # Erfassung bekommt den Fehler beim nächsten submit()
+                    self._in_flight = 0
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self.written += len(batch)
+                self.batches += 1
+                self._in_flight = 0
+                self._cond.notify_all()
+
+
+def storage_worker(write_batch: Callable[[list], Optional[int]], **kwargs) -> StorageWorker:
+    """
+    Erzeugt und startet einen `StorageWorker` (Parameter siehe dort).
+
+    Examples
+    --------
+    >>> worker = storage_worker(write_batch, sync=sync, fsync_interval_s=2.0)
+    """
+    return StorageWorker(write_batch, **kwargs).start()
+
+
+def fsync_path(path: str) -> None:
+    """Bringt eine (von anderen Handles geschriebene) Datei per fsync auf die Platte."""
+    with open(path, "r+b") as f:
+        os.fsync(f.fileno())
+
+
+class CsvChunkWriter:
+    """
+    Hängt kodierte CSV-Blöcke aus einem Hintergrund-Thread an eine Datei an.
+
+    `write()` legt einen Block nur in eine begrenzte Warteschlange; der
+    Thread (ein `StorageWorker`) fasst wartende Blöcke zu einem
+    Schreibaufruf zusammen. Der Aufrufer blockiert erst, wenn max_pending
+    Blöcke ausstehen. `write_pulse()` trägt den Puls nach dem Schreiben
+    zusätzlich in den Index ein (siehe `csv_index.py`). Fehler des Threads
+    werden beim nächsten `write()`/`flush()`/`close()` erneut ausgelöst.
+
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei. MUSS bereits existieren (mit Header).
+    max_pending : int, optional
+        Maximal ausstehende Blöcke (Standard: CSV_WRITER_QUEUE).
+
+    Examples
+    --------
+    >>> with CsvChunkWriter("runs/test_01.csv") as writer:
+    ...     append_raw_pulse_to_csv("runs/test_01.csv", pulse, writer=writer)
+    """
+
+    def __init__(self, csv_path: str, max_pending: int = CSV_WRITER_QUEUE):
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"CSV-Datei existiert nicht: {csv_path}")
+        self.csv_path = csv_path
+        self._file = open(csv_path, "ab")
+        self._position = self._file.tell()  # Dateiende nach allen übergebenen Blöcken
+        self._worker = storage_worker(
+            self._write_batch, queue_size=max(1, int(max_pending)), batch_size=max(1, int(max_pending)),
+            fsync_interval_s=None, name="csv-writer"
+        )
+
+    @property
+    def bytes_written(self) -> int:
+        """Bisher geschriebene Bytes."""
+        return self._worker.bytes_written
+
+    def _write_batch(self, batch: list) -> int:
+        """Schreibt Blöcke gesammelt; Index-Einträge erst nach ihren Zeilen (Hintergrund-Thread)."""
+        pending, entries, nbytes = [], [], 0
+        for item in batch:
+            if isinstance(item, bytes):
+                pending.append(item)
+            else:
+                entries.append(item)
+                data = b"".join(pending)
+                self._file.write(data)
+                nbytes += len(data)
+                pending = []
+        data = b"".join(pending)
+        self._file.write(data)
+        self._file.flush()
+        append_index_entries(self.csv_path, entries)
+        return nbytes + len(data)
+
+    def write(self, chunk: bytes) -> None:
+        """Übergibt einen kodierten Block an den Schreib-Thread."""
+        self._worker.submit(chunk)
+        self._position += len(chunk)
+
+    def write_pulse(self, chunks: Iterator[bytes], pulse_id: int, rows: int,
+                    timestamp: Optional[float] = None) -> None:
+        """Übergibt die Blöcke eines Pulses und danach seinen Index-Eintrag."""
+        offset = self._position
+        for chunk in chunks:
+            self.write(chunk)
+        self._worker.submit((pulse_id, offset, self._position - offset, rows, timestamp))
+
+    def flush(self) -> None:
+        """Wartet, bis alle Blöcke geschrieben sind (Datei ist dann aktuell)."""
+        self._worker.flush()
+
+    def close(self) -> None:
+        """Schreibt ausstehende Blöcke, beendet den Thread und schließt die Datei."""
+        try:
+            self._worker.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def append_pulses_to_csv(csv_path: str, pulses: List, f=None) -> int:
+    """
+    Hängt mehrere RawPulse mit einem Dateizugriff an die CSV an.
+
+    Batch-Gegenstück zu `append_raw_pulse_to_csv()` für den Speicher-Thread:
+    alle Pulse werden über einen Dateipuffer von CSV_WRITE_BUFFER Bytes
+    geschrieben und danach mit einem Zugriff in den Index eingetragen.
+
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei. MUSS bereits existieren (mit Header).
+    pulses : list of RawPulse
+        Pulse in Schreibreihenfolge.
+    f : file, optional
+        Bereits im Modus "ab" geöffnete Datei (bleibt offen); None öffnet
+        die Datei für diesen Aufruf.
+
+    Returns
+    -------
+    int
+        Geschriebene Bytes.
+    """
+    own = f is None
+    if own:
+        f = open(csv_path, "ab", buffering=CSV_WRITE_BUFFER)
+    try:
+        entries, start = [], f.tell()
+        for pulse in pulses:
+            offset = f.tell()
+            for chunk in encode_raw_pulse_csv(pulse):
+                f.write(chunk)
+            timestamp = time.time() if pulse.timestamp is None else pulse.timestamp
+            entries.append((pulse.pulse_id, offset, f.tell() - offset, pulse.n_samples, timestamp))
+        f.flush()
+        nbytes = f.tell() - start
+    finally:
+        if own:
+            f.close()
+    append_index_entries(csv_path, entries)
+    return nbytes
+
+
 def append_pulse_to_csv(
     csv_path: str,
     t: np.ndarray,
     u: np.ndarray,
     i: np.ndarray,
     i_unit: str,
-    pulse_id: int
+    pulse_id: int,
+    writer: Optional[CsvChunkWriter] = None,
+    timestamp: Optional[float] = None
 ) -> None:
     """
     Hängt einen Puls mit gegebener pulse_id an die CSV an.
@@ -155,17 +775,21 @@ def append_pulse_to_csv(
     csv_path : str
         Pfad zur CSV-Datei. MUSS bereits existieren (mit Header).
         Verwende `ensure_csv()` vorher falls nötig.
-    t : np.ndarray
-        Zeitvektor in Sekunden (1D-Array).
-    u : np.ndarray
-        Spannungswerte in Volt (1D-Array, gleiche Länge wie t).
-    i : np.ndarray
-        Stromwerte in Ampere oder Volt (1D-Array, gleiche Länge wie t).
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (1D-Array oder `TimeAxis`).
+    u : np.ndarray or None
+        Spannungswerte in Volt (1D-Array, gleiche Länge wie t); None ohne Kanal A.
+    i : np.ndarray or None
+        Stromwerte in Ampere oder Volt (1D-Array, gleiche Länge wie t); None ohne Kanal B.
     i_unit : str
         Einheit des Stroms ("A" oder "V").
         Muss mit dem Header übereinstimmen.
     pulse_id : int
         Eindeutige ID des Pulses (positive Ganzzahl).
+    writer : CsvChunkWriter, optional
+        Schreib-Thread der Datei; None schreibt direkt.
+    timestamp : float, optional
+        Zeitstempel des Pulses für den Index (Standard: Zeitpunkt des Schreibens).
     
     Returns
     -------
@@ -187,7 +811,7 @@ def append_pulse_to_csv(
     >>> append_pulse_to_csv("runs/test_01.csv", t, u, i, "A", pulse_id=1)
     """
     # Delegiere an append_csv_with_id (synonym)
-    append_csv_with_id(csv_path, t, u, i, i_unit, pulse_id)
+    append_csv_with_id(csv_path, t, u, i, i_unit, pulse_id, writer=writer, timestamp=timestamp)
 
 
 def append_csv_with_id(
@@ -196,7 +820,9 @@ def append_csv_with_id(
     u: np.ndarray, 
     i: np.ndarray, 
     i_unit: str, 
-    pulse_id: int
+    pulse_id: int,
+    writer: Optional[CsvChunkWriter] = None,
+    timestamp: Optional[float] = None
 ) -> None:
     """
     Hängt einen Puls mit gegebener pulse_id an die CSV an (ohne erneuten Scan).
@@ -210,16 +836,21 @@ def append_csv_with_id(
     csv_path : str
         Pfad zur CSV-Datei. MUSS bereits existieren.
         Verwende `ensure_csv()` vorher falls nötig.
-    t : np.ndarray
-        Zeitvektor in Sekunden.
-    u : np.ndarray
-        Spannungswerte in Volt.
-    i : np.ndarray
-        Stromwerte (in Einheit i_unit).
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (`TimeAxis` wird erst hier expandiert).
+    u : np.ndarray or None
+        Spannungswerte in Volt (None: Spalte u_V entfällt).
+    i : np.ndarray or None
+        Stromwerte in Einheit i_unit (None: Spalte i_{unit} entfällt).
     i_unit : str
         Einheit des Stroms ("A" oder "V").
     pulse_id : int
         Eindeutige ID des Pulses.
+    writer : CsvChunkWriter, optional
+        Schreib-Thread der Datei: kodierte Blöcke werden nur übergeben.
+        None öffnet die Datei und schreibt direkt.
+    timestamp : float, optional
+        Zeitstempel des Pulses für den Index (Standard: Zeitpunkt des Schreibens).
     
     Returns
     -------
@@ -230,29 +861,60 @@ def append_csv_with_id(
     - Datei wird im Append-Modus geöffnet (an vorhandene Daten anhängen).
     - Format: wissenschaftliche Notation mit 9 Dezimalstellen für Zeit/Spannung/Strom.
     - Integer-Format für pulse_id und sample_idx.
+    - Die Spalten müssen zum Header passen (siehe `ensure_csv(channels=...)`).
+    - Kodierung über `encode_pulse_csv()`; die Bytes sind identisch zur
+      früheren Ausgabe über `np.savetxt`.
+    - Der Puls wird danach in den Index <csv>.idx eingetragen (siehe `csv_index.py`).
     """
     # Länge prüfen
     n = len(t)
-    if len(u) != n or len(i) != n:
+    values = [x for x in (u, i) if x is not None]
+    if not values:
+        raise ValueError("Mindestens einer von u und i muss vorhanden sein")
+    if any(len(x) != n for x in values):
         raise ValueError("Arrays t, u, i müssen gleiche Länge haben")
     
-    # Datenmatrix zusammenbauen: [pulse_id, sample_idx, t, u, i]
-    data = np.column_stack([
-        np.full(n, pulse_id, dtype=np.int64),  # pulse_id (konstant)
-        np.arange(n, dtype=np.int64),          # sample_idx (0, 1, 2, ...)
-        t.astype(np.float64, copy=False),      # Zeit in Sekunden
-        u.astype(np.float64, copy=False),      # Spannung in Volt
-        i.astype(np.float64, copy=False),      # Strom (Einheit: i_unit)
-    ])
-    
-    # In Datei schreiben (append mode)
-    with open(csv_path, "a", encoding="utf-8") as f:
-        np.savetxt(
-            f, 
-            data, 
-            delimiter=",",  # Komma-getrennt
-            fmt=["%d", "%d", "%.9e", "%.9e", "%.9e"]  # Format: int, int, float, float, float
-        )
+    # Spaltenweise kodieren und blockweise anhängen
+    _write_pulse(csv_path, encode_pulse_csv(t, u, i, pulse_id), pulse_id, n, timestamp, writer)
+
+
+def append_raw_pulse_to_csv(
+    csv_path: str,
+    pulse,
+    chunk_samples: int = CSV_CHUNK_ROWS,
+    writer: Optional[CsvChunkWriter] = None
+) -> None:
+    """
+    Hängt einen RawPulse (int16 + Skalierung) an die CSV an.
+    
+    Die Umrechnung in Volt/Ampere erfolgt blockweise und nur einmal je
+    vorkommendem ADC-Wert (siehe `encode_raw_pulse_csv()`), sodass nie der
+    ganze Puls als float64 im Speicher liegt. Das Spaltenformat ist identisch
+    zu `append_csv_with_id()` (nur die Spalten der erfassten Kanäle).
+    
+    Der Index-Eintrag übernimmt `pulse.timestamp`.
+    
+    Parameters
+    ----------
+    csv_path : str
+        Pfad zur CSV-Datei. MUSS bereits existieren (mit Header).
+    pulse : RawPulse
+        Puls mit int16-Rohdaten (siehe `acquisition/pulse_data.py`).
+    chunk_samples : int, optional
+        Samples pro Schreibblock (Standard: CSV_CHUNK_ROWS).
+    writer : CsvChunkWriter, optional
+        Schreib-Thread der Datei; None schreibt direkt.
+    
+    Returns
+    -------
+    None
+    
+    Examples
+    --------
+    >>> append_raw_pulse_to_csv("runs/test_01.csv", pulse)
+    """
+    _write_pulse(csv_path, encode_raw_pulse_csv(pulse, chunk_rows=chunk_samples),
+                 pulse.pulse_id, pulse.n_samples, pulse.timestamp, writer)
 
 
 def write_meta(meta_path: str, meta: Dict) -> None:
@@ -0,0 +1,404 @@
+"""
+Vorab allokierter, per np.memmap beschriebener Lauf-Speicher für int16-Pulse.
+
+Für Dauerläufe mit Tausenden Pulsen à 480k Samples: alle Pulse liegen in
+einer Datei als ein Array (Pulse × Kanäle × Samples) in int16. `append()`
+kopiert int16-Puffer (ctypes-SDK-Puffer oder Arrays) ohne Umrechnung in
+die abgebildete Datei (eine Kopie pro Kanal, kein Neuschreiben); die
+Datei wächst blockweise um `grow_pulses` Pulse. Leser bekommen Ansichten
+ohne Kopie – ein Puls, ein Kanal über alle Pulse oder ein Sample-Fenster
+über alle Pulse – ohne die Datei zu laden.
+
+Der `PicoReader` (binary_format="memmap") schreibt nicht aus den
+SDK-Puffern, sondern im Speicher-Thread aus dem `RawPulse` des Pulses
+(`append_pulse()`): die Rohdaten werden also einmal beim Erfassen und
+einmal in die Datei kopiert. Dafür können die SDK- bzw. Pipeline-Puffer
+sofort wieder verwendet werden, und nur der Speicher-Thread greift auf
+die Datei zu (Wachsen und fsync ohne Sperre).
+
+Dateiaufbau:
+- Kopf (auf 4096 Byte aufgerundet): b"PPLMMAP1", Version, Kanalzahl,
+  Kopfgröße, Samples pro Puls, Kapazität, Anzahl Pulse (wird nach jedem
+  Puls an Ort und Stelle aktualisiert) und JSON (channels, dt, i_unit, meta)
+- Danach `capacity` Datensätze gleicher Größe: 64 Byte Pulsdaten
+  (pulse_id, timestamp, t0, n_valid, scale_u, scale_i, offset_u, offset_i)
+  gefolgt von den ADC-Werten (Kanäle × Samples, int16)
+
+Zugeschnittene Pulse (siehe `processing/pulse_preprocess.py`) belegen nur
+die ersten `n_valid` Samples; der Rest bleibt 0. Nur ein Prozess schreibt;
+Leser sehen neue Pulse nach `refresh()`.
+
+Examples
+--------
+>>> store = MemmapRunStore.create("runs/r1/r1.i16", n_samples=480_000, channels="AB", dt=5e-8)
+>>> store.append(buf_a, buf_b, pulse_id=1, n_values=480_000, scaling=(scale_u, scale_i))
+>>> store.close()
+>>> with MemmapRunStore("runs/r1/r1.i16") as run:
+...     i_all = run.channel("B")          # (Pulse, Samples), ohne Kopie
+...     peak = run.window(90_000, 100_000).min(axis=-1)
+"""
+
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+MEMMAP_MAGIC    = b"PPLMMAP1"
+MEMMAP_VERSION  = 1
+MEMMAP_EXT      = ".i16"
+HEADER_ALIGN    = 4096                  # Datenbeginn auf Seitengrenze
+GROW_PULSES     = 32                    # Wachstum der Datei in Pulsen pro Schritt
+_HEAD           = struct.Struct("<8sHHIQQQI")   # Magic, Version, Kanäle, Kopfgröße, Samples, Kapazität, Anzahl, JSON-Länge
+_CAPACITY_OFFSET = 24
+_COUNT_OFFSET   = 32
+
+INFO_DTYPE = np.dtype([
+    ('pulse_id', '<i8'),
+    ('timestamp', '<f8'),
+    ('t0', '<f8'),
+    ('n_valid', '<i8'),
+    ('scale_u', '<f8'),
+    ('scale_i', '<f8'),
+    ('offset_u', '<f8'),
+    ('offset_i', '<f8'),
+])
+
+
+def _as_int16(buf, n_values: int) -> np.ndarray:
+    """int16-Ansicht eines SDK-Puffers (ctypes) oder Arrays ohne Kopie."""
+    if isinstance(buf, np.ndarray):
+        return buf.reshape(-1)[:n_values]
+    return np.frombuffer(buf, dtype=np.int16, count=n_values)
+
+
+class MemmapRunStore:
+    """
+    Lauf-Speicher (Pulse × Kanäle × Samples, int16) auf Basis von `np.memmap`.
+
+    Parameters
+    ----------
+    path : str
+        Pfad einer mit `create()` angelegten Datei.
+    mode : str, optional
+        "r" (nur lesen, Standard) oder "r+" (weitere Pulse anhängen).
+    grow_pulses : int, optional
+        Wachstum in Pulsen, wenn die Kapazität erreicht ist (Standard: 32).
+    """
+
+    def __init__(self, path: str, mode: str = "r", grow_pulses: int = GROW_PULSES):
+        if mode not in ("r", "r+"):
+            raise ValueError("mode muss 'r' oder 'r+' sein")
+        self.path = path
+        self.mode = mode
+        self.grow_pulses = max(1, int(grow_pulses))
+        self._f = open(path, "rb" if mode == "r" else "r+b", buffering=0)  # Kopf immer direkt lesen/schreiben
+        head = self._f.read(_HEAD.size)
+        if len(head) < _HEAD.size or head[:len(MEMMAP_MAGIC)] != MEMMAP_MAGIC:
+            self._f.close()
+            raise ValueError(f"Kein Memmap-Lauf: {path}")
+        (_, version, n_channels, self._header_bytes, self.n_samples,
+         self._capacity, self._count, json_len) = _HEAD.unpack(head)
+        if version > MEMMAP_VERSION:
+            self._f.close()
+            raise ValueError(f"Memmap-Version {version} nicht unterstützt")
+        header = json.loads(self._f.read(json_len).decode("utf-8"))
+        self.channels = header['channels']
+        self.dt = header['dt']
+        self.i_unit = header['i_unit']
+        self.meta = header.get('meta', {})
+        self.record_dtype = np.dtype([('info', INFO_DTYPE),
+                                      ('adc', '<i2', (n_channels, self.n_samples))])
+        self._mm = None
+        self._map()
+
+    # ---------- Anlegen ----------
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        n_samples: int,
+        channels: str = "AB",
+        dt: float = 1.0,
+        i_unit: str = "A",
+        meta: Optional[Dict] = None,
+        grow_pulses: int = GROW_PULSES
+    ) -> "MemmapRunStore":
+        """
+        Legt eine neue Datei an (überschreibt eine bestehende) und öffnet sie zum Schreiben.
+
+        Parameters
+        ----------
+        path : str
+            Pfad der Datei (z.B. "runs/r1/r1.i16"); Verzeichnis wird erstellt.
+        n_samples : int
+            Samples pro Puls und Kanal (Fensterlänge; kürzere Pulse sind erlaubt).
+        channels : str, optional
+            Gespeicherte Kanäle: "AB", "A" oder "B" (Standard: "AB").
+        dt : float, optional
+            Abtastintervall in Sekunden.
+        i_unit : str, optional
+            Einheit des Stroms ("A" oder "V").
+        meta : dict, optional
+            Metadaten des Laufs (JSON-tauglich), im Kopf gespeichert.
+        grow_pulses : int, optional
+            Anfangskapazität und Wachstum in Pulsen (Standard: 32).
+
+        Returns
+        -------
+        MemmapRunStore
+            Geöffnet im Modus "r+".
+        """
+        channels = str(channels).upper()
+        if channels not in ("AB", "A", "B"):
+            raise ValueError("channels muss 'AB', 'A' oder 'B' sein")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = json.dumps({
+            'channels': channels,
+            'dt': float(dt),
+            'i_unit': i_unit,
+            'created': datetime.now().isoformat(),
+            'meta': meta or {},
+        }, default=str).encode("utf-8")
+        header_bytes = -(-(_HEAD.size + len(header)) // HEADER_ALIGN) * HEADER_ALIGN
+        with open(path, "wb") as f:
+            f.write(_HEAD.pack(MEMMAP_MAGIC, MEMMAP_VERSION, len(channels), header_bytes,
+                               int(n_samples), 0, 0, len(header)))
+            f.write(header)
+            f.truncate(header_bytes)
+        store = cls(path, mode="r+", grow_pulses=grow_pulses)
+        store._grow()
+        return store
+
+    # ---------- Abbildung ----------
+    def _map(self):
+        """Bildet die Datensätze [0, capacity) ab (interne Funktion)."""
+        self._mm = None
+        if self._capacity > 0:
+            self._mm = np.memmap(self.path, dtype=self.record_dtype, mode=self.mode,
+                                 offset=self._header_bytes, shape=(self._capacity,))
+
+    def _grow(self):
+        """Vergrößert die Datei um grow_pulses Datensätze und bildet neu ab (interne Funktion)."""
+        if self._mm is not None:
+            self._mm.flush()
+        self._mm = None  # Abbildung lösen, bevor die Datei wächst (Windows)
+        self._capacity += self.grow_pulses
+        self._f.truncate(self._header_bytes + self._capacity * self.record_dtype.itemsize)
+        self._write_header_field(_CAPACITY_OFFSET, self._capacity)
+        self._map()
+
+    def _write_header_field(self, offset: int, value: int):
+        """Schreibt einen uint64-Wert des Kopfes an Ort und Stelle (interne Funktion)."""
+        self._f.seek(offset)
+        self._f.write(struct.pack("<Q", int(value)))
+        self._f.flush()
+
+    def refresh(self) -> int:
+        """
+        Liest Anzahl und Kapazität neu (Leser neben einem laufenden Schreiber).
+
+        Returns
+        -------
+        int
+            Anzahl gespeicherter Pulse.
+        """
+        self._f.seek(_CAPACITY_OFFSET)
+        capacity, count = struct.unpack("<QQ", self._f.read(16))
+        if capacity != self._capacity:
+            self._capacity = capacity
+            self._map()
+        self._count = count
+        return count
+
+    # ---------- Schreiben ----------
+    def append(
+        self,
+        buf_a,
+        buf_b,
+        pulse_id: int,
+        n_values: int = None,
+        timestamp: float = None,
+        t0: float = 0.0,
+        scaling: Tuple[float, float] = (1.0, 1.0),
+        offsets: Tuple[float, float] = (0.0, 0.0)
+    ) -> int:
+        """
+        Kopiert einen Puls aus int16-Puffern (z.B. SDK-Puffern) in die Datei.
+
+        Parameters
+        ----------
+        buf_a, buf_b : ctypes-Array, np.ndarray or None
+            ADC-Werte (int16) von Kanal A bzw. B; None für einen nicht
+            gespeicherten Kanal.
+        pulse_id : int
+            ID des Pulses.
+        n_values : int, optional
+            Gültige Samples (Standard: Länge des Puffers bzw. n_samples).
+        timestamp : float, optional
+            Host-Zeit des Pulses (Standard: jetzt).
+        t0 : float, optional
+            Zeit des ersten Samples in Sekunden (z.B. Versatz nach Zuschnitt).
+        scaling : tuple of float, optional
+            (scale_u, scale_i) in V bzw. A pro ADC-Wert.
+        offsets : tuple of float, optional
+            (offset_u, offset_i).
+
+        Returns
+        -------
+        int
+            Position des Pulses im Speicher.
+        """
+        if self.mode != "r+":
+            raise IOError("Speicher ist nur zum Lesen geöffnet")
+        if n_values is None:
+            src = buf_a if buf_a is not None else buf_b
+            n_values = len(src) if src is not None else self.n_samples
+        if n_values > self.n_samples:
+            raise ValueError(f"Puls mit {n_values} Samples länger als Fenster ({self.n_samples})")
+        if self._count >= self._capacity:
+            self._grow()
+
+        k = self._count
+        adc = self._mm['adc']
+        for ci, channel in enumerate(self.channels):
+            buf = buf_a if channel == "A" else buf_b
+            if buf is None:
+                raise ValueError(f"Kanal {channel} fehlt")
+            adc[k, ci, :n_values] = _as_int16(buf, n_values)
+        self._mm['info'][k] = (pulse_id, time.time() if timestamp is None else timestamp, t0, n_values,
+                          scaling[0], scaling[1], offsets[0], offsets[1])
+
+        # Anzahl erst nach den Daten erhöhen: ein Abbruch hinterlässt keinen halben Puls
+        self._count = k + 1
+        self._write_header_field(_COUNT_OFFSET, self._count)
+        return k
+
+    def append_pulse(self, pulse) -> int:
+        """
+        Speichert einen RawPulse (int16 + Skalierung).
+
+        Parameters
+        ----------
+        pulse : RawPulse
+            Puls mit den Kanälen dieses Speichers und dem gleichen `dt`.
+
+        Returns
+        -------
+        int
+            Position des Pulses im Speicher.
+        """
+        return self.append(pulse.adc_u, pulse.adc_i, pulse.pulse_id, n_values=pulse.n_samples,
+                           timestamp=pulse.timestamp, t0=pulse.t0,
+                           scaling=(pulse.scale_u, pulse.scale_i),
+                           offsets=(pulse.offset_u, pulse.offset_i))
+
+    def flush(self):
+        """Schreibt geänderte Seiten auf die Platte."""
+        if self._mm is not None:
+            self._mm.flush()
+
+    def close(self, shrink: bool = True):
+        """
+        Schließt den Speicher.
+
+        Parameters
+        ----------
+        shrink : bool, optional
+            Beim Schreiber ungenutzte Kapazität abschneiden (Standard: True).
+        """
+        if self._f.closed:
+            return
+        self.flush()
+        self._mm = None
+        if self.mode == "r+" and shrink and self._capacity > self._count:
+            self._capacity = self._count
+            self._f.truncate(self._header_bytes + self._capacity * self.record_dtype.itemsize)
+            self._write_header_field(_CAPACITY_OFFSET, self._capacity)
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- Lesen (Ansichten ohne Kopie) ----------
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def data(self) -> np.ndarray:
+        """Alle Pulse als Ansicht (Pulse × Kanäle × Samples, int16)."""
+        if self._mm is None:
+            return np.zeros((0, len(self.channels), self.n_samples), dtype=np.int16)
+        return self._mm['adc'][:self._count]
+
+    @property
+    def info(self) -> np.ndarray:
+        """Pulsdaten (strukturiert, siehe INFO_DTYPE) aller Pulse als Ansicht."""
+        if self._mm is None:
+            return np.zeros(0, dtype=INFO_DTYPE)
+        return self._mm['info'][:self._count]
+
+    @property
+    def pulse_ids(self) -> np.ndarray:
+        """Pulse-IDs in Speicherreihenfolge."""
+        return self.info['pulse_id']
+
+    def index_of(self, pulse_id: int) -> int:
+        """
+        Position eines Pulses (letzter Eintrag bei doppelter ID).
+
+        Raises
+        ------
+        KeyError
+            Wenn die pulse_id fehlt.
+        """
+        hits = np.flatnonzero(self.pulse_ids == pulse_id)
+        if hits.size == 0:
+            raise KeyError(f"Pulse-ID {pulse_id} nicht im Speicher")
+        return int(hits[-1])
+
+    def _channel_index(self, channel: str) -> int:
+        """Index eines Kanals im Array (interne Funktion)."""
+        channel = channel.upper()
+        if channel not in self.channels:
+            raise KeyError(f"Kanal {channel} nicht gespeichert (Kanäle: {self.channels})")
+        return self.channels.index(channel)
+
+    def pulse(self, k: int) -> np.ndarray:
+        """Puls an Position k als Ansicht (Kanäle × gültige Samples)."""
+        return self.data[k, :, :int(self.info['n_valid'][k])]
+
+    def channel(self, channel: str) -> np.ndarray:
+        """Ein Kanal ("A" oder "B") aller Pulse als Ansicht (Pulse × Samples)."""
+        return self.data[:, self._channel_index(channel), :]
+
+    def window(self, start: int, stop: int) -> np.ndarray:
+        """Sample-Fenster [start, stop) aller Pulse als Ansicht (Pulse × Kanäle × Samples)."""
+        return self.data[:, :, start:stop]
+
+    def raw_pulse(self, k: int):
+        """
+        Puls an Position k als RawPulse; die ADC-Arrays sind Ansichten in die Datei.
+
+        Returns
+        -------
+        RawPulse
+            Umrechnung wie gewohnt per `.u()` / `.i()`.
+        """
+        from pico_pulse_lab.acquisition.pulse_data import RawPulse
+        info = self.info[k]
+        view = self.pulse(k)
+        adc = {channel: view[ci] for ci, channel in enumerate(self.channels)}
+        return RawPulse(int(info['pulse_id']), adc.get("A"), adc.get("B"),
+                        scale_u=float(info['scale_u']), scale_i=float(info['scale_i']), dt=self.dt,
+                        offset_u=float(info['offset_u']), offset_i=float(info['offset_i']),
+                        t0=float(info['t0']), i_unit=self.i_unit, timestamp=float(info['timestamp']))
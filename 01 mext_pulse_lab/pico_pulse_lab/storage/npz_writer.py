@@ -5,16 +5,222 @@ Dieses Modul stellt Funktionen zum schnellen, kompakten Speichern und Laden
 von Puls-Messdaten im NumPy .npz Format bereit. Das Format ist deutlich
 schneller als CSV und behält die volle numerische Präzision.
 
-Struktur:
-- {'pulses': {pulse_id: {'t': ..., 'u': ..., 'i': ...}}, 'meta': {...}}
+Struktur (flach, ohne Pickle – jedes Array ist ein eigenes Zip-Member):
+- 'meta': JSON-String (0-d Unicode-Array) mit den Metadaten
+- 'pulse_{id}/u', 'pulse_{id}/i': float64 in Volt/Ampere
+- 'pulse_{id}/t' (Zeitvektor) oder 'pulse_{id}/time_axis' ([t0, dt])
+- Rohdaten-Pulse: 'pulse_{id}/adc_u', 'pulse_{id}/adc_i' (int16) plus
+  'pulse_{id}/scaling' (JSON-String, siehe `RawPulse.scaling_meta()`)
+- Bei Erfassung nur eines Kanals fehlt das Member des anderen ('u'/'adc_u'
+  bzw. 'i'/'adc_i'); die Ladefunktionen geben dafür None zurück.
+
+Laden liest nur die benötigten Member: Pulse-IDs kommen aus dem
+Zip-Verzeichnis, die Metadaten aus 'meta', ein Puls aus seinen eigenen
+Membern. In unkomprimierten Dateien (`save_pulse_npz(..., compressed=False)`)
+lassen sich die Arrays mit `mmap_mode='r'` direkt aus der Datei abbilden.
+Neue Pulse werden als weitere Member an das Zip-Archiv angehängt, ohne die
+bestehenden neu zu schreiben (nur bei bereits vorhandener pulse_id wird die
+Datei neu geschrieben).
+
+Ältere Dateien mit verschachteltem Dictionary ('pulses' als Objekt-Array,
+nur mit `allow_pickle=True` lesbar) werden weiterhin gelesen und beim
+ersten Anhängen in die flache Struktur überführt.
 """
 
 import os
 import json
+import re
+import struct
+import zipfile
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple, Union
 from datetime import datetime
 
+from pico_pulse_lab.acquisition.pulse_data import TimeAxis
+
+
+NPZ_SCHEMA      = "flat-1"                      # meta['npz_schema'] der flachen Struktur
+_META_KEY       = "meta"
+_LEGACY_KEY     = "pulses"                      # Objekt-Array der alten, verschachtelten Struktur
+_MEMBER_RE      = re.compile(r"^pulse_(-?\d+)/(\w+)\.npy$")
+_LOCAL_HEADER   = struct.Struct("<4s22xHH")     # Zip Local File Header: Signatur ... Namens-, Extra-Länge
+
+
+def _member(pulse_id: int, field: str) -> str:
+    """Name des Zip-Members eines Puls-Feldes (ohne .npy)."""
+    return f"pulse_{int(pulse_id)}/{field}"
+
+
+def _json_array(obj) -> np.ndarray:
+    """JSON als 0-d Unicode-Array (ohne Pickle speicherbar)."""
+    return np.array(json.dumps(obj, default=lambda v: v.item() if isinstance(v, np.generic) else str(v)))
+
+
+def _pulse_entry(t, u: Optional[np.ndarray], i: Optional[np.ndarray]) -> Dict:
+    """
+    Baut einen float-Puls-Eintrag; eine `TimeAxis` wird nur als [t0, dt] gespeichert.
+
+    Ein fehlender Kanal (None) bekommt keinen Schlüssel.
+    """
+    entry = {key: np.asarray(x, dtype=np.float64) for key, x in (('u', u), ('i', i)) if x is not None}
+    if not entry:
+        raise ValueError("Mindestens einer von u und i muss vorhanden sein")
+    if isinstance(t, TimeAxis):
+        if len(t) != _entry_size(entry):
+            raise ValueError("Zeitachse und Daten müssen gleiche Länge haben")
+        entry['time_axis'] = np.array([t.t0, t.dt], dtype=np.float64)
+    else:
+        entry['t'] = np.asarray(t, dtype=np.float64)
+    return entry
+
+
+def _raw_entry(pulse) -> Dict:
+    """Baut einen Rohdaten-Eintrag (int16 der erfassten Kanäle + Skalierung)."""
+    entry = {'scaling': pulse.scaling_meta()}
+    for key, adc in (('adc_u', pulse.adc_u), ('adc_i', pulse.adc_i)):
+        if adc is not None:
+            entry[key] = np.asarray(adc, dtype=np.int16)
+    return entry
+
+
+def _entry_members(pulse_id: int, entry: Dict) -> Dict[str, np.ndarray]:
+    """Zip-Member eines Eintrags; die Skalierung wird als JSON gespeichert."""
+    return {_member(pulse_id, key): (_json_array(value) if key == 'scaling' else value)
+            for key, value in entry.items()}
+
+
+def _entry_size(entry: Dict) -> int:
+    """Anzahl Samples eines float-Eintrags (aus dem vorhandenen Kanal)."""
+    return (entry['u'] if 'u' in entry else entry['i']).size
+
+
+def _entry_time(entry: Dict, time_axis: bool):
+    """Zeitvektor eines float-Eintrags (Array oder `TimeAxis`)."""
+    if 'time_axis' in entry:
+        t0, dt = entry['time_axis']
+        axis = TimeAxis(t0, dt, _entry_size(entry))
+        return axis if time_axis else axis.to_array()
+    return TimeAxis.from_array(entry['t']) if time_axis else entry['t']
+
+
+# ---------- Zip-Zugriff ----------
+def _write_members(path: str, members: Dict[str, np.ndarray], mode: str, compressed: bool) -> None:
+    """Schreibt Arrays als .npy-Member (wie `np.savez`, aber auch anhängend mit mode='a')."""
+    compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, mode=mode, compression=compression, allowZip64=True) as zf:
+        for name, arr in members.items():
+            with zf.open(name + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(arr), allow_pickle=False)
+
+
+def _read_member(zf: zipfile.ZipFile, path: str, name: str, mmap_mode: Optional[str] = None) -> np.ndarray:
+    """
+    Liest ein Member; unkomprimiert und mit mmap_mode als `np.memmap` direkt aus der Datei.
+    """
+    info = zf.getinfo(name + ".npy")
+    if mmap_mode is not None and info.compress_type == zipfile.ZIP_STORED:
+        with open(path, "rb") as f:
+            f.seek(info.header_offset)
+            _, name_len, extra_len = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            f.seek(info.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                shape = None
+            offset = f.tell()
+        if shape is not None and not dtype.hasobject and len(shape) > 0:
+            return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                             order='F' if fortran else 'C')
+    with zf.open(info) as f:
+        return np.lib.format.read_array(f, allow_pickle=False)
+
+
+def _members_by_pulse(names: Iterable[str]) -> Dict[int, list]:
+    """Pulse-ID -> Feldnamen aus dem Zip-Verzeichnis."""
+    pulses = {}
+    for name in names:
+        match = _MEMBER_RE.match(name)
+        if match:
+            pulses.setdefault(int(match.group(1)), []).append(match.group(2))
+    return pulses
+
+
+def _is_legacy(zf: zipfile.ZipFile) -> bool:
+    """True für die alte Struktur mit gepickeltem 'pulses'-Dictionary."""
+    return _LEGACY_KEY + ".npy" in zf.namelist()
+
+
+def _legacy_load(path: str) -> Tuple[Dict, Dict]:
+    """Lädt (pulses, meta) einer alten, verschachtelten Datei (benötigt Pickle)."""
+    loaded = np.load(path, allow_pickle=True)
+    pulses = loaded[_LEGACY_KEY].item() if _LEGACY_KEY in loaded else {}
+    meta = dict(loaded[_META_KEY].item()) if _META_KEY in loaded else {}
+    return pulses, meta
+
+
+def _load_entry(path: str, pulse_id: int, mmap_mode: Optional[str] = None) -> Dict:
+    """Liest nur die Member eines Pulses als Eintrag (bzw. aus einer alten Datei)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {path}")
+    with zipfile.ZipFile(path) as zf:
+        if _is_legacy(zf):
+            pulses, _ = _legacy_load(path)
+            if pulse_id not in pulses:
+                raise KeyError(f"Pulse-ID {pulse_id} nicht in Datei gefunden")
+            return pulses[pulse_id]
+        fields = _members_by_pulse(zf.namelist()).get(int(pulse_id))
+        if not fields:
+            raise KeyError(f"Pulse-ID {pulse_id} nicht in Datei gefunden")
+        entry = {field: _read_member(zf, path, _member(pulse_id, field), mmap_mode) for field in fields}
+    if 'scaling' in entry:
+        entry['scaling'] = json.loads(str(entry['scaling']))
+    return entry
+
+
+def _rewrite(path: str, members: Dict[str, np.ndarray], drop_pulse_id: int = None) -> None:
+    """
+    Schreibt die Datei neu (flache Struktur): bestehende Member ohne drop_pulse_id plus neue.
+
+    Alte, verschachtelte Dateien werden dabei überführt.
+    """
+    compressed = True
+    out = {}
+    with zipfile.ZipFile(path) as zf:
+        if _is_legacy(zf):
+            pulses, meta = _legacy_load(path)
+            meta['npz_schema'] = NPZ_SCHEMA
+            out[_META_KEY] = _json_array(meta)
+            for pid, entry in pulses.items():
+                out.update(_entry_members(pid, entry))
+        else:
+            for info in zf.infolist():
+                compressed = info.compress_type != zipfile.ZIP_STORED
+                name = info.filename[:-len(".npy")]
+                match = _MEMBER_RE.match(info.filename)
+                if match and drop_pulse_id is not None and int(match.group(1)) == int(drop_pulse_id):
+                    continue
+                out[name] = _read_member(zf, path, name)
+    out.update(members)
+    tmp_path = path + ".tmp"
+    _write_members(tmp_path, out, "w", compressed)
+    os.replace(tmp_path, path)
+
+
+def _append_entry(path: str, pulse_id: int, entry: Dict) -> None:
+    """Hängt die Member eines Eintrags an; vorhandene ID bzw. alte Datei: neu schreiben."""
+    members = _entry_members(pulse_id, entry)
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        rewrite = _is_legacy(zf) or int(pulse_id) in _members_by_pulse(names)
+        compressed = any(info.compress_type != zipfile.ZIP_STORED for info in zf.infolist())
+    if rewrite:
+        _rewrite(path, members, drop_pulse_id=pulse_id)
+    else:
+        _write_members(path, members, "a", compressed)
+
 
 def save_pulse_npz(
     path: str,
@@ -22,37 +228,43 @@ def save_pulse_npz(
     t: np.ndarray,
     u: np.ndarray,
     i: np.ndarray,
-    meta: Optional[Dict] = None
+    meta: Optional[Dict] = None,
+    compressed: bool = True
 ) -> None:
     """
     Speichert einen einzelnen Puls in eine neue .npz Datei.
-    
+
     Erstellt eine neue Datei oder überschreibt eine existierende.
     Für das Anhängen weiterer Pulse verwende `append_pulse_npz()`.
-    
+
     Parameters
     ----------
     path : str
         Vollständiger Pfad zur .npz Datei (z.B. "runs/test/run_01.npz").
         Verzeichnis muss nicht existieren (wird erstellt).
     pulse_id : int
-        Eindeutige ID des Pulses (positive Ganzzahl).
-        Wird als Schlüssel im 'pulses' Dictionary verwendet.
-    t : np.ndarray
-        Zeitvektor in Sekunden (1D-Array).
+        Eindeutige ID des Pulses (Ganzzahl).
+        Wird im Member-Namen 'pulse_{id}/...' verwendet.
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (1D-Array). Eine `TimeAxis` wird kompakt
+        als [t0, dt] gespeichert.
     u : np.ndarray
         Spannungswerte in Volt (1D-Array, gleiche Länge wie t).
     i : np.ndarray
         Stromwerte in Ampere (1D-Array, gleiche Länge wie t).
     meta : dict, optional
         Dictionary mit Metadaten (z.B. Abtastfrequenz, Bereiche, etc.).
-        Wird unter dem Schlüssel 'meta' gespeichert.
-        Standard: {'created': timestamp, 'pulse_count': 1}
-    
+        Wird als JSON im Member 'meta' gespeichert und muss daher
+        JSON-tauglich sein. 'created' und 'npz_schema' werden ergänzt.
+    compressed : bool, optional
+        Member komprimieren (Standard: True). Unkomprimierte Dateien sind
+        größer, lassen sich aber per `mmap_mode='r'` ohne Kopie laden.
+        Angehängte Pulse übernehmen die Einstellung der Datei.
+
     Returns
     -------
     None
-    
+
     Examples
     --------
     >>> import numpy as np
@@ -64,87 +276,123 @@ def save_pulse_npz(
     """
     # Verzeichnis erstellen falls nötig
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    
-    # Datenstruktur aufbauen
-    data = {
-        'pulses': {
-            pulse_id: {
-                't': np.asarray(t, dtype=np.float64),
-                'u': np.asarray(u, dtype=np.float64),
-                'i': np.asarray(i, dtype=np.float64)
-            }
-        }
-    }
-    
-    # Metadaten hinzufügen
-    if meta is None:
-        meta = {}
-    
-    # Standard-Metadaten ergänzen
-    meta_out = dict(meta)
+
+    # Metadaten ergänzen
+    meta_out = dict(meta or {})
     meta_out['created'] = datetime.now().isoformat()
-    meta_out['pulse_count'] = 1
-    data['meta'] = meta_out
-    
-    # Speichern
-    np.savez_compressed(path, **data)
+    meta_out['npz_schema'] = NPZ_SCHEMA
+
+    # Speichern (überschreibt alte Datei)
+    members = {_META_KEY: _json_array(meta_out)}
+    members.update(_entry_members(pulse_id, _pulse_entry(t, u, i)))
+    _write_members(path, members, "w", compressed)
 
 
-def load_pulse_npz(path: str, pulse_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+def load_pulse_npz(
+    path: str,
+    pulse_id: int,
+    time_axis: bool = False,
+    mmap_mode: Optional[str] = None
+) -> Tuple[Union[np.ndarray, TimeAxis], np.ndarray, np.ndarray]:
     """
     Lädt einen einzelnen Puls aus einer .npz Datei.
-    
+
+    Es werden nur die Member dieses Pulses gelesen.
+
     Parameters
     ----------
     path : str
         Pfad zur .npz Datei.
     pulse_id : int
         ID des zu ladenden Pulses.
-    
+    time_axis : bool, optional
+        Zeit als `TimeAxis` statt als Array zurückgeben (Standard: False).
+    mmap_mode : str, optional
+        z.B. 'r': Arrays unkomprimierter Dateien als `np.memmap` abbilden
+        statt zu lesen (Standard: None). Bei komprimierten Membern wird
+        normal gelesen; Rohdaten werden bei der Umrechnung ohnehin kopiert.
+
     Returns
     -------
-    t : np.ndarray
+    t : np.ndarray or TimeAxis
         Zeitvektor in Sekunden.
-    u : np.ndarray
-        Spannungswerte in Volt.
-    i : np.ndarray
-        Stromwerte in Ampere.
-    
+    u : np.ndarray or None
+        Spannungswerte in Volt (None, wenn Kanal A nicht erfasst wurde).
+    i : np.ndarray or None
+        Stromwerte in Ampere (None, wenn Kanal B nicht erfasst wurde).
+
     Raises
     ------
     FileNotFoundError
         Wenn die Datei nicht existiert.
     KeyError
         Wenn die pulse_id nicht in der Datei vorhanden ist.
-    
+
     Examples
     --------
     >>> t, u, i = load_pulse_npz('runs/test_01.npz', pulse_id=1)
     >>> print(f"Geladen: {len(t)} Samples")
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Datei nicht gefunden: {path}")
-    
-    # Laden
-    loaded = np.load(path, allow_pickle=True)
-    
-    # Struktur prüfen
-    if 'pulses' not in loaded:
-        raise ValueError("Ungültige .npz Struktur: 'pulses' fehlt")
-    
-    pulses = loaded['pulses'].item() if isinstance(loaded['pulses'], np.ndarray) else loaded['pulses']
-    
-    if pulse_id not in pulses:
-        raise KeyError(f"Pulse-ID {pulse_id} nicht in Datei gefunden")
-    
-    pulse_data = pulses[pulse_id]
-    t = pulse_data['t']
-    u = pulse_data['u']
-    i = pulse_data['i']
-    
+    pulse_data = _load_entry(path, pulse_id, mmap_mode)
+
+    # Rohdaten-Eintrag (int16 + Skalierung): erst hier in Volt/Ampere umrechnen
+    if 'scaling' in pulse_data:
+        raw = _raw_entry_to_pulse(pulse_id, pulse_data)
+        return (raw.time_axis() if time_axis else raw.t()), raw.u(), raw.i()
+
+    t = _entry_time(pulse_data, time_axis)
+    u = pulse_data.get('u')
+    i = pulse_data.get('i')
+
     return t, u, i
 
 
+def _raw_entry_to_pulse(pulse_id: int, entry: Dict):
+    """Baut aus einem gespeicherten Rohdaten-Eintrag wieder einen RawPulse."""
+    from pico_pulse_lab.acquisition.pulse_data import RawPulse
+    return RawPulse(pulse_id, entry.get('adc_u'), entry.get('adc_i'), **entry['scaling'])
+
+
+def load_raw_pulse_npz(path: str, pulse_id: int, mmap_mode: Optional[str] = None):
+    """
+    Lädt einen Puls als RawPulse (int16 + Skalierung) ohne float-Umrechnung.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur .npz Datei.
+    pulse_id : int
+        ID des zu ladenden Pulses.
+    mmap_mode : str, optional
+        z.B. 'r': ADC-Arrays unkomprimierter Dateien als `np.memmap`
+        abbilden (Standard: None = lesen).
+
+    Returns
+    -------
+    RawPulse
+        Puls mit int16-Rohdaten; Umrechnung per `.u()` / `.i()` bei Bedarf.
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+    KeyError
+        Wenn die pulse_id fehlt.
+    ValueError
+        Wenn der Puls nicht als Rohdaten gespeichert wurde.
+
+    Examples
+    --------
+    >>> pulse = load_raw_pulse_npz('runs/test_01.npz', pulse_id=3)
+    >>> u = pulse.u(np.float32)
+    """
+    entry = _load_entry(path, pulse_id, mmap_mode)
+    if 'scaling' not in entry:
+        raise ValueError(f"Pulse-ID {pulse_id} wurde nicht als Rohdaten gespeichert")
+
+    return _raw_entry_to_pulse(pulse_id, entry)
+
+
 def append_pulse_npz(
     path: str,
     pulse_id: int,
@@ -154,10 +402,12 @@ def append_pulse_npz(
 ) -> None:
     """
     Hängt einen neuen Puls an eine bestehende .npz Datei an.
-    
-    Lädt die bestehende Datei, fügt den neuen Puls hinzu und speichert
-    alles wieder. Die Metadaten werden aktualisiert (pulse_count, updated).
-    
+
+    Die Member des Pulses werden an das Zip-Archiv angehängt; bestehende
+    Pulse werden nicht neu geschrieben. Nur wenn die pulse_id schon
+    vorhanden ist (oder die Datei noch die alte, verschachtelte Struktur
+    hat), wird die Datei einmal komplett neu geschrieben.
+
     Parameters
     ----------
     path : str
@@ -166,22 +416,22 @@ def append_pulse_npz(
     pulse_id : int
         Eindeutige ID des neuen Pulses.
         Falls bereits vorhanden, wird der alte Puls überschrieben.
-    t : np.ndarray
-        Zeitvektor in Sekunden.
-    u : np.ndarray
-        Spannungswerte in Volt.
-    i : np.ndarray
-        Stromwerte in Ampere.
-    
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (`TimeAxis` wird als [t0, dt] gespeichert).
+    u : np.ndarray or None
+        Spannungswerte in Volt (None ohne Kanal A).
+    i : np.ndarray or None
+        Stromwerte in Ampere (None ohne Kanal B).
+
     Returns
     -------
     None
-    
+
     Raises
     ------
     FileNotFoundError
         Wenn die Datei nicht existiert.
-    
+
     Examples
     --------
     >>> # Ersten Puls speichern
@@ -192,57 +442,60 @@ def append_pulse_npz(
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Datei nicht gefunden: {path}. Verwende save_pulse_npz() für erste Pulse.")
-    
-    # Bestehende Datei laden
-    loaded = np.load(path, allow_pickle=True)
-    
-    # Struktur extrahieren
-    if 'pulses' in loaded:
-        # NumPy-Array zu dict konvertieren falls nötig
-        pulses = loaded['pulses'].item() if isinstance(loaded['pulses'], np.ndarray) else loaded['pulses']
-    else:
-        pulses = {}
-    
-    if 'meta' in loaded:
-        meta = loaded['meta'].item() if isinstance(loaded['meta'], np.ndarray) else loaded['meta']
-    else:
-        meta = {}
-    
-    # Neuen Puls hinzufügen
-    pulses[pulse_id] = {
-        't': np.asarray(t, dtype=np.float64),
-        'u': np.asarray(u, dtype=np.float64),
-        'i': np.asarray(i, dtype=np.float64)
-    }
-    
-    # Metadaten aktualisieren
-    meta['updated'] = datetime.now().isoformat()
-    meta['pulse_count'] = len(pulses)
-    
-    # Neue Struktur aufbauen
-    data = {
-        'pulses': pulses,
-        'meta': meta
-    }
-    
-    # Speichern (überschreibt alte Datei)
-    np.savez_compressed(path, **data)
+
+    _append_entry(path, pulse_id, _pulse_entry(t, u, i))
+
+
+def append_raw_pulse_npz(path: str, pulse) -> None:
+    """
+    Hängt einen RawPulse als int16-Rohdaten an eine bestehende .npz Datei an.
+
+    Es werden nur die ADC-Werte (2 Byte/Sample) plus Skalierungs-Metadaten
+    gespeichert; float64-Arrays werden dabei nie erzeugt. `load_pulse_npz()`
+    rechnet solche Einträge beim Laden transparent in Volt/Ampere um.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur .npz Datei. Muss bereits existieren.
+    pulse : RawPulse
+        Puls mit int16-Rohdaten (siehe `acquisition/pulse_data.py`).
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+
+    Examples
+    --------
+    >>> append_raw_pulse_npz('runs/test_01.npz', pulse)
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {path}. Verwende save_pulse_npz() für erste Pulse.")
+
+    _append_entry(path, pulse.pulse_id, _raw_entry(pulse))
 
 
 def get_all_pulse_ids(path: str) -> list:
     """
     Gibt eine Liste aller gespeicherten Pulse-IDs aus einer .npz Datei zurück.
-    
+
+    Liest nur das Zip-Verzeichnis, keine Daten.
+
     Parameters
     ----------
     path : str
         Pfad zur .npz Datei.
-    
+
     Returns
     -------
     list of int
         Sortierte Liste aller Pulse-IDs in der Datei.
-    
+
     Examples
     --------
     >>> ids = get_all_pulse_ids('runs/test_01.npz')
@@ -251,32 +504,28 @@ def get_all_pulse_ids(path: str) -> list:
     """
     if not os.path.exists(path):
         return []
-    
-    loaded = np.load(path, allow_pickle=True)
-    
-    if 'pulses' not in loaded:
-        return []
-    
-    pulses = loaded['pulses'].item() if isinstance(loaded['pulses'], np.ndarray) else loaded['pulses']
-    ids = sorted(list(pulses.keys()))
-    
-    return ids
+
+    with zipfile.ZipFile(path) as zf:
+        if _is_legacy(zf):
+            pulses, _ = _legacy_load(path)
+            return sorted(pulses)
+        return sorted(_members_by_pulse(zf.namelist()))
 
 
 def load_meta_npz(path: str) -> Dict:
     """
     Lädt nur die Metadaten aus einer .npz Datei.
-    
+
     Parameters
     ----------
     path : str
         Pfad zur .npz Datei.
-    
+
     Returns
     -------
     dict
-        Dictionary mit Metadaten.
-    
+        Dictionary mit Metadaten, plus 'pulse_count' (Anzahl Pulse).
+
     Examples
     --------
     >>> meta = load_meta_npz('runs/test_01.npz')
@@ -284,12 +533,14 @@ def load_meta_npz(path: str) -> Dict:
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Datei nicht gefunden: {path}")
-    
-    loaded = np.load(path, allow_pickle=True)
-    
-    if 'meta' in loaded:
-        meta = loaded['meta'].item() if isinstance(loaded['meta'], np.ndarray) else loaded['meta']
-        return dict(meta)
-    else:
-        return {}
 
+    with zipfile.ZipFile(path) as zf:
+        if _is_legacy(zf):
+            pulses, meta = _legacy_load(path)
+            meta['pulse_count'] = len(pulses)
+            return meta
+        meta = {}
+        if _META_KEY + ".npy" in zf.namelist():
+            meta = json.loads(str(_read_member(zf, path, _META_KEY)))
+        meta['pulse_count'] = len(_members_by_pulse(zf.namelist()))
+    return meta
@@ -0,0 +1,432 @@
+"""
+Kompakter Puls-Codec für int16-Rohdaten (Delta + Byte-Shuffle + zlib/lzma/bz2).
+
+`np.savez_compressed` komprimiert float64-Kurven: 8 Byte pro Sample, deren
+Mantissen-Bits kaum wiederholt vorkommen – Deflate erreicht damit wenig und
+ist langsam. Dieser Codec speichert die ADC-Rohwerte (int16) eines RawPulse:
+
+1. Delta: je Kanal x[k] - x[k-1] (int16, Überlauf läuft modulo 2^16 um und
+   wird beim Aufsummieren exakt rückgängig gemacht). Glatte Kurven werden
+   zu kleinen Werten um 0.
+2. Byte-Shuffle (optional): erst alle Low-Bytes, dann alle High-Bytes. Die
+   High-Bytes kleiner Deltas sind fast nur 0x00/0xFF; beim 8-Bit-3000A
+   (Vielfache von 256) sind sogar alle Low-Bytes 0.
+3. Kompression mit einem Codec der Standardbibliothek (CODECS) und
+   einstellbarer Stufe.
+
+Jeder Puls ist ein eigenständiger Block (Chunk) mit festem Kopf (_CHUNK_HEADER):
+Magic b"PPLC", Version, Codec, Stufe, Flags (Delta, Shuffle, Kanäle),
+pulse_id, Samples, Länge der Nutzdaten, CRC32 der Rohwerte, Skalierung
+(scale_u, scale_i, offset_u, offset_i, dt, t0), Zeitstempel (NaN =
+unbekannt) und i_unit. Blöcke können hintereinander in eine Datei gehängt
+werden (`append_pulse_chunks()`, `iter_pulse_chunks()`); ein
+unvollständiger letzter Block wird beim Lesen ignoriert.
+
+Der Vergleich mit dem bisherigen `savez_compressed`-Pfad (Verhältnis,
+Kodier-/Dekodierzeit) steht in `benchmark_codecs()`, auch als
+`python -m pico_pulse_lab.storage.pulse_codec [run.pstore|run.npz]`.
+"""
+
+import bz2
+import io
+import lzma
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+
+
+CODEC_MAGIC     = b"PPLC"
+CODEC_VERSION   = 1
+CODEC_EXT       = ".pzc"
+CODECS          = ("none", "zlib", "lzma", "bz2")
+DEFAULT_CODEC   = "zlib"
+DEFAULT_LEVELS  = {"none": 0, "zlib": 6, "lzma": 6, "bz2": 9}
+_LEVEL_RANGES   = {"none": (0, 0), "zlib": (0, 9), "lzma": (0, 9), "bz2": (1, 9)}
+
+# Magic, Version, Codec, Stufe, Flags, pulse_id, Samples, Nutzdaten, CRC32,
+# scale_u, scale_i, offset_u, offset_i, dt, t0, Zeitstempel, i_unit
+_CHUNK_HEADER   = struct.Struct("<4sBBBBqQQI7d4s")
+_FLAG_DELTA     = 0x01
+_FLAG_SHUFFLE   = 0x02
+_FLAG_U         = 0x04          # Kanal A (adc_u) vorhanden
+_FLAG_I         = 0x08          # Kanal B (adc_i) vorhanden
+
+_COMPRESS = {
+    "none": lambda data, level: data,
+    "zlib": lambda data, level: zlib.compress(data, level),
+    "lzma": lambda data, level: lzma.compress(data, preset=level),
+    "bz2":  lambda data, level: bz2.compress(data, compresslevel=level),
+}
+_DECOMPRESS = {
+    "none": bytes,
+    "zlib": zlib.decompress,
+    "lzma": lzma.decompress,
+    "bz2":  bz2.decompress,
+}
+
+
+def _check_codec(codec: str, level: Optional[int]) -> int:
+    """Prüft Codec und Stufe, gibt die Stufe zurück (interne Funktion)."""
+    if codec not in CODECS:
+        raise ValueError(f"codec muss einer von {CODECS} sein")
+    if level is None:
+        return DEFAULT_LEVELS[codec]
+    low, high = _LEVEL_RANGES[codec]
+    if not low <= level <= high:
+        raise ValueError(f"Stufe für {codec} muss zwischen {low} und {high} liegen")
+    return int(level)
+
+
+def _delta(adc: np.ndarray) -> np.ndarray:
+    """x[k] - x[k-1] mit x[-1] = 0, int16 modulo 2^16 (interne Funktion)."""
+    out = np.empty(adc.size, dtype="<i2")
+    out[:1] = adc[:1]
+    np.subtract(adc[1:], adc[:-1], out=out[1:])
+    return out
+
+
+def _shuffle(data: np.ndarray) -> bytes:
+    """int16 -> alle Low-Bytes, dann alle High-Bytes (interne Funktion)."""
+    return data.view(np.uint8).reshape(-1, 2).T.tobytes()
+
+
+def _unshuffle(raw: bytes) -> np.ndarray:
+    """Umkehrung von `_shuffle()` (interne Funktion)."""
+    planes = np.frombuffer(raw, dtype=np.uint8).reshape(2, -1)
+    return np.ascontiguousarray(planes.T).view("<i2").ravel()
+
+
+def encode_pulse(
+    pulse: RawPulse,
+    codec: str = DEFAULT_CODEC,
+    level: Optional[int] = None,
+    shuffle: bool = True,
+    delta: bool = True
+) -> bytes:
+    """
+    Kodiert einen RawPulse als Block (Kopf + komprimierte Rohwerte).
+
+    Parameters
+    ----------
+    pulse : RawPulse
+        Puls mit int16-Rohdaten.
+    codec : str, optional
+        "zlib" (Standard), "lzma", "bz2" oder "none".
+    level : int, optional
+        Kompressionsstufe (zlib/lzma 0–9, bz2 1–9); None: DEFAULT_LEVELS.
+    shuffle : bool, optional
+        Byte-Shuffle vor der Kompression (Standard: True).
+    delta : bool, optional
+        Delta-Kodierung je Kanal (Standard: True).
+
+    Returns
+    -------
+    bytes
+        Vollständiger Block, dekodierbar mit `decode_pulse()`.
+
+    Examples
+    --------
+    >>> chunk = encode_pulse(pulse, codec="zlib", level=1)
+    >>> decode_pulse(chunk).adc_u
+    """
+    level = _check_codec(codec, level)
+    channels = [adc for adc in (pulse.adc_u, pulse.adc_i) if adc is not None]
+    adc = [np.ascontiguousarray(x, dtype="<i2") for x in channels]
+    crc = 0
+    for x in adc:
+        crc = zlib.crc32(memoryview(x), crc)
+    data = np.concatenate([_delta(x) for x in adc] if delta else adc)
+    raw = _shuffle(data) if shuffle else data.tobytes()
+    payload = _COMPRESS[codec](raw, level)
+
+    flags = ((_FLAG_DELTA if delta else 0) | (_FLAG_SHUFFLE if shuffle else 0)
+             | (_FLAG_U if pulse.adc_u is not None else 0) | (_FLAG_I if pulse.adc_i is not None else 0))
+    timestamp = np.nan if pulse.timestamp is None else pulse.timestamp
+    header = _CHUNK_HEADER.pack(
+        CODEC_MAGIC, CODEC_VERSION, CODECS.index(codec), level, flags,
+        pulse.pulse_id, pulse.n_samples, len(payload), crc,
+        pulse.scale_u, pulse.scale_i, pulse.offset_u, pulse.offset_i, pulse.dt, pulse.t0, timestamp,
+        pulse.i_unit.encode("ascii")[:4],
+    )
+    return header + payload
+
+
+def _unpack_header(head) -> Tuple:
+    """Liest und prüft einen Block-Kopf (interne Funktion)."""
+    fields = _CHUNK_HEADER.unpack(head)
+    if fields[0] != CODEC_MAGIC:
+        raise ValueError("Kein Puls-Codec-Block (Magic fehlt)")
+    if fields[1] > CODEC_VERSION:
+        raise ValueError(f"Codec-Version {fields[1]} nicht unterstützt")
+    if fields[2] >= len(CODECS):
+        raise ValueError(f"Unbekannter Codec {fields[2]}")
+    return fields
+
+
+def decode_pulse(chunk) -> RawPulse:
+    """
+    Dekodiert einen Block von `encode_pulse()` in einen RawPulse.
+
+    Parameters
+    ----------
+    chunk : bytes-like
+        Block (Kopf + Nutzdaten); weitere Bytes dahinter werden ignoriert.
+
+    Returns
+    -------
+    RawPulse
+        Puls mit den ursprünglichen int16-Rohwerten und der Skalierung.
+
+    Raises
+    ------
+    ValueError
+        Bei fremden, unvollständigen oder beschädigten Blöcken (Prüfsumme).
+    """
+    chunk = memoryview(chunk)
+    if len(chunk) < _CHUNK_HEADER.size:
+        raise ValueError("Block unvollständig (Kopf)")
+    (_, _, codec_id, _, flags, pulse_id, n, payload_len, crc,
+     scale_u, scale_i, offset_u, offset_i, dt, t0, timestamp, i_unit) = _unpack_header(
+        chunk[:_CHUNK_HEADER.size])
+    payload = chunk[_CHUNK_HEADER.size:_CHUNK_HEADER.size + payload_len]
+    if len(payload) < payload_len:
+        raise ValueError("Block unvollständig (Nutzdaten)")
+
+    raw = _DECOMPRESS[CODECS[codec_id]](payload)
+    n_channels = bool(flags & _FLAG_U) + bool(flags & _FLAG_I)
+    if len(raw) != 2 * n * n_channels:
+        raise ValueError("Block beschädigt (Länge der Rohwerte)")
+    data = _unshuffle(raw) if flags & _FLAG_SHUFFLE else np.frombuffer(raw, dtype="<i2")
+    adc = []
+    for k in range(n_channels):
+        x = data[k * n:(k + 1) * n]
+        adc.append(np.cumsum(x, dtype=np.int16) if flags & _FLAG_DELTA else x.astype(np.int16))
+
+    check = 0
+    for x in adc:
+        check = zlib.crc32(memoryview(np.ascontiguousarray(x, dtype="<i2")), check)
+    if check != crc:
+        raise ValueError(f"Block beschädigt (Prüfsumme, pulse_id {pulse_id})")
+
+    adc_u = adc.pop(0) if flags & _FLAG_U else None
+    adc_i = adc.pop(0) if flags & _FLAG_I else None
+    return RawPulse(
+        pulse_id, adc_u, adc_i, scale_u=scale_u, scale_i=scale_i, dt=dt,
+        offset_u=offset_u, offset_i=offset_i, t0=t0, i_unit=i_unit.rstrip(b"\0").decode("ascii"),
+        timestamp=None if np.isnan(timestamp) else timestamp,
+    )
+
+
+def append_pulse_chunks(path: str, pulses: Iterable[RawPulse], **kwargs) -> int:
+    """
+    Hängt Pulse als Blöcke an eine Datei an (legt sie bei Bedarf an).
+
+    Parameters
+    ----------
+    path : str
+        Zieldatei (üblich: CODEC_EXT).
+    pulses : iterable of RawPulse
+        Pulse in Schreibreihenfolge.
+    **kwargs
+        codec, level, shuffle, delta wie bei `encode_pulse()`.
+
+    Returns
+    -------
+    int
+        Geschriebene Bytes.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    nbytes = 0
+    with open(path, "ab") as f:
+        for pulse in pulses:
+            nbytes += f.write(encode_pulse(pulse, **kwargs))
+    return nbytes
+
+
+def iter_pulse_chunks(path: str) -> Iterator[RawPulse]:
+    """
+    Liest alle Pulse einer Block-Datei in Dateireihenfolge.
+
+    Ein unvollständiger letzter Block (z.B. nach Absturz) wird ignoriert;
+    beschädigte Blöcke lösen ValueError aus.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {path}")
+    with open(path, "rb") as f:
+        while True:
+            head = f.read(_CHUNK_HEADER.size)
+            if len(head) < _CHUNK_HEADER.size:
+                return
+            payload_len = _unpack_header(head)[7]
+            payload = f.read(payload_len)
+            if len(payload) < payload_len:
+                return
+            yield decode_pulse(head + payload)
+
+
+# ---------- Vergleich mit savez_compressed ----------
+
+def discharge_pulses(
+    n_pulses: int = 4,
+    n_samples: int = 400_000,
+    dt: float = 5e-8,
+    seed: int = 0
+) -> List[RawPulse]:
+    """
+    Realistische Entladepulse für `benchmark_codecs()` (Signalmodell wie `SimulatedPS3000A`).
+
+    RC-Entladung (tau um 1 ms) nach 20 % Pretrigger auf beiden Kanälen,
+    8-Bit-quantisiert (Vielfache von 256) mit 0,7 LSB Rauschen; Skalierung
+    wie 2-V-Bereich und Rogowski-Spule.
+    """
+    from pico_pulse_lab.acquisition.sim_backend import ADC_LSB, MAX_ADC
+
+    rng = np.random.default_rng(seed)
+    pre = int(0.2 * n_samples)
+    k = np.arange(n_samples - pre)
+    pulses = []
+    for pulse_id in range(1, n_pulses + 1):
+        tau = 1e-3 * rng.uniform(0.8, 1.2)
+        adc = []
+        for amplitude in (-0.5 * rng.uniform(0.9, 1.0), -0.25 * rng.uniform(0.9, 1.0)):
+            counts = np.zeros(n_samples)
+            counts[pre:] = amplitude * np.exp(-k * dt / tau) * MAX_ADC
+            counts += rng.normal(0.0, 0.7 * ADC_LSB, n_samples)
+            adc.append((np.clip(np.round(counts / ADC_LSB), -127, 127) * ADC_LSB).astype(np.int16))
+        pulses.append(RawPulse(pulse_id, adc[0], adc[1], scale_u=2.0 / MAX_ADC * 50,
+                               scale_i=1.0 / MAX_ADC / 0.02, dt=dt, timestamp=time.time()))
+    return pulses
+
+
+def _savez_encode(pulse: RawPulse) -> bytes:
+    """Bisheriger Pfad: float64 u/i per np.savez_compressed (interne Funktion)."""
+    buf = io.BytesIO()
+    arrays = {key: x for key, x in (('u', pulse.u()), ('i', pulse.i())) if x is not None}
+    np.savez_compressed(buf, **arrays)
+    pulse.release_cache()
+    return buf.getvalue()
+
+
+def _savez_decode(data: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(data)) as npz:
+        return {key: npz[key] for key in npz.files}
+
+
+def benchmark_codecs(
+    pulses: Optional[List[RawPulse]] = None,
+    settings: Optional[List[Tuple[str, Optional[int], bool]]] = None,
+    repeat: int = 3
+) -> List[Dict]:
+    """
+    Vergleicht Kompressionsverhältnis und Geschwindigkeit mit `np.savez_compressed`.
+
+    Kodieren umfasst beim savez-Pfad die Umrechnung in float64, Dekodieren
+    beim Codec die Umrechnung zurück in Volt/Ampere – beide Seiten liefern
+    also dieselben float64-Kurven.
+
+    Parameters
+    ----------
+    pulses : list of RawPulse, optional
+        Zu kodierende Pulse (Standard: `discharge_pulses()`).
+    settings : list of tuple, optional
+        (codec, level, shuffle) je Variante; Standard: zlib 1/6, lzma 6 und
+        bz2 9 mit Shuffle, zlib 6 ohne Shuffle.
+    repeat : int, optional
+        Wiederholungen; gewertet wird die schnellste (Standard: 3).
+
+    Returns
+    -------
+    list of dict
+        Je Variante {'name', 'bytes', 'ratio', 'bytes_per_sample',
+        'encode_ms', 'decode_ms', 'encode_msps', 'decode_msps'}; erster Eintrag
+        ist 'savez_compressed'. 'ratio' bezieht sich auf die unkomprimierten
+        float64-Kurven, Zeiten und Msamples/s auf alle Pulse zusammen.
+
+    Examples
+    --------
+    >>> for row in benchmark_codecs():
+    ...     print(row['name'], round(row['ratio'], 1), row['encode_ms'])
+    """
+    if pulses is None:
+        pulses = discharge_pulses()
+    if settings is None:
+        settings = [("zlib", 1, True), ("zlib", 6, True), ("zlib", 6, False),
+                    ("lzma", 6, True), ("bz2", 9, True)]
+    n_values = sum(p.n_samples * len(p.channels) for p in pulses)
+
+    def timed(func, items):
+        best, out = float("inf"), None
+        for _ in range(max(1, repeat)):
+            t_start = time.perf_counter()
+            out = [func(item) for item in items]
+            best = min(best, time.perf_counter() - t_start)
+        return best, out
+
+    def float_values(pulse):
+        values = (pulse.u(), pulse.i())
+        pulse.release_cache()
+        return values
+
+    variants = [("savez_compressed", _savez_encode, _savez_decode)]
+    for codec, level, shuffle in settings:
+        variants.append((
+            f"{codec}-{DEFAULT_LEVELS[codec] if level is None else level}" + ("+shuffle" if shuffle else ""),
+            lambda p, c=codec, lv=level, s=shuffle: encode_pulse(p, codec=c, level=lv, shuffle=s),
+            lambda data: float_values(decode_pulse(data)),
+        ))
+
+    results = []
+    for name, encode, decode in variants:
+        encode_s, chunks = timed(encode, pulses)
+        decode_s, _ = timed(decode, chunks)
+        nbytes = sum(len(chunk) for chunk in chunks)
+        results.append({
+            'name': name,
+            'bytes': nbytes,
+            'ratio': 8 * n_values / nbytes,
+            'bytes_per_sample': nbytes / n_values,
+            'encode_ms': encode_s * 1e3,
+            'decode_ms': decode_s * 1e3,
+            'encode_msps': n_values / encode_s / 1e6,
+            'decode_msps': n_values / decode_s / 1e6,
+        })
+    return results
+
+
+def _load_raw_pulses(path: str) -> List[RawPulse]:
+    """Rohdaten-Pulse aus .pstore oder .npz für den Vergleich (interne Funktion)."""
+    if path.endswith(".npz"):
+        from pico_pulse_lab.storage.npz_writer import get_all_pulse_ids, load_raw_pulse_npz
+        ids, load = get_all_pulse_ids(path), load_raw_pulse_npz
+    else:
+        from pico_pulse_lab.storage.pulse_store import get_all_pulse_ids_store, load_raw_pulse_store
+        ids, load = get_all_pulse_ids_store(path), load_raw_pulse_store
+    pulses = []
+    for pulse_id in ids:
+        try:
+            pulses.append(load(path, pulse_id))
+        except ValueError:
+            pass  # float-Eintrag (ohne Rohdaten)
+    return pulses
+
+
+if __name__ == "__main__":
+    pulses = _load_raw_pulses(sys.argv[1]) if len(sys.argv) > 1 else discharge_pulses()
+    if not pulses:
+        print("Keine Rohdaten-Pulse gefunden (raw_storage=True bzw. binary_format='memmap' verwenden)")
+        sys.exit(1)
+    print(f"{len(pulses)} Pulse, {pulses[0].n_samples} Samples, Kanäle {pulses[0].channels}")
+    print(f"{'Variante':<22}{'Bytes':>12}{'Verhältnis':>12}{'B/Sample':>10}"
+          f"{'Kodieren ms':>13}{'Dekodieren ms':>15}")
+    for row in benchmark_codecs(pulses):
+        print(f"{row['name']:<22}{row['bytes']:>12}{row['ratio']:>12.1f}{row['bytes_per_sample']:>10.3f}"
+              f"{row['encode_ms']:>13.1f}{row['decode_ms']:>15.1f}")
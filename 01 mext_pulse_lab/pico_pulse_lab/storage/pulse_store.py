@@ -0,0 +1,512 @@
+"""
+Anhängbarer Puls-Container (.pstore) für lange Messläufe.
+
+`append_pulse_npz()` hängt zwar nur die Member des neuen Pulses an, liest
+und schreibt dabei aber jedes Mal das Zip-Verzeichnis aller Member. Dieser
+Container hängt jeden Puls als eigenen Datensatz an das Dateiende an:
+ein `write()` pro Puls, unabhängig von der Länge des Laufs.
+
+Dateiaufbau:
+- Dateikopf: b"PPLSTORE" + uint16 Version + uint16 reserviert (12 Byte)
+- Datensatz: 4 Byte Typ (b"PULS" oder b"META") + uint32 Länge des
+  JSON-Kopfs + uint64 Länge der Nutzdaten (16 Byte), danach JSON-Kopf
+  (UTF-8) und die Arrays unkomprimiert hintereinander (little endian)
+- PULS-Kopf: {'pulse_id', 'arrays': [[name, dtype, n], ...], ...}
+  - Rohdaten: 'adc_u'/'adc_i' (int16) plus 'scaling' wie bei
+    `append_raw_pulse_npz()`
+  - float: 'u'/'i' (float64) plus 't' als Array oder 'time_axis' [t0, dt]
+  - Ein nicht erfasster Kanal fehlt in 'arrays'.
+- META-Kopf: Metadaten-Dictionary; spätere META-Datensätze ergänzen bzw.
+  überschreiben frühere Schlüssel.
+
+Zum Lesen werden nur die Datensatz-Köpfe gelesen (Nutzdaten übersprungen)
+und ein Index pulse_id -> Dateiposition aufgebaut; der Index wird pro
+Datei zwischengespeichert und bei weiteren Zugriffen nur um neu
+angehängte Datensätze ergänzt. Ein Puls wird direkt per Seek geladen.
+Gleiche pulse_id mehrfach: der zuletzt angehängte Datensatz gilt. Ein
+unvollständiger letzter Datensatz (z.B. nach Absturz) wird ignoriert.
+
+Die Funktionen entsprechen denen in `npz_writer.py`; bestehende .npz
+Dateien überführt `convert_npz_to_store()` (auch als
+`python -m pico_pulse_lab.storage.pulse_store run.npz`).
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pico_pulse_lab.acquisition.pulse_data import TimeAxis
+
+
+STORE_MAGIC     = b"PPLSTORE"
+STORE_VERSION   = 1
+STORE_EXT       = ".pstore"
+_FILE_HEADER    = struct.Struct("<8sHH")        # Magic, Version, reserviert
+_RECORD_HEADER  = struct.Struct("<4sIQ")        # Typ, Länge JSON-Kopf, Länge Nutzdaten
+_PULSE_TAG      = b"PULS"
+_META_TAG       = b"META"
+
+
+class _StoreIndex:
+    """Index einer Container-Datei: gelesene Länge, Pulse und Metadaten (interne Klasse)."""
+
+    __slots__ = ("ino", "end", "pulses", "meta")
+
+    def __init__(self, ino: int):
+        self.ino = ino
+        self.end = _FILE_HEADER.size           # bis hierhin vollständig gelesen
+        self.pulses = {}                       # pulse_id -> (Offset der Nutzdaten, Kopf)
+        self.meta = {}
+
+
+_INDEX_CACHE: Dict[str, _StoreIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def _json_default(value):
+    """JSON-Umwandlung für NumPy-Skalare und -Arrays in Metadaten."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _write_record(f, tag: bytes, header: Dict, arrays: List[Tuple[str, np.ndarray]] = ()) -> None:
+    """Schreibt einen Datensatz (Kopf + Arrays) an die aktuelle Position (interne Funktion)."""
+    header = dict(header)
+    header['arrays'] = [[name, arr.dtype.str, int(arr.size)] for name, arr in arrays]
+    head = json.dumps(header, default=_json_default).encode("utf-8")
+    payload = sum(arr.nbytes for _, arr in arrays)
+    f.write(_RECORD_HEADER.pack(tag, len(head), payload) + head)
+    for _, arr in arrays:
+        f.write(memoryview(arr))
+
+
+def _create(path: str, meta: Dict) -> None:
+    """Legt eine neue Datei mit Dateikopf und META-Datensatz an (interne Funktion)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    meta_out = dict(meta)
+    meta_out['created'] = datetime.now().isoformat()
+    with open(path, "wb") as f:
+        f.write(_FILE_HEADER.pack(STORE_MAGIC, STORE_VERSION, 0))
+        _write_record(f, _META_TAG, meta_out)
+    with _INDEX_LOCK:
+        _INDEX_CACHE.pop(os.path.abspath(path), None)
+
+
+def _append(path: str, tag: bytes, header: Dict, arrays: List[Tuple[str, np.ndarray]] = ()) -> None:
+    """Hängt einen Datensatz an eine bestehende Datei an (interne Funktion)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {path}. Verwende create_pulse_store() zuerst.")
+    with open(path, "ab") as f:
+        _write_record(f, tag, header, arrays)
+
+
+def _float_arrays(t, u: Optional[np.ndarray], i: Optional[np.ndarray]) -> Tuple[Dict, List]:
+    """Kopf und Arrays eines float-Pulses; `TimeAxis` nur als [t0, dt] (interne Funktion)."""
+    arrays = [(key, np.ascontiguousarray(x, dtype="<f8")) for key, x in (('u', u), ('i', i))
+              if x is not None]
+    if not arrays:
+        raise ValueError("Mindestens einer von u und i muss vorhanden sein")
+    header = {}
+    if isinstance(t, TimeAxis):
+        if len(t) != arrays[0][1].size:
+            raise ValueError("Zeitachse und Daten müssen gleiche Länge haben")
+        header['time_axis'] = [t.t0, t.dt]
+    else:
+        arrays.append(('t', np.ascontiguousarray(t, dtype="<f8")))
+    return header, arrays
+
+
+def _raw_arrays(pulse) -> List[Tuple[str, np.ndarray]]:
+    """int16-Arrays der erfassten Kanäle eines RawPulse (interne Funktion)."""
+    return [(key, np.ascontiguousarray(adc, dtype="<i2"))
+            for key, adc in (('adc_u', pulse.adc_u), ('adc_i', pulse.adc_i)) if adc is not None]
+
+
+def _index(path: str) -> _StoreIndex:
+    """
+    Index der Datei; liest nur Datensatz-Köpfe ab der zuletzt gelesenen Position (interne Funktion).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Datei nicht gefunden: {path}")
+    key = os.path.abspath(path)
+    with _INDEX_LOCK:
+        st = os.stat(path)
+        index = _INDEX_CACHE.get(key)
+        if index is None or index.ino != st.st_ino or st.st_size < index.end:
+            index = _StoreIndex(st.st_ino)
+            with open(path, "rb") as f:
+                head = f.read(_FILE_HEADER.size)
+            if len(head) < _FILE_HEADER.size or head[:len(STORE_MAGIC)] != STORE_MAGIC:
+                raise ValueError(f"Kein Puls-Container: {path}")
+            version = _FILE_HEADER.unpack(head)[1]
+            if version > STORE_VERSION:
+                raise ValueError(f"Container-Version {version} nicht unterstützt")
+        if st.st_size > index.end:
+            with open(path, "rb") as f:
+                _scan_records(f, index, st.st_size)
+        _INDEX_CACHE[key] = index
+        return index
+
+
+def _scan_records(f, index: _StoreIndex, size: int) -> None:
+    """Liest Datensatz-Köpfe bis zum Dateiende in den Index (interne Funktion)."""
+    pos = index.end
+    while pos + _RECORD_HEADER.size <= size:
+        f.seek(pos)
+        tag, head_len, payload_len = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+        data_pos = pos + _RECORD_HEADER.size + head_len
+        if data_pos + payload_len > size:
+            break  # unvollständiger letzter Datensatz
+        header = json.loads(f.read(head_len).decode("utf-8"))
+        if tag == _PULSE_TAG:
+            index.pulses[int(header['pulse_id'])] = (data_pos, header)
+        elif tag == _META_TAG:
+            header.pop('arrays', None)
+            index.meta.update(header)
+        pos = data_pos + payload_len
+    index.end = pos
+
+
+def _read_arrays(path: str, offset: int, header: Dict) -> Dict[str, np.ndarray]:
+    """Liest die Arrays eines Datensatzes ab der Nutzdaten-Position (interne Funktion)."""
+    out = {}
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for name, dtype, n in header['arrays']:
+            out[name] = np.fromfile(f, dtype=np.dtype(dtype), count=n)
+    return out
+
+
+def _record(path: str, pulse_id: int) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Kopf und Arrays eines Pulses (interne Funktion)."""
+    pulses = _index(path).pulses
+    if pulse_id not in pulses:
+        raise KeyError(f"Pulse-ID {pulse_id} nicht in Datei gefunden")
+    offset, header = pulses[pulse_id]
+    return header, _read_arrays(path, offset, header)
+
+
+def create_pulse_store(path: str, meta: Optional[Dict] = None) -> None:
+    """
+    Legt einen neuen, leeren Puls-Container an (überschreibt eine bestehende Datei).
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei (z.B. "runs/test_01/test_01.pstore").
+        Verzeichnis muss nicht existieren (wird erstellt).
+    meta : dict, optional
+        Metadaten des Laufs (JSON-tauglich); 'created' wird ergänzt.
+
+    Examples
+    --------
+    >>> create_pulse_store('runs/test_01.pstore', meta={'fs': 1e6})
+    >>> append_raw_pulse_store('runs/test_01.pstore', pulse)
+    """
+    _create(path, meta or {})
+
+
+def save_pulse_store(
+    path: str,
+    pulse_id: int,
+    t: np.ndarray,
+    u: np.ndarray,
+    i: np.ndarray,
+    meta: Optional[Dict] = None
+) -> None:
+    """
+    Speichert einen einzelnen Puls in einen neuen Container (wie `save_pulse_npz()`).
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei (wird überschrieben).
+    pulse_id : int
+        ID des Pulses.
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (`TimeAxis` wird als [t0, dt] gespeichert).
+    u : np.ndarray or None
+        Spannungswerte in Volt (None ohne Kanal A).
+    i : np.ndarray or None
+        Stromwerte in Ampere (None ohne Kanal B).
+    meta : dict, optional
+        Metadaten des Laufs.
+    """
+    _create(path, meta or {})
+    append_pulse_store(path, pulse_id, t, u, i)
+
+
+def append_pulse_store(
+    path: str,
+    pulse_id: int,
+    t: np.ndarray,
+    u: np.ndarray,
+    i: np.ndarray
+) -> None:
+    """
+    Hängt einen float-Puls an einen bestehenden Container an.
+
+    Es wird nur der neue Datensatz geschrieben; die Kosten hängen nicht
+    von der Anzahl bereits gespeicherter Pulse ab.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei. Muss bereits existieren.
+    pulse_id : int
+        ID des Pulses (vorhandene ID: neuer Datensatz gilt).
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden (`TimeAxis` wird als [t0, dt] gespeichert).
+    u : np.ndarray or None
+        Spannungswerte in Volt (None ohne Kanal A).
+    i : np.ndarray or None
+        Stromwerte in Ampere (None ohne Kanal B).
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+    """
+    header, arrays = _float_arrays(t, u, i)
+    header['pulse_id'] = int(pulse_id)
+    _append(path, _PULSE_TAG, header, arrays)
+
+
+def append_raw_pulse_store(path: str, pulse) -> None:
+    """
+    Hängt einen RawPulse als int16-Rohdaten plus Skalierung an.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei. Muss bereits existieren.
+    pulse : RawPulse
+        Puls mit int16-Rohdaten (siehe `acquisition/pulse_data.py`).
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+
+    Examples
+    --------
+    >>> append_raw_pulse_store('runs/test_01.pstore', pulse)
+    """
+    header = {'pulse_id': pulse.pulse_id, 'scaling': pulse.scaling_meta(), 'timestamp': pulse.timestamp}
+    _append(path, _PULSE_TAG, header, _raw_arrays(pulse))
+
+
+def update_meta_store(path: str, meta: Dict) -> None:
+    """
+    Ergänzt bzw. überschreibt Metadaten-Schlüssel (hängt einen META-Datensatz an).
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei. Muss bereits existieren.
+    meta : dict
+        Neue Metadaten; 'updated' wird ergänzt.
+    """
+    meta_out = dict(meta)
+    meta_out['updated'] = datetime.now().isoformat()
+    _append(path, _META_TAG, meta_out)
+
+
+def load_pulse_store(
+    path: str,
+    pulse_id: int,
+    time_axis: bool = False
+) -> Tuple[Union[np.ndarray, TimeAxis], np.ndarray, np.ndarray]:
+    """
+    Lädt einen einzelnen Puls (wie `load_pulse_npz()`).
+
+    Rohdaten-Datensätze werden erst hier in Volt/Ampere umgerechnet.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei.
+    pulse_id : int
+        ID des zu ladenden Pulses.
+    time_axis : bool, optional
+        Zeit als `TimeAxis` statt als Array zurückgeben (Standard: False).
+
+    Returns
+    -------
+    t : np.ndarray or TimeAxis
+        Zeitvektor in Sekunden.
+    u : np.ndarray or None
+        Spannungswerte in Volt (None, wenn Kanal A nicht erfasst wurde).
+    i : np.ndarray or None
+        Stromwerte in Ampere (None, wenn Kanal B nicht erfasst wurde).
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+    KeyError
+        Wenn die pulse_id nicht in der Datei vorhanden ist.
+    """
+    header, arrays = _record(path, pulse_id)
+    if 'scaling' in header:
+        raw = _to_raw_pulse(pulse_id, header, arrays)
+        return (raw.time_axis() if time_axis else raw.t()), raw.u(), raw.i()
+
+    u, i = arrays.get('u'), arrays.get('i')
+    if 'time_axis' in header:
+        t0, dt = header['time_axis']
+        axis = TimeAxis(t0, dt, (u if u is not None else i).size)
+        return (axis if time_axis else axis.to_array()), u, i
+    t = arrays['t']
+    return (TimeAxis.from_array(t) if time_axis else t), u, i
+
+
+def _to_raw_pulse(pulse_id: int, header: Dict, arrays: Dict[str, np.ndarray]):
+    """Baut aus einem Rohdaten-Datensatz wieder einen RawPulse (interne Funktion)."""
+    from pico_pulse_lab.acquisition.pulse_data import RawPulse
+    return RawPulse(pulse_id, arrays.get('adc_u'), arrays.get('adc_i'),
+                    timestamp=header.get('timestamp'), **header['scaling'])
+
+
+def load_raw_pulse_store(path: str, pulse_id: int):
+    """
+    Lädt einen Puls als RawPulse (int16 + Skalierung) ohne float-Umrechnung.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei.
+    pulse_id : int
+        ID des zu ladenden Pulses.
+
+    Returns
+    -------
+    RawPulse
+        Puls mit int16-Rohdaten.
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+    KeyError
+        Wenn die pulse_id fehlt.
+    ValueError
+        Wenn der Puls nicht als Rohdaten gespeichert wurde.
+    """
+    header, arrays = _record(path, pulse_id)
+    if 'scaling' not in header:
+        raise ValueError(f"Pulse-ID {pulse_id} wurde nicht als Rohdaten gespeichert")
+    return _to_raw_pulse(pulse_id, header, arrays)
+
+
+def get_all_pulse_ids_store(path: str) -> list:
+    """
+    Sortierte Liste aller Pulse-IDs im Container (leer, wenn die Datei fehlt).
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei.
+
+    Returns
+    -------
+    list of int
+        Sortierte Pulse-IDs.
+    """
+    if not os.path.exists(path):
+        return []
+    return sorted(_index(path).pulses)
+
+
+def load_meta_store(path: str) -> Dict:
+    """
+    Lädt die Metadaten des Containers.
+
+    Parameters
+    ----------
+    path : str
+        Pfad zur Container-Datei.
+
+    Returns
+    -------
+    dict
+        Zusammengeführte META-Datensätze plus 'pulse_count'.
+
+    Raises
+    ------
+    FileNotFoundError
+        Wenn die Datei nicht existiert.
+    """
+    index = _index(path)
+    meta = dict(index.meta)
+    meta['pulse_count'] = len(index.pulses)
+    return meta
+
+
+def convert_npz_to_store(npz_path: str, store_path: Optional[str] = None) -> str:
+    """
+    Überführt eine bestehende .npz Datei (siehe `npz_writer.py`) in einen Container.
+
+    Rohdaten-Einträge bleiben int16 plus Skalierung, float-Einträge
+    float64; äquidistante Zeitvektoren werden als [t0, dt] gespeichert.
+    Die Metadaten werden übernommen und um 'converted_from' ergänzt.
+
+    Parameters
+    ----------
+    npz_path : str
+        Pfad zur .npz Datei.
+    store_path : str, optional
+        Ziel (Standard: gleicher Name mit Endung .pstore; wird überschrieben).
+
+    Returns
+    -------
+    str
+        Pfad des Containers.
+
+    Examples
+    --------
+    >>> convert_npz_to_store('runs/test_01/test_01.npz')
+    'runs/test_01/test_01.pstore'
+    """
+    from pico_pulse_lab.storage.npz_writer import (
+        get_all_pulse_ids,
+        load_meta_npz,
+        load_pulse_npz,
+        load_raw_pulse_npz,
+    )
+
+    if store_path is None:
+        store_path = os.path.splitext(npz_path)[0] + STORE_EXT
+    meta = load_meta_npz(npz_path)
+    meta['converted_from'] = os.path.abspath(npz_path)
+    _create(store_path, meta)
+    for pulse_id in get_all_pulse_ids(npz_path):
+        try:
+            append_raw_pulse_store(store_path, load_raw_pulse_npz(npz_path, pulse_id))
+        except ValueError:  # float-Eintrag
+            t, u, i = load_pulse_npz(npz_path, pulse_id)
+            try:
+                t = TimeAxis.from_array(t)
+            except ValueError:
+                pass  # nicht äquidistant bzw. zu kurz: Array behalten
+            append_pulse_store(store_path, pulse_id, t, u, i)
+    return store_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Verwendung: python -m pico_pulse_lab.storage.pulse_store <run.npz> [ziel.pstore]")
+        sys.exit(1)
+    target = convert_npz_to_store(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"{len(get_all_pulse_ids_store(target))} Pulse nach {target} übertragen")
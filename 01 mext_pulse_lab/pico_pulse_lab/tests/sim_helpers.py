@@ -0,0 +1,74 @@
+"""
+Gemeinsame Hilfsfunktionen für Tests mit dem simulierten PS3000A-Backend.
+
+Alle Reader-Tests messen mit denselben Grundeinstellungen (1 MS/s, 2000
+Samples, Kanal A 2 V / Kanal B 1 V DC) und legen den Timebase-Cache im
+Temp-Verzeichnis des Tests statt unter ~/.pico_pulse_lab ab.
+"""
+
+import os
+import sys
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.picoscope_reader import PicoReader
+
+# Grundeinstellungen für `PicoReader.configure()` mit dem Simulator
+SIM_SETTINGS = dict(
+    target_fs=1e6,          # 1 MS/s -> 2 ms Pulsfenster
+    trigger_level_v=-0.2,   # Entladepuls des Simulators fällt auf -1 V
+    coupling_a="DC",
+    range_a="2V",
+    coupling_b="DC",
+    range_b="1V",
+    base_samples=2000,
+    pretrig_ratio=0.2,
+)
+
+
+def sim_settings(tmpdir, **overrides):
+    """
+    Gibt die configure()-Argumente für einen Simulator-Test zurück.
+
+    Parameters
+    ----------
+    tmpdir : str
+        Temp-Verzeichnis des Tests (base_dir und Timebase-Cache).
+    **overrides
+        Abweichende oder zusätzliche Einstellungen.
+
+    Returns
+    -------
+    dict
+        Argumente für `PicoReader.configure()`, `ProcessReader.configure()`
+        bzw. `MultiScopeManager.configure()` (run_name kommt vom Aufrufer).
+    """
+    settings = dict(SIM_SETTINGS, base_dir=tmpdir,
+                    timebase_cache_path=os.path.join(tmpdir, "tb_cache.json"))
+    settings.update(overrides)
+    return settings
+
+
+def sim_reader(sim, tmpdir, run_name="sim", **overrides):
+    """
+    Erzeugt einen mit `sim_settings()` konfigurierten PicoReader.
+
+    Parameters
+    ----------
+    sim : SimulatedPS3000A
+        Simulator als SDK-Backend.
+    tmpdir : str
+        Temp-Verzeichnis des Tests.
+    run_name : str, optional
+        Name des Messlaufs (Standard: "sim").
+    **overrides
+        Abweichende oder zusätzliche Einstellungen.
+
+    Returns
+    -------
+    PicoReader
+    """
+    reader = PicoReader(backend=sim)
+    reader.configure(run_name=run_name, **sim_settings(tmpdir, **overrides))
+    return reader
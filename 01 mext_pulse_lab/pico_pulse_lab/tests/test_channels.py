@@ -0,0 +1,181 @@
+"""
+Test-Funktionen für die Kanalauswahl (A, B oder beide).
+
+Diese Tests überprüfen Rohpulse mit nur einem Kanal, die höhere
+Abtastrate bei einem Kanal und das Speichern ohne den abgeschalteten
+Kanal (CSV/NPZ) mit dem simulierten Scope.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.processing.pulse_preprocess import trim_pulse
+from pico_pulse_lab.storage.csv_writer import csv_columns
+from pico_pulse_lab.storage.npz_writer import load_pulse_npz
+from sim_helpers import sim_reader
+
+
+def _run(sim, tmpdir, n_pulses=2, save=False, **config):
+    """Misst n_pulses mit dem Simulator und gibt (reader, Rohpulse) zurück."""
+    reader = sim_reader(sim, tmpdir, run_name="channels", **config)
+
+    pulses = []
+    reader.set_raw_callback(pulses.append)
+    reader.start_measurement(n_pulses=n_pulses, save_csv=save, save_npz=save)
+    return reader, pulses
+
+
+def test_single_channel_pulse():
+    """
+    Test: RawPulse, Zuschnitt und CSV-Spalten mit nur einem Kanal.
+    """
+    print("\n=== Test: RawPulse mit einem Kanal ===")
+
+    adc = np.zeros(1000, dtype=np.int16)
+    adc[200:] = -16000
+    pulse = RawPulse(1, None, adc, scale_u=1e-3, scale_i=1e-2, dt=1e-6)
+    assert pulse.channels == "B" and pulse.n_samples == 1000 and pulse.nbytes == adc.nbytes
+    assert pulse.u() is None and np.allclose(pulse.i(), adc * 1e-2)
+
+    trimmed, (start, stop) = trim_pulse(pulse, pre_samples=200, margin_samples=10)
+    assert trimmed.adc_u is None and trimmed.n_samples == stop - start
+
+    assert csv_columns("A", "A") == ["pulse_id", "sample_idx", "time_s", "u_V"]
+    assert csv_columns("A", "B")[-1] == "i_A" and len(csv_columns("A")) == 5
+
+    try:
+        RawPulse(1, None, None, scale_u=1.0, scale_i=1.0, dt=1.0)
+        assert False, "Puls ohne Kanal muss ValueError auslösen"
+    except ValueError:
+        pass
+    print("✓ Einzelkanal-Puls korrekt")
+    return True
+
+
+def test_single_channel_timebase():
+    """
+    Test: Mit nur Kanal A erlaubt der Scope Timebase 0 (500 MS/s), mit A+B nicht.
+    """
+    print("\n=== Test: Timebase abhängig von der Kanalzahl ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reader, pulses = _run(SimulatedPS3000A(trigger_interval_s=0.002, seed=21), tmpdir,
+                              n_pulses=1, target_fs=500e6, channels="A")
+        assert reader.meta['timebase'] == 0 and np.isclose(reader.meta['fs'], 500e6)
+        assert pulses[0].channels == "A"
+
+        reader, pulses = _run(SimulatedPS3000A(trigger_interval_s=0.002, seed=22), tmpdir,
+                              n_pulses=1, target_fs=500e6, channels="AB")
+        assert reader.meta['timebase'] == 1 and np.isclose(reader.meta['fs'], 250e6)
+        assert pulses[0].channels == "AB"
+    print("✓ Timebase folgt der Kanalzahl")
+    return True
+
+
+def test_reader_channel_b_only():
+    """
+    Test: Nur Kanal B – Trigger auf B, CSV/NPZ/Meta ohne Spannungskanal.
+    """
+    print("\n=== Test: PicoReader nur Kanal B ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=23)
+        reader, pulses = _run(sim, tmpdir, n_pulses=2, save=True, channels="b")
+        assert reader.channels == "B" and len(pulses) == 2
+        pre = reader.meta['pretrigger_samples']
+        for pulse in pulses:
+            assert pulse.adc_u is None and pulse.adc_i.size == reader.n_samples
+            # Simulator: Kanal B springt am Triggerpunkt auf -0.5 V (1 V Bereich)
+            assert pulse.adc_i[pre] < -12000, "Trigger nicht auf Kanal B"
+
+        with open(reader.csv_path, encoding="utf-8") as f:
+            header = [line for line in f if not line.startswith("#")][0]
+        assert "u_V" not in header, f"Spannungsspalte im Header: {header}"
+        data = np.loadtxt(reader.csv_path, delimiter=",", comments="#", skiprows=1)
+        assert data.shape == (2 * reader.n_samples, 4)
+
+        _, u, i = load_pulse_npz(reader.npz_path, pulses[0].pulse_id)
+        assert u is None and np.allclose(i, pulses[0].i())
+
+        with open(reader.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        assert meta['channels'] == "B" and not meta['ch_a']['enabled'] and meta['ch_b']['enabled']
+    print("✓ Nur Kanal B korrekt")
+    return True
+
+
+def test_streaming_single_channel():
+    """
+    Test: Streaming mit Pipeline und nur Kanal A findet die Pulse.
+    """
+    print("\n=== Test: Streaming nur Kanal A ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=24)
+        reader, pulses = _run(sim, tmpdir, n_pulses=3, channels="A", use_pipeline=True,
+                              acquisition_mode="streaming", stream_buffer_samples=20_000)
+        assert len(pulses) == 3 and reader.meta['streaming']['lost'] == 0
+        pre = reader.meta['pretrigger_samples']
+        for pulse in pulses:
+            assert pulse.adc_i is None
+            assert pulse.adc_u[pre] < -12000, "Sprung am Triggerpunkt fehlt"
+    print("✓ Streaming mit einem Kanal korrekt")
+    return True
+
+
+def test_streaming_channel_b_only():
+    """
+    Test: Streaming nur mit Kanal B – Software-Trigger auf Kanal B, Puls ohne adc_u.
+    """
+    print("\n=== Test: Streaming nur Kanal B ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=25)
+        reader, pulses = _run(sim, tmpdir, n_pulses=3, channels="B", trigger_level_v=-0.1,
+                              acquisition_mode="streaming", stream_buffer_samples=20_000)
+        assert len(pulses) == 3 and reader.meta['streaming']['lost'] == 0
+        pre = reader.meta['pretrigger_samples']
+        for pulse in pulses:
+            assert pulse.adc_u is None and pulse.channels == "B"
+            assert pulse.adc_i[pre] < -6000, "Sprung am Triggerpunkt fehlt"
+    print("✓ Streaming nur mit Kanal B korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_single_channel_pulse())
+    results.append(test_single_channel_timebase())
+    results.append(test_reader_channel_b_only())
+    results.append(test_streaming_single_channel())
+    results.append(test_streaming_channel_b_only())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
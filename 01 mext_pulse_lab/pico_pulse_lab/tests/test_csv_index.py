@@ -0,0 +1,176 @@
+"""
+Test-Funktionen für den Puls-Index neben der Lauf-CSV (<run>.csv.idx).
+
+Diese Tests überprüfen die Einträge beim Anhängen (direkt und über den
+Schreib-Thread), den Seek-Zugriff, das Nachtragen bzw. Neuaufbauen für
+Dateien ohne aktuellen Index und die Fortsetzung der pulse_id im PicoReader.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.storage.csv_index import (
+    find_pulse,
+    index_path,
+    load_csv_index,
+    next_pulse_id,
+    read_pulse_rows,
+    rebuild_csv_index,
+)
+from pico_pulse_lab.storage.csv_writer import (
+    CsvChunkWriter,
+    append_pulse_to_csv,
+    append_raw_pulse_to_csv,
+    ensure_csv,
+    scan_next_pulse_id,
+)
+from sim_helpers import sim_reader
+
+
+def _raw_pulse(pulse_id, n=700, seed=0):
+    """Zufälliger int16-Puls mit Zeitstempel."""
+    rng = np.random.default_rng(seed)
+    adc = rng.integers(-32000, 32000, size=(2, n)).astype(np.int16)
+    return RawPulse(pulse_id, adc[0], adc[1], scale_u=1e-3, scale_i=2e-3, dt=1e-6,
+                    timestamp=1000.0 + pulse_id)
+
+
+def _write_run(csv_path, n_pulses=4):
+    """CSV mit n_pulses Pulsen, abwechselnd direkt und über den Schreib-Thread."""
+    ensure_csv(csv_path, "idx", "A")
+    for pulse_id in range(1, n_pulses + 1, 2):
+        append_raw_pulse_to_csv(csv_path, _raw_pulse(pulse_id, seed=pulse_id))
+        with CsvChunkWriter(csv_path) as writer:
+            append_raw_pulse_to_csv(csv_path, _raw_pulse(pulse_id + 1, seed=pulse_id + 1),
+                                    chunk_samples=128, writer=writer)
+
+
+def test_index_on_append():
+    """
+    Test: Jeder angehängte Puls steht mit Position, Länge, Zeilen und Zeitstempel im Index.
+    """
+    print("\n=== Test: Index beim Anhängen ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "run", "run.csv")
+        _write_run(csv_path)
+        t_before = time.time()
+        append_pulse_to_csv(csv_path, TimeAxis(0.0, 1e-6, 50), np.ones(50), None, "A", 9)
+
+        index = load_csv_index(csv_path)
+        assert list(index['pulse_id']) == [1, 2, 3, 4, 9]
+        assert list(index['rows']) == [700] * 4 + [50]
+        assert np.array_equal(index['timestamp'][:4], [1001.0, 1002.0, 1003.0, 1004.0])
+        assert index['timestamp'][4] >= t_before, "Zeitstempel beim Schreiben fehlt"
+        assert int(index['offset'][-1] + index['nbytes'][-1]) == os.path.getsize(csv_path)
+        assert next_pulse_id(csv_path) == scan_next_pulse_id(csv_path) == 10
+
+        rows = read_pulse_rows(csv_path, 3)
+        data = np.loadtxt(io.BytesIO(rows), delimiter=",")
+        pulse = _raw_pulse(3, seed=3)
+        assert data.shape == (700, 5) and np.all(data[:, 0] == 3)
+        assert np.allclose(data[:, 4], pulse.i(), rtol=1e-8)
+        try:
+            find_pulse(csv_path, 42)
+            assert False, "Fehlende ID muss KeyError auslösen"
+        except KeyError:
+            pass
+    print("✓ Index-Einträge korrekt")
+    return True
+
+
+def test_legacy_and_stale_index():
+    """
+    Test: Fehlender, veralteter oder zu langer Index wird nachgetragen bzw. neu aufgebaut.
+    """
+    print("\n=== Test: Index nachtragen/neu aufbauen ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "run.csv")
+        _write_run(csv_path)
+        reference = load_csv_index(csv_path)
+
+        # Lauf ohne Index (vor dieser Änderung geschrieben)
+        os.remove(index_path(csv_path))
+        assert scan_next_pulse_id(csv_path) == 5
+        rebuilt = load_csv_index(csv_path)
+        for name in ('pulse_id', 'offset', 'nbytes', 'rows'):
+            assert np.array_equal(rebuilt[name], reference[name]), name
+        assert np.all(np.isnan(rebuilt['timestamp']))
+        assert rebuild_csv_index(csv_path) == 4
+
+        # Extern angehängte Zeilen: nur der Rest wird gelesen
+        with open(csv_path, "a", encoding="utf-8") as f:
+            f.write("7,0,0.0,1.0,2.0\n7,1,1.0,1.0,2.0\n8,0,0.0,1.0,2.0\n")
+        assert next_pulse_id(csv_path) == 9
+        index = load_csv_index(csv_path)
+        assert list(index['pulse_id'][-2:]) == [7, 8] and list(index['rows'][-2:]) == [2, 1]
+
+        # CSV gekürzt (kürzer als indiziert): Index neu aufbauen
+        with open(csv_path, "r+b") as f:
+            f.truncate(int(reference['offset'][2]))
+        assert next_pulse_id(csv_path) == 3
+        assert list(load_csv_index(csv_path)['pulse_id']) == [1, 2]
+    print("✓ Index nachgetragen")
+    return True
+
+
+def test_reader_continues_ids():
+    """
+    Test: Eine zweite Messung in dieselbe CSV setzt die pulse_id über den Index fort.
+    """
+    print("\n=== Test: PicoReader mit CSV-Index ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=51)
+        reader = sim_reader(sim, tmpdir, run_name="idx", base_samples=1000, raw_storage=True,
+                            use_pipeline=True)
+        reader.start_measurement(n_pulses=2, save_csv=True, save_npz=False)
+        reader.start_measurement(n_pulses=2, save_csv=True, save_npz=False)
+
+        index = load_csv_index(reader.csv_path)
+        assert list(index['pulse_id']) == [1, 2, 3, 4]
+        assert np.all(index['rows'] == reader.n_samples)
+        assert np.all(np.isfinite(index['timestamp']))
+        data = np.loadtxt(io.BytesIO(read_pulse_rows(reader.csv_path, 4)), delimiter=",")
+        assert np.all(data[:, 0] == 4) and np.array_equal(data[:, 1], np.arange(reader.n_samples))
+    print("✓ pulse_id über den Index fortgesetzt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_index_on_append())
+    results.append(test_legacy_and_stale_index())
+    results.append(test_reader_continues_ids())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
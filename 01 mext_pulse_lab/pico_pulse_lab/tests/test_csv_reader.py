@@ -0,0 +1,141 @@
+"""
+Test-Funktionen für das Lesen von Puls-CSV-Dateien.
+
+Diese Tests überprüfen das Laden einzelner und mehrerer Pulse über den
+Index, Einkanal-Dateien und den LRU-Cache geladener Pulse.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis
+from pico_pulse_lab.storage import csv_reader
+from pico_pulse_lab.storage.csv_reader import (
+    clear_pulse_cache,
+    get_all_pulse_ids_csv,
+    load_pulse_csv,
+    load_pulses_csv,
+    read_csv_columns,
+)
+from pico_pulse_lab.storage.csv_writer import append_pulse_to_csv, append_raw_pulse_to_csv, ensure_csv
+
+
+def _raw_pulse(pulse_id, n=800, seed=0, adc_u=True):
+    """Zufälliger int16-Puls."""
+    rng = np.random.default_rng(seed)
+    adc = rng.integers(-32000, 32000, size=(2, n)).astype(np.int16)
+    return RawPulse(pulse_id, adc[0] if adc_u else None, adc[1], scale_u=1e-3, scale_i=2e-3,
+                    dt=1e-6, t0=1e-5)
+
+
+def test_load_many():
+    """
+    Test: Mehrere Pulse in einem Durchgang, Reihenfolge wie angefragt, Werte wie geschrieben.
+    """
+    print("\n=== Test: load_pulses_csv ===")
+
+    clear_pulse_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "run.csv")
+        ensure_csv(csv_path, "read", "A")
+        pulses = [_raw_pulse(k, seed=k) for k in range(1, 7)]
+        for pulse in pulses:
+            append_raw_pulse_to_csv(csv_path, pulse)
+
+        assert read_csv_columns(csv_path) == ['pulse_id', 'sample_idx', 'time_s', 'u_V', 'i_A']
+        assert get_all_pulse_ids_csv(csv_path) == [1, 2, 3, 4, 5, 6]
+        loaded = load_pulses_csv(csv_path, [5, 2, 3])
+        assert list(loaded) == [5, 2, 3]
+        for pid, (t, u, i) in loaded.items():
+            ref = pulses[pid - 1]
+            assert np.allclose(t, ref.t(), rtol=1e-8) and np.allclose(u, ref.u(), rtol=1e-8)
+            assert np.allclose(i, ref.i(), rtol=1e-8)
+        assert len(load_pulses_csv(csv_path)) == 6
+        try:
+            load_pulses_csv(csv_path, [1, 42])
+            assert False, "Fehlende ID muss KeyError auslösen"
+        except KeyError:
+            pass
+    print("✓ Mehrere Pulse geladen")
+    return True
+
+
+def test_single_channel():
+    """
+    Test: Ohne Kanal A ist u None, i kommt aus der Spalte i_V.
+    """
+    print("\n=== Test: load_pulse_csv (nur Kanal B) ===")
+
+    clear_pulse_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "run.csv")
+        ensure_csv(csv_path, "read", "V", channels="B")
+        pulse = _raw_pulse(1, adc_u=False)
+        append_raw_pulse_to_csv(csv_path, pulse)
+        t, u, i = load_pulse_csv(csv_path, 1)
+        assert u is None and np.allclose(i, pulse.i(), rtol=1e-8) and len(t) == 800
+    print("✓ Einkanal-CSV korrekt")
+    return True
+
+
+def test_lru_cache():
+    """
+    Test: Wiederholtes Laden kommt aus dem Cache; neu angehängte gleiche ID wird neu gelesen.
+    """
+    print("\n=== Test: LRU-Cache ===")
+
+    clear_pulse_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "run.csv")
+        ensure_csv(csv_path, "read", "A")
+        for k in range(1, csv_reader.PULSE_CACHE_SIZE + 3):
+            append_raw_pulse_to_csv(csv_path, _raw_pulse(k, n=100, seed=k))
+
+        first = load_pulse_csv(csv_path, 1)
+        assert load_pulse_csv(csv_path, 1)[1] is first[1], "Zweites Laden nicht aus dem Cache"
+        assert not first[1].flags.writeable, "Arrays im Cache müssen schreibgeschützt sein"
+        load_pulses_csv(csv_path, range(2, csv_reader.PULSE_CACHE_SIZE + 3))
+        assert len(csv_reader._PULSE_CACHE) == csv_reader.PULSE_CACHE_SIZE
+        assert load_pulse_csv(csv_path, 1)[1] is not first[1], "Ältester Eintrag nicht verdrängt"
+
+        # Gleiche ID erneut angehängt: letzter Eintrag gilt, Cache-Schlüssel ändert sich
+        axis = TimeAxis(0.0, 1e-6, 50)
+        append_pulse_to_csv(csv_path, axis, np.full(50, 3.0), np.full(50, 4.0), "A", 1)
+        t, u, i = load_pulse_csv(csv_path, 1)
+        assert len(t) == 50 and np.all(u == 3.0) and np.all(i == 4.0)
+    print("✓ LRU-Cache korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_load_many())
+    results.append(test_single_channel())
+    results.append(test_lru_cache())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+"""
+Test-Funktionen für den CSV-Schreibpfad.
+
+Diese Tests überprüfen, dass die spaltenweise Kodierung byte-identisch zu
+`np.savetxt` ist (float-, Rohdaten- und Einkanal-Pulse) und dass der
+CsvChunkWriter alle Blöcke in Reihenfolge schreibt.
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis
+from pico_pulse_lab.storage.csv_writer import (
+    CsvChunkWriter,
+    append_csv_with_id,
+    append_raw_pulse_to_csv,
+    encode_pulse_csv,
+    encode_raw_pulse_csv,
+    ensure_csv,
+)
+
+
+def _savetxt(pulse_id, t, *values):
+    """Referenz: bisheriger Schreibpfad über np.savetxt (Textmodus wie in der Datei)."""
+    n = len(t)
+    data = np.column_stack([np.full(n, pulse_id, dtype=np.int64), np.arange(n, dtype=np.int64),
+                            np.asarray(t, dtype=np.float64)] + list(values))
+    buf = io.StringIO(newline=None)
+    np.savetxt(buf, data, delimiter=",", fmt=["%d", "%d"] + ["%.9e"] * (1 + len(values)))
+    return buf.getvalue().replace("\n", os.linesep).encode()
+
+
+def _raw_pulse(pulse_id=7, n=5000, seed=0, t0=0.0):
+    """8-Bit-quantisierter Puls wie vom PicoScope (Vielfache von 256)."""
+    rng = np.random.default_rng(seed)
+    adc = (rng.integers(-127, 128, size=(2, n)) * 256).astype(np.int16)
+    return RawPulse(pulse_id, adc[0], adc[1], scale_u=2.0 / 32512 * 50, scale_i=1.0 / 32512 / 0.02,
+                    dt=5e-8, t0=t0, offset_u=0.01)
+
+
+def test_float_identical_to_savetxt():
+    """
+    Test: float-Pulse (TimeAxis und Array, ein/zwei Kanäle) wie np.savetxt kodiert.
+    """
+    print("\n=== Test: encode_pulse_csv == np.savetxt ===")
+
+    rng = np.random.default_rng(1)
+    n = 3000
+    axis = TimeAxis(0.0, 5e-8, n)
+    u = rng.normal(0, 3, n)
+    i = rng.normal(0, 0.1, n)
+    u[:4] = [0.0, -0.0, np.nan, 1e-300]  # Sonderwerte (np.unique fasst ±0 zusammen)
+
+    assert b"".join(encode_pulse_csv(axis, u, i, 12, chunk_rows=1000)) == _savetxt(12, axis, u, i)
+    t_arr = np.sort(rng.uniform(0, 1e-3, n))
+    assert b"".join(encode_pulse_csv(t_arr, None, i, 3)) == _savetxt(3, t_arr, i)
+    assert b"".join(encode_pulse_csv(axis[100:], u[100:], None, 4)) == _savetxt(4, axis[100:], u[100:])
+    print("✓ Byte-identisch zu np.savetxt")
+    return True
+
+
+def test_raw_identical_to_savetxt():
+    """
+    Test: RawPulse aus int16 kodiert wie adc * scale + offset über np.savetxt.
+    """
+    print("\n=== Test: encode_raw_pulse_csv == np.savetxt ===")
+
+    pulse = _raw_pulse()
+    ref = _savetxt(7, pulse.time_axis(), pulse.u(), pulse.i())
+    assert b"".join(encode_raw_pulse_csv(pulse, chunk_rows=777)) == ref
+
+    # Zugeschnittener Puls (t0 > 0), nur Kanal B
+    short = RawPulse(8, None, pulse.adc_i[100:900], scale_u=1.0, scale_i=pulse.scale_i,
+                     dt=pulse.dt, t0=100 * pulse.dt)
+    idx = np.arange(800)
+    assert b"".join(encode_raw_pulse_csv(short)) == _savetxt(8, idx * short.dt + short.t0, short.i())
+    print("✓ Rohdaten byte-identisch")
+    return True
+
+
+def test_chunk_writer():
+    """
+    Test: CsvChunkWriter schreibt alle Pulse in Reihenfolge wie der direkte Pfad.
+    """
+    print("\n=== Test: CsvChunkWriter ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        direct = os.path.join(tmpdir, "direct.csv")
+        threaded = os.path.join(tmpdir, "threaded.csv")
+        for path in (direct, threaded):
+            ensure_csv(path, "csv", "A")
+        with open(direct, "rb") as f_direct, open(threaded, "rb") as f_threaded:
+            header_direct, header_threaded = f_direct.read(), f_threaded.read()
+
+        pulses = [_raw_pulse(k, n=2000, seed=k) for k in range(1, 6)]
+        with CsvChunkWriter(threaded, max_pending=2) as writer:
+            for pulse in pulses:
+                append_raw_pulse_to_csv(threaded, pulse, chunk_samples=500, writer=writer)
+                append_csv_with_id(threaded, pulse.time_axis(), pulse.u(), pulse.i(), "A",
+                                   pulse.pulse_id + 10, writer=writer)
+            writer.flush()
+            assert writer.bytes_written == os.path.getsize(threaded) - len(header_threaded)
+        for pulse in pulses:
+            append_raw_pulse_to_csv(direct, pulse)
+            append_csv_with_id(direct, pulse.time_axis(), pulse.u(), pulse.i(), "A", pulse.pulse_id + 10)
+
+        with open(direct, "rb") as f_direct, open(threaded, "rb") as f_threaded:
+            assert f_direct.read()[len(header_direct):] == f_threaded.read()[len(header_threaded):]
+        try:
+            writer.write(b"x")
+            assert False, "Schreiben nach close() muss fehlschlagen"
+        except ValueError:
+            pass
+        try:
+            CsvChunkWriter(os.path.join(tmpdir, "missing.csv"))
+            assert False, "Fehlende Datei muss FileNotFoundError auslösen"
+        except FileNotFoundError:
+            pass
+    print("✓ Schreib-Thread korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_float_identical_to_savetxt())
+    results.append(test_raw_identical_to_savetxt())
+    results.append(test_chunk_writer())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,147 @@
+"""
+Test-Funktionen für den Memmap-Lauf-Speicher (.i16).
+
+Diese Tests überprüfen das Schreiben aus ctypes-Puffern, das blockweise
+Wachstum, Ansichten ohne Kopie und die Speicherung im PicoReader.
+"""
+
+import ctypes as ct
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.storage.memmap_store import HEADER_ALIGN, MemmapRunStore
+from sim_helpers import sim_reader
+
+
+def test_append_and_views():
+    """
+    Test: Pulse aus SDK-Puffern landen im (Pulse × Kanäle × Samples)-Array; Leser ohne Kopie.
+    """
+    print("\n=== Test: MemmapRunStore ===")
+
+    n = 1000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run", "run.i16")
+        store = MemmapRunStore.create(path, n_samples=n, channels="AB", dt=1e-6,
+                                      meta={'run_name': 'mm'}, grow_pulses=4)
+        record = store.record_dtype.itemsize
+        assert os.path.getsize(path) == HEADER_ALIGN + 4 * record, "Anfangskapazität falsch"
+
+        buf_a, buf_b = (ct.c_int16 * n)(), (ct.c_int16 * n)()
+        for k in range(10):
+            np.frombuffer(buf_a, dtype=np.int16)[:] = k
+            np.frombuffer(buf_b, dtype=np.int16)[:] = -k
+            store.append(buf_a, buf_b, pulse_id=k + 1, scaling=(1e-3, 2e-3), timestamp=float(k))
+        assert os.path.getsize(path) == HEADER_ALIGN + 12 * record, "Nicht blockweise gewachsen"
+        # Zugeschnittener Puls: nur n_valid Samples gültig
+        short = RawPulse(11, np.full(300, 7, np.int16), np.full(300, -7, np.int16),
+                         scale_u=1e-3, scale_i=2e-3, dt=1e-6, t0=2e-4, timestamp=10.0)
+        store.append_pulse(short)
+        store.close()
+        assert os.path.getsize(path) == HEADER_ALIGN + 11 * record, "Ungenutzte Kapazität nicht abgeschnitten"
+
+        with MemmapRunStore(path) as run:
+            assert len(run) == 11 and run.data.shape == (11, 2, n)
+            assert run.meta['run_name'] == 'mm' and run.channels == "AB"
+            assert np.shares_memory(run.channel("B"), run.data), "Kanal ist eine Kopie"
+            assert np.array_equal(run.channel("A")[:10, 0], np.arange(10))
+            assert np.array_equal(run.window(100, 110)[3], np.array([[3] * 10, [-3] * 10]))
+            assert list(run.pulse_ids) == list(range(1, 12)) and run.index_of(5) == 4
+
+            pulse = run.raw_pulse(run.index_of(11))
+            assert pulse.n_samples == 300 and pulse.t0 == 2e-4 and pulse.timestamp == 10.0
+            assert np.shares_memory(pulse.adc_u, run.data), "RawPulse kopiert die Daten"
+            assert np.allclose(pulse.i(), -7 * 2e-3)
+            try:
+                run.append(buf_a, buf_b, pulse_id=99)
+                assert False, "Schreiben im Lesemodus muss fehlschlagen"
+            except IOError:
+                pass
+    print("✓ Memmap-Speicher korrekt")
+    return True
+
+
+def test_reader_sees_appends():
+    """
+    Test: Ein Leser sieht neue Pulse eines laufenden Schreibers nach refresh().
+    """
+    print("\n=== Test: MemmapRunStore refresh ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.i16")
+        writer = MemmapRunStore.create(path, n_samples=100, channels="B", grow_pulses=2)
+        writer.append(None, np.arange(100, dtype=np.int16), pulse_id=1)
+        reader = MemmapRunStore(path)
+        assert len(reader) == 1
+        for pulse_id in (2, 3, 4):
+            writer.append(None, np.full(100, pulse_id, np.int16), pulse_id=pulse_id)
+        assert reader.refresh() == 4 and reader.channel("B")[3, 0] == 4
+        try:
+            reader.channel("A")
+            assert False, "Nicht gespeicherter Kanal muss KeyError auslösen"
+        except KeyError:
+            pass
+        reader.close()
+        writer.close()
+    print("✓ refresh korrekt")
+    return True
+
+
+def test_reader_memmap_format():
+    """
+    Test: PicoReader schreibt mit binary_format="memmap" alle Pulse in <run_name>.i16.
+    """
+    print("\n=== Test: PicoReader binary_format='memmap' ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=41)
+        reader = sim_reader(sim, tmpdir, run_name="mm", binary_format="memmap", use_pipeline=True)
+        pulses = []
+        reader.set_raw_callback(pulses.append)
+        reader.start_measurement(n_pulses=3, save_csv=False, save_npz=True)
+
+        with MemmapRunStore(reader.memmap_path) as run:
+            assert len(run) == 3 and run.data.shape == (3, 2, reader.n_samples)
+            assert run.meta['binary_format'] == "memmap" and np.isclose(run.dt, reader.dt)
+            for k, pulse in enumerate(pulses):
+                stored = run.raw_pulse(k)
+                assert stored.pulse_id == pulse.pulse_id
+                assert np.array_equal(stored.adc_u, pulse.adc_u) and np.allclose(stored.i(), pulse.i())
+    print("✓ Reader-Speicherung im Memmap korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_append_and_views())
+    results.append(test_reader_sees_appends())
+    results.append(test_reader_memmap_format())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
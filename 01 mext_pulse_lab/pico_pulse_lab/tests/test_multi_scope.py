@@ -0,0 +1,169 @@
+"""
+Test-Funktionen für den Multi-Scope-Manager.
+
+Diese Tests starten mehrere Worker-Prozesse mit je einem simulierten
+PS3000A und prüfen Run-Verzeichnisse, Seriennummern und die zeitliche
+Sortierung des zusammengeführten Ereignis-Stroms – ohne Picoscope.
+"""
+
+import os
+import queue
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.multi_scope import MultiScopeManager
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from sim_helpers import sim_settings
+
+
+SERIALS = ["SIM0001", "SIM0002/A"]
+
+
+def _start(tmpdir, n_pulses, **manager_kwargs):
+    """Konfiguriert zwei simulierte Scopes, misst und gibt (manager, events) zurück."""
+    manager = MultiScopeManager(SERIALS, backend_factory=SimulatedPS3000A, **manager_kwargs)
+    manager.configure("bench", per_scope={"SIM0002/A": {"range_b": "2V"}}, **sim_settings(tmpdir))
+    events = []
+    manager.set_event_callback(events.append)
+    manager.start(n_pulses=n_pulses, save_csv=True, save_npz=False)
+    assert manager.wait(timeout=30.0), "Worker nicht rechtzeitig fertig"
+    return manager, events
+
+
+def test_merged_event_feed():
+    """
+    Test: Pulse beider Scopes kommen vollständig und nach Zeit sortiert an,
+    jeder Scope speichert in sein eigenes Run-Verzeichnis.
+    """
+    print("\n=== Test: MultiScopeManager Ereignis-Strom ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager, events = _start(tmpdir, n_pulses=4, mp_context="fork")
+
+        assert len(events) == 8, f"{len(events)} statt 8 Ereignisse"
+        stamps = [ev.timestamp for ev in events]
+        assert stamps == sorted(stamps), "Ereignisse nicht nach Zeit sortiert"
+        for serial in SERIALS:
+            ids = [ev.pulse_id for ev in events if ev.serial == serial]
+            assert ids == [1, 2, 3, 4], f"pulse_ids von {serial} falsch: {ids}"
+
+        # Rohdaten über Prozessgrenze: int16 + Skalierung, Kanal B je Scope konfiguriert
+        scale_b = {ev.serial: ev.pulse.scale_i for ev in events}
+        assert np.isclose(scale_b["SIM0002/A"], 2 * scale_b["SIM0001"]), "per_scope nicht übernommen"
+        assert events[0].pulse.adc_u.dtype == np.int16
+
+        status = manager.get_status()
+        assert not status['is_running'] and status['emitted'] == 8 and status['pending'] == 0
+        for serial in SERIALS:
+            scope = status['scopes'][serial]
+            assert scope['pulse_count'] == 4 and scope['error'] is None
+            assert manager.results[serial]['meta']['device'].endswith(serial)
+            assert os.path.isfile(os.path.join(scope['run_dir'], os.path.basename(scope['run_dir']) + ".csv"))
+        assert manager.run_dirs["SIM0002/A"].endswith(os.path.join("bench", "bench_SIM0002-A"))
+    print("✓ Ereignis-Strom korrekt")
+    return True
+
+
+def test_worker_error_reported():
+    """
+    Test: Ein Scope, der sich nicht öffnen lässt, meldet den Fehler über wait().
+    """
+    print("\n=== Test: MultiScopeManager Fehler ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = MultiScopeManager(["SIM0001"], backend_factory=_wrong_serial, mp_context="fork",
+                                    forward_pulses=False)
+        manager.configure("bench", base_dir=tmpdir, range_a="2V", range_b="1V")
+        manager.start(n_pulses=1, save_csv=False, save_npz=False)
+        try:
+            manager.wait(timeout=30.0)
+            raise AssertionError("Fehler im Worker wurde nicht gemeldet")
+        except RuntimeError as e:
+            assert "SIM0001" in str(e)
+        assert manager.get_status()['scopes']['SIM0001']['error']
+    print("✓ Fehler gemeldet")
+    return True
+
+
+class _ExitedProcess:
+    """Ersatz für einen regulär beendeten Worker-Prozess."""
+
+    exitcode = 0
+
+    def is_alive(self):
+        return False
+
+
+class _LateQueue(queue.Queue):
+    """Queue, deren erster Abruf mit Zeitlimit leer ausgeht (Nachrichten noch unterwegs)."""
+
+    def __init__(self):
+        super().__init__()
+        self.first = True
+
+    def get(self, block=True, timeout=None):
+        if self.first and block:
+            self.first = False
+            raise queue.Empty
+        return super().get(block, timeout)
+
+
+def test_exited_worker_drained():
+    """
+    Test: Ist ein Worker schon beendet, während seine letzten Nachrichten noch
+    in der Queue liegen, gehen weder Pulse verloren noch wird ein Fehler gemeldet.
+    """
+    print("\n=== Test: MultiScopeManager beendeter Worker ===")
+
+    manager = MultiScopeManager(["SIM0001"], forward_pulses=False)
+    manager._processes = [_ExitedProcess()]
+    manager._queue = _LateQueue()
+    manager.received = {"SIM0001": 0}
+    for pulse_id in (1, 2):
+        manager._queue.put(("pulse", 0, 100.0 + pulse_id, pulse_id, None))
+    manager._queue.put(("done", 0, None, None, {'pulse_count': 2, 'meta': {}, 'error': None}))
+    manager._collect_loop()
+
+    events = [manager.events.get_nowait() for _ in range(manager.events.qsize())]
+    assert [ev.pulse_id for ev in events] == [1, 2], events
+    assert manager.results["SIM0001"]['error'] is None and manager.results["SIM0001"]['pulse_count'] == 2
+    print("✓ Letzte Nachrichten abgeholt")
+    return True
+
+
+def _wrong_serial(serial):
+    """Backend, dessen Gerät eine andere Seriennummer hat (OpenUnit -> NOT_FOUND)."""
+    return SimulatedPS3000A(serial="OTHER")
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_merged_event_feed())
+    results.append(test_worker_error_reported())
+    results.append(test_exited_worker_drained())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
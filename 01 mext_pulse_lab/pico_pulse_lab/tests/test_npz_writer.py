@@ -9,14 +9,18 @@ import numpy as np
 import os
 import tempfile
 import sys
+import zipfile
 
 # Pfad für Import hinzufügen
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis
 from pico_pulse_lab.storage.npz_writer import (
     save_pulse_npz,
     load_pulse_npz,
+    load_raw_pulse_npz,
     append_pulse_npz,
+    append_raw_pulse_npz,
     get_all_pulse_ids,
     load_meta_npz
 )
@@ -185,6 +189,101 @@ def test_npz_with_meta():
             return False
 
 
+def test_flat_schema_without_pickle():
+    """
+    Test: Flache Struktur ist ohne Pickle lesbar; Anhängen schreibt bestehende Member nicht neu.
+    """
+    print("\n=== Test: flache .npz Struktur ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_path = os.path.join(tmpdir, "flat.npz")
+        axis = TimeAxis(0.0, 1e-6, 1000)
+        u = np.sin(axis.to_array() * 1e4)
+        save_pulse_npz(npz_path, 1, axis, u, None, meta={'run_name': 'flat', 'fs': 1e6})
+        ino_before = os.stat(npz_path).st_ino
+        with zipfile.ZipFile(npz_path) as zf:
+            members_before = [(info.filename, info.header_offset, info.CRC) for info in zf.infolist()]
+
+        adc = np.arange(-500, 500, dtype=np.int16)
+        raw = RawPulse(2, adc, adc[::-1], scale_u=1e-3, scale_i=2e-3, dt=1e-6)
+        append_raw_pulse_npz(npz_path, raw)
+        with zipfile.ZipFile(npz_path) as zf:
+            members_after = [(info.filename, info.header_offset, info.CRC) for info in zf.infolist()]
+        assert os.stat(npz_path).st_ino == ino_before, "Datei neu geschrieben statt angehängt"
+        assert members_after[:len(members_before)] == members_before, "Bestehende Member verändert"
+
+        loaded = np.load(npz_path)  # allow_pickle=False
+        assert sorted(loaded.files) == ['meta', 'pulse_1/time_axis', 'pulse_1/u',
+                                        'pulse_2/adc_i', 'pulse_2/adc_u', 'pulse_2/scaling']
+        for name in loaded.files:
+            loaded[name]  # kein Objekt-Array
+
+        assert get_all_pulse_ids(npz_path) == [1, 2]
+        meta = load_meta_npz(npz_path)
+        assert meta['run_name'] == 'flat' and meta['pulse_count'] == 2
+        t, u_loaded, i_loaded = load_pulse_npz(npz_path, 1, time_axis=True)
+        assert t == axis and i_loaded is None and np.array_equal(u_loaded, u)
+        assert np.array_equal(load_raw_pulse_npz(npz_path, 2).adc_i, adc[::-1])
+
+        # Vorhandene ID: wird ersetzt, nicht doppelt gespeichert
+        append_pulse_npz(npz_path, 1, axis, None, u)
+        assert load_pulse_npz(npz_path, 1)[1] is None
+        assert len(np.load(npz_path).files) == 6
+    print("✓ Flache Struktur korrekt")
+    return True
+
+
+def test_mmap_uncompressed():
+    """
+    Test: Unkomprimierte Dateien liefern mit mmap_mode='r' np.memmap statt Kopien.
+    """
+    print("\n=== Test: mmap_mode ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_path = os.path.join(tmpdir, "mmap.npz")
+        t = np.linspace(0, 1e-3, 5000)
+        u, i = np.sin(t * 1e4), np.cos(t * 1e4)
+        save_pulse_npz(npz_path, 1, t, u, i, compressed=False)
+        append_pulse_npz(npz_path, 2, t, -u, -i)
+
+        t_map, u_map, i_map = load_pulse_npz(npz_path, 2, mmap_mode='r')
+        assert isinstance(u_map, np.memmap) and isinstance(t_map, np.memmap), "Nicht gemappt"
+        assert np.array_equal(u_map, -u) and np.array_equal(i_map, -i) and np.array_equal(t_map, t)
+        del t_map, u_map, i_map
+
+        # Komprimiert: mmap_mode wird ignoriert, Daten trotzdem korrekt
+        save_pulse_npz(npz_path, 1, t, u, i)
+        _, u_loaded, _ = load_pulse_npz(npz_path, 1, mmap_mode='r')
+        assert not isinstance(u_loaded, np.memmap) and np.array_equal(u_loaded, u)
+    print("✓ mmap korrekt")
+    return True
+
+
+def test_legacy_file():
+    """
+    Test: Alte Dateien (verschachteltes Dictionary) werden gelesen und beim Anhängen überführt.
+    """
+    print("\n=== Test: alte .npz Struktur ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_path = os.path.join(tmpdir, "legacy.npz")
+        t = np.linspace(0, 1e-3, 100)
+        pulses = {1: {'t': t, 'u': np.sin(t), 'i': np.cos(t)}}
+        np.savez_compressed(npz_path, pulses=pulses, meta={'run_name': 'legacy', 'pulse_count': 1})
+
+        assert get_all_pulse_ids(npz_path) == [1]
+        assert load_meta_npz(npz_path)['run_name'] == 'legacy'
+        assert np.array_equal(load_pulse_npz(npz_path, 1)[1], np.sin(t))
+
+        append_pulse_npz(npz_path, 2, t, np.sin(2 * t), np.cos(2 * t))
+        assert 'pulses' not in np.load(npz_path).files, "Nicht überführt"
+        assert get_all_pulse_ids(npz_path) == [1, 2]
+        assert load_meta_npz(npz_path)['npz_schema'] == "flat-1"
+        assert np.array_equal(load_pulse_npz(npz_path, 1)[2], np.cos(t))
+    print("✓ Alte Struktur gelesen und überführt")
+    return True
+
+
 def run_all_tests():
     """
     Führt alle Tests aus.
@@ -199,6 +298,9 @@ def run_all_tests():
     results.append(test_save_load_pulse_npz())
     results.append(test_append_pulse_npz())
     results.append(test_npz_with_meta())
+    results.append(test_flat_schema_without_pickle())
+    results.append(test_mmap_uncompressed())
+    results.append(test_legacy_file())
     
     print("\n=== Test-Zusammenfassung ===")
     passed = sum(results)
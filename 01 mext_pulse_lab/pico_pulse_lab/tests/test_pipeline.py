@@ -0,0 +1,146 @@
+"""
+Test-Funktionen für die Producer/Consumer-Pipeline.
+
+Diese Tests überprüfen Reihenfolge, Pufferwiederverwendung und die
+Backpressure-Strategien (block, drop_oldest, spill) ohne Picoscope.
+"""
+
+import numpy as np
+import os
+import sys
+import tempfile
+import threading
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pipeline import AcquisitionPipeline
+
+
+N_SAMPLES = 1000
+
+
+def _produce(pipe, n_pulses):
+    """Füllt n_pulses Pufferpaare mit ihrer laufenden Nummer, info = Nummer (wie ein Producer)."""
+    for k in range(n_pulses):
+        idx, buf_a, buf_b = pipe.acquire_buffers()
+        a = np.frombuffer(buf_a, dtype=np.int16)
+        b = np.frombuffer(buf_b, dtype=np.int16)
+        a[:] = k
+        b[:] = -k
+        pipe.submit(idx, N_SAMPLES, 0, info=k)
+
+
+def test_pipeline_block_keeps_all_pulses():
+    """
+    Test: Im Modus "block" kommen alle Pulse in Erfassungsreihenfolge an.
+    """
+    print("\n=== Test: pipeline block ===")
+
+    seen = []
+
+    def consumer(buf_a, buf_b, n_values, overflow, info):
+        a = np.frombuffer(buf_a, dtype=np.int16, count=n_values)
+        b = np.frombuffer(buf_b, dtype=np.int16, count=n_values)
+        assert np.all(a == a[0]) and np.all(b == -a[0]), "Puffer wurde während Verarbeitung überschrieben"
+        assert info == a[0], "info gehört nicht zum Puffer"
+        seen.append(int(a[0]))
+
+    pipe = AcquisitionPipeline(N_SAMPLES, consumer, queue_size=2, backpressure="block")
+    pipe.start()
+    _produce(pipe, 20)
+    pipe.close()
+
+    assert seen == list(range(20)), f"Reihenfolge stimmt nicht: {seen}"
+    assert pipe.dropped == 0 and pipe.spilled == 0, "Im block-Modus darf nichts verworfen werden"
+    print(f"✓ {len(seen)} Pulse verarbeitet, max. Tiefe {pipe.max_depth}")
+    return True
+
+
+def test_pipeline_drop_oldest():
+    """
+    Test: Im Modus "drop_oldest" blockiert der Producer nie, alte Pulse fallen weg.
+    """
+    print("\n=== Test: pipeline drop_oldest ===")
+
+    gate = threading.Event()
+    seen = []
+
+    def consumer(buf_a, buf_b, n_values, overflow, info):
+        gate.wait()  # Consumer hängt, bis der Producer fertig ist
+        seen.append(int(np.frombuffer(buf_a, dtype=np.int16, count=1)[0]))
+        assert info == seen[-1], "info nach Verwerfen verschoben"
+
+    pipe = AcquisitionPipeline(N_SAMPLES, consumer, queue_size=3, backpressure="drop_oldest")
+    pipe.start()
+    _produce(pipe, 20)
+    gate.set()
+    pipe.close()
+
+    assert pipe.dropped > 0, "Es hätten Pulse verworfen werden müssen"
+    assert len(seen) + pipe.dropped == 20, "Verarbeitete + verworfene Pulse ergeben nicht die Gesamtzahl"
+    assert seen == sorted(seen), f"Reihenfolge stimmt nicht: {seen}"
+    assert seen[-1] == 19, "Der neueste Puls muss erhalten bleiben"
+    print(f"✓ verarbeitet={len(seen)}, verworfen={pipe.dropped}")
+    return True
+
+
+def test_pipeline_spill_to_disk():
+    """
+    Test: Im Modus "spill" gehen keine Pulse verloren, ausgelagerte Dateien werden aufgeräumt.
+    """
+    print("\n=== Test: pipeline spill ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gate = threading.Event()
+        seen = []
+
+        def consumer(buf_a, buf_b, n_values, overflow, info):
+            gate.wait()
+            a = np.frombuffer(buf_a, dtype=np.int16, count=n_values)
+            b = np.frombuffer(buf_b, dtype=np.int16, count=n_values)
+            assert np.all(b == -a), "Ausgelagerte Daten stimmen nicht"
+            assert info == a[0], "info des ausgelagerten Pulses fehlt"
+            seen.append(int(a[0]))
+
+        spill_dir = os.path.join(tmpdir, "spill")
+        pipe = AcquisitionPipeline(N_SAMPLES, consumer, queue_size=2,
+                                   backpressure="spill", spill_dir=spill_dir)
+        pipe.start()
+        _produce(pipe, 15)
+        assert pipe.spilled > 0, "Es hätten Pulse ausgelagert werden müssen"
+        gate.set()
+        pipe.close()
+
+        assert seen == list(range(15)), f"Reihenfolge/Vollständigkeit stimmt nicht: {seen}"
+        assert os.listdir(spill_dir) == [], "Spill-Dateien wurden nicht gelöscht"
+        print(f"✓ {len(seen)} Pulse verarbeitet, davon {pipe.spilled} ausgelagert")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_pipeline_block_keeps_all_pulses())
+    results.append(test_pipeline_drop_oldest())
+    results.append(test_pipeline_spill_to_disk())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
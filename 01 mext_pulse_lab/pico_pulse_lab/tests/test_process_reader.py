@@ -0,0 +1,140 @@
+"""
+Test-Funktionen für die Erfassung im Kind-Prozess.
+
+Diese Tests starten den PicoReader mit simuliertem PS3000A in einem
+eigenen Prozess und prüfen den Shared-Memory-Ring: Pulse ohne Kopie,
+Freigabe der Slots und Verwerfen bei vollem Ring – ohne Picoscope.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.process_reader import ProcessReader, PulseRing
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from sim_helpers import sim_settings
+
+
+def _measure(tmpdir, n_pulses, callback, n_slots):
+    """Misst n_pulses im Kind-Prozess (fork) und gibt den Reader zurück."""
+    reader = ProcessReader(backend_factory=SimulatedPS3000A, n_slots=n_slots, mp_context="fork")
+    reader.configure(run_name="proc", **sim_settings(tmpdir, preview_points=100))
+    reader.set_raw_callback(callback)
+    previews = []
+    reader.set_preview_callback(lambda *args: previews.append(args[0]))
+    reader.start_measurement(n_pulses=n_pulses, save_csv=True, save_npz=False)
+    return reader, previews
+
+
+def test_ring_lease():
+    """
+    Test: Ansichten zeigen ohne Kopie in den Ring, Freigabe erst mit der letzten Ansicht.
+    """
+    print("\n=== Test: PulseRing ===")
+
+    ring = PulseRing(2, 100)
+    other = PulseRing(2, 100, name=ring.name)
+    try:
+        ring.write(1, np.arange(10, dtype=np.int16), -np.arange(10, dtype=np.int16))
+        released = []
+        adc_u, adc_i = other.lease(1, 10, lambda: released.append(1))
+        assert adc_i[3] == -3 and np.shares_memory(adc_u, other.array), "Ansicht ist Kopie"
+
+        part = adc_u[5:]
+        del adc_u, adc_i
+        gc.collect()
+        assert not released, "Slot trotz Teil-Ansicht freigegeben"
+        del part
+        gc.collect()
+        assert released == [1], "Slot nicht freigegeben"
+
+        try:
+            ring.write(0, np.zeros(101, dtype=np.int16), np.zeros(101, dtype=np.int16))
+            raise AssertionError("Zu langer Puls nicht erkannt")
+        except ValueError:
+            pass
+    finally:
+        other.close()
+        ring.close(unlink=True)
+    print("✓ Ring korrekt")
+    return True
+
+
+def test_process_reader():
+    """
+    Test: Pulse kommen vollständig aus dem Kind-Prozess, gespeichert wird im Kind.
+    """
+    print("\n=== Test: ProcessReader ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        seen = []
+
+        def on_pulse(pulse):
+            assert pulse.adc_u.base is not None, "Puls wurde kopiert"
+            seen.append((pulse.pulse_id, pulse.n_samples, pulse.adc_u.min(), pulse.scale_i))
+
+        reader, previews = _measure(tmpdir, 4, on_pulse, n_slots=2)
+        status = reader.get_status()
+        assert [s[0] for s in seen] == [1, 2, 3, 4], f"pulse_ids falsch: {seen}"
+        assert all(n == 2400 for _, n, _, _ in seen) and seen[0][2] < -10000
+        assert previews == [1, 2, 3, 4], "Vorschau nicht weitergeleitet"
+        assert status['pulse_count'] == 4 and status['dropped'] == 0 and not status['is_running']
+        assert reader.meta['pulses_captured'] == 4 and reader.error is None
+        data = np.loadtxt(os.path.join(tmpdir, "proc", "proc.csv"), delimiter=",", comments="#", skiprows=1)
+        assert len(data) == 4 * 2400, "CSV im Kind nicht geschrieben"
+        reader.close()
+    print("✓ ProcessReader korrekt")
+    return True
+
+
+def test_full_ring_drops():
+    """
+    Test: Hält der Eltern-Prozess alle Slots, werden weitere Pulse nur verworfen.
+    """
+    print("\n=== Test: ProcessReader voller Ring ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        held = []
+        reader, _ = _measure(tmpdir, 4, held.append, n_slots=2)
+        assert [p.pulse_id for p in held] == [1, 2] and reader.dropped == 2, reader.get_status()
+        assert reader.meta['pulses_captured'] == 4, "Verworfene Pulse fehlen in der Messung"
+        # Gehaltene Pulse bleiben nach dem Ende lesbar
+        assert held[1].adc_u.min() < -10000
+        reader.close()
+        assert held[0].u().size == 2400
+    print("✓ Voller Ring korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_ring_lease())
+    results.append(test_process_reader())
+    results.append(test_full_ring_drops())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,151 @@
+"""
+Test-Funktionen für den int16-Puls-Codec (Delta + Byte-Shuffle + Kompression).
+
+Diese Tests überprüfen die verlustfreie Rundreise für alle Codecs und
+Varianten (inkl. Überlauf der Deltas und Einkanal-Pulse), das Erkennen
+beschädigter Blöcke, Block-Dateien und den Vergleich mit savez_compressed.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+from pico_pulse_lab.storage.pulse_codec import (
+    CODECS,
+    append_pulse_chunks,
+    benchmark_codecs,
+    decode_pulse,
+    discharge_pulses,
+    encode_pulse,
+    iter_pulse_chunks,
+)
+
+
+def _assert_same(decoded, pulse):
+    """Rohwerte und Skalierung identisch."""
+    for name in ('adc_u', 'adc_i'):
+        a, b = getattr(decoded, name), getattr(pulse, name)
+        assert (a is None) == (b is None), name
+        assert a is None or (a.dtype == np.int16 and np.array_equal(a, b)), name
+    assert decoded.scaling_meta() == pulse.scaling_meta()
+    assert decoded.pulse_id == pulse.pulse_id and decoded.timestamp == pulse.timestamp
+
+
+def test_roundtrip():
+    """
+    Test: Jeder Codec und jede Variante gibt die int16-Werte exakt zurück.
+    """
+    print("\n=== Test: Rundreise encode/decode ===")
+
+    rng = np.random.default_rng(3)
+    n = 5000
+    extreme = rng.choice(np.array([-32768, 32767, 0], dtype=np.int16), n)  # Deltas laufen über
+    pulses = [
+        discharge_pulses(n_pulses=1, n_samples=n)[0],
+        RawPulse(7, extreme, rng.integers(-32768, 32768, n).astype(np.int16), scale_u=1e-3,
+                 scale_i=2e-3, dt=1e-6, offset_u=0.5, t0=-1e-4, i_unit="V", timestamp=123.5),
+        RawPulse(8, None, extreme, scale_u=1.0, scale_i=0.1, dt=1e-6),
+        RawPulse(9, np.zeros(0, dtype=np.int16), None, scale_u=1.0, scale_i=1.0, dt=1e-6),
+    ]
+    for pulse in pulses:
+        for codec in CODECS:
+            for shuffle in (True, False):
+                for delta in (True, False):
+                    chunk = encode_pulse(pulse, codec=codec, shuffle=shuffle, delta=delta)
+                    _assert_same(decode_pulse(chunk), pulse)
+    try:
+        encode_pulse(pulses[0], codec="zstd")
+        assert False, "Unbekannter Codec muss ValueError auslösen"
+    except ValueError:
+        pass
+    try:
+        encode_pulse(pulses[0], codec="bz2", level=0)
+        assert False, "Ungültige Stufe muss ValueError auslösen"
+    except ValueError:
+        pass
+    print(f"✓ Verlustfrei für {len(CODECS)} Codecs")
+    return True
+
+
+def test_corrupt_and_files():
+    """
+    Test: Beschädigte Blöcke werden erkannt; Block-Dateien lesen alle Pulse, unvollständiger Rest wird ignoriert.
+    """
+    print("\n=== Test: Prüfsumme und Block-Datei ===")
+
+    pulses = discharge_pulses(n_pulses=3, n_samples=3000, seed=4)
+    chunk = bytearray(encode_pulse(pulses[0], codec="none"))
+    chunk[-100] ^= 0x01
+    for bad in (bytes(chunk), b"XXXX" + bytes(chunk[4:]), bytes(chunk[:20])):
+        try:
+            decode_pulse(bad)
+            assert False, "Beschädigter Block muss ValueError auslösen"
+        except ValueError:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run", "run.pzc")
+        nbytes = append_pulse_chunks(path, pulses[:2], codec="lzma", level=1)
+        nbytes += append_pulse_chunks(path, pulses[2:])
+        assert nbytes == os.path.getsize(path)
+        with open(path, "ab") as f:
+            f.write(encode_pulse(pulses[0])[:50])  # abgebrochener Schreibvorgang
+        loaded = list(iter_pulse_chunks(path))
+        assert len(loaded) == 3
+        for decoded, pulse in zip(loaded, pulses):
+            _assert_same(decoded, pulse)
+            assert np.array_equal(decoded.u(), pulse.u())
+    print("✓ Beschädigte Blöcke erkannt, Block-Datei gelesen")
+    return True
+
+
+def test_benchmark():
+    """
+    Test: Vergleich mit savez_compressed – der Codec komprimiert Entladepulse stärker.
+    """
+    print("\n=== Test: benchmark_codecs ===")
+
+    pulses = discharge_pulses(n_pulses=2, n_samples=20000, seed=5)
+    results = benchmark_codecs(pulses, settings=[("zlib", 1, True), ("zlib", 6, True)], repeat=1)
+    by_name = {row['name']: row for row in results}
+    assert list(by_name) == ["savez_compressed", "zlib-1+shuffle", "zlib-6+shuffle"]
+    for row in results:
+        assert row['bytes'] > 0 and row['encode_ms'] > 0 and row['decode_ms'] > 0
+    assert by_name["zlib-6+shuffle"]['ratio'] > by_name["savez_compressed"]['ratio']
+    print(f"✓ Verhältnis savez {by_name['savez_compressed']['ratio']:.1f}, "
+          f"zlib-6+shuffle {by_name['zlib-6+shuffle']['ratio']:.1f}")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_roundtrip())
+    results.append(test_corrupt_and_files())
+    results.append(test_benchmark())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,162 @@
+"""
+Test-Funktionen für die Ablaufsteuerung Scope + STM32.
+
+Diese Tests prüfen die Trigger-Auswertung und den Ablauf "armieren, dann
+feuern" mit simuliertem PS3000A und einem Ersatz für `NucleoUART`.
+"""
+
+import os
+import sys
+import tempfile
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.picoscope_reader import PicoReader
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.control.pulse_controller import PulseController, classify_triggers
+from sim_helpers import sim_settings
+
+
+class _FakeNucleo:
+    """Ersatz für NucleoUART: merkt sich Kommandos und ob der Scope beim START armiert war."""
+
+    def __init__(self, reader, period_ms=10):
+        self.reader = reader
+        self.periods = {1: 50, 2: period_ms}
+        self.calls = []
+        self.armed_at_start = None
+
+    def set_timer(self, timer, period):
+        self.periods[timer] = period
+        self.calls.append(("set", timer, period))
+
+    def readback(self, timer):
+        self.calls.append(("readback", timer))
+        return self.periods[timer], 0
+
+    def start_sequence(self, pulse_count, timer_for_cmd=1):
+        self.armed_at_start = self.reader.wait_armed(0)
+        self.calls.append(("start", pulse_count))
+
+    def stop_timer(self, *, hard=False, timer_for_cmd=1):
+        self.calls.append(("stop", self.reader.is_running))
+
+
+def _run(tmpdir, transfer_latency_s, n_pulses, trigger_interval_s=0.01, **run_kwargs):
+    """Pulsfolge mit Simulator (Trigger standardmäßig alle 10 ms) und Ersatz-STM32."""
+    sim = SimulatedPS3000A(trigger_interval_s=trigger_interval_s, jitter_s=0.0,
+                           transfer_latency_s=transfer_latency_s, seed=5)
+    reader = PicoReader(backend=sim)
+    nuc = _FakeNucleo(reader)
+    ctrl = PulseController(reader, nuc, finish_margin_s=0.5)
+    ctrl.configure("ctrl", **sim_settings(tmpdir))
+    report = ctrl.run(n_pulses, save_csv=False, save_npz=False, **run_kwargs)
+    return report, nuc, reader
+
+
+def test_classify_triggers():
+    """
+    Test: Abstände im T2-Raster ergeben zusätzliche und übersprungene Trigger.
+    """
+    print("\n=== Test: classify_triggers ===")
+
+    regular = classify_triggers([0.0, 0.1, 0.2, 0.3], period_s=0.1, expected=4)
+    assert regular['missed'] == 0 and regular['extra'] == 0 and regular['skipped'] == 0
+    assert abs(regular['interval_ms']['mean'] - 100.0) < 1e-6
+
+    # Lücke (0.1 -> 0.3) und Störimpuls (0.302)
+    report = classify_triggers([0.0, 0.1, 0.3, 0.302, 0.4], period_s=0.1, expected=6)
+    assert report['skipped'] == 1 and report['extra'] == 1, report
+    assert report['missed'] == 2, "Fehlende Pulse inkl. Ende falsch"
+
+    # Trigger vor START und nach Ende der Folge zählen nicht
+    window = classify_triggers([0.95, 1.01, 1.11, 1.21, 1.5], period_s=0.1, expected=3, t_fire=1.0)
+    assert window['extra'] == 2 and window['missed'] == 0 and window['skipped'] == 0, window
+
+    empty = classify_triggers([], period_s=0.1, expected=3)
+    assert empty['missed'] == 3 and empty['interval_ms'] is None
+    print("✓ Trigger-Auswertung korrekt")
+    return True
+
+
+def test_armed_then_fire():
+    """
+    Test: START geht erst an den STM32, wenn der Scope armiert ist; alle Pulse erfasst.
+    """
+    print("\n=== Test: PulseController Ablauf ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report, nuc, reader = _run(tmpdir, transfer_latency_s=1e-3, n_pulses=5, period_ms=10)
+        assert nuc.calls == [("set", 2, 10), ("start", 5)], nuc.calls
+        assert nuc.armed_at_start, "START vor dem Armieren gesendet"
+        assert report['captured'] == 5 and report['missed'] == 0 and report['extra'] == 0, report
+        assert report['period_ok'] and report['dead_time_ms'] < 10
+        assert 50 < report['rate_hz'] < 200, f"Pulsrate {report['rate_hz']} statt ~100 Hz"
+        assert reader.use_pipeline, "Pipeline nicht aktiviert"
+    print("✓ Ablauf korrekt")
+    return True
+
+
+def test_missed_triggers():
+    """
+    Test: Ist die Totzeit länger als T2, werden fehlende Trigger gemeldet.
+    """
+    print("\n=== Test: PulseController fehlende Trigger ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # T2 per READBACK (10 ms), Transfer 15 ms -> jeder zweite Puls fällt in die Totzeit;
+        # der Simulator triggert nach der Folge weiter (zählt als zusätzlich)
+        report, nuc, _ = _run(tmpdir, transfer_latency_s=15e-3, n_pulses=6)
+        assert ("readback", 2) in nuc.calls
+        assert report['skipped'] >= 1 and report['missed'] >= 2, report
+        assert report['captured'] - report['extra'] + report['missed'] == 6
+        assert not report['period_ok'] and report['dead_time_ms'] >= 10
+    print("✓ Fehlende Trigger gemeldet")
+    return True
+
+
+def test_deadline_stops_stm32_first():
+    """
+    Test: Kommen die Trigger nicht bis zur Frist, wird der STM32 vor der Erfassung gestoppt.
+    """
+    print("\n=== Test: PulseController Frist abgelaufen ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report, nuc, reader = _run(tmpdir, transfer_latency_s=1e-3, n_pulses=3,
+                                   trigger_interval_s=5.0, period_ms=10)
+        assert ("stop", True) in nuc.calls, f"STM32 nicht vor reader.stop() gestoppt: {nuc.calls}"
+        assert nuc.calls.index(("start", 3)) < nuc.calls.index(("stop", True))
+        assert report['captured'] == 0 and report['missed'] == 3, report
+        assert reader.meta['aborted'] and not reader.is_running
+    print("✓ STM32 vor der Erfassung gestoppt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_classify_triggers())
+    results.append(test_armed_then_fire())
+    results.append(test_missed_triggers())
+    results.append(test_deadline_stops_stm32_first())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,214 @@
+"""
+Test-Funktionen für RawPulse (int16-Rohdaten mit verzögerter Umrechnung).
+
+Diese Tests überprüfen Skalierung, dtype-Cache und das Speichern von
+Rohdaten-Pulsen in .npz und CSV.
+"""
+
+import numpy as np
+import os
+import sys
+import tempfile
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis, aggregate_min_max
+from pico_pulse_lab.processing.cap_params import estimate_cap_params
+from pico_pulse_lab.storage.npz_writer import (
+    save_pulse_npz,
+    append_raw_pulse_npz,
+    load_pulse_npz,
+    load_raw_pulse_npz,
+    get_all_pulse_ids
+)
+from pico_pulse_lab.storage.csv_writer import ensure_csv, append_raw_pulse_to_csv, append_pulse_to_csv
+
+
+def _make_pulse(pulse_id=1, n=1000):
+    adc_u = np.linspace(-32000, 32000, n).astype(np.int16)
+    adc_i = (adc_u // 2).astype(np.int16)
+    return RawPulse(pulse_id, adc_u, adc_i, scale_u=1e-3, scale_i=2e-4,
+                    dt=5e-8, offset_i=0.01)
+
+
+def test_raw_pulse_scaling():
+    """
+    Test: Umrechnung in float32/float64 stimmt mit adc * scale + offset überein.
+    """
+    print("\n=== Test: RawPulse Skalierung ===")
+
+    pulse = _make_pulse()
+    u64 = pulse.u()
+    u32 = pulse.u(np.float32)
+    i64 = pulse.i()
+
+    assert u64.dtype == np.float64 and u32.dtype == np.float32, "Falscher dtype"
+    assert np.allclose(u64, pulse.adc_u * 1e-3), "Spannung falsch skaliert"
+    assert np.allclose(u32, u64, rtol=1e-6), "float32 weicht zu stark ab"
+    assert np.allclose(i64, pulse.adc_i * 2e-4 + 0.01), "Strom falsch skaliert"
+    assert pulse.u() is u64, "Umrechnung wurde nicht gecacht"
+    assert np.isclose(pulse.t()[-1], 999 * 5e-8), "Zeitvektor falsch"
+    assert pulse.nbytes == 4000, "Rohdaten sind nicht int16"
+
+    pulse.release_cache()
+    assert pulse.u() is not u64, "Cache wurde nicht verworfen"
+    print("✓ Skalierung und Cache korrekt")
+    return True
+
+
+def test_raw_pulse_from_values():
+    """
+    Test: Quantisierung von float-Werten mit Begrenzung auf den int16-Bereich.
+    """
+    print("\n=== Test: RawPulse.from_values ===")
+
+    u = np.array([0.0, 1.0, -1.0, 100.0])
+    i = np.array([0.0, 0.5, -0.5, 0.25])
+    pulse = RawPulse.from_values(7, u, i, scale_u=1e-3, scale_i=1e-3, dt=1e-6)
+
+    assert pulse.adc_u.dtype == np.int16
+    assert pulse.adc_u[-1] == np.iinfo(np.int16).max, "Werte nicht begrenzt"
+    assert np.allclose(pulse.u()[:3], u[:3], atol=1e-3), "Quantisierung ungenau"
+    assert np.allclose(pulse.i(), i, atol=1e-3), "Quantisierung ungenau"
+    print("✓ Quantisierung korrekt")
+    return True
+
+
+def test_raw_pulse_npz_roundtrip():
+    """
+    Test: Rohdaten-Pulse werden int16 gespeichert und beim Laden umgerechnet.
+    """
+    print("\n=== Test: RawPulse .npz ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_path = os.path.join(tmpdir, "raw.npz")
+        p1 = _make_pulse(1)
+        p2 = _make_pulse(2)
+        # Datei wie im Reader zuerst mit Meta-Puls 0 anlegen
+        save_pulse_npz(npz_path, 0, np.zeros(1), np.zeros(1), np.zeros(1), meta={'run_name': 'raw'})
+        append_raw_pulse_npz(npz_path, p1)
+        append_raw_pulse_npz(npz_path, p2)
+
+        assert get_all_pulse_ids(npz_path) == [0, 1, 2], "Pulse-IDs falsch"
+
+        t, u, i = load_pulse_npz(npz_path, 2)
+        assert np.allclose(u, p2.u()) and np.allclose(i, p2.i()), "Umrechnung beim Laden falsch"
+        assert np.allclose(t, p2.t()), "Zeitvektor beim Laden falsch"
+
+        raw = load_raw_pulse_npz(npz_path, 1)
+        assert raw.adc_u.dtype == np.int16, "Rohdaten nicht als int16 geladen"
+        assert np.array_equal(raw.adc_i, p1.adc_i), "Rohdaten verändert"
+    print("✓ Roundtrip korrekt")
+    return True
+
+
+def test_raw_pulse_csv():
+    """
+    Test: Blockweises CSV-Schreiben liefert dieselben Werte wie die Umrechnung.
+    """
+    print("\n=== Test: RawPulse CSV ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "raw.csv")
+        ensure_csv(csv_path, "raw", "A")
+        pulse = _make_pulse(3, n=250)
+        append_raw_pulse_to_csv(csv_path, pulse, chunk_samples=64)
+
+        data = np.loadtxt(csv_path, delimiter=",", comments="#", skiprows=1)
+        assert data.shape == (250, 5), f"Falsche Form: {data.shape}"
+        assert np.all(data[:, 0] == 3), "pulse_id falsch"
+        assert np.array_equal(data[:, 1], np.arange(250)), "sample_idx falsch"
+        assert np.allclose(data[:, 3], pulse.u(), rtol=1e-8), "Spannung falsch"
+        assert np.allclose(data[:, 4], pulse.i(), rtol=1e-8), "Strom falsch"
+    print("✓ CSV korrekt")
+    return True
+
+
+def test_aggregate_min_max():
+    """
+    Test: Software-Aggregat liefert Min/Max je Bin inkl. kürzerem letzten Bin.
+    """
+    print("\n=== Test: aggregate_min_max ===")
+
+    x = np.array([3, -1, 4, 1, -5, 9, 2], dtype=np.int16)
+    a_min, a_max = aggregate_min_max(x, 3)
+    assert a_min.dtype == np.int16, "dtype verändert"
+    assert list(a_min) == [-1, -5, 2] and list(a_max) == [4, 9, 2], "Min/Max falsch"
+
+    a_min, a_max = aggregate_min_max(x, 100)
+    assert list(a_min) == [-5] and list(a_max) == [9], "Ein Bin über alles falsch"
+    print("✓ Aggregat korrekt")
+    return True
+
+
+def test_time_axis():
+    """
+    Test: TimeAxis ersetzt das Zeit-Array in Callbacks, Parameter-Berechnung und Speicherung.
+    """
+    print("\n=== Test: TimeAxis ===")
+
+    axis = TimeAxis(1e-6, 5e-8, 1000)
+    t = axis.to_array()
+    assert np.allclose(np.asarray(axis), t) and len(axis) == 1000
+    assert np.isclose(axis[-1], t[-1]) and np.isclose(axis[10], t[10])
+    assert axis[:100] == TimeAxis(1e-6, 5e-8, 100), "Slice falsch"
+    assert np.allclose(axis[10:50:4].to_array(), t[10:50:4]), "Slice mit Schrittweite falsch"
+    detected = TimeAxis.from_array(t)
+    assert detected.n == 1000 and np.isclose(detected.dt, 5e-8) and np.isclose(detected.t0, 1e-6)
+
+    # Parameter-Berechnung: gleiches Ergebnis wie mit Array
+    tau = 1e-5
+    u = 10.0 * np.exp(-(t - t[0]) / tau)
+    i = np.gradient(u, t) * -1e-6
+    assert np.allclose(estimate_cap_params(axis, u, i), estimate_cap_params(t, u, i))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # .npz: nur [t0, dt] statt n float64-Werten
+        npz_path = os.path.join(tmpdir, "axis.npz")
+        save_pulse_npz(npz_path, 1, axis, u, i)
+        t_loaded, u_loaded, _ = load_pulse_npz(npz_path, 1)
+        assert np.allclose(t_loaded, t) and np.allclose(u_loaded, u)
+        assert load_pulse_npz(npz_path, 1, time_axis=True)[0] == axis
+        loaded = np.load(npz_path)
+        assert 'pulse_1/t' not in loaded and loaded['pulse_1/time_axis'].size == 2, "Zeit-Array gespeichert"
+
+        # CSV: Zeitspalte wird aus der Achse erzeugt
+        csv_path = os.path.join(tmpdir, "axis.csv")
+        ensure_csv(csv_path, "axis", "A")
+        append_pulse_to_csv(csv_path, axis, u, i, "A", 1)
+        data = np.loadtxt(csv_path, delimiter=",", comments="#")
+        assert np.allclose(data[:, 2], t, rtol=1e-8), "Zeitspalte falsch"
+    print("✓ TimeAxis korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_raw_pulse_scaling())
+    results.append(test_raw_pulse_from_values())
+    results.append(test_raw_pulse_npz_roundtrip())
+    results.append(test_raw_pulse_csv())
+    results.append(test_aggregate_min_max())
+    results.append(test_time_axis())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
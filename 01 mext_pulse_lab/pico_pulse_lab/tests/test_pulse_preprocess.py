@@ -0,0 +1,132 @@
+"""
+Test-Funktionen für das Zuschneiden von Pulsen auf den aktiven Bereich.
+
+Diese Tests überprüfen die Erkennung des Pulsendes über |i| und |du/dt|,
+den Versatz in t0 und das Zuschneiden im PicoReader (mit Simulator).
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.processing.pulse_preprocess import find_active_region, trim_pulse
+from sim_helpers import sim_reader
+
+
+def _rc_pulse(n=100_000, pre=20_000, tau=2_000, noise=200, seed=0):
+    """RC-Entladung ab Sample pre, 8-Bit-quantisiert mit Rauschen (int16)."""
+    rng = np.random.default_rng(seed)
+    k = np.arange(n)
+    shape = np.where(k >= pre, np.exp(-(k - pre) / tau), 0.0)
+    adc_u = np.round((-16000 * shape + rng.normal(0, noise, n)) / 256) * 256
+    adc_i = np.round((-20000 * shape + rng.normal(0, noise, n)) / 256) * 256
+    return RawPulse(5, adc_u.astype(np.int16), adc_i.astype(np.int16),
+                    scale_u=1e-3, scale_i=1e-2, dt=1e-7, timestamp=123.0)
+
+
+def test_find_active_region():
+    """
+    Test: Aktiver Bereich beginnt am Trigger und endet, wenn |i| im Rauschen bzw. unter 1 % fällt.
+    """
+    print("\n=== Test: find_active_region ===")
+
+    pulse = _rc_pulse()
+    start, stop = find_active_region(pulse.adc_u, pulse.adc_i, pre_samples=20_000)
+    assert abs(start - 20_000) <= 64, f"Start {start} nicht am Trigger"
+    # Ende, wenn |i| im Grundlinienrauschen (3 LSB = 768) verschwindet: ~ tau * ln(20000 / 1536)
+    assert 20_000 + 2 * 2_000 < stop < 20_000 + 4 * 2_000, f"Ende {stop} falsch"
+
+    # Ohne Rauschen greift der relative Schwellwert (|i| > 1 % bis ~29210, |du/dt| ggf. länger)
+    quiet = _rc_pulse(noise=0)
+    _, stop = find_active_region(quiet.adc_u, quiet.adc_i, pre_samples=20_000)
+    assert 20_000 + 2_000 * np.log(100) - 100 < stop < 20_000 + 6 * 2_000, f"Ende {stop} falsch"
+
+    flat = np.zeros(1000, dtype=np.int16)
+    assert find_active_region(flat, flat, pre_samples=200) == (0, 1000), "Ohne Puls nichts abschneiden"
+    print("✓ Aktiver Bereich korrekt")
+    return True
+
+
+def test_trim_pulse():
+    """
+    Test: Zugeschnittener Puls enthält unveränderte Rohdaten mit Versatz in t0.
+    """
+    print("\n=== Test: trim_pulse ===")
+
+    pulse = _rc_pulse()
+    trimmed, (start, stop) = trim_pulse(pulse, pre_samples=20_000, margin_samples=1_000)
+    assert trimmed.n_samples == stop - start < pulse.n_samples / 3, "Kaum zugeschnitten"
+    assert np.array_equal(trimmed.adc_u, pulse.adc_u[start:stop])
+    assert np.isclose(trimmed.t0, start * pulse.dt), "Versatz nicht in t0"
+    assert np.allclose(trimmed.t(), pulse.t()[start:stop])
+    assert trimmed.pulse_id == 5 and trimmed.timestamp == 123.0 and trimmed.scale_i == pulse.scale_i
+
+    same, region = trim_pulse(pulse, pre_samples=20_000, margin_samples=200_000)
+    assert same is pulse and region == (0, pulse.n_samples), "Rand über ganze Länge muss Original liefern"
+    print("✓ Zuschneiden korrekt")
+    return True
+
+
+def test_reader_trim():
+    """
+    Test: PicoReader schneidet nach GetValues zu und protokolliert den Versatz in meta.
+    """
+    print("\n=== Test: PicoReader trim_pulses ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, tau_s=100e-6, seed=9)
+        reader = sim_reader(sim, tmpdir, run_name="trim", base_samples=5000, trim_pulses=True,
+                            trim_margin_samples=100)
+        pulses = []
+        reader.set_raw_callback(pulses.append)
+        reader.start_measurement(n_pulses=2, save_csv=True, save_npz=False)
+
+        pre = reader.meta['pretrigger_samples']
+        trim = reader.meta['trim']
+        assert trim['pulses'] == 2 and trim['samples_in'] == 2 * reader.n_samples
+        assert trim['samples_out'] < trim['samples_in'] / 3, f"Kaum zugeschnitten: {trim}"
+        for pulse in pulses:
+            start = int(round(pulse.t0 / pulse.dt))
+            assert start == trim['last_start'] and pre - 200 <= start <= pre - 100
+            assert pulse.adc_u.min() < -10000, "Puls abgeschnitten"
+
+        data = np.loadtxt(reader.csv_path, delimiter=",", comments="#", skiprows=1)
+        assert len(data) == trim['samples_out'], "CSV enthält nicht nur den Ausschnitt"
+        assert np.isclose(data[0, 2], pulses[0].t0), "Zeitspalte ohne Versatz"
+    print("✓ Reader-Zuschnitt korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_find_active_region())
+    results.append(test_trim_pulse())
+    results.append(test_reader_trim())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
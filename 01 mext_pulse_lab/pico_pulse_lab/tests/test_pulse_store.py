@@ -0,0 +1,194 @@
+"""
+Test-Funktionen für den anhängbaren Puls-Container (.pstore).
+
+Diese Tests überprüfen Anhängen und Laden (Rohdaten, float, ein Kanal),
+das Verhalten bei unvollständigem letzten Datensatz, die Überführung
+bestehender .npz Dateien und die Speicherung im PicoReader.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.pulse_data import RawPulse, TimeAxis
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.storage.npz_writer import append_pulse_npz, append_raw_pulse_npz, save_pulse_npz
+from pico_pulse_lab.storage.pulse_store import (
+    append_pulse_store,
+    append_raw_pulse_store,
+    convert_npz_to_store,
+    create_pulse_store,
+    get_all_pulse_ids_store,
+    load_meta_store,
+    load_pulse_store,
+    load_raw_pulse_store,
+    update_meta_store,
+)
+from sim_helpers import sim_reader
+
+
+def _raw_pulse(pulse_id, n=1000, seed=0, adc_u=True):
+    """Zufälliger int16-Puls mit Skalierung."""
+    rng = np.random.default_rng(seed)
+    adc = rng.integers(-32000, 32000, size=(2, n)).astype(np.int16)
+    return RawPulse(pulse_id, adc[0] if adc_u else None, adc[1], scale_u=1e-3, scale_i=2e-3,
+                    dt=1e-6, t0=5e-6, timestamp=100.0 + pulse_id)
+
+
+def test_append_and_load():
+    """
+    Test: Jeder Puls ist ein eigener Datensatz am Dateiende; Laden per Index.
+    """
+    print("\n=== Test: append/load Puls-Container ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run", "run.pstore")
+        create_pulse_store(path, meta={'fs': 1e6, 'run_name': 'store'})
+        assert get_all_pulse_ids_store(path) == []
+
+        sizes = [os.path.getsize(path)]
+        for k in range(1, 6):
+            append_raw_pulse_store(path, _raw_pulse(k, seed=k))
+            sizes.append(os.path.getsize(path))
+        growth = np.diff(sizes)
+        assert np.all(growth == growth[0]), f"Anhängen nicht konstant: {growth}"
+        assert growth[0] < 2 * 2 * 1000 + 512, "Datensatz größer als Rohdaten + Kopf"
+
+        raw = load_raw_pulse_store(path, 3)
+        ref = _raw_pulse(3, seed=3)
+        assert np.array_equal(raw.adc_u, ref.adc_u) and np.array_equal(raw.adc_i, ref.adc_i)
+        assert raw.scale_i == 2e-3 and raw.t0 == 5e-6 and raw.timestamp == 103.0
+        t, u, i = load_pulse_store(path, 3)
+        assert np.allclose(u, ref.u()) and np.allclose(t, ref.t())
+
+        # float-Pulse: TimeAxis kompakt, Array-Zeitvektor, nur Kanal B
+        axis = TimeAxis(0.0, 1e-6, 1000)
+        append_pulse_store(path, 10, axis, ref.u(), ref.i())
+        t_arr = np.linspace(0, 1, 1000) ** 2
+        append_pulse_store(path, 11, t_arr, None, ref.i())
+        assert load_pulse_store(path, 10, time_axis=True)[0] == axis
+        t, u, i = load_pulse_store(path, 11)
+        assert u is None and np.array_equal(t, t_arr) and np.array_equal(i, ref.i())
+        try:
+            load_raw_pulse_store(path, 10)
+            assert False, "float-Puls darf nicht als Rohdaten laden"
+        except ValueError:
+            pass
+
+        # Gleiche ID erneut: letzter Datensatz gilt; Metadaten ergänzen
+        append_raw_pulse_store(path, _raw_pulse(2, seed=99, adc_u=False))
+        assert load_raw_pulse_store(path, 2).adc_u is None
+        update_meta_store(path, {'note': 'ok'})
+        meta = load_meta_store(path)
+        assert meta['fs'] == 1e6 and meta['note'] == 'ok' and meta['pulse_count'] == 7
+        assert get_all_pulse_ids_store(path) == [1, 2, 3, 4, 5, 10, 11]
+        try:
+            load_pulse_store(path, 42)
+            assert False, "Fehlende ID muss KeyError auslösen"
+        except KeyError:
+            pass
+    print("✓ Anhängen und Laden korrekt")
+    return True
+
+
+def test_truncated_record():
+    """
+    Test: Ein unvollständiger letzter Datensatz (Absturz beim Schreiben) wird ignoriert.
+    """
+    print("\n=== Test: unvollständiger Datensatz ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.pstore")
+        create_pulse_store(path)
+        append_raw_pulse_store(path, _raw_pulse(1))
+        assert get_all_pulse_ids_store(path) == [1]
+        append_raw_pulse_store(path, _raw_pulse(2))
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 100)
+        assert get_all_pulse_ids_store(path) == [1], "Abgeschnittener Puls im Index"
+        assert load_raw_pulse_store(path, 1).n_samples == 1000
+    print("✓ Unvollständiger Datensatz ignoriert")
+    return True
+
+
+def test_convert_npz():
+    """
+    Test: Bestehende .npz Dateien (Rohdaten und float) werden vollständig überführt.
+    """
+    print("\n=== Test: convert_npz_to_store ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_path = os.path.join(tmpdir, "run.npz")
+        save_pulse_npz(npz_path, 0, np.array([0.0]), np.array([0.0]), np.array([0.0]), meta={'fs': 2e6})
+        axis = TimeAxis(0.0, 5e-7, 1000)
+        u = np.sin(axis.to_array() * 1e4)
+        append_pulse_npz(npz_path, 1, axis, u, None)
+        append_raw_pulse_npz(npz_path, _raw_pulse(2))
+
+        path = convert_npz_to_store(npz_path)
+        assert path == os.path.join(tmpdir, "run.pstore")
+        assert get_all_pulse_ids_store(path) == [0, 1, 2]
+        meta = load_meta_store(path)
+        assert meta['fs'] == 2e6 and meta['converted_from'].endswith("run.npz")
+        t, u_loaded, i_loaded = load_pulse_store(path, 1, time_axis=True)
+        assert t == axis and i_loaded is None and np.array_equal(u_loaded, u)
+        assert np.array_equal(load_raw_pulse_store(path, 2).adc_i, _raw_pulse(2).adc_i)
+    print("✓ .npz überführt")
+    return True
+
+
+def test_reader_store_format():
+    """
+    Test: PicoReader speichert mit binary_format="store" in <run_name>.pstore.
+    """
+    print("\n=== Test: PicoReader binary_format='store' ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=31)
+        reader = sim_reader(sim, tmpdir, run_name="store", raw_storage=True, binary_format="store")
+        pulses = []
+        reader.set_raw_callback(pulses.append)
+        reader.start_measurement(n_pulses=3, save_csv=False, save_npz=True)
+
+        assert not os.path.exists(reader.npz_path), ".npz trotz binary_format='store'"
+        assert get_all_pulse_ids_store(reader.store_path) == [1, 2, 3]
+        assert load_meta_store(reader.store_path)['binary_format'] == "store"
+        for pulse in pulses:
+            stored = load_raw_pulse_store(reader.store_path, pulse.pulse_id)
+            assert np.array_equal(stored.adc_u, pulse.adc_u) and np.array_equal(stored.adc_i, pulse.adc_i)
+    print("✓ Reader-Speicherung im Container korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_append_and_load())
+    results.append(test_truncated_record())
+    results.append(test_convert_npz())
+    results.append(test_reader_store_format())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
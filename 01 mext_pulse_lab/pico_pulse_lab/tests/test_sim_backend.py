@@ -0,0 +1,295 @@
+"""
+Test-Funktionen für das simulierte PS3000A-Backend.
+
+Diese Tests lassen `PicoReader` mit `SimulatedPS3000A` als SDK-Backend
+komplett durchlaufen (Block, Rapid-Block, Vorschau, Streaming, Session,
+Abbruch) und prüfen Signalform, Timing-Modell und Status-Codes – ohne Picoscope.
+"""
+
+import ctypes as ct
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.picoscope_reader import STOP_TIMEOUT_S
+from pico_pulse_lab.acquisition.sim_backend import (
+    ADC_LSB,
+    PICO_INVALID_HANDLE,
+    PICO_INVALID_TIMEBASE,
+    PICO_NOT_FOUND,
+    SimulatedPS3000A,
+)
+from sim_helpers import sim_reader
+
+
+def _run(sim, tmpdir, n_pulses=3, stop_after_s=None, **config):
+    """
+    Misst n_pulses mit dem Simulator und gibt (reader, Rohpulse, Vorschauen) zurück.
+
+    Mit stop_after_s läuft die Messung in einem Thread und wird nach dieser
+    Zeit mit `stop()` abgebrochen; zurückgegeben wird dann zusätzlich die
+    Dauer von `stop()` bis zum Ende des Mess-Threads.
+    """
+    reader = sim_reader(sim, tmpdir, **config)
+
+    pulses, previews = [], []
+    reader.set_raw_callback(pulses.append)
+    reader.set_preview_callback(lambda *args: previews.append(args))
+    if stop_after_s is None:
+        reader.start_measurement(n_pulses=n_pulses, save_csv=False, save_npz=False)
+        return reader, pulses, previews
+
+    thread = threading.Thread(
+        target=reader.start_measurement,
+        kwargs=dict(n_pulses=n_pulses, save_csv=False, save_npz=False),
+    )
+    thread.start()
+    time.sleep(stop_after_s)
+    t_stop = time.perf_counter()
+    reader.stop()
+    thread.join(5.0)
+    assert not thread.is_alive(), "Mess-Thread nach stop() nicht beendet"
+    return reader, pulses, time.perf_counter() - t_stop
+
+
+def _check_pulse(pulse, pre):
+    """Puls beginnt am Triggerpunkt mit der RC-Entladung (Kanal A: -1 V bei 2 V Bereich)."""
+    expected = -1.0 / 2.0 * 32512
+    assert pulse.adc_u.dtype == np.int16
+    assert np.all(pulse.adc_u % ADC_LSB == 0), "Nicht auf 8 Bit quantisiert"
+    assert abs(pulse.adc_u[:pre].mean()) < 3 * ADC_LSB, "Pretrigger nicht auf Grundlinie"
+    assert abs(pulse.adc_u[pre] - expected) < 4 * ADC_LSB, "Sprung am Triggerpunkt fehlt"
+    assert pulse.adc_u[-1] > pulse.adc_u[pre], "Keine Entladung"
+
+
+def test_sdk_calls():
+    """
+    Test: Handles, Seriennummer, Geräte-Info und Timebase-Regeln wie beim echten SDK.
+    """
+    print("\n=== Test: SimulatedPS3000A SDK-Aufrufe ===")
+
+    sim = SimulatedPS3000A(serial="AB123/001", seed=1)
+    handle = ct.c_int16()
+    assert sim.ps3000aOpenUnit(ct.byref(handle), b"XY999/000") == PICO_NOT_FOUND
+    assert sim.ps3000aOpenUnit(ct.byref(handle), b"AB123/001") == 0
+
+    buf = ct.create_string_buffer(32)
+    required = ct.c_int16()
+    assert sim.ps3000aGetUnitInfo(handle, buf, len(buf), ct.byref(required), 4) == 0
+    assert buf.value == b"AB123/001"
+
+    interval_ns, max_samples = ct.c_float(), ct.c_int32()
+    assert sim.ps3000aGetTimebase2(handle, 0, 1000, ct.byref(interval_ns), 0,
+                                   ct.byref(max_samples), 0) == PICO_INVALID_TIMEBASE
+    assert sim.ps3000aGetTimebase2(handle, 3, 1000, ct.byref(interval_ns), 0,
+                                   ct.byref(max_samples), 0) == 0
+    assert abs(interval_ns.value - 16.0) < 1e-6, "tb=3 muss 16 ns ergeben"
+
+    assert sim.ps3000aCloseUnit(handle) == 0
+    assert sim.ps3000aStop(handle) == PICO_INVALID_HANDLE
+    print("✓ SDK-Aufrufe korrekt")
+    return True
+
+
+def test_block_mode():
+    """
+    Test: Block-Modus (Callback und Polling) liefert RC-Pulse im Trigger-Takt.
+    """
+    print("\n=== Test: Block-Modus mit Simulator ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for ready_mode in ("callback", "poll"):
+            sim = SimulatedPS3000A(trigger_interval_s=0.01, jitter_s=0.0, seed=2)
+            t_start = time.perf_counter()
+            reader, pulses, _ = _run(sim, tmpdir, n_pulses=3, ready_mode=ready_mode)
+            elapsed = time.perf_counter() - t_start
+
+            pre = reader.meta['pretrigger_samples']
+            assert [p.pulse_id for p in pulses] == [1, 2, 3]
+            for pulse in pulses:
+                _check_pulse(pulse, pre)
+            assert reader.meta['device'] == "3205A/SIM0001"
+            assert abs(reader.fs - 1e6) / 1e6 < 0.02
+            assert elapsed >= 0.02, "Trigger-Abstand nicht simuliert"
+            assert sim.handle is None, "Gerät nicht geschlossen"
+    print("✓ Block-Modus korrekt")
+    return True
+
+
+def test_rapid_block_and_preview():
+    """
+    Test: Rapid-Block überträgt alle Segmente, Vorschau liefert Min/Max-Bins.
+    """
+    print("\n=== Test: Rapid-Block und Vorschau mit Simulator ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=3)
+        reader, pulses, _ = _run(sim, tmpdir, n_pulses=5, n_segments=2)
+        assert len(pulses) == 5
+        for pulse in pulses:
+            _check_pulse(pulse, reader.meta['pretrigger_samples'])
+        assert sim.calls['ps3000aGetValuesBulk'] == 3, "Segmente nicht gesammelt übertragen"
+
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=4)
+        reader, pulses, previews = _run(sim, tmpdir, n_pulses=2, preview_points=100)
+        assert len(previews) == 2
+        pulse_id, t, u_min, u_max = previews[0][:4]
+        assert pulse_id == 1 and len(u_min) == len(t) == 100
+        assert np.all(u_min <= u_max)
+        assert np.isclose(u_min.min(), pulses[0].u().min(), rtol=1e-5), "Aggregat passt nicht zu den Rohdaten"
+
+        # Verwirft die Pipeline Pulse, bleiben Lücken statt verschobener IDs
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=5)
+        reader = sim_reader(sim, tmpdir, preview_points=100, use_pipeline=True,
+                            backpressure="drop_oldest", queue_size=1)
+        kept, previews = [], {}
+        reader.set_raw_callback(lambda pulse: (time.sleep(0.02), kept.append(pulse)))
+        reader.set_preview_callback(lambda pulse_id, t, u_min, *rest: previews.__setitem__(pulse_id, u_min))
+        reader.start_measurement(n_pulses=10, save_csv=False, save_npz=False)
+        assert reader.meta['pipeline']['dropped'] > 0 and sorted(previews) == list(range(1, 11))
+        ids = [pulse.pulse_id for pulse in kept]
+        assert len(ids) < 10 and ids == sorted(ids) and ids[-1] == 10, ids
+        for pulse in kept:
+            assert np.isclose(previews[pulse.pulse_id].min(), pulse.u().min(), rtol=1e-5), \
+                f"Vorschau {pulse.pulse_id} zeigt eine andere Erfassung"
+            # Zeitstempel = Erfassungszeit im Producer, nicht Verarbeitung im langsamen Consumer
+            assert pulse.timestamp == reader.trigger_times[pulse.pulse_id - 1]
+    print("✓ Rapid-Block und Vorschau korrekt")
+    return True
+
+
+def test_streaming_and_session():
+    """
+    Test: Streaming mit Software-Trigger findet die simulierten Pulse;
+    Session-Modus sendet bei gleicher Konfiguration keine Einstellungen erneut.
+    """
+    print("\n=== Test: Streaming und Session mit Simulator ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, seed=5)
+        reader, pulses, _ = _run(sim, tmpdir, n_pulses=3, acquisition_mode="streaming",
+                                 stream_buffer_samples=20_000)
+        assert len(pulses) == 3
+        pre = reader.meta['pretrigger_samples']
+        for pulse in pulses:
+            _check_pulse(pulse, pre)
+        assert reader.meta['streaming']['lost'] == 0
+
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=6)
+        reader, _, _ = _run(sim, tmpdir, n_pulses=1, keep_open=True)
+        calls_before = dict(sim.calls)
+        reader.start_measurement(n_pulses=1, save_csv=False, save_npz=False)
+        assert sim.calls['ps3000aSetChannel'] == calls_before['ps3000aSetChannel']
+        assert sim.calls['ps3000aOpenUnit'] == 1
+        assert reader.meta['session_reused']
+        reader.close()
+        assert sim.handle is None
+
+        # Rapid-Block-Session: letzter Block mit weniger Captures darf den nächsten Lauf nicht stören
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=7)
+        reader, pulses, _ = _run(sim, tmpdir, n_pulses=5, n_segments=4, keep_open=True)
+        reader.start_measurement(n_pulses=6, save_csv=False, save_npz=False)
+        assert [p.pulse_id for p in pulses] == [1, 2, 3, 4, 5] + [1, 2, 3, 4, 5, 6]  # ohne CSV ab 1
+        assert sim.calls['ps3000aMemorySegments'] == 1 and reader.meta['session_reused']
+        reader.close()
+    print("✓ Streaming und Session korrekt")
+    return True
+
+
+def test_stop_latency():
+    """
+    Test: stop() beendet eine wartende Erfassung innerhalb von STOP_TIMEOUT_S,
+    speichert fertige Rapid-Block-Segmente und lässt die Session im Leerlauf.
+    """
+    print("\n=== Test: Abbruch mit stop() ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for ready_mode in ("callback", "poll"):
+            # Kanal A springt positiv -> fallender Trigger kommt nie (kein Auto-Trigger)
+            sim = SimulatedPS3000A(amplitudes_v=(0.5, -0.5), seed=7)
+            reader, pulses, elapsed = _run(sim, tmpdir, n_pulses=5, stop_after_s=0.05,
+                                           ready_mode=ready_mode, keep_open=True)
+            assert pulses == [] and reader.meta['aborted']
+            assert reader.meta['abort_latency_ms'] < STOP_TIMEOUT_S * 1e3, \
+                f"Abbruch zu langsam: {reader.meta['abort_latency_ms']:.1f} ms"
+            assert elapsed < 0.5
+            assert sim.calls['ps3000aStop'] >= 1 and sim._block is None
+
+            # Session: Gerät offen und sofort wieder startbereit
+            assert not reader.is_running and reader.stop()
+            assert sim.handle is not None, "Gerät nach Abbruch geschlossen"
+            sim.amplitudes_v = (-1.0, -0.5)
+            reader.start_measurement(n_pulses=1, save_csv=False, save_npz=False)
+            assert len(pulses) == 1 and not reader.meta['aborted']
+            reader.close()
+
+        # Rapid-Block: bis zum Stop gefüllte Segmente werden noch übertragen
+        sim = SimulatedPS3000A(trigger_interval_s=0.01, jitter_s=0.0, seed=8)
+        reader, pulses, _ = _run(sim, tmpdir, n_pulses=10, stop_after_s=0.045,
+                                 n_segments=10, use_pipeline=True)
+        assert 1 <= len(pulses) < 10, f"{len(pulses)} Pulse nach Abbruch"
+        assert reader.meta['pulses_captured'] == len(pulses)
+        assert [p.pulse_id for p in pulses] == list(range(1, len(pulses) + 1))
+        for pulse in pulses:
+            _check_pulse(pulse, reader.meta['pretrigger_samples'])
+
+        # Rapid-Block mit langsamem Consumer: stop() wartet nicht auf freie Pool-Puffer
+        sim = SimulatedPS3000A(trigger_interval_s=0.005, jitter_s=0.0, seed=9)
+        reader = sim_reader(sim, tmpdir, run_name="slow", n_segments=20,
+                            use_pipeline=True, queue_size=1, backpressure="block")
+        slow = []
+        reader.set_raw_callback(lambda pulse: (time.sleep(0.1), slow.append(pulse)))
+        thread = threading.Thread(
+            target=reader.start_measurement,
+            kwargs=dict(n_pulses=20, save_csv=False, save_npz=False),
+        )
+        thread.start()
+        time.sleep(0.25)  # Block gefüllt, Producer wartet auf freie Puffer
+        t_stop = time.perf_counter()
+        reader.stop()
+        thread.join(5.0)
+        elapsed = time.perf_counter() - t_stop
+        assert not thread.is_alive()
+        # Nach stop() nur noch Pool-Puffer (queue_size + 2) verarbeiten, nicht alle 20 Segmente
+        assert elapsed < STOP_TIMEOUT_S + 3 * 0.1 + 0.1, f"Abbruch zu langsam: {elapsed * 1e3:.0f} ms"
+        assert reader.meta['aborted'] and len(slow) < 20
+        assert reader.meta['pipeline']['submitted'] == len(slow) == reader.meta['pulses_captured']
+    print("✓ Abbruch korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_sdk_calls())
+    results.append(test_block_mode())
+    results.append(test_rapid_block_and_preview())
+    results.append(test_streaming_and_session())
+    results.append(test_stop_latency())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
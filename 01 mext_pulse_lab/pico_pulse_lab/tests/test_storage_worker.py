@@ -0,0 +1,267 @@
+"""
+Test-Funktionen für den Speicher-Thread (StorageWorker).
+
+Diese Tests überprüfen das gesammelte Schreiben mehrerer Pulse, das
+Verwerfen bei voller Warteschlange, den fsync-Takt, die Weitergabe von
+Schreibfehlern und die Speicherung einer Messung des PicoReaders über den
+Speicher-Thread.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.picoscope_reader import PicoReader
+from pico_pulse_lab.acquisition.pulse_data import RawPulse
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.storage.csv_index import load_csv_index
+from pico_pulse_lab.storage.csv_reader import clear_pulse_cache, load_pulses_csv
+from pico_pulse_lab.storage.csv_writer import (
+    StorageWorker,
+    append_pulses_to_csv,
+    append_raw_pulse_to_csv,
+    ensure_csv,
+    storage_worker,
+)
+from pico_pulse_lab.storage.pulse_store import load_pulse_store
+from sim_helpers import sim_reader, sim_settings
+
+
+def _raw_pulse(pulse_id, n=600, seed=0):
+    """Zufälliger int16-Puls mit Zeitstempel."""
+    rng = np.random.default_rng(seed)
+    adc = rng.integers(-32000, 32000, size=(2, n)).astype(np.int16)
+    return RawPulse(pulse_id, adc[0], adc[1], scale_u=1e-3, scale_i=2e-3, dt=1e-6,
+                    timestamp=2000.0 + pulse_id)
+
+
+def test_batched_csv():
+    """
+    Test: Pulse werden gesammelt geschrieben, Ergebnis wie beim Schreiben einzeln.
+    """
+    print("\n=== Test: Gesammeltes Schreiben ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        single = os.path.join(tmpdir, "single.csv")
+        batched = os.path.join(tmpdir, "batched.csv")
+        for path in (single, batched):
+            ensure_csv(path, "batch", "A")
+        pulses = [_raw_pulse(k, seed=k) for k in range(1, 11)]
+        for pulse in pulses:
+            append_raw_pulse_to_csv(single, pulse)
+
+        gate = threading.Event()
+        batch_sizes = []
+
+        def write_batch(batch):
+            gate.wait(5.0)  # erster Batch wartet, bis alles eingereiht ist
+            batch_sizes.append(len(batch))
+            return append_pulses_to_csv(batched, batch)
+
+        worker = storage_worker(write_batch, queue_size=16, batch_size=4, fsync_interval_s=None)
+        for pulse in pulses:
+            worker.submit(pulse)
+        gate.set()
+        worker.close()
+
+        stats = worker.get_stats()
+        assert sum(batch_sizes) == 10 and max(batch_sizes) == 4 and len(batch_sizes) <= 4
+        assert stats['submitted'] == stats['written'] == 10 and stats['dropped'] == 0
+        assert stats['batches'] == len(batch_sizes) and stats['queue_depth'] == 0
+        index_single, index_batched = load_csv_index(single), load_csv_index(batched)
+        with open(single, "rb") as f_single, open(batched, "rb") as f_batched:
+            # Header enthält den Erstellzeitpunkt -> erst ab dem ersten Puls vergleichen
+            assert f_single.read()[index_single['offset'][0]:] == f_batched.read()[index_batched['offset'][0]:]
+        assert stats['bytes_written'] == int(index_batched['nbytes'].sum())
+        for name in ('pulse_id', 'nbytes', 'rows', 'timestamp'):
+            assert np.array_equal(index_single[name], index_batched[name]), name
+        try:
+            worker.submit(pulses[0])
+            assert False, "submit() nach close() muss fehlschlagen"
+        except ValueError:
+            pass
+    print(f"✓ {len(batch_sizes)} Batches für 10 Pulse")
+    return True
+
+
+def test_drop_oldest():
+    """
+    Test: Bei voller Warteschlange verwirft "drop_oldest" den ältesten Puls, ohne zu blockieren.
+    """
+    print("\n=== Test: overflow='drop_oldest' ===")
+
+    gate = threading.Event()
+    written = []
+
+    def write_batch(batch):
+        gate.wait(5.0)
+        written.extend(batch)
+
+    worker = storage_worker(write_batch, queue_size=3, batch_size=1, fsync_interval_s=None,
+                            overflow="drop_oldest")
+    worker.submit(0)
+    deadline = time.monotonic() + 5.0
+    while worker.depth and time.monotonic() < deadline:
+        time.sleep(0.001)  # Puls 0 ist im Thread (hängt an gate)
+    t_start = time.perf_counter()
+    for k in range(1, 8):
+        worker.submit(k)
+    assert time.perf_counter() - t_start < 0.5, "submit() darf nicht blockieren"
+    assert worker.get_stats()['max_queue_depth'] == 3
+    gate.set()
+    worker.close()
+
+    assert written == [0, 5, 6, 7]
+    assert worker.get_stats()['dropped'] == 4
+    try:
+        StorageWorker(write_batch, overflow="spill")
+        assert False, "Unbekannter overflow-Modus muss ValueError auslösen"
+    except ValueError:
+        pass
+    print("✓ Älteste Pulse verworfen")
+    return True
+
+
+def test_fsync_interval_and_errors():
+    """
+    Test: fsync höchstens im eingestellten Abstand und beim Schließen; Schreibfehler erreichen die Erfassung.
+    """
+    print("\n=== Test: fsync-Takt und Fehler ===")
+
+    syncs = []
+    every = storage_worker(lambda batch: 10, sync=lambda: syncs.append(1), batch_size=1,
+                           fsync_interval_s=0)
+    for k in range(5):
+        every.submit(k)
+        every.flush()
+    every.close()
+    assert every.get_stats()['fsyncs'] == 5 and len(syncs) == 5
+
+    syncs.clear()
+    rare = storage_worker(lambda batch: 10, sync=lambda: syncs.append(1), batch_size=1,
+                          fsync_interval_s=60.0)
+    for k in range(5):
+        rare.submit(k)
+        rare.flush()
+    assert len(syncs) == 0, "fsync vor Ablauf des Intervalls"
+    rare.close()
+    assert len(syncs) == 1 and rare.get_stats()['bytes_written'] == 50
+
+    def failing(batch):
+        raise OSError("Platte voll")
+
+    broken = storage_worker(failing, fsync_interval_s=None)
+    broken.submit(1)
+    try:
+        broken.flush()
+        broken.submit(2)
+        assert False, "Schreibfehler muss als IOError weitergegeben werden"
+    except IOError as e:
+        assert "Platte voll" in str(e)
+    try:
+        broken.close()
+        assert False, "close() muss den Schreibfehler erneut auslösen"
+    except IOError:
+        pass
+    print("✓ fsync-Takt und Fehlerweitergabe korrekt")
+    return True
+
+
+def test_reader_storage_worker():
+    """
+    Test: PicoReader speichert CSV und .pstore über den Speicher-Thread; Statistik in meta['storage'].
+    """
+    print("\n=== Test: PicoReader mit Speicher-Thread ===")
+
+    clear_pulse_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.002, seed=61)
+        reader = sim_reader(sim, tmpdir, run_name="storage", raw_storage=True, binary_format="store",
+                            storage_queue_size=4, fsync_interval_s=0)
+        received = []
+        reader.on_raw_pulse_callback = received.append
+        reader.start_measurement(n_pulses=6, save_csv=True, save_npz=True)
+
+        stats = reader.meta['storage']
+        assert stats['submitted'] == stats['written'] == 6 and stats['dropped'] == 0
+        assert stats['fsyncs'] >= 1 and stats['bytes_written'] == os.path.getsize(reader.csv_path) - \
+            int(load_csv_index(reader.csv_path)['offset'][0])
+        assert reader._storage is None and reader._csv_file is None
+
+        csv_pulses = load_pulses_csv(reader.csv_path)
+        assert list(csv_pulses) == [1, 2, 3, 4, 5, 6]
+        for pulse in received:
+            t, u, i = csv_pulses[pulse.pulse_id]
+            assert np.allclose(u, pulse.u(), rtol=1e-8) and np.allclose(i, pulse.i(), rtol=1e-8)
+            _, u_store, i_store = load_pulse_store(reader.store_path, pulse.pulse_id)
+            assert np.allclose(u_store, pulse.u()) and np.allclose(i_store, pulse.i())
+        timing = reader.meta['timing']
+        assert timing['csv_write']['n'] == 6 and timing['npz_write']['n'] == 6
+    print(f"✓ {stats['batches']} Batches, {stats['fsyncs']} fsync")
+    return True
+
+
+def test_mock_storage_worker():
+    """
+    Test: Auch die Mock-Messung (ohne SDK) speichert über den Speicher-Thread.
+    """
+    print("\n=== Test: Mock-Messung mit Speicher-Thread ===")
+
+    clear_pulse_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reader = PicoReader()
+        reader.ps, reader.sdk_available = None, False  # Mock-Modus auch mit installiertem picosdk
+        reader.configure(run_name="mock", **sim_settings(tmpdir, raw_storage=True, binary_format="store"))
+        received = []
+        reader.on_raw_pulse_callback = received.append
+        reader.start_measurement(n_pulses=3, save_csv=True, save_npz=True)
+
+        stats = reader.meta['storage']
+        assert stats['submitted'] == stats['written'] == 3 and reader._storage is None
+        assert reader.meta['mock_mode'] and reader.meta['timing']['csv_write']['n'] == 3
+        csv_pulses = load_pulses_csv(reader.csv_path)
+        assert list(csv_pulses) == [1, 2, 3]
+        for pulse in received:
+            _, u, i = csv_pulses[pulse.pulse_id]
+            assert np.allclose(u, pulse.u(), rtol=1e-8) and np.allclose(i, pulse.i(), rtol=1e-8)
+            _, u_store, _ = load_pulse_store(reader.store_path, pulse.pulse_id)
+            assert np.allclose(u_store, pulse.u())
+    print(f"✓ {stats['written']} Mock-Pulse über den Speicher-Thread")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_batched_csv())
+    results.append(test_drop_oldest())
+    results.append(test_fsync_interval_and_errors())
+    results.append(test_reader_storage_worker())
+    results.append(test_mock_storage_worker())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
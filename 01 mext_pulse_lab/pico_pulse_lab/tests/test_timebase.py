@@ -0,0 +1,168 @@
+"""
+Test-Funktionen für die Timebase-Auflösung.
+
+Diese Tests überprüfen die analytische 3000A-Formel, die Kalibrierung
+bei abweichendem Takt und den persistenten Cache – ohne Picoscope, mit
+einer simulierten `ps3000aGetTimebase2`-Funktion.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.timebase import (
+    TimebaseCache,
+    dt_to_timebase,
+    resolve_timebase,
+    resolve_timebase_cached,
+    timebase_to_dt,
+)
+
+
+class FakeScope:
+    """Simuliert ps3000aGetTimebase2 und zählt die Aufrufe."""
+
+    def __init__(self, fast_hz=500e6, linear_hz=62.5e6, min_tb=1):
+        self.fast_hz = fast_hz
+        self.linear_hz = linear_hz
+        self.min_tb = min_tb  # 2 Kanäle: tb 0 nicht erlaubt
+        self.calls = 0
+
+    def get_timebase(self, tb):
+        self.calls += 1
+        if tb < self.min_tb:
+            return None
+        if tb < 3:
+            return (2 ** tb) / self.fast_hz
+        return (tb - 2) / self.linear_hz
+
+
+def _linear_scan(scope, target_fs):
+    """Referenz: bisherige vollständige Suche (bester Fehler über alle tb)."""
+    best = None
+    for tb in range(1, 5000):
+        dt = scope.get_timebase(tb)
+        if dt is None:
+            continue
+        err = abs(1.0 / dt - target_fs) / target_fs
+        if best is None or err < best[0]:
+            best = (err, tb)
+    return best[1]
+
+
+def test_formula_roundtrip():
+    """
+    Test: dt_to_timebase ist die Umkehrung von timebase_to_dt.
+    """
+    print("\n=== Test: Timebase-Formel ===")
+
+    for tb in (0, 1, 2, 3, 4, 10, 1000, 123456):
+        assert dt_to_timebase(timebase_to_dt(tb)) == tb, f"Roundtrip für tb={tb} falsch"
+    assert timebase_to_dt(3) == 16e-9, "tb=3 muss 16 ns ergeben"
+    print("✓ Formel korrekt")
+    return True
+
+
+def test_resolve_matches_linear_scan():
+    """
+    Test: Ergebnis wie die vollständige Suche, aber mit wenigen SDK-Aufrufen.
+    """
+    print("\n=== Test: resolve_timebase ===")
+
+    for target_fs in (250e6, 125e6, 20e6, 10e6, 3.3e6, 1e6):
+        scope = FakeScope()
+        tb, dt, fs = resolve_timebase(scope.get_timebase, target_fs)
+        assert tb == _linear_scan(FakeScope(), target_fs), f"Falsche Timebase für {target_fs}"
+        assert scope.calls <= 6, f"Zu viele SDK-Aufrufe: {scope.calls}"
+        assert abs(fs - 1.0 / dt) < 1e-6 * fs
+    print("✓ Ergebnis identisch, max. 6 SDK-Aufrufe")
+    return True
+
+
+def test_resolve_calibrates_clock():
+    """
+    Test: Abweichender linearer Takt (1-GS/s-Modell) wird aus der SDK-Antwort kalibriert.
+    """
+    print("\n=== Test: Takt-Kalibrierung ===")
+
+    scope = FakeScope(fast_hz=1e9, linear_hz=125e6)
+    tb, dt, fs = resolve_timebase(scope.get_timebase, 20e6)
+    assert tb == 2 + round(125e6 / 20e6), f"Falsche Timebase: {tb}"
+    assert abs(fs - 125e6 / 6) < 1.0
+    assert scope.calls <= 7, f"Zu viele SDK-Aufrufe: {scope.calls}"
+    print(f"✓ tb={tb}, {scope.calls} SDK-Aufrufe")
+    return True
+
+
+def test_cache_hit_needs_one_call():
+    """
+    Test: Zweiter Start mit gleichem Schlüssel braucht nur einen Bestätigungsaufruf.
+    """
+    print("\n=== Test: Timebase-Cache ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = TimebaseCache(os.path.join(tmpdir, "sub", "tb.json"))
+
+        first = FakeScope()
+        result1 = resolve_timebase_cached(first.get_timebase, 20e6, 480_000,
+                                          "3205A/TEST/1", cache=cache)
+
+        second = FakeScope()
+        result2 = resolve_timebase_cached(second.get_timebase, 20e6, 480_000,
+                                          "3205A/TEST/1", cache=TimebaseCache(cache.path))
+        assert result1 == result2, "Cache liefert anderes Ergebnis"
+        assert second.calls == 1, f"Cache-Treffer sollte 1 Aufruf brauchen, waren {second.calls}"
+
+        # Anderes Gerät -> eigener Eintrag
+        third = FakeScope(fast_hz=1e9, linear_hz=125e6)
+        result3 = resolve_timebase_cached(third.get_timebase, 20e6, 480_000,
+                                          "3206D/TEST/2", cache=cache)
+        assert result3[0] != result1[0] and third.calls > 1
+
+        # Ungültig gewordener Eintrag wird neu aufgelöst
+        stale = FakeScope(min_tb=9)
+        tb, _, _ = resolve_timebase_cached(stale.get_timebase, 20e6, 480_000,
+                                           "3205A/TEST/1", cache=cache)
+        assert tb == 9, "Veralteter Cache-Eintrag wurde verwendet"
+
+        # invalidate() schreibt atomar, der andere Eintrag bleibt erhalten
+        key = next(k for k in cache._load() if k.startswith("3206D"))
+        cache.invalidate(key)
+        with open(cache.path, encoding="utf-8") as f:
+            assert key not in json.load(f) and len(cache._load()) == 1
+        assert not os.path.exists(cache.path + ".tmp")
+    print("✓ Cache korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_formula_roundtrip())
+    results.append(test_resolve_matches_linear_scan())
+    results.append(test_resolve_calibrates_clock())
+    results.append(test_cache_hit_needs_one_call())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,95 @@
+"""
+Test-Funktionen für die Zeitmessung der Erfassungsstufen.
+
+Diese Tests überprüfen `StageTimer` (Ringpuffer, Statistik, Histogramm)
+und die Instrumentierung von `PicoReader` mit dem simulierten Scope.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Pfad für Import hinzufügen
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pico_pulse_lab.acquisition.sim_backend import SimulatedPS3000A
+from pico_pulse_lab.acquisition.timing import ARM, CSV_WRITE, HIST_EDGES_US, STAGES, StageTimer
+from sim_helpers import sim_reader
+
+
+def test_stage_timer():
+    """
+    Test: Dauern landen im vorab allokierten Ring, Statistik passt dazu.
+    """
+    print("\n=== Test: StageTimer ===")
+
+    timer = StageTimer(capacity=4)
+    for delay_us in (10, 20, 30, 40, 50, 60):
+        timer.record(ARM, time.perf_counter_ns() - delay_us * 1000)
+    assert timer.count(ARM) == 6 and timer.values_ns(ARM).size == 4, "Ringpuffer falsch"
+    assert timer.values_ns(CSV_WRITE).size == 0
+
+    summary = timer.summary()
+    arm = summary['arm']
+    assert 'csv_write' not in summary, "Stufe ohne Messung in Statistik"
+    assert arm['n'] == 6 and sum(arm['hist']) == 4
+    assert 40 <= arm['p50_us'] < 1000 and arm['max_us'] >= 60  # letzte 4: 30..60 µs
+    assert len(summary['hist_edges_us']) == len(HIST_EDGES_US) == len(arm['hist']) + 1
+    json.dumps(summary)  # muss in die Meta-JSON passen
+    print("✓ StageTimer korrekt")
+    return True
+
+
+def test_reader_stage_timing():
+    """
+    Test: PicoReader misst alle Stufen pro Puls und schreibt sie in Status und Meta-JSON.
+    """
+    print("\n=== Test: PicoReader Zeitmessung ===")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = SimulatedPS3000A(trigger_interval_s=0.01, jitter_s=0.0, transfer_latency_s=2e-3, seed=11)
+        reader = sim_reader(sim, tmpdir, run_name="timing")
+        reader.set_callback(lambda *args: None)
+        reader.start_measurement(n_pulses=4, save_csv=True, save_npz=True)
+
+        timing = reader.get_status()['timing']
+        for stage in STAGES:
+            assert timing[stage]['n'] == 4, f"Stufe {stage} nicht pro Puls gemessen"
+        assert timing['transfer']['p50_us'] >= 2000, "Transfer-Latenz des Simulators fehlt"
+        # Trigger kommen im 10-ms-Raster: typisches Warten unter einem Trigger-Intervall
+        assert timing['trigger_wait']['p50_us'] < 15_000, "Trigger-Warten zu lang"
+
+        with open(reader.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        assert meta['timing']['npz_write']['n'] == 4, "Zeitmessung fehlt in Meta-JSON"
+    print("✓ Zeitmessung korrekt")
+    return True
+
+
+def run_all_tests():
+    """
+    Führt alle Tests aus.
+
+    Returns
+    -------
+    bool
+        True wenn alle Tests erfolgreich, False sonst.
+    """
+    results = []
+
+    results.append(test_stage_timer())
+    results.append(test_reader_stage_timing())
+
+    print("\n=== Test-Zusammenfassung ===")
+    passed = sum(results)
+    total = len(results)
+    print(f"Bestanden: {passed}/{total}")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
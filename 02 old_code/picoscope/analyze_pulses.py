@@ -8,10 +8,19 @@ Analyse CSV-basierter U/I-Pulse (ohne CLI)
 """
 
 import os
+import sys
 import json
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Lesefunktionen aus pico_pulse_lab (Index <csv>.idx + Seek statt Zeilen-Scan)
+_lab_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "01 mext_pulse_lab")
+if _lab_dir not in sys.path:
+    sys.path.insert(0, _lab_dir)
+
+from pico_pulse_lab.storage.csv_index import next_pulse_id
+from pico_pulse_lab.storage.csv_reader import get_all_pulse_ids_csv, load_pulses_csv
+
 # ===================== CONTROL =====================
 BASE_DIR     = r"/Users/peer/Documents/00 - MEXT BA/10 Code/MEXT Capacitor Pulse Lab"
 RUN_NAME     = "31-10_01"   # muss zum Messlauf passen (CSV + meta.json)
@@ -59,64 +68,32 @@ def detect_i_unit_from_header():
     return i_colname  # "i_A" oder "i_V"
 
 def get_last_pulse_id():
-    """Liest die größte pulse_id aus der CSV (letzte Zeilen scannen)."""
+    """Größte pulse_id der CSV (aus dem Index <csv>.idx, ohne die CSV zu durchsuchen)."""
     if not os.path.isfile(CSV_PATH):
         raise FileNotFoundError(f"CSV nicht gefunden: {CSV_PATH}")
-    last_id = None
-    # effizient genug für typische Dateigrößen; für extrem große CSV ggf. anders lösen
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line or line[0] == "#":
-                continue
-            try:
-                pid = int(line.split(",")[0])
-                last_id = pid if (last_id is None or pid > last_id) else last_id
-            except Exception:
-                pass
-    if last_id is None:
+    last_id = next_pulse_id(CSV_PATH) - 1
+    if last_id < 1:
         raise ValueError("Keine Datenzeilen in CSV gefunden.")
     return last_id
 
-def read_pulse_from_csv(pulse_id, i_colname):
+def read_pulses_from_csv(pulse_ids):
     """
-    Liest einen Puls (alle Zeilen mit pulse_id) aus der CSV.
-    Gibt (t, u, i) zurück.
+    Liest mehrere Pulse in einem Durchgang (per Seek über den Index, siehe storage/csv_reader.py).
+    Gibt {pulse_id: (t, u, i)} zurück.
     """
     if not os.path.isfile(CSV_PATH):
         raise FileNotFoundError(f"CSV nicht gefunden: {CSV_PATH}")
+    try:
+        return load_pulses_csv(CSV_PATH, pulse_ids)
+    except KeyError as e:
+        raise FileNotFoundError(f"Pulse-ID nicht in CSV gefunden: {e}") from e
 
-    # Spalten: pulse_id,sample_idx,time_s,u_V,i_{V|A}
-    # Wir lesen nur Datenzeilen (skip '#'), dann filtern wir auf pulse_id.
-    # Für moderate Dateigrößen ist das okay. Bei >GB CSV später auf chunking umstellen.
-    rows = []
-    with open(CSV_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line or line[0] == "#":
-                continue
-            parts = line.strip().split(",")
-            if len(parts) < 5:
-                continue
-            try:
-                pid = int(parts[0])
-            except:
-                continue
-            if pid == pulse_id:
-                # sample_idx = int(parts[1])  # würde die Reihenfolge sichern, falls nötig
-                t = float(parts[2])
-                u = float(parts[3])
-                i = float(parts[4])
-                rows.append((t, u, i))
-
-    if not rows:
-        raise FileNotFoundError(f"Pulse-ID {pulse_id} nicht in CSV gefunden.")
-
-    # nach Zeit sortieren (falls Zeilenreihenfolge nicht sicher)
-    rows.sort(key=lambda r: r[0])
-    data = np.array(rows, dtype=float)
-    t = data[:, 0]
-    u = data[:, 1]
-    i = data[:, 2]
-    return t, u, i
+def read_pulse_from_csv(pulse_id, i_colname=None):
+    """
+    Liest einen Puls aus der CSV. Gibt (t, u, i) zurück.
+    i_colname wird nur aus Kompatibilität angenommen (die Spalte steht im Header).
+    """
+    return read_pulses_from_csv([pulse_id])[int(pulse_id)]
 
 def plot_fft(y, fs, title="FFT"):
     N = len(y)
@@ -152,8 +129,16 @@ def analyze_pulse_csv():
     # Hauptpuls-ID
     pid = get_last_pulse_id() if USE_LAST else int(PULSE_ID)
 
-    # Hauptpuls laden
-    t, u, i = read_pulse_from_csv(pid, i_colname)
+    # Hauptpuls und Overlays in einem Durchgang laden (fehlende Overlays nur melden)
+    available = set(get_all_pulse_ids_csv(CSV_PATH))
+    overlay_ids = []
+    for pid_ov in OVERLAY_IDS:
+        if int(pid_ov) in available:
+            overlay_ids.append(int(pid_ov))
+        else:
+            print(f"[Warn] Overlay {pid_ov}: Pulse-ID nicht in CSV gefunden")
+    found = read_pulses_from_csv([pid] + overlay_ids)
+    t, u, i = found[pid]
 
     # y-Limits aus Meta: voller Messbereich ±v_range
     if v_range_u:
@@ -188,13 +173,10 @@ def analyze_pulse_csv():
     ax_i.grid(True, alpha=GRID_ALPHA)
 
     # Overlays (optional)
-    for pid_ov in OVERLAY_IDS:
-        try:
-            t_o, u_o, i_o = read_pulse_from_csv(int(pid_ov), i_colname)
-            ax_u.plot(t_o, u_o, linewidth=0.9, alpha=0.65, label=f"U (pulse {pid_ov})")
-            ax_i.plot(t_o, i_o, linewidth=0.9, alpha=0.65, label=f"I (pulse {pid_ov})")
-        except Exception as e:
-            print(f"[Warn] Overlay {pid_ov}: {e}")
+    for pid_ov in overlay_ids:
+        t_o, u_o, i_o = found[pid_ov]
+        ax_u.plot(t_o, u_o, linewidth=0.9, alpha=0.65, label=f"U (pulse {pid_ov})")
+        ax_i.plot(t_o, i_o, linewidth=0.9, alpha=0.65, label=f"I (pulse {pid_ov})")
 
     ax_u.legend(loc="best", fontsize=9)
     ax_i.legend(loc="best", fontsize=9)